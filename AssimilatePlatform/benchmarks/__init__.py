@@ -0,0 +1 @@
+"""Microbenchmarks for the AssimilatePlatform solver hot paths."""
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+bench_core.py
+-------------
+AssimilatePlatform 求解热点的基准用例。
+
+运行（在 AssimilatePlatform 目录下）：
+    python -m benchmarks.bench_core                  # 仅计时
+    python -m benchmarks.bench_core --save baseline  # 写入 benchmarks/baselines/baseline.json
+    python -m benchmarks.bench_core --compare        # 与基线比较，回退时退出码为 1
+
+夹具：README 示例体系（m=1, YF=0.04, YN=0.002, V=100）：
+    - L/Lmin = 1.5 / 1.02 / 1.0005 ：富端夹点，级数 6 / 30 / 91；
+    - A = L/(mV) = 1 且调整 X0 ：平行线，级数 ~19 / ~200 / ~1900（接近 2000 上限）；
+    - 批量：m × L/Lmin × X0 网格共 10000 个工况；
+    - 非线性平衡：修正亨利定律（H=1.2, k=-0.5，切点夹点），L/Lmin = 1.5 / 1.02；
+    - 经济优化：线性 / 亨利平衡，两种填料，缺省 L/Lmin 网格 + 3 轮加密；
+    - NTU_OG：亨利平衡下 10000 个 L 的向量化求积。
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from core.equilibrium import compute_Lmin, HenryEquilibrium
+from core.stagewise import stepwise_stairs
+from core.kremser import kremser_search, kremser_rating
+from core.runner import run_absorption
+from core.batch import evaluate_cases, expand_grid
+from core.optimizer import AbsorberOptimizer
+from core.transfer_units import ntu_og
+from utils.sinks import NullSink
+
+from benchmarks.harness import case, main
+
+
+M, YF, YN, V = 1.0, 0.04, 0.002, 100.0
+
+
+def _pinch_case(factor):
+    X0 = 0.0
+    return compute_Lmin(V, YF, YN, M, X0) * factor, X0
+
+
+def _parallel_case(N):
+    # A = 1：N = (YF - YN) / (YN - m·X0)
+    return M * V, (YN - (YF - YN) / N) / M
+
+
+CASES = [
+    ("pinch_6", *_pinch_case(1.5)),
+    ("pinch_30", *_pinch_case(1.02)),
+    ("pinch_91", *_pinch_case(1.0005)),
+    ("A1_19", *_parallel_case(19)),
+    ("A1_200", *_parallel_case(200)),
+    ("A1_1900", *_parallel_case(1900)),
+]
+
+
+
+def _register():
+    for name, L, X0 in CASES:
+        @case(f"stepwise_stairs[{name}]")
+        def _stairs(L=L, X0=X0):
+            return lambda: stepwise_stairs(L, V, M, YF, YN, X0, cap=2000)[1]
+
+        @case(f"kremser_search[{name}]", repeat=3)
+        def _kremser(L=L, X0=X0):
+            return lambda: kremser_search(L, V, M, YF, YN, X0, cap=2000)
+
+        @case(f"kremser_rating[{name}]")
+        def _rating(L=L, X0=X0, N=int(name.rsplit("_", 1)[1])):
+            return lambda: kremser_rating(N, L, V, M, YF, X0)["YN"]
+
+    for name, L, X0 in (CASES[0], CASES[4]):
+        for plot in (False, True):
+            @case(f"run_absorption[{name},plot={plot}]", repeat=3)
+            def _run(L=L, X0=X0, plot=plot):
+                workdir = tempfile.mkdtemp(prefix="bench_absorption_")
+                cfg = {"m": M, "YF": YF, "YN_target": YN, "X0": X0, "V": V, "L": L,
+                       "HETP": 0.5, "max_stages_cap": 2000, "case_name": "bench", "plot": plot}
+
+                def fn():
+                    cwd = os.getcwd()
+                    os.chdir(workdir)            # run_absorption 写入 ./results
+                    try:
+                        return run_absorption(cfg)[1]["results"]["N_used"]
+                    finally:
+                        os.chdir(cwd)
+                return fn
+
+        @case(f"run_absorption[{name},sink=null]", repeat=3)
+        def _run_null(L=L, X0=X0):
+            cfg = {"m": M, "YF": YF, "YN_target": YN, "X0": X0, "V": V, "L": L,
+                   "HETP": 0.5, "max_stages_cap": 2000, "case_name": "bench"}
+            return lambda: run_absorption(cfg, sink=NullSink())[1]["results"]["N_used"]
+
+    @case("evaluate_cases[grid_10k]", repeat=3)
+    def _batch():
+        grid = expand_grid({"YF": YF, "YN_target": YN, "V": V, "HETP": 0.5},
+                           {"m": np.linspace(0.5, 2.0, 40), "L_factor": np.linspace(1.001, 3.0, 50),
+                            "X0": np.linspace(0.0, 0.0015, 5)})
+        return lambda: float(np.nansum(evaluate_cases(grid)["N_used"]))
+
+
+    eq = HenryEquilibrium(1.2, -0.5)
+    for factor in (1.5, 1.02):
+        L = compute_Lmin(V, 0.2, 0.01, eq, 0.0) * factor
+
+        @case(f"stepwise_stairs[henry,L/Lmin={factor}]")
+        def _nl_stairs(L=L):
+            return lambda: stepwise_stairs(L, V, eq, 0.2, 0.01, 0.0, cap=2000)[1]
+
+    @case("compute_Lmin[henry,tangent]", repeat=3)
+    def _nl_lmin():
+        return lambda: compute_Lmin(V, 0.2, 0.01, eq, 0.0)
+
+    @case("ntu_og[henry,10k]", repeat=3)
+    def _ntu():
+        L = compute_Lmin(V, 0.2, 0.01, eq, 0.0) * np.linspace(1.01, 3.0, 10000)
+        return lambda: float(np.sum(ntu_og(L, V, eq, 0.2, 0.01, 0.0)))
+
+    packings = [{"name": "rings", "HETP": 0.8, "cost_per_m": 30.0},
+                {"name": "structured", "HETP": 0.35, "cost_per_m": 90.0}]
+    for tag, cfg in (("linear", {"m": M, "YF": YF, "YN_target": YN, "X0": 0.0, "V": V}),
+                     ("henry", {"equilibrium": {"type": "henry", "H": 1.2, "k": -0.5},
+                                "YF": 0.2, "YN_target": 0.01, "X0": 0.0, "V": V})):
+
+        @case(f"economic_optimization[{tag}]", repeat=3)
+        def _opt(cfg=cfg):
+            return lambda: AbsorberOptimizer(cfg).economic_optimization(packings=packings)["C_opt"]
+
+
+_register()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
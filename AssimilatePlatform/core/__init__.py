@@ -1,19 +1,53 @@
 """Core algorithms for the Absorption Platform."""
 
-from .equilibrium import compute_Lmin, y_star, operating_y
-from .stagewise import stepwise_stairs
-from .kremser import kremser_search
+from .equilibrium import (compute_Lmin, y_star, operating_y, find_pinch, pinch_slopes, make_equilibrium,
+                          Equilibrium, LinearEquilibrium, PolynomialEquilibrium, HenryEquilibrium,
+                          TabulatedEquilibrium)
+from .stagewise import stepwise_stairs, iter_stairs, bottom_up_stairs, lockstep_stairs, StairArray
+from .kremser import (kremser_search, kremser_stages, kremser_stage_counts, kremser_rating,
+                      gas_below_stages, absorption_factor)
 from .streams import material_balance
 from .runner import run_absorption
+from .batch import evaluate_cases, run_batch, run_sweep, run_sweep_sharded, load_cases, expand_grid
+from .transfer_units import ntu_og, htu_og, transfer_unit_height
+from .optimizer import AbsorberOptimizer, run_optimization
 
 __all__ = [
     "compute_Lmin",
     "y_star",
     "operating_y",
+    "find_pinch",
+    "pinch_slopes",
+    "make_equilibrium",
+    "Equilibrium",
+    "LinearEquilibrium",
+    "PolynomialEquilibrium",
+    "HenryEquilibrium",
+    "TabulatedEquilibrium",
     "stepwise_stairs",
+    "iter_stairs",
+    "bottom_up_stairs",
+    "lockstep_stairs",
+    "StairArray",
     "kremser_search",
+    "kremser_stages",
+    "kremser_stage_counts",
+    "kremser_rating",
+    "gas_below_stages",
+    "absorption_factor",
     "material_balance",
     "run_absorption",
+    "evaluate_cases",
+    "run_batch",
+    "run_sweep",
+    "run_sweep_sharded",
+    "load_cases",
+    "expand_grid",
+    "ntu_og",
+    "htu_og",
+    "transfer_unit_height",
+    "AbsorberOptimizer",
+    "run_optimization",
 ]
 
 __version__ = "0.1.0"
\ No newline at end of file
@@ -0,0 +1,545 @@
+import os
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.io_utils import ensure_dir, now, load_config_any
+from utils.instrument import PROFILER
+from utils.sinks import CSVSink
+from utils.config import Sweep, load_study
+from utils.shards import ShardQueue
+
+from .equilibrium import Equilibrium, make_equilibrium, pinch_slopes
+from .stagewise import lockstep_stairs
+from .kremser import gas_below_stages, kremser_stage_counts, kremser_stages
+from .streams import material_balance
+from .transfer_units import HTU_KEYS, ntu_og, mean_slope, htu_og
+
+
+# 批量计算的输入列：(名称, 默认值)；默认值为 None 的列必须给出
+INPUT_FIELDS = (
+    ("m", None), ("YF", None), ("YN_target", None), ("X0", None), ("V", None),
+    ("L", 0.0), ("L_factor", 1.5), ("HETP", 0.5), ("max_stages_cap", 300),
+    # 传质单元法（可选，NaN 表示未给出）：HTU_OG 直接给定，或由 area + kYa [+ kXa] 求出
+    ("HTU_OG", np.nan), ("area", np.nan), ("kYa", np.nan), ("kXa", np.nan),
+)
+
+# 结果表列与文本格式
+RESULT_COLUMNS = (
+    ("case_name", None), ("status", None),
+    ("m", ".6g"), ("YF", ".8f"), ("YN", ".8f"), ("X0", ".8f"), ("V", ".6g"),
+    ("L", ".6g"), ("L_factor", ".4g"), ("HETP", ".4g"), ("max_stages_cap", None),
+    ("Lmin", ".8f"), ("L_used", ".8f"), ("L_ratio", ".4f"), ("absorption_factor", ".6f"),
+    ("N_kremser_continuous", ".4f"), ("N_kremser", ".0f"), ("N_used", ".0f"), ("H_total_m", ".4f"),
+    ("NTU_OG", ".4f"), ("HTU_OG", ".4g"), ("H_NTU_m", ".4f"),
+    ("absorbed_kmol_h", ".8f"), ("X1", ".8f"),
+    ("gas_in_total_kmol_h", ".6f"), ("gas_out_total_kmol_h", ".6f"),
+    ("liq_in_total_kmol_h", ".6f"), ("liq_out_total_kmol_h", ".6f"),
+)
+
+# 状态码（与 run_absorption 对单个工况的处理一一对应）
+#   ok           正常
+#   invalid      m、V 非正，或 YN_target ≥ YF
+#   invalid_Lmin L_min 计算无效（run_absorption 抛出 "L_min 计算无效。"）
+#   L_below_Lmin 给定 L < Lmin（run_absorption 抛出 "L=... < Lmin=..."）
+#   backtrack    YN < m·X0，塔顶即无推动力（逐级计算 X 回退）
+#   not_reached  max(cap, 2000) 级内达不到 YF，N_used 取 cap（与逐级计算跑满 cap 一致）
+#   step_failed  逐级计算中 X 回退、超过 1 或超出平衡数据范围（线性平衡由闭式解判断 X 是否超过 1）
+STATUSES = ("ok", "invalid", "invalid_Lmin", "L_below_Lmin", "backtrack", "not_reached", "step_failed")
+
+
+# ---------- 输入整理 ----------
+def _as_columns(cases):
+    """list[dict] / dict[str, 标量或序列] → (dict[str, list 或 ndarray], 工况数)"""
+    if isinstance(cases, dict):
+        seq = {k: v if isinstance(v, np.ndarray) else list(v)
+               for k, v in cases.items() if isinstance(v, (list, tuple, np.ndarray))}
+        lengths = {len(v) for v in seq.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"各列长度不一致：{sorted(lengths)}")
+        n = lengths.pop() if lengths else 1
+        return {k: seq.get(k, [v] * n) for k, v in cases.items()}, n
+    cases = list(cases)
+    keys = {k for c in cases for k in c}
+    return {k: [c.get(k) for c in cases] for k in keys}, len(cases)
+
+
+def case_arrays(cases, optional=()):
+    """
+    把工况整理为列数组（float），缺省列用 INPUT_FIELDS 的默认值填充。
+    cases 可为 list[dict]（每个 dict 与 run_absorption 的 cfg 相同）或 dict[列名, 标量/数组]。
+    optional 中的必填列缺省时填 NaN（如给定非线性平衡时的 m）。
+    返回：(arrays: dict[str, ndarray], names: list[str])
+    """
+    cols, n = _as_columns(cases)
+    if n == 0:
+        raise ValueError("工况为空。")
+    arrays = {}
+    for key, default in INPUT_FIELDS:
+        values = cols.get(key)
+        if values is None:
+            if key in optional:
+                values = [np.nan] * n
+            elif default is None:
+                raise KeyError(f"缺少必填参数：{key}")
+            else:
+                values = [default] * n
+        if isinstance(values, np.ndarray) and values.dtype.kind in "iuf":
+            arrays[key] = values.astype(float)      # 数值数组（如 expand_grid 输出）直接使用
+            continue
+        values = [default if v is None or v == "" else v for v in values]
+        if any(v is None for v in values):
+            raise KeyError(f"参数 {key} 存在空值")
+        arrays[key] = np.asarray(values, dtype=float)
+    arrays["max_stages_cap"] = np.maximum(1, arrays["max_stages_cap"].astype(int))
+    names = cols.get("case_name")
+    names = [None] * n if names is None else names
+    names = [str(s) if s not in (None, "") else f"case_{i + 1}" for i, s in enumerate(names)]
+    return arrays, names
+
+
+def expand_grid(base=None, grid=None):
+    """
+    全组合展开：base 为公共参数，grid 为 {参数: 取值列表}。
+    返回 dict[列名, ndarray]，可直接传给 evaluate_cases / run_batch。
+    """
+    base, grid = dict(base or {}), dict(grid or {})
+    if not grid:
+        return {k: np.atleast_1d(v) for k, v in base.items()}
+    keys = list(grid)
+    mesh = np.meshgrid(*(np.asarray(grid[k], dtype=float) for k in keys), indexing="ij")
+    cols = {k: g.ravel() for k, g in zip(keys, mesh)}
+    n = len(cols[keys[0]])
+    for k, v in base.items():
+        if k not in cols:
+            cols[k] = [v] * n if isinstance(v, str) else (np.full(n, v, dtype=float) if np.isscalar(v) else v)
+    if "case_name" not in base:
+        width = len(str(n))
+        cols["case_name"] = [f"case_{i + 1:0{width}d}" for i in range(n)]
+    return cols
+
+
+def load_cases(path):
+    """
+    读取批量工况文件：
+      .csv        每行一个工况，表头为参数名（空单元格取默认值）
+      .json/.yaml 工况列表 [{...}, ...]，或 {"cases": [...]}，或 {"base": {...}, "grid": {参数: [取值...]}}，
+                  或带 "sweep" 的配置（返回惰性展开的 Sweep，见 utils/config.py）
+    """
+    if os.path.splitext(path)[1].lower() == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            return [{k.strip(): v.strip() for k, v in row.items() if k} for row in csv.DictReader(f)]
+    data = load_config_any(path)
+    if isinstance(data, list):
+        return data
+    if "sweep" in data:
+        return load_study(data)
+    if "grid" in data:
+        return expand_grid(data.get("base"), data["grid"])
+    if "cases" in data:
+        return [{**data.get("base", {}), **c} for c in data["cases"]]
+    return [data]
+
+
+def shared_equilibrium(cases, equilibrium=None):
+    """
+    批量工况共用的平衡关系：显式给出的 equilibrium，或工况中的 "equilibrium" 项
+    （须全部相同）；都没有时返回 None（逐工况线性 Y* = mX）。
+    """
+    if equilibrium is not None:
+        return make_equilibrium({"equilibrium": equilibrium})
+    specs = _as_columns(cases)[0].get("equilibrium")
+    if specs is None:
+        return None
+    keys = {s if isinstance(s, Equilibrium) else json.dumps(s, sort_keys=True, default=str) for s in specs}
+    if len(keys) != 1 or specs[0] is None:
+        raise ValueError("批量计算要求所有工况使用同一平衡关系（equilibrium）。")
+    return make_equilibrium({"equilibrium": specs[0]})
+
+
+# ---------- 向量化计算 ----------
+def evaluate_cases(cases, equilibrium=None):
+    """
+    所有工况一次性向量化计算（不写任何文件）：
+      Lmin → L_used → Kremser 整数/连续级数 → 物料衡算 → 填料高度。
+    与逐个调用 run_absorption 的 summary["results"] 数值一致；
+    run_absorption 会报错的工况不抛异常，而是在 status 列标出，数值列为 NaN。
+    equilibrium（或工况中统一的 "equilibrium" 项）为非线性平衡时，Lmin 由向量化切点
+    夹点求解，级数由 lockstep_stairs 多工况同步逐级得到（无 Kremser 列）。
+    返回：dict[列名, ndarray]（列见 RESULT_COLUMNS）
+    """
+    eq = shared_equilibrium(cases, equilibrium)
+    if eq is not None and not eq.linear:
+        return _evaluate_nonlinear(cases, eq)
+    a, names = case_arrays(cases, optional=("m",) if eq is not None else ())
+    if eq is not None:
+        a["m"] = np.full(len(names), eq.m)
+    m, YF, YN, X0, V = a["m"], a["YF"], a["YN_target"], a["X0"], a["V"]
+    L_in, L_factor, HETP, cap = a["L"], a["L_factor"], a["HETP"], a["max_stages_cap"]
+    n = len(m)
+
+    with PROFILER.span("batch.Lmin"):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            valid = (m > 0) & (V > 0) & (YF > YN)
+            denom = YF / np.where(m > 0, m, 1.0) - X0
+            Lmin = np.where(denom > 0, V * (YF - YN) / denom, np.inf)
+        L_used = np.where(L_in <= 0, Lmin * L_factor, L_in)
+
+    status = np.full(n, "ok", dtype=object)
+    status[~valid] = "invalid"
+    status[valid & ~(np.isfinite(Lmin) & (Lmin > 0))] = "invalid_Lmin"
+    status[(status == "ok") & (L_in > 0) & (L_used < Lmin * (1.0 - 1e-9))] = "L_below_Lmin"
+    status[(status == "ok") & (YN - m * X0 <= 0)] = "backtrack"
+    ok = status == "ok"
+    L_used = np.where(ok, L_used, np.nan)
+
+    with PROFILER.span("batch.kremser"):
+        safe = dict(L=np.where(ok, L_used, 1.0), V=np.where(ok, V, 1.0), m=np.where(ok, m, 1.0))
+        N_int = kremser_stage_counts(safe["L"], safe["V"], safe["m"], YF, YN, X0,
+                                     cap=np.maximum(cap, 2000))
+        N_cont = np.asarray(kremser_stages(safe["L"], safe["V"], safe["m"], YF, YN, X0), dtype=float)
+    reached = np.isfinite(N_int)
+    status[ok & ~reached] = "not_reached"
+    N_used = np.where(reached, N_int, cap).astype(float)
+
+    with PROFILER.span("batch.stage_bounds"):
+        # 与逐级计算相同的越界判据：X 自塔顶向下递增，只需看最后一个未终止级 K 的 X_K = Y_{K-1}/m
+        # （cap 内达到 YF 时末级允许越界，K = N − 1；否则逐级跑满 cap 级，K = cap）
+        K = np.where(N_int <= cap, N_int - 1.0, np.floor(cap))
+        X_K = gas_below_stages(np.maximum(K - 1.0, 0.0), safe["L"], safe["V"], safe["m"], YN, X0) / safe["m"]
+        status[ok & (K >= 1) & (X_K > 1.0 + 1e-6)] = "step_failed"
+    ok &= status != "step_failed"
+
+    with PROFILER.span("batch.transfer_units"):
+        tu = _transfer_units(a, safe["L"], safe["V"], safe["m"], YF, YN, X0, safe["m"])
+
+    with PROFILER.span("batch.material_balance"):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            streams = material_balance(YF, YN, X0, V, L_used)
+
+    out = {
+        "case_name": np.array(names, dtype=object), "status": status,
+        "m": m, "YF": YF, "YN": YN, "X0": X0, "V": V,
+        "L": L_in, "L_factor": L_factor, "HETP": HETP, "max_stages_cap": cap,
+        "Lmin": np.where(np.isfinite(Lmin), Lmin, np.nan),
+        "L_used": L_used,
+        "L_ratio": L_used / Lmin,
+        "absorption_factor": safe["L"] / (safe["m"] * safe["V"]),
+        "N_kremser_continuous": N_cont,
+        "N_kremser": N_int,
+        "N_used": N_used,
+        "H_total_m": N_used * HETP,
+        **tu,
+        "absorbed_kmol_h": streams["absorbed"],
+        "X1": streams["X1"],
+        "gas_in_total_kmol_h": streams["gas_in_total"],
+        "gas_out_total_kmol_h": streams["gas_out_total"],
+        "liq_in_total_kmol_h": streams["liq_in_total"],
+        "liq_out_total_kmol_h": streams["liq_out_total"],
+    }
+    return _finish(out, ok)
+
+
+def _transfer_units(a, L, V, m, YF, YN, X0, slope):
+    """NTU_OG（对数平均闭式或向量化求积）与 HTU_OG（逐工况参数），L 须已对无效工况替换为安全值"""
+    NTU = ntu_og(L, V, m, YF, YN, X0)
+    HTU = htu_og({k: a[k] for k in HTU_KEYS if k in a}, L, V, slope)
+    return {"NTU_OG": np.where(np.isfinite(NTU), NTU, np.nan), "HTU_OG": HTU, "H_NTU_m": NTU * HTU}
+
+
+def _finish(out, ok):
+    """run_absorption 会报错的工况：数值结果置 NaN"""
+    n = len(ok)
+    for key in ("absorption_factor", "N_kremser_continuous", "N_kremser", "N_used", "H_total_m",
+                "NTU_OG", "HTU_OG", "H_NTU_m",
+                "absorbed_kmol_h", "X1", "gas_in_total_kmol_h", "gas_out_total_kmol_h",
+                "liq_in_total_kmol_h", "liq_out_total_kmol_h", "L_ratio"):
+        out[key] = np.where(ok, np.broadcast_to(out[key], (n,)), np.nan)
+    PROFILER.count("batch.cases", n)
+    return out
+
+
+def _evaluate_nonlinear(cases, eq):
+    """非线性平衡：向量化切点夹点求 Lmin，lockstep_stairs 同步逐级求级数"""
+    a, names = case_arrays(cases, optional=("m",))
+    YF, YN, X0, V = a["YF"], a["YN_target"], a["X0"], a["V"]
+    L_in, L_factor, HETP, cap = a["L"], a["L_factor"], a["HETP"], a["max_stages_cap"]
+    n = len(YF)
+
+    status = np.full(n, "ok", dtype=object)
+    valid = (V > 0) & (YF > YN)
+    status[~valid] = "invalid"
+    with PROFILER.span("batch.Lmin"):
+        Lmin = np.full(n, np.inf)
+        if valid.any():
+            Lmin[valid] = V[valid] * pinch_slopes(eq, YF[valid], YN[valid], X0[valid])
+        L_used = np.where(L_in <= 0, Lmin * L_factor, L_in)
+    status[valid & ~(np.isfinite(Lmin) & (Lmin > 0))] = "invalid_Lmin"
+    status[(status == "ok") & (L_in > 0) & (L_used < Lmin * (1.0 - 1e-9))] = "L_below_Lmin"
+    ok = status == "ok"
+    L_used = np.where(ok, L_used, np.nan)
+
+    N_used = np.full(n, np.nan)
+    with PROFILER.span("batch.stairs"):
+        if ok.any():
+            N, _, reached = lockstep_stairs(L_used[ok], V[ok], eq, YF[ok], YN[ok], X0[ok], cap=int(cap[ok].max()))
+            cap_ok = cap[ok]
+            reached &= N <= cap_ok
+            N_used[ok] = np.where(np.isnan(N), np.nan, np.where(reached, N, cap_ok))
+            idx = np.nonzero(ok)[0]
+            status[idx[np.isnan(N)]] = "step_failed"
+            status[idx[~np.isnan(N) & ~reached]] = "not_reached"
+    ok &= status != "step_failed"
+
+    with PROFILER.span("batch.transfer_units"):
+        tu = {k: np.full(n, np.nan) for k in ("NTU_OG", "HTU_OG", "H_NTU_m")}
+        if ok.any():
+            L_ok = L_used[ok]
+            slope = mean_slope(L_ok, V[ok], eq, YF[ok], YN[ok], X0[ok])
+            sub_a = {k: a[k][ok] for k in HTU_KEYS if k in a}
+            for k, v in _transfer_units(sub_a, L_ok, V[ok], eq, YF[ok], YN[ok], X0[ok], slope).items():
+                tu[k][ok] = v
+
+    with PROFILER.span("batch.material_balance"):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            streams = material_balance(YF, YN, X0, V, L_used)
+
+    nan = np.full(n, np.nan)
+    out = {
+        "case_name": np.array(names, dtype=object), "status": status,
+        "m": a["m"], "YF": YF, "YN": YN, "X0": X0, "V": V,
+        "L": L_in, "L_factor": L_factor, "HETP": HETP, "max_stages_cap": cap,
+        "Lmin": np.where(np.isfinite(Lmin), Lmin, np.nan),
+        "L_used": np.where(ok, L_used, np.nan),
+        "L_ratio": L_used / Lmin,
+        "absorption_factor": nan,
+        "N_kremser_continuous": nan,
+        "N_kremser": nan,
+        "N_used": N_used,
+        "H_total_m": N_used * HETP,
+        **tu,
+        "absorbed_kmol_h": streams["absorbed"],
+        "X1": streams["X1"],
+        "gas_in_total_kmol_h": streams["gas_in_total"],
+        "gas_out_total_kmol_h": streams["gas_out_total"],
+        "liq_in_total_kmol_h": streams["liq_in_total"],
+        "liq_out_total_kmol_h": streams["liq_out_total"],
+    }
+    return _finish(out, ok)
+
+
+# ---------- 批量运行（写一张汇总表） ----------
+def _case_cfg(results, i, plot, eq=None):
+    cfg = {
+        "case_name": results["case_name"][i],
+        "m": float(results["m"][i]), "YF": float(results["YF"][i]),
+        "YN_target": float(results["YN"][i]), "X0": float(results["X0"][i]),
+        "V": float(results["V"][i]), "L": float(results["L"][i]),
+        "L_factor": float(results["L_factor"][i]), "HETP": float(results["HETP"][i]),
+        "max_stages_cap": int(results["max_stages_cap"][i]), "plot": plot,
+    }
+    cfg.update({k: float(results[k][i]) for k in HTU_KEYS if k in results and np.isfinite(results[k][i])})
+    if eq is not None:
+        cfg["equilibrium"] = eq
+    return cfg
+
+
+def run_batch(cases, sink=None, name="batch", detail=False, plot=False, equilibrium=None):
+    """
+    批量吸收计算：evaluate_cases 一次算完全部工况，结果写成一张表 batch_results + batch_summary。
+    sink=None 时在 results/ 下新建 {时间戳}_{name} 目录并写 CSV；MemorySink/NullSink 不写文件。
+    detail=True 时另对每个 status 为 ok 的工况调用 run_absorption 生成各自的结果目录（阶梯表、日志；plot=True 时含图），
+    也可传入工况名列表，只为这些工况生成。
+    equilibrium：全部工况共用的平衡关系（Equilibrium 对象或配置 dict），缺省为各工况的线性 m。
+    返回：(outdir, results)，results 为 evaluate_cases 的列数组 dict
+    cases 为 Sweep 时转交 run_sweep 分块流式计算，返回 (outdir, summary)。
+    """
+    if isinstance(cases, Sweep):
+        if detail:
+            raise ValueError("sweep 配置不支持 detail（工况数可能极大），请改用显式工况列表。")
+        return run_sweep(cases, sink=sink, name=name, equilibrium=equilibrium)
+    with PROFILER.run("run_batch", case=name):
+        eq = shared_equilibrium(cases, equilibrium)
+        results = evaluate_cases(cases, eq)
+
+        if sink is None:
+            sink = CSVSink(os.path.join(ensure_dir("results"), f"{now()}_{name}"))
+        columns = [c for c, _ in RESULT_COLUMNS]
+        formats = [f for _, f in RESULT_COLUMNS]
+        with PROFILER.span("write.batch_results"):
+            cols = [results[c].tolist() for c in columns]
+            sink.write_table("batch_results", columns, list(zip(*cols)), formats=formats)
+
+        status = results["status"]
+        counts = {s: int(np.count_nonzero(status == s)) for s in STATUSES}
+        detail_dirs = {}
+        if detail:
+            from .runner import run_absorption
+            wanted = None if detail is True else set(detail)
+            for i in np.nonzero(status == "ok")[0]:
+                if wanted is not None and results["case_name"][i] not in wanted:
+                    continue
+                outdir, _ = run_absorption(_case_cfg(results, i, plot, eq))
+                detail_dirs[results["case_name"][i]] = outdir
+
+        ok = status == "ok"
+        summary = {
+            "name": name,
+            "n_cases": int(len(status)),
+            "equilibrium": eq.describe() if eq is not None else {"type": "linear", "m": "per case"},
+            "status_counts": counts,
+            "N_used_range": ([float(np.min(results["N_used"][ok])), float(np.max(results["N_used"][ok]))]
+                             if ok.any() else None),
+            "H_total_m_range": ([float(np.min(results["H_total_m"][ok])), float(np.max(results["H_total_m"][ok]))]
+                                if ok.any() else None),
+            "artifacts": {"batch_results": sink.artifact("batch_results"),
+                          "case_dirs": detail_dirs or None},
+        }
+        with PROFILER.span("write.summary"):
+            sink.write_json("batch_summary", summary)
+    return sink.folder, results
+
+
+# ---------- 参数扫描（惰性展开，分块流式计算） ----------
+def _range_update(acc, values):
+    values = values[np.isfinite(values)]
+    if values.size:
+        lo, hi = float(values.min()), float(values.max())
+        return [lo, hi] if acc is None else [min(acc[0], lo), max(acc[1], hi)]
+    return acc
+
+
+def _sweep_inputs(study, equilibrium):
+    """扫描共用的平衡关系与传质单元参数（标量）"""
+    if "equilibrium" in study.swept:
+        raise ValueError("扫描中所有工况须共用一个平衡关系，equilibrium 不能作为扫描参数。")
+    eq = shared_equilibrium({}, equilibrium or study.base.get("equilibrium"))
+    tu = {k: v for k, v in (study.base.get("transfer_units") or {}).items()
+          if k in HTU_KEYS and np.isscalar(v)}
+    return eq, tu
+
+
+def _sweep_block(study, eq, tu, sink, table, chunk_size, start=0, stop=None, tick=None):
+    """
+    计算工况 [start, stop)：按 chunk_size 分块 evaluate_cases，结果追加写入 sink 的 table 表。
+    每块之后调用 tick()（分片运行时刷新租约）。返回该段的状态计数与 N_used / H_total_m 范围。
+    """
+    keep = {k for k, _ in INPUT_FIELDS} | {"case_name"}
+    columns = [c for c, _ in RESULT_COLUMNS]
+    formats = [f for _, f in RESULT_COLUMNS]
+    counts = dict.fromkeys(STATUSES, 0)
+    N_range = H_range = None
+    for _, cols in study.chunks(chunk_size, start, stop):
+        cols = {**tu, **{k: v for k, v in cols.items() if k in keep}}
+        results = evaluate_cases(cols, eq)
+        with PROFILER.span("write.batch_results"):
+            sink.append_table(table, columns,
+                              list(zip(*(results[c].tolist() for c in columns))), formats=formats)
+        status = results["status"]
+        for s in STATUSES:
+            counts[s] += int(np.count_nonzero(status == s))
+        ok = status == "ok"
+        N_range = _range_update(N_range, results["N_used"][ok])
+        H_range = _range_update(H_range, results["H_total_m"][ok])
+        if tick is not None:
+            tick()
+    return {"status_counts": counts, "N_used_range": N_range, "H_total_m_range": H_range}
+
+
+def run_sweep(study, sink=None, name=None, chunk_size=100_000, equilibrium=None):
+    """
+    对 Sweep 按 chunk_size 分块：每块取列数组 → evaluate_cases → 追加写入 batch_results，
+    内存占用只与块大小有关（不生成逐工况 dict/对象），适合百万级工况。
+    study：utils.config.Sweep（或含 "sweep" 的配置 dict / 文件路径）。
+    返回：(outdir, summary)
+    """
+    if not isinstance(study, Sweep):
+        study = load_study(study)
+    name = name or study.name
+    eq, tu = _sweep_inputs(study, equilibrium)
+
+    with PROFILER.run("run_sweep", case=name):
+        if sink is None:
+            sink = CSVSink(os.path.join(ensure_dir("results"), f"{now()}_{name}"))
+        stats = _sweep_block(study, eq, tu, sink, "batch_results", chunk_size)
+        summary = {
+            "name": name,
+            "n_cases": len(study),
+            "sweep": study.describe(),
+            "equilibrium": eq.describe() if eq is not None else {"type": "linear", "m": "per case"},
+            **stats,
+            "artifacts": {"batch_results": sink.artifact("batch_results"), "case_dirs": None},
+        }
+        with PROFILER.span("write.summary"):
+            sink.write_json("batch_summary", summary)
+        sink.close()
+    return sink.folder, summary
+
+
+# ---------- 分片扫描（可续算；多进程 / 多台机器共享目录） ----------
+def _shard_worker(cfg, root, chunk_size, lease, equilibrium):
+    """一个工作进程：重建 Sweep，认领并计算分片直到没有可认领的分片，返回完成的分片数"""
+    study = load_study(cfg)
+    queue = ShardQueue(root, len(study), study.fingerprint, lease=lease)
+    eq, tu = _sweep_inputs(study, equilibrium)
+    sink = CSVSink(queue.shards)
+    return queue.work(lambda i, lo, hi: _sweep_block(study, eq, tu, sink, queue.temp_name(i), chunk_size,
+                                                     lo, hi, tick=lambda: queue.heartbeat(i)))
+
+
+def run_sweep_sharded(study, root, workers=1, shard_size=None, lease=600.0,
+                      chunk_size=100_000, equilibrium=None):
+    """
+    把扫描按 shard_size 个工况一片确定性地切分，在 root 目录下以文件认领的方式计算
+    （布局与认领规则见 utils/shards.py）：
+      - workers 个本地进程同时认领；其他机器对同一 root（共享文件系统）运行同一命令即可加入；
+      - 每个分片的结果表先写临时文件再原子改名，中断后重新运行只计算未完成的分片；
+      - 全部分片完成时按顺序合并为 root/batch_results.csv，并写 root/batch_summary.json。
+    study：含 "sweep" 的配置文件路径或 dict（工作进程据此重建 Sweep）。
+    返回：(root, summary)；仍有分片由其他机器计算中时 summary["complete"] 为 False，只含进度。
+    """
+    cfg = load_config_any(study) if isinstance(study, str) else study
+    sweep = load_study(cfg)
+    queue = ShardQueue(root, len(sweep), sweep.fingerprint, shard_size, lease)
+    args = (cfg, queue.root, chunk_size, lease, equilibrium)
+
+    with PROFILER.run("run_sweep_sharded", case=sweep.name):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                n_run = sum(f.result() for f in [pool.submit(_shard_worker, *args) for _ in range(workers)])
+        else:
+            n_run = _shard_worker(*args)
+
+        progress = queue.progress()
+        if progress["pending"]:
+            return queue.root, {"name": sweep.name, "complete": False, "shards_run": n_run, **progress}
+
+        stats = queue.stats()
+        counts = dict.fromkeys(STATUSES, 0)
+        N_range = H_range = None
+        for st in stats:
+            for s in STATUSES:
+                counts[s] += st["status_counts"][s]
+            N_range = _range_update(N_range, np.asarray(st["N_used_range"] or [], dtype=float))
+            H_range = _range_update(H_range, np.asarray(st["H_total_m_range"] or [], dtype=float))
+        with PROFILER.span("write.merge"):
+            queue.merge(os.path.join(queue.root, "batch_results.csv"))
+        eq, _ = _sweep_inputs(sweep, equilibrium)
+        summary = {
+            "name": sweep.name,
+            "complete": True,
+            "n_cases": len(sweep),
+            "sweep": sweep.describe(),
+            "equilibrium": eq.describe() if eq is not None else {"type": "linear", "m": "per case"},
+            "status_counts": counts,
+            "N_used_range": N_range,
+            "H_total_m_range": H_range,
+            "shards": {"n_shards": queue.n_shards, "shard_size": queue.shard_size, "shards_run": n_run,
+                       "hosts": sorted({st["host"] for st in stats}),
+                       "compute_seconds": sum(st["seconds"] for st in stats)},
+            "artifacts": {"batch_results": "batch_results.csv", "case_dirs": None},
+        }
+        CSVSink(queue.root).write_json("batch_summary", summary)
+    return queue.root, summary
@@ -1,5 +1,13 @@
+import math
+from bisect import bisect_right
+
+import numpy as np
+
+
 def y_star(m, x):
-    """Linear equilibrium line Y*=mX"""
+    """Equilibrium line Y*=mX (m may also be an Equilibrium object)"""
+    if isinstance(m, Equilibrium):
+        return m.y_star(x)
     return m * x
 
 def operating_y(L, V, x, YN, X0):
@@ -7,8 +15,413 @@ def operating_y(L, V, x, YN, X0):
     return (L / V) * x + (YN - (L / V) * X0)
 
 def compute_Lmin(V, YF, YN, m, X0):
-    """Minimum solvent rate from intersection of operating and equilibrium lines"""
+    """
+    Minimum solvent rate.
+    - linear Y*=mX: intersection of operating and equilibrium lines at the rich end
+    - Equilibrium object: tangent/rich-end pinch from find_pinch()
+    """
+    if isinstance(m, Equilibrium):
+        if not m.linear:
+            return V * find_pinch(m, YF, YN, X0)[0]
+        m = m.m
     denom = (YF / m) - X0
     if denom <= 0:
         return float("inf")
-    return V * (YF - YN) / denom
\ No newline at end of file
+    return V * (YF - YN) / denom
+
+
+# ---------- 平衡关系对象 ----------
+class Equilibrium:
+    """
+    平衡线 Y* = f(X)（摩尔比），要求在 [X_min, X_max] 上严格单调递增（X_min 缺省为 0）。
+    子类实现：
+        y_star(X)  向量化正函数        _y1(x)  标量正函数（纯 Python，逐级计算用）
+        slope(X)   向量化导数          _dy1(x) 标量导数
+    反函数 x_star / x_star1 由基类提供：预先在 X 网格上制表（单调），反函数按
+    三次 Hermite 插值（节点斜率 dX/dY = 1/f'(X)），查表即得，无需迭代。
+    """
+
+    linear = False
+    kind = "equilibrium"
+    _TABLE_POINTS = 4097
+
+    X_min = 0.0
+
+    def __init__(self, X_max=1.0):
+        self.X_max = float(X_max)
+        self._X_tab = None
+
+    # ---------- 子类接口 ----------
+    def y_star(self, X):
+        raise NotImplementedError
+
+    def slope(self, X):
+        raise NotImplementedError
+
+    def _y1(self, x):
+        return float(self.y_star(x))
+
+    def _dy1(self, x):
+        return float(self.slope(x))
+
+    def describe(self):
+        return {"type": self.kind, "X_max": self.X_max}
+
+    # ---------- 反函数（单调表 + 三次 Hermite） ----------
+    def _table(self):
+        if self._X_tab is None:
+            X = np.linspace(self.X_min, self.X_max, self._TABLE_POINTS)
+            Y = np.asarray(self.y_star(X), dtype=float)
+            if not np.all(np.isfinite(Y)) or np.any(np.diff(Y) <= 0):
+                raise ValueError(f"{self.kind} 平衡线在 [{self.X_min:g}, {self.X_max:g}] 上"
+                                 "必须有限且严格单调递增。")
+            h, dX = np.diff(Y), np.diff(X)
+            with np.errstate(divide="ignore"):
+                s = 1.0 / np.asarray(self.slope(X), dtype=float)
+            # 斜率为 0（如 Y = cX² 在 X=0）时反函数斜率无界，该节点改用割线斜率
+            secant = dX / h
+            bad = ~np.isfinite(s) | (s <= 0)
+            s[bad] = np.concatenate((secant[:1], 0.5 * (secant[:-1] + secant[1:]), secant[-1:]))[bad]
+            s0, s1, q = s[:-1], s[1:], dX / h
+            self._X_tab, self._Y_tab = X, Y
+            self._coef = np.column_stack((X[:-1], s0, (3 * q - 2 * s0 - s1) / h, (s0 + s1 - 2 * q) / h ** 2))
+            self._Yl, self._cl = Y.tolist(), self._coef.tolist()
+        return self._X_tab, self._Y_tab
+
+    @property
+    def Y_max(self):
+        return float(self._table()[1][-1])
+
+    def x_star(self, Y):
+        """X* = f⁻¹(Y)，向量化；超出 [Y(X_min), Y(X_max)] 时为 NaN"""
+        _, Y_tab = self._table()
+        Y = np.asarray(Y, dtype=float)
+        i = np.clip(np.searchsorted(Y_tab, Y, side="right") - 1, 0, len(Y_tab) - 2)
+        d = Y - Y_tab[i]
+        a0, a1, a2, a3 = self._coef[i].T
+        X = ((a3 * d + a2) * d + a1) * d + a0
+        X = np.where((Y >= Y_tab[0]) & (Y <= Y_tab[-1]), X, np.nan)
+        return X if X.ndim else float(X)
+
+    def x_star1(self, Y):
+        """标量反函数（二分 + Horner，纯 Python）；超出平衡数据范围时抛出 RuntimeError"""
+        if self._X_tab is None:
+            self._table()
+        Yl = self._Yl
+        if not Yl[0] <= Y <= Yl[-1]:
+            raise RuntimeError(f"Y={Y:.6g} 超出平衡线范围 [{Yl[0]:.6g}, {Yl[-1]:.6g}]"
+                               f"（X_max={self.X_max:g}），请扩大平衡数据/X_max 或检查输入。")
+        i = bisect_right(Yl, Y) - 1
+        if i >= len(Yl) - 1:
+            i -= 1
+        a0, a1, a2, a3 = self._cl[i]
+        d = Y - Yl[i]
+        return ((a3 * d + a2) * d + a1) * d + a0
+
+
+class LinearEquilibrium(Equilibrium):
+    """Y* = mX（Kremser 解析解与闭式逐级计算仍然适用）"""
+
+    linear = True
+    kind = "linear"
+
+    def __init__(self, m, X_max=1.0):
+        if m <= 0:
+            raise RuntimeError("m 必须为正。请检查平衡式 Y* = m X 的 m。")
+        super().__init__(X_max)
+        self.m = float(m)
+
+    def y_star(self, X):
+        return np.multiply(self.m, X)
+
+    def slope(self, X):
+        return np.full_like(np.asarray(X, dtype=float), self.m)
+
+    def _y1(self, x):
+        return self.m * x
+
+    def _dy1(self, x):
+        return self.m
+
+    def x_star(self, Y):
+        return np.divide(Y, self.m)
+
+    def x_star1(self, Y):
+        return Y / self.m
+
+    def describe(self):
+        return {"type": self.kind, "m": self.m}
+
+
+class PolynomialEquilibrium(Equilibrium):
+    """
+    Y* = c0 + c1·X + c2·X² + …（coeffs 按升幂），适用于关联式或实验数据的多项式拟合。
+    """
+
+    kind = "polynomial"
+
+    def __init__(self, coeffs, X_max=1.0):
+        super().__init__(X_max)
+        self.coeffs = [float(c) for c in coeffs]
+        if not self.coeffs:
+            raise ValueError("多项式系数不能为空。")
+        self._d = [k * c for k, c in enumerate(self.coeffs)][1:] or [0.0]
+        self._table()
+
+    @classmethod
+    def fit(cls, X, Y, deg=3):
+        """最小二乘拟合平衡数据（X_max 取数据最大值）"""
+        X, Y = np.asarray(X, dtype=float), np.asarray(Y, dtype=float)
+        return cls(np.polynomial.polynomial.polyfit(X, Y, deg), X_max=float(X.max()))
+
+    def y_star(self, X):
+        return np.polynomial.polynomial.polyval(np.asarray(X, dtype=float), self.coeffs)
+
+    def slope(self, X):
+        return np.polynomial.polynomial.polyval(np.asarray(X, dtype=float), self._d)
+
+    def _y1(self, x):
+        y = 0.0
+        for c in reversed(self.coeffs):
+            y = y * x + c
+        return y
+
+    def _dy1(self, x):
+        y = 0.0
+        for c in reversed(self._d):
+            y = y * x + c
+        return y
+
+    def describe(self):
+        return {"type": self.kind, "coeffs": self.coeffs, "X_max": self.X_max}
+
+
+class HenryEquilibrium(Equilibrium):
+    """
+    亨利定律（摩尔分率）加活度修正，换算为摩尔比：
+        y = H·x·exp(k·x)，x = X/(1+X)，Y* = y/(1-y)
+    k = 0 时即摩尔分率下的亨利定律；k ≠ 0 近似描述非理想溶液的偏离。
+    X_max 缺省取 y = 0.95 处（高浓度端 Y* 发散之前）。
+    """
+
+    kind = "henry"
+
+    def __init__(self, H, k=0.0, X_max=None):
+        if H <= 0:
+            raise ValueError("亨利系数 H 必须为正。")
+        self.H, self.k = float(H), float(k)
+        if X_max is None:
+            X_max = self._X_at_y(0.95)
+        super().__init__(X_max)
+        self._table()
+
+    def _X_at_y(self, y_target):
+        # 二分求 y(x) = y_target；x → 1 仍达不到时 Y* 处处有限，取 X_max = 99（x = 0.99）
+        lo, hi = 0.0, 1.0
+        if self.H * math.exp(self.k) < y_target:
+            return 99.0
+        for _ in range(100):
+            mid = 0.5 * (lo + hi)
+            if self.H * mid * math.exp(self.k * mid) < y_target:
+                lo = mid
+            else:
+                hi = mid
+        return lo / (1.0 - lo)
+
+    def y_star(self, X):
+        X = np.asarray(X, dtype=float)
+        x = X / (1.0 + X)
+        y = self.H * x * np.exp(self.k * x)
+        return y / (1.0 - y)
+
+    def slope(self, X):
+        X = np.asarray(X, dtype=float)
+        x = X / (1.0 + X)
+        y = self.H * x * np.exp(self.k * x)
+        dy_dx = self.H * np.exp(self.k * x) * (1.0 + self.k * x)
+        return dy_dx / (1.0 - y) ** 2 / (1.0 + X) ** 2
+
+    def _y1(self, X):
+        x = X / (1.0 + X)
+        y = self.H * x * math.exp(self.k * x)
+        return y / (1.0 - y)
+
+    def _dy1(self, X):
+        x = X / (1.0 + X)
+        e = math.exp(self.k * x)
+        y = self.H * x * e
+        return self.H * e * (1.0 + self.k * x) / (1.0 - y) ** 2 / (1.0 + X) ** 2
+
+    def describe(self):
+        return {"type": self.kind, "H": self.H, "k": self.k, "X_max": self.X_max}
+
+
+class TabulatedEquilibrium(Equilibrium):
+    """
+    平衡数据表 (X, Y)，PCHIP 保单调插值（不会在数据点之间产生虚假的极值）。
+    标量计算直接使用分段三次多项式系数（二分 + Horner），不经过 scipy 调用。
+    """
+
+    kind = "table"
+
+    def __init__(self, X, Y):
+        from scipy.interpolate import PchipInterpolator
+
+        X, Y = np.asarray(X, dtype=float), np.asarray(Y, dtype=float)
+        order = np.argsort(X)
+        X, Y = X[order], Y[order]
+        if len(X) < 2 or np.any(np.diff(X) <= 0) or np.any(np.diff(Y) <= 0):
+            raise ValueError("平衡数据表需至少 2 个点，且 X、Y 均严格递增。")
+        self.X_data, self.Y_data = X, Y
+        self._f = PchipInterpolator(X, Y, extrapolate=False)
+        self._df = self._f.derivative()
+        self._breaks = X.tolist()
+        self._c = self._f.c.T.tolist()          # 每段 [c3, c2, c1, c0]
+        super().__init__(X[-1])
+        self.X_min = float(X[0])
+        self._table()
+
+    @classmethod
+    def from_csv(cls, path, x_col="X", y_col="Y"):
+        import csv
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+        return cls([float(r[x_col]) for r in rows], [float(r[y_col]) for r in rows])
+
+    def y_star(self, X):
+        return self._f(np.asarray(X, dtype=float))
+
+    def slope(self, X):
+        return self._df(np.asarray(X, dtype=float))
+
+    def _seg(self, x):
+        b = self._breaks
+        i = min(max(bisect_right(b, x) - 1, 0), len(b) - 2)
+        return x - b[i], self._c[i]
+
+    def _y1(self, x):
+        if not self._breaks[0] <= x <= self._breaks[-1]:
+            raise RuntimeError(f"X={x:.6g} 超出平衡数据范围 [{self._breaks[0]:.6g}, {self._breaks[-1]:.6g}]。")
+        dx, (c3, c2, c1, c0) = self._seg(x)
+        return ((c3 * dx + c2) * dx + c1) * dx + c0
+
+    def _dy1(self, x):
+        dx, (c3, c2, c1, _) = self._seg(x)
+        return (3.0 * c3 * dx + 2.0 * c2) * dx + c1
+
+    def describe(self):
+        return {"type": self.kind, "points": len(self._breaks), "X_max": self.X_max}
+
+
+EQUILIBRIA = {"linear": LinearEquilibrium, "polynomial": PolynomialEquilibrium,
+              "henry": HenryEquilibrium, "table": TabulatedEquilibrium}
+
+
+def make_equilibrium(cfg):
+    """
+    由配置构造平衡关系：
+      cfg["equilibrium"] 缺省时为线性 Y* = cfg["m"]·X；否则为 dict：
+        {"type": "linear", "m": 1.2}
+        {"type": "polynomial", "coeffs": [c0, c1, ...], "X_max": 0.5}
+        {"type": "henry", "H": 1.2, "k": 0.3}
+        {"type": "table", "X": [...], "Y": [...]}  或  {"type": "table", "file": "eq.csv"}
+    """
+    spec = cfg.get("equilibrium")
+    if spec is None:
+        return LinearEquilibrium(float(cfg["m"]))
+    if isinstance(spec, Equilibrium):
+        return spec
+    spec = dict(spec)
+    kind = spec.pop("type", "linear")
+    if kind not in EQUILIBRIA:
+        raise ValueError(f"unknown equilibrium type {kind!r}, choose from {sorted(EQUILIBRIA)}")
+    if kind == "table" and "file" in spec:
+        return TabulatedEquilibrium.from_csv(spec["file"], spec.get("x_col", "X"), spec.get("y_col", "Y"))
+    return EQUILIBRIA[kind](**spec)
+
+
+# ---------- 最小液气比（切点/富端夹点） ----------
+def find_pinch(eq, YF, YN, X0, n=257):
+    """
+    操作线过塔顶 (X0, YN)，需在 (X0, X1] 上始终不低于平衡线；最小斜率
+        (L/V)min = max_{X0 < X ≤ X*(YF)} g(X)，  g(X) = (Y*(X) - YN)/(X - X0)
+    先在 n 个点上向量化求 g 的最大值，内部极大（切点夹点）再用有界 Brent 精化。
+    返回：(slope_min, X_pinch, kind)，kind 为 "rich_end" / "tangent"；不可行时 slope 为 inf。
+    """
+    if eq.linear:
+        X_end = YF / eq.m
+        return ((YF - YN) / (X_end - X0) if X_end > X0 else float("inf")), X_end, "rich_end"
+    if eq._y1(max(X0, 0.0)) >= YN:
+        return float("inf"), X0, "top"
+    X_end = eq.x_star(YF)
+    if not math.isfinite(X_end) or X_end <= X0:
+        return float("inf"), X_end, "rich_end"
+
+    X = X0 + (X_end - X0) * np.linspace(0.0, 1.0, n)[1:]
+    g = (eq.y_star(X) - YN) / (X - X0)
+    g[-1] = (YF - YN) / (X_end - X0)
+    k = int(np.argmax(g))
+    if k == len(g) - 1:
+        return float(g[-1]), float(X_end), "rich_end"
+
+    from scipy.optimize import minimize_scalar
+    lo = X[k - 1] if k > 0 else X0 + 1e-12 * (X_end - X0)
+    res = minimize_scalar(lambda x: -(eq._y1(x) - YN) / (x - X0), bounds=(lo, X[k + 1]),
+                          method="bounded", options={"xatol": 1e-12 * max(X_end, 1.0)})
+    if -res.fun >= g[k]:
+        return float(-res.fun), float(res.x), "tangent"
+    return float(g[k]), float(X[k]), "tangent"
+
+
+def pinch_slopes(eq, YF, YN, X0, n=257, iters=60):
+    """
+    find_pinch 的多工况向量化版本（共用一个 Equilibrium，YF/YN/X0 可为数组）：
+    每个工况在 n 个点上求 g(X) 的最大值，内部极大再用向量化黄金分割精化。
+    返回：(L/V)min 数组，不可行为 inf。
+    """
+    YF, YN, X0 = (a.ravel() for a in np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (YF, YN, X0))))
+    if eq.linear:
+        X_end = YF / eq.m
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(X_end > X0, (YF - YN) / (X_end - X0), np.inf)
+
+    X_end = np.asarray(eq.x_star(YF), dtype=float)
+    with np.errstate(invalid="ignore"):
+        ok = np.isfinite(X_end) & (X_end > X0) & (eq.y_star(np.maximum(X0, eq.X_min)) < YN)
+    out = np.full(len(YF), np.inf)
+    if not ok.any():
+        return out
+    YF, YN, X0, X_end = YF[ok], YN[ok], X0[ok], X_end[ok]
+
+    span = (X_end - X0)[:, None]
+    t = np.linspace(0.0, 1.0, n)[1:]
+    X = X0[:, None] + span * t
+    g = (eq.y_star(X) - YN[:, None]) / (X - X0[:, None])
+    g[:, -1] = (YF - YN) / (X_end - X0)
+    k = np.argmax(g, axis=1)
+    best = g[np.arange(len(k)), k]
+
+    inner = k < len(t) - 1
+    if inner.any():
+        rows = np.nonzero(inner)[0]
+        ki = k[rows]
+        lo = X0[rows] + span[rows, 0] * np.where(ki > 0, t[np.maximum(ki - 1, 0)], 1e-12)
+        hi = X0[rows] + span[rows, 0] * t[ki + 1]
+        x0, yn = X0[rows], YN[rows]
+        gr = (math.sqrt(5.0) - 1.0) / 2.0
+        c, d = hi - gr * (hi - lo), lo + gr * (hi - lo)
+        gc, gd = (eq.y_star(c) - yn) / (c - x0), (eq.y_star(d) - yn) / (d - x0)
+        for _ in range(iters):
+            left = gc > gd                       # 最大值在 [lo, d]
+            hi = np.where(left, d, hi)
+            lo = np.where(left, lo, c)
+            c_new = np.where(left, hi - gr * (hi - lo), d)
+            d_new = np.where(left, c, lo + gr * (hi - lo))
+            x_new = np.where(left, c_new, d_new)
+            g_new = (eq.y_star(x_new) - yn) / (x_new - x0)
+            gc, gd = np.where(left, g_new, gd), np.where(left, gc, g_new)
+            c, d = c_new, d_new
+        best[rows] = np.maximum(best[rows], np.maximum(gc, gd))
+    out[ok] = best
+    return out
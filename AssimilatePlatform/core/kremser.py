@@ -1,9 +1,130 @@
-from .stagewise import stepwise_stairs
+import math
+
+import numpy as np
+
+from utils.instrument import PROFILER
+
+
+# 与 stepwise_stairs 逐级结果一致的解析解（线性平衡 Y* = mX）：
+#   吸收因子 A = L/(mV)，塔顶推动力 δ = YN - m·X0，操作线截距 b = YN - (L/V)·X0
+#   逐级递推 Y_{k+1} = A·Y_k + b，Y_1 = YN  ⇒  第 n 级下方气相
+#       Y_{n+1} = A^n·YN + b·S_n，  S_n = 1 + A + … + A^{n-1}
+#   Kremser:  N = ln[ (YF - YN)(1 - 1/A)/δ + 1 ] / ln A     （A ≠ 1）
+#             N = (YF - YN) / δ                             （A = 1）
+_A_EPS = 1e-12
+
+
+def absorption_factor(L, V, m):
+    """吸收因子 A = L / (mV)"""
+    return L / (m * V)
+
+
+def _geom_sum(A, n):
+    """S_n = Σ_{k<n} A^k，A→1 时数值稳定"""
+    d = A - 1.0
+    if abs(d) < _A_EPS:
+        return float(n)
+    return math.expm1(n * math.log1p(d)) / d
+
+
+def _gas_below(n, L, V, m, YN, X0):
+    """第 n 级下方（进入第 n 级）的气相摩尔比 Y_{n+1}"""
+    A = absorption_factor(L, V, m)
+    return A ** n * YN + (YN - L / V * X0) * _geom_sum(A, n)
+
+
+def kremser_stages(L, V, m, YF, YN, X0):
+    """
+    连续（非整数）理论级数，支持 numpy 数组广播（如对 L 扫描）。
+    δ ≤ 0 或 A<1 且 YF 超过夹点（L ≤ Lmin）时返回 inf。
+    """
+    L, V, m, YF, YN, X0 = np.broadcast_arrays(*(np.asarray(v, dtype=float)
+                                                 for v in (L, V, m, YF, YN, X0)))
+    A = L / (m * V)
+    delta = YN - m * X0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = (YF - YN) * (1.0 - 1.0 / A) / delta
+        near_one = np.abs(A - 1.0) < _A_EPS
+        N = np.where(near_one, (YF - YN) / delta, np.log1p(u) / np.log(np.where(near_one, 2.0, A)))
+    N = np.where((delta > 0) & (u > -1.0) & np.isfinite(N), N, np.inf)
+    return N if N.ndim else float(N)
+
 
 def kremser_search(L, V, m, YF, YN, X0, cap=2000):
-    """整数级数搜索"""
-    for N in range(1, cap):
-        stairs, n_calc, X1 = stepwise_stairs(L, V, m, YF, YN, X0, cap=N)
-        if stairs[-1]["Y"] >= YF - 1e-8:
-            return N
-    return float("inf")
\ No newline at end of file
+    """
+    整数理论级数（与 stepwise_stairs 的终止判据一致），O(1)：
+    满足 Y_{N+1} ≥ YF 的最小 N；超过 cap 或不可达时返回 inf。
+    """
+    n_real = kremser_stages(L, V, m, YF - 1e-8, YN, X0)
+    if not math.isfinite(n_real) or n_real >= cap:
+        PROFILER.trace("kremser", A=absorption_factor(L, V, m), N=float("inf"))
+        return float("inf")
+    N = max(1, math.ceil(n_real - 1e-9))
+    # 取整边界处按逐级判据校正 ±1
+    if _gas_below(N, L, V, m, YN, X0) < YF - 1e-8:
+        N += 1
+    elif N > 1 and _gas_below(N - 1, L, V, m, YN, X0) >= YF - 1e-8:
+        N -= 1
+    PROFILER.trace("kremser", A=absorption_factor(L, V, m), N=N)
+    return N if N < cap else float("inf")
+
+
+def gas_below_stages(n, L, V, m, YN, X0):
+    """
+    _gas_below 的向量化版本（参数可广播）：自塔顶逐级 n 级后下方的气相 Y = A^n·YN + b·S_n。
+    第 k 级液相 X_k = Y(k-1)/m。
+    """
+    n, L, V, m, YN, X0 = np.broadcast_arrays(*(np.asarray(v, dtype=float)
+                                                for v in (n, L, V, m, YN, X0)))
+    A = L / (m * V)
+    d = A - 1.0
+    near = np.abs(d) < _A_EPS
+    la = np.log1p(np.where(near, 0.0, d))
+    with np.errstate(over="ignore", invalid="ignore"):
+        S = np.where(near, n, np.expm1(n * la) / np.where(near, 1.0, d))
+        return np.exp(n * la) * YN + (YN - L / V * X0) * S
+
+
+def kremser_stage_counts(L, V, m, YF, YN, X0, cap=2000):
+    """
+    kremser_search 的向量化版本（参数可广播）：整数理论级数数组，超过 cap 或不可达为 inf。
+    """
+    L, V, m, YF, YN, X0 = np.broadcast_arrays(*(np.asarray(v, dtype=float)
+                                                 for v in (L, V, m, YF, YN, X0)))
+    n_real = np.asarray(kremser_stages(L, V, m, YF - 1e-8, YN, X0), dtype=float)
+    ok = np.isfinite(n_real) & (n_real < cap)
+    N = np.where(ok, np.maximum(1.0, np.ceil(np.where(ok, n_real, 1.0) - 1e-9)), 1.0)
+
+    target = YF - 1e-8
+    N = N + (gas_below_stages(N, L, V, m, YN, X0) < target)
+    N = N - ((N > 1) & (gas_below_stages(N - 1, L, V, m, YN, X0) >= target))
+    return np.where(ok & (N < cap), N, np.inf)
+
+
+def kremser_rating(N, L, V, m, YF, X0):
+    """
+    校核模式：给定理论级数 N 与吸收剂量 L，求可达到的出口气相 YN 与塔底液相 X1。
+        YN = (YF + (L/V)·X0·S_N) / (A^N + S_N)
+        X1 = X0 + V(YF - YN)/L
+    返回：dict(YN, X1, A, absorbed, recovery)
+    """
+    if N < 0 or L <= 0 or V <= 0 or m <= 0:
+        raise ValueError("N ≥ 0，L、V、m 必须为正。")
+    A = absorption_factor(L, V, m)
+    r = L / V
+    if A > 1.0 + _A_EPS:
+        # 分子分母同除 A^N，避免大 N 时 A^N 溢出
+        t = math.exp(-N * math.log(A))
+        St = -math.expm1(-N * math.log1p(A - 1.0)) / (A - 1.0)
+        YN = (YF * t + r * X0 * St) / (1.0 + St)
+    else:
+        S = _geom_sum(A, N)
+        YN = (YF + r * X0 * S) / (A ** N + S)
+    X1 = X0 + V * (YF - YN) / L
+    return {
+        "YN": YN,
+        "X1": X1,
+        "A": A,
+        "absorbed": V * (YF - YN),
+        "recovery": (YF - YN) / YF if YF > 0 else 0.0,
+    }
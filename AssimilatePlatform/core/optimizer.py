@@ -0,0 +1,230 @@
+import os
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.io_utils import ensure_dir, now, copy_file
+from utils.instrument import PROFILER
+from utils.sinks import CSVSink
+from utils.plot_mt import draw_cost_curves
+
+from .equilibrium import compute_Lmin, make_equilibrium
+from .kremser import kremser_stage_counts, kremser_stages
+from .stagewise import lockstep_stairs
+from .transfer_units import HTU_KEYS, ntu_og, mean_slope, htu_og
+
+
+# 经济参数缺省值（单位自洽即可，如 元/h）：
+#   solvent_cost  每 kmol/h 吸收剂循环（泵送、补充）
+#   regen_cost    每 kmol/h 吸收剂再生（解吸塔显热/汽提蒸汽，正比于循环量）
+#   height_cost   每 m 填料层（折算到小时的设备 + 填料投资），packings 未给出时使用
+DEFAULT_ECONOMICS = {"solvent_cost": 1.0, "regen_cost": 2.0, "height_cost": 50.0}
+
+# L/Lmin 粗网格：factor - 1 在 [0.01, 3] 上对数均布
+DEFAULT_FACTORS = 1.0 + np.logspace(-2, math.log10(3.0), 40)
+
+
+def _lockstep_chunk(task):
+    L, V, eq, YF, YN, X0, cap = task
+    N, _, reached = lockstep_stairs(L, V, eq, YF, YN, X0, cap=cap)
+    return np.where(reached, N, np.nan)
+
+
+class AbsorberOptimizer:
+    """
+    吸收塔经济优化：在 L/Lmin × 填料上最小化
+        C = (solvent_cost + regen_cost)·L + cost_per_m(packing)·H(L, packing)
+    H 按填料给出的参数取 N(L)·HETP（理论级）或 NTU_OG(L)·HTU_OG(L)（传质单元，HTU 可随 L 变化）。
+    N(L) 与填料无关，每个 L 只算一次：线性平衡用 Kremser 闭式（向量化），
+    非线性平衡用 lockstep_stairs 多工况同步逐级（max_workers > 1 时分块多进程）；
+    NTU_OG 为对数平均闭式或向量化求积。
+
+    参数：
+        cfg : dict            与 run_absorption 相同的配置（m/equilibrium, YF, YN_target, X0, V, HETP, ...）
+        economics : dict      经济参数，缺省取 cfg.get("economics") 与 DEFAULT_ECONOMICS
+        max_workers : int     非线性平衡时的并行进程数（None/1 为当前进程）
+    """
+
+    def __init__(self, cfg, economics=None, max_workers=None):
+        self.cfg = cfg
+        self.eq = make_equilibrium(cfg)
+        self.YF = float(cfg["YF"])
+        self.YN = float(cfg["YN_target"])
+        self.X0 = float(cfg["X0"])
+        self.V = float(cfg["V"])
+        self.cap = int(cfg.get("max_stages_cap", 300))
+        self.economics = {**DEFAULT_ECONOMICS, **(cfg.get("economics") or {}), **(economics or {})}
+        self.max_workers = max_workers
+        self._N = {}            # L -> N 缓存（细化阶段与粗网格共享）
+
+        m = self.eq.m if self.eq.linear else self.eq
+        self.Lmin = compute_Lmin(self.V, self.YF, self.YN, m, self.X0)
+        if not math.isfinite(self.Lmin) or self.Lmin <= 0:
+            raise RuntimeError("L_min 计算无效。")
+
+    # ---------- 填料选项 ----------
+    def packings(self, packings=None):
+        """
+        填料选项列表 [{"name", "HETP", "cost_per_m"}, ...]；给出 HTU_OG（或 HTU_G/HTU_L、
+        area + kYa/kXa，见 htu_og）而非 HETP 的填料按传质单元法计算高度。
+        缺省为 economics["packings"]，再缺省为配置中的 HETP + height_cost。
+        """
+        packings = packings or self.economics.get("packings")
+        if not packings:
+            packings = [{"name": "default", "HETP": float(self.cfg.get("HETP", 0.5)),
+                         "cost_per_m": self.economics["height_cost"]}]
+        out = []
+        for i, p in enumerate(packings):
+            name = str(p.get("name", f"packing_{i + 1}"))
+            item = {"name": name, "HETP": None,
+                    "cost_per_m": float(p.get("cost_per_m", self.economics["height_cost"]))}
+            if p.get("HETP") is not None:
+                item["HETP"] = float(p["HETP"])
+                if item["HETP"] <= 0:
+                    raise ValueError(f"填料 {name} 的 HETP 必须为正。")
+            else:
+                item["transfer_units"] = {k: p[k] for k in HTU_KEYS if k in p}
+                if not item["transfer_units"]:
+                    raise ValueError(f"填料 {name} 需给出 HETP 或 HTU_OG（或 area + kYa）。")
+            out.append(item)
+        return out
+
+    # ---------- 级数 ----------
+    def stage_counts(self, L):
+        """各 L 下的理论级数（数组）；cap 内达不到时为 NaN"""
+        L = np.asarray(L, dtype=float)
+        todo = np.array([l for l in np.unique(L) if l not in self._N])
+        if todo.size:
+            with PROFILER.span("optimizer.stages"):
+                N = self._compute_stages(todo)
+            self._N.update(zip(todo.tolist(), N.tolist()))
+        return np.array([self._N[l] for l in L.tolist()])
+
+    def _compute_stages(self, L):
+        if self.eq.linear:
+            N = kremser_stage_counts(L, self.V, self.eq.m, self.YF, self.YN, self.X0, cap=max(self.cap, 2000))
+            return np.where(N <= self.cap, N, np.nan)
+
+        args = (self.V, self.eq, self.YF, self.YN, self.X0, self.cap)
+        workers = self.max_workers or 1
+        if workers > 1 and len(L) >= 2 * workers:
+            chunks = np.array_split(L, workers)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return np.concatenate(list(pool.map(_lockstep_chunk, [(c, *args) for c in chunks])))
+        return _lockstep_chunk((L, *args))
+
+    # ---------- 成本 ----------
+    def costs(self, factors, packings=None):
+        """
+        factors × packings 网格上的成本分项（2 维数组，行 = L/Lmin，列 = 填料）。
+        """
+        factors = np.asarray(factors, dtype=float)
+        packs = self.packings(packings)
+        L = self.Lmin * factors
+        N = self.stage_counts(L)
+        per_m = np.array([p["cost_per_m"] for p in packs])
+
+        H = np.empty((len(L), len(packs)))
+        NTU = None
+        for j, p in enumerate(packs):
+            if p["HETP"] is not None:
+                H[:, j] = N * p["HETP"]
+                continue
+            if NTU is None:
+                m = self.eq.m if self.eq.linear else self.eq
+                NTU = ntu_og(L, self.V, m, self.YF, self.YN, self.X0)
+                slope = mean_slope(L, self.V, m, self.YF, self.YN, self.X0)
+            H[:, j] = NTU * htu_og(p["transfer_units"], L, self.V, slope)
+        H = np.where(np.isfinite(H), H, np.nan)
+
+        e = self.economics
+        C_solvent = np.broadcast_to((e["solvent_cost"] * L)[:, None], (len(L), len(packs)))
+        C_regen = np.broadcast_to((e["regen_cost"] * L)[:, None], (len(L), len(packs)))
+        C_height = H * per_m[None, :]
+        C = C_solvent + C_regen + C_height
+        for f, n, c in zip(factors.tolist(), N.tolist(), C.min(axis=1).tolist()):
+            PROFILER.trace("absorber_optimization", L_factor=f, N=n, C=c)
+        return {"L_factor": factors, "L": L, "N": N, "NTU_OG": NTU, "H": H, "C": C,
+                "C_solvent": C_solvent, "C_regen": C_regen, "C_height": C_height, "packings": packs}
+
+    # ---------- 经济优化 ----------
+    def economic_optimization(self, factor_range=None, packings=None, refine=3, points=33):
+        """
+        先在 factor_range（缺省 DEFAULT_FACTORS）上求全部成本曲线，
+        再在当前最优点相邻两个网格点之间加密 refine 轮（每轮 points 个点）。
+        N(L) 为整数，成本曲线呈锯齿状，因此细化用网格加密而非黄金分割。
+        返回：dict（最优点 + 全部网格点上的成本曲线，按 L/Lmin 排序）
+        """
+        factors = np.unique(np.asarray(DEFAULT_FACTORS if factor_range is None else factor_range,
+                                       dtype=float))
+        if factors[0] <= 1.0:
+            raise ValueError("L/Lmin 必须全部大于 1")
+        res = self.costs(factors, packings)
+
+        for _ in range(refine):
+            C = np.where(np.isfinite(res["C"]), res["C"], np.inf)
+            i = int(np.unravel_index(np.argmin(C), C.shape)[0])
+            lo = res["L_factor"][max(i - 1, 0)]
+            hi = res["L_factor"][min(i + 1, len(res["L_factor"]) - 1)]
+            new = np.linspace(lo, hi, points)[1:-1]
+            factors = np.unique(np.concatenate((res["L_factor"], new)))
+            res = self.costs(factors, packings)
+
+        C = np.where(np.isfinite(res["C"]), res["C"], np.inf)
+        if not np.isfinite(C).any():
+            raise RuntimeError(f"所有 L/Lmin 下均未在 max_stages_cap={self.cap} 级内达到分离要求。")
+        i, j = np.unravel_index(np.argmin(C), C.shape)
+        pack = res["packings"][j]
+        L_opt = float(res["L"][i])
+        return {
+            "L_factor_opt": float(res["L_factor"][i]), "L_opt": L_opt, "Lmin": self.Lmin,
+            "N_opt": int(res["N"][i]) if np.isfinite(res["N"][i]) else None,
+            "NTU_OG_opt": float(res["NTU_OG"][i]) if res["NTU_OG"] is not None else None,
+            "packing_opt": pack["name"], "HETP_opt": pack["HETP"],
+            "H_opt": float(res["H"][i, j]), "C_opt": float(res["C"][i, j]),
+            "C_solvent_opt": float(res["C_solvent"][i, j]), "C_regen_opt": float(res["C_regen"][i, j]),
+            "C_height_opt": float(res["C_height"][i, j]),
+            "N_continuous_opt": (float(kremser_stages(L_opt, self.V, self.eq.m, self.YF, self.YN, self.X0))
+                                 if self.eq.linear else None),
+            "curves": res,
+        }
+
+
+# ---------- 运行入口（写成本曲线 + 最优点） ----------
+def run_optimization(cfg, config_path=None, sink=None, max_workers=None, plot=None):
+    """
+    吸收塔经济优化并输出：cost_curve 表（每个 L/Lmin × 填料一行）、optimum.json、
+    以及（有结果目录且 plot 时）economic_opt.png。返回：(outdir, optimum)
+    """
+    with PROFILER.run("absorber_optimization", case=cfg.get("case_name", "case")):
+        opt = AbsorberOptimizer(cfg, max_workers=max_workers)
+        best = opt.economic_optimization(cfg.get("L_factor_range"))
+        if sink is None:
+            sink = CSVSink(os.path.join(ensure_dir("results"), f"{now()}_{cfg.get('case_name', 'case')}_opt"))
+
+        cur = best["curves"]
+        NTU = cur["NTU_OG"] if cur["NTU_OG"] is not None else np.full(len(cur["L"]), np.nan)
+        rows = []
+        for j, p in enumerate(cur["packings"]):
+            HETP = p["HETP"] if p["HETP"] is not None else math.nan
+            for i in range(len(cur["L"])):
+                rows.append((p["name"], HETP, cur["L_factor"][i], cur["L"][i], cur["N"][i], NTU[i], cur["H"][i, j],
+                             cur["C_solvent"][i, j], cur["C_regen"][i, j], cur["C_height"][i, j], cur["C"][i, j]))
+        sink.write_table("cost_curve",
+                         ["packing", "HETP", "L_factor", "L", "N", "NTU_OG", "H_m",
+                          "C_solvent", "C_regen", "C_height", "C_total"],
+                         rows, formats=[None, ".4g", ".6f", ".6f", ".0f", ".4f", ".4f", ".4f", ".4f", ".4f", ".4f"])
+        plot = bool(cfg.get("plot", True) if plot is None else plot) and sink.folder is not None
+        optimum = {k: v for k, v in best.items() if k != "curves"}
+        optimum["economics"] = opt.economics
+        optimum["equilibrium"] = opt.eq.describe()
+        optimum["artifacts"] = {"cost_curve": sink.artifact("cost_curve"),
+                                "plot": "economic_opt.png" if plot else None}
+        sink.write_json("optimum", optimum)
+
+        if plot:
+            draw_cost_curves(sink.path("economic_opt.png"), cur, optimum)
+        if config_path and sink.folder:
+            copy_file(config_path, sink.folder)
+    return sink.folder, optimum
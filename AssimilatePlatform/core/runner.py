@@ -1,110 +1,114 @@
 import os
 import math
 
-from utils.io_utils import ensure_dir, now, write_json, copy_file
+from utils.io_utils import ensure_dir, now, copy_file
 from utils.logger import Logger
+from utils.instrument import PROFILER
 from utils.plot_mt import draw_mt
+from utils.sinks import CSVSink
+from utils.config import compile_case
 
-from .equilibrium import compute_Lmin
-from .stagewise import stepwise_stairs
-from .kremser import kremser_search
+from .equilibrium import compute_Lmin, make_equilibrium, find_pinch
+from .stagewise import stepwise_stairs, bottom_up_stairs
+from .kremser import kremser_search, kremser_stages, absorption_factor
 from .streams import material_balance
+from .transfer_units import transfer_unit_height, htu_spec
+
+
+def run_absorption(cfg, config_path=None, sink=None):
+    """
+    吸收塔主运行逻辑
+    sink=None 时在 results/ 下新建带时间戳的目录并写 CSV（原有行为）；
+    传入 MemorySink/NullSink 时不创建目录、不写日志、不绘图，返回的 outdir 为 None。
+    日志在整个运行期间保持同一个缓冲句柄，结束（含异常）时关闭。
+    cfg 可为配置 dict（此处按 utils.config.ABSORPTION 校验一次）或已编译的 AbsorptionCase。
+    """
+    cfg = compile_case(cfg)
+    with PROFILER.run("run_absorption", case=cfg.case_name):
+        if sink is None:
+            results_root = ensure_dir("results")
+            sink = CSVSink(os.path.join(results_root, f"{now()}_{cfg.case_name}"))
+        with Logger(sink.path("log.txt")) as logger:
+            try:
+                return _run_absorption(cfg, config_path, sink, logger)
+            except Exception as e:
+                logger.error("Absorption calculation failed: %r", e)
+                raise
+
+
+def _run_absorption(cfg, config_path, sink, logger):
+    outdir = sink.folder
+    logger.info("=== Absorption calculation started ===")
+    logger.info("Case %s: YF=%g, YN_target=%g, X0=%g, V=%g", cfg.case_name, cfg.YF, cfg.YN_target, cfg.X0, cfg.V)
+    logger.debug("Config: %s", cfg)
 
+    # --- 1️⃣ 读取输入参数（cfg 已校验并转换类型） ---
+    eq  = make_equilibrium(cfg)          # 缺省为线性 Y* = mX；cfg.equilibrium 可给出非线性平衡
+    m   = eq.m if eq.linear else eq
+    YF, YN, X0, V = cfg.YF, cfg.YN_target, cfg.X0, cfg.V
+    L_in, L_factor = cfg.L, cfg.L_factor
+    HETP, cap, plot = cfg.HETP, cfg.max_stages_cap, cfg.plot
 
-def _bottom_up_stage_table(m, L, V, YF, YN, X0, N_cap):
-    """自底向上计算级板表"""
-    r = L / V
-    b = YN - r * X0
-    X = (YF - b) / r
-    if not math.isfinite(X) or X < 0:
-        raise RuntimeError("计算底部 X1 失败：请检查参数。")
-
-    table = []
-    k = 1
-    while k <= max(1, int(N_cap)):
-        Y = m * X
-        table.append({"stage": k, "X": X, "Y": Y})
-        if Y <= YN + 1e-12:
-            break
-        X_next = (Y - b) / r
-        if X_next > X + 1e-12:
-            break
-        X = X_next
-        k += 1
-    return table
-
-
-def run_absorption(cfg, config_path=None):
-    """吸收塔主运行逻辑"""
-    results_root = ensure_dir("results")
-    outdir = ensure_dir(os.path.join(results_root, f"{now()}_{cfg.get('case_name', 'case')}"))
-    logger = Logger(os.path.join(outdir, "log.txt"))
-    logger.info("=== Absorption calculation started ===")
-    logger.info(f"Config: {cfg}")
-
-    # --- 1️⃣ 读取输入参数 ---
-    m   = float(cfg["m"])
-    YF  = float(cfg["YF"])
-    YN  = float(cfg["YN_target"])
-    X0  = float(cfg["X0"])
-    V   = float(cfg["V"])
-    L_in = float(cfg["L"])
-    L_factor = float(cfg.get("L_factor", 1.5))
-    HETP = float(cfg.get("HETP", 0.5))
-    cap  = int(cfg.get("max_stages_cap", 300))
-    plot = bool(cfg.get("plot", True))
-
-    solute_name  = cfg.get("solute_name",  "溶质")
-    inert_name   = cfg.get("inert_name",   "惰性气体")
-    solvent_name = cfg.get("solvent_name", "溶剂")
+    solute_name, inert_name, solvent_name = cfg.solute_name, cfg.inert_name, cfg.solvent_name
 
     # --- 2️⃣ Lmin 与 L_used ---
-    Lmin = compute_Lmin(V, YF, YN, m, X0)
+    with PROFILER.span("Lmin"):
+        slope_min, X_pinch, pinch_kind = find_pinch(eq, YF, YN, X0)
+        Lmin = compute_Lmin(V, YF, YN, m, X0) if eq.linear else V * slope_min
+    pinch = {"kind": pinch_kind, "X": X_pinch}
     if not math.isfinite(Lmin) or Lmin <= 0:
         raise RuntimeError("L_min 计算无效。")
     if L_in <= 0:
         L_used = Lmin * L_factor
-        logger.info(f"自动 L = {Lmin:.6f}×{L_factor:.2f} = {L_used:.6f}")
+        logger.info("自动 L = %.6f×%.2f = %.6f", Lmin, L_factor, L_used)
     else:
         L_used = L_in
         if L_used < Lmin * (1.0 - 1e-9):
             raise RuntimeError(f"L={L_used:.4g} < Lmin={Lmin:.4g}")
-        logger.info(f"输入 L = {L_used:.6f}, L/Lmin={L_used/Lmin:.3f}")
+        logger.info("输入 L = %.6f, L/Lmin=%.3f", L_used, L_used / Lmin)
 
     # --- 3️⃣ 顶→底 阶梯数据 ---
-    stairs, N_stair, _ = stepwise_stairs(L_used, V, m, YF, YN, X0, cap=cap)
-    N_int = kremser_search(L_used, V, m, YF, YN, X0, cap=max(cap, 2000))
+    with PROFILER.span("stairs"):
+        stairs, N_stair, _ = stepwise_stairs(L_used, V, m, YF, YN, X0, cap=cap)
+    if eq.linear:
+        with PROFILER.span("kremser"):
+            N_int = kremser_search(L_used, V, m, YF, YN, X0, cap=max(cap, 2000))
+    else:
+        N_int = float("inf")            # Kremser 解析解仅适用于线性平衡
     N_used = int(round(N_int)) if math.isfinite(N_int) else N_stair
     H_total = N_used * HETP
 
-    # --- 4️⃣ 保存 stage_data.csv ---
-    stage_data_csv = os.path.join(outdir, "stage_data.csv")
-    with open(stage_data_csv, "w", encoding="utf-8") as f:
-        f.write("stage,type,X,Y\n")
-        for node in stairs:
-            f.write(f"{node['stage']},{node['type']},{node['X']:.8f},{node['Y']:.8f}\n")
-    logger.info("stage_data.csv saved.")
+    # 传质单元法（填料塔）：NTU_OG 沿操作线积分，HTU_OG 取自配置或膜系数关联式
+    with PROFILER.span("transfer_units"):
+        tu = transfer_unit_height(cfg, L_used, V, m, YF, YN, X0)
+    logger.info("NTU_OG = %s, HTU_OG = %s, H(NTU) = %s", tu["NTU_OG"], tu["HTU_OG"], tu["H_NTU_m"])
+
+    # --- 4️⃣ 阶梯数据 stage_data ---
+    with PROFILER.span("write.stage_data"):
+        sink.write_table("stage_data", ["stage", "type", "X", "Y"],
+                         stairs.rows(),
+                         formats=[None, None, ".8f", ".8f"])
+    logger.info("stage_data saved.")
 
     # --- 5️⃣ 保存 stage_table.csv ---
-    table = _bottom_up_stage_table(m, L_used, V, YF, YN, X0, N_cap=N_used + 5)
-    stage_table_csv = os.path.join(outdir, "stage_table.csv")
-    with open(stage_table_csv, "w", encoding="utf-8") as f:
-        f.write("Stage,X(%),Y(%)\n")
-        for row in table:
-            f.write(f"{row['stage']},{row['X']*100:.2f},{row['Y']*100:.2f}\n")
-    logger.info("stage_table.csv saved.")
+    with PROFILER.span("bottom_up_table"):
+        stage_no, X_bu, Y_bu = bottom_up_stairs(L_used, V, m, YF, YN, X0, cap=N_used + 5)
+    with PROFILER.span("write.stage_table"):
+        sink.write_table("stage_table", ["Stage", "X(%)", "Y(%)"],
+                         list(zip(stage_no.tolist(), (X_bu * 100).tolist(), (Y_bu * 100).tolist())),
+                         formats=[None, ".2f", ".2f"])
+    logger.info("stage_table saved.")
 
     # --- 6️⃣ 物料衡算 + 流程表 ---
     streams = material_balance(YF, YN, X0, V, L_used)
 
     # 6.1 明细版
-    streams_csv = os.path.join(outdir, "streams.csv")
-    with open(streams_csv, "w", encoding="utf-8") as f:
-        f.write("stream,total_kmol_h,inert_kmol_h,solvent_kmol_h,solute_kmol_h,ratio\n")
-        for r in streams["rows"]:
-            f.write(f"{r['stream']},{r['total_kmol_h']:.8f},{r['inert_kmol_h']:.8f},"
-                    f"{r['solvent_kmol_h']:.8f},{r['solute_kmol_h']:.8f},{r['ratio']:.8f}\n")
-    logger.info("streams.csv saved.")
+    stream_cols = ["stream", "total_kmol_h", "inert_kmol_h", "solvent_kmol_h", "solute_kmol_h", "ratio"]
+    with PROFILER.span("write.streams"):
+        sink.write_table("streams", stream_cols,
+                         [tuple(r[c] for c in stream_cols) for r in streams["rows"]],
+                         formats=[None] + [".8f"] * 5)
+    logger.info("streams saved.")
 
     # 6.2 表格版（教学展示）
     cols = ["气体进", "气体出", "吸收液进", "吸收液出"]
@@ -127,27 +131,33 @@ def run_absorption(cfg, config_path=None):
         streams["components"]["liq_in"]["solvent"],
         streams["components"]["liq_out"]["solvent"],
     ]
-    streams_table_csv = os.path.join(outdir, "streams_table.csv")
-    with open(streams_table_csv, "w", encoding="utf-8") as f:
-        f.write("," + ",".join(cols) + "\n")
-        f.write(f"总流量 (kmol/h),{total_row[0]:.4f},{total_row[1]:.4f},{total_row[2]:.4f},{total_row[3]:.4f}\n")
-        f.write(f"{solute_name}流量 (kmol/h),{solute_row[0]:.4f},{solute_row[1]:.4f},{solute_row[2]:.4f},{solute_row[3]:.4f}\n")
-        f.write(f"{inert_name}流量 (kmol/h),{inert_row[0]:.4f},{inert_row[1]:.4f},{inert_row[2]:.4f},{inert_row[3]:.4f}\n")
-        f.write(f"{solvent_name}流量 (kmol/h),{solvent_row[0]:.4f},{solvent_row[1]:.4f},{solvent_row[2]:.4f},{solvent_row[3]:.4f}\n")
-    logger.info("streams_table.csv saved.")
+    with PROFILER.span("write.streams_table"):
+        sink.write_table("streams_table", [""] + cols, [
+            ["总流量 (kmol/h)"] + total_row,
+            [f"{solute_name}流量 (kmol/h)"] + solute_row,
+            [f"{inert_name}流量 (kmol/h)"] + inert_row,
+            [f"{solvent_name}流量 (kmol/h)"] + solvent_row,
+        ], formats=[None] + [".4f"] * 4)
+    logger.info("streams_table saved.")
 
     # --- 7️⃣ summary.json ---
     summary = {
-        "case_name": cfg.get("case_name", "case"),
+        "case_name": cfg.case_name,
         "inputs": {
-            "m": m, "YF": YF, "YN": YN, "X0": X0,
+            "m": eq.m if eq.linear else None, "equilibrium": eq.describe(), "YF": YF, "YN": YN, "X0": X0,
             "V": V, "L": L_in, "L_factor": L_factor,
-            "HETP": HETP, "max_stages_cap": cap, "plot": plot
+            "HETP": HETP, "transfer_units": htu_spec(cfg) or None,
+            "max_stages_cap": cap, "plot": plot
         },
         "results": {
             "Lmin": Lmin, "L_used": L_used,
-            "N_stair": N_stair, "N_kremser": N_int,
+            "N_stair": N_stair, "N_kremser": N_int if eq.linear else None,
+            "N_kremser_continuous": kremser_stages(L_used, V, m, YF, YN, X0) if eq.linear else None,
+            "absorption_factor": absorption_factor(L_used, V, m) if eq.linear else None,
+            "pinch": pinch,
             "N_used": N_used, "H_total_m": H_total,
+            "NTU_OG": tu["NTU_OG"], "HTU_OG": tu["HTU_OG"], "H_NTU_m": tu["H_NTU_m"],
+            "stripping_factor": tu["stripping_factor"],
             "absorbed_kmol_h": streams["absorbed"], "X1": streams["X1"],
             "gas_in_total_kmol_h":  streams["gas_in_total"],
             "gas_out_total_kmol_h": streams["gas_out_total"],
@@ -156,30 +166,32 @@ def run_absorption(cfg, config_path=None):
             "components": streams["components"]
         },
         "artifacts": {
-            "stage_data_csv": "stage_data.csv",
-            "stage_table_csv": "stage_table.csv",
-            "streams_csv": "streams.csv",
-            "streams_table_csv": "streams_table.csv",
-            "mt_plot": "mt_plot.png" if plot else None,
-            "log": "log.txt"
+            "stage_data_csv": sink.artifact("stage_data"),
+            "stage_table_csv": sink.artifact("stage_table"),
+            "streams_csv": sink.artifact("streams"),
+            "streams_table_csv": sink.artifact("streams_table"),
+            "mt_plot": "mt_plot.png" if plot and outdir else None,
+            "log": "log.txt" if outdir else None
         }
     }
-    write_json(os.path.join(outdir, "summary.json"), summary)
+    with PROFILER.span("write.summary"):
+        sink.write_json("summary", summary)
     logger.info("summary.json saved.")
 
     # --- 8️⃣ 绘图 ---
-    if plot:
+    if plot and outdir:
         fig_path = os.path.join(outdir, "mt_plot.png")
-        draw_mt(fig_path, m, L_used, V, YN, X0, YF, stairs)
-        logger.info(f"McCabe–Thiele plot saved: {fig_path}")
+        with PROFILER.span("plot"):
+            draw_mt(fig_path, m, L_used, V, YN, X0, YF, stairs, pinch=pinch)
+        logger.info("McCabe–Thiele plot saved: %s", fig_path)
 
     # --- 9️⃣ 复制配置文件 ---
-    if config_path:
+    if config_path and outdir:
         try:
             copy_file(config_path, outdir)
-            logger.info(f"config copied: {config_path} -> {outdir}")
+            logger.info("config copied: %s -> %s", config_path, outdir)
         except Exception as e:
-            logger.info(f"config copy skipped: {e!r}")
+            logger.info("config copy skipped: %r", e)
 
     logger.info("=== Absorption calculation completed ===")
     return outdir, summary
\ No newline at end of file
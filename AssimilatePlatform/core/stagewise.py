@@ -1,4 +1,130 @@
-from .equilibrium import y_star
+import math
+
+import numpy as np
+
+from utils.instrument import PROFILER
+
+from .equilibrium import Equilibrium
+from .stepping import iter_steps, step_stages, BACKTRACK, BOUNDS
+
+
+_SCALAR_STAGES = 32
+
+_BACKTRACK_MSG = ("逐级计算检测到 X 回退：X_eq({:.6g}) < 当前 X({:.6g})。"
+                  "请核对起点 (X0, YN) 与 m（以及 X/Y 的定义是否为摩尔比而非分率）。")
+_OVER_ONE_MSG = "X 已超过 1（X={:.6g}），不合物理。请检查输入定义/单位（是否以摩尔分率而非摩尔比）。"
+
+
+# ---------- 线性递推内核 ----------
+def affine_sequence(z0, a, c, k):
+    """
+    z_k = a·z_{k-1} + c 的闭式解，k 可为整数数组（向量化）：
+        z_k = a^k·z0 + c·(a^k - 1)/(a - 1)，a → 1 时用 expm1/log1p 保持精度。
+    吸收塔的自顶向下（气相 Y）与自底向上（液相 X）逐级都是这种线性递推。
+    """
+    k = np.asarray(k, dtype=float)
+    if abs(a - 1.0) < 1e-12:
+        return z0 + c * k
+    la = math.log1p(a - 1.0)
+    with np.errstate(over="ignore", invalid="ignore"):
+        return np.exp(k * la) * z0 + c * np.expm1(k * la) / (a - 1.0)
+
+
+def _blocked_sequence(seq, done, cap, block=64):
+    """
+    按块（64, 128, …）计算递推序列，返回 (z[0..N], N)，N 为首个满足 done(z_k) 的 k（k ≥ 1）；
+    cap 内均不满足时 N = cap。块式计算避免高 cap 下一次性分配整段数组。
+    """
+    parts, lo = [], 0
+    while lo <= cap:
+        hi = min(cap, lo + block - 1)
+        z = seq(np.arange(lo, hi + 1))
+        parts.append(z)
+        hit = np.nonzero(done(z[1:] if lo == 0 else z))[0]
+        if hit.size:
+            N = int(hit[0]) + (1 if lo == 0 else lo)
+            break
+        lo, block = hi + 1, block * 2
+    else:
+        N = cap
+    z = np.concatenate(parts)
+    return z[:N + 1], N
+
+
+class StairArray:
+    """
+    列式阶梯数据（替代逐节点 dict 列表）：
+        X[k-1] : 第 k 级液相（水平到平衡线后的 X_eq），k = 1..N
+        Y[k]   : 第 k 级下方气相（竖直到操作线后），Y[0] = YN
+    兼容旧接口：len() / 下标 / 迭代仍按 start/horizontal/vertical 节点给出 dict。
+    """
+
+    __slots__ = ("X0", "X", "Y")
+
+    def __init__(self, X0, X, Y):
+        self.X0 = float(X0)
+        self.X = X
+        self.Y = Y
+
+    @property
+    def N(self):
+        return len(self.X)
+
+    # ---------- 节点视图 ----------
+    def nodes(self):
+        """返回 (stage, type, X, Y) 四列，长度 2N+1（start + 每级水平/竖直两个节点）。"""
+        n = self.N
+        stage = np.repeat(np.arange(n + 1), 2)[1:]
+        kind = np.array(["start"] + ["horizontal", "vertical"] * n, dtype=object)
+        X = np.empty(2 * n + 1)
+        Y = np.empty(2 * n + 1)
+        X[0], X[1::2], X[2::2] = self.X0, self.X, self.X
+        Y[0], Y[1::2], Y[2::2] = self.Y[0], self.Y[:-1], self.Y[1:]
+        return stage, kind, X, Y
+
+    def path(self):
+        """阶梯折线 (X, Y)，可直接用于一次 plot 调用。"""
+        _, _, X, Y = self.nodes()
+        return X, Y
+
+    def rows(self):
+        """(stage, type, X, Y) 行元组，Python 标量。"""
+        stage, kind, X, Y = self.nodes()
+        return list(zip(stage.tolist(), kind.tolist(), X.tolist(), Y.tolist()))
+
+    def __len__(self):
+        return 2 * self.N + 1
+
+    def __getitem__(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        if i == 0:
+            return {"stage": 0, "type": "start", "X": self.X0, "Y": float(self.Y[0])}
+        k = (i + 1) // 2
+        horizontal = i % 2 == 1
+        return {"stage": k, "type": "horizontal" if horizontal else "vertical",
+                "X": float(self.X[k - 1]), "Y": float(self.Y[k - 1] if horizontal else self.Y[k])}
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+def _check_inputs(L, V, m):
+    if L <= 0 or V <= 0:
+        raise ValueError("L 和 V 必须为正。")
+    if not isinstance(m, Equilibrium) and m <= 0:
+        raise RuntimeError("m 必须为正。请检查平衡式 Y* = m X 的 m。")
+
+
+def _linear_m(m):
+    """线性平衡（数值 m 或 LinearEquilibrium）返回 m，非线性平衡对象返回 None"""
+    if isinstance(m, Equilibrium):
+        return m.m if m.linear else None
+    return m
+
 
 def stepwise_stairs(L, V, m, YF, YN, X0, cap=500, tol=1e-12):
     """
@@ -11,58 +137,178 @@ def stepwise_stairs(L, V, m, YF, YN, X0, cap=500, tol=1e-12):
       - 允许首级 Y 先下降（若顶端操作线高于平衡线）；这在吸收是正常的。
       - 对 X 做物理约束（非负、不回退）；若回退，提示参数矛盾。
       - L < Lmin 的不可行情况由 runner 预先拦截；本函数不做“跑满 cap”的假收敛。
+      - 前 32 级由逐级内核 step_stages 计算；更长的阶梯其余部分按 Y_{k+1} = A·Y_k + b（A = L/(mV)）
+        用 affine_sequence 闭式成块计算。
+      - m 也可为 Equilibrium 对象；非线性平衡线逐级用 x_star1 查表求 X_eq。
     返回：
-      stairs: 节点列表（start/horizontal/vertical）
+      stairs: StairArray（列式阶梯数据）
       N: 理论级数
       X1: 塔底液相溶质摩尔比（最后一次水平段的 X_eq）
     """
-    if L <= 0 or V <= 0:
-        raise ValueError("L 和 V 必须为正。")
-
+    _check_inputs(L, V, m)
     r = L / V
     intercept = YN - r * X0  # 操作线：Y = r*X + (YN - r*X0)
+    cap = max(1, int(cap))
+    m_lin = _linear_m(m)
 
-    # 起点（塔顶）
-    Y = float(YN)
-    X = float(X0)
-    stairs = [{"stage": 0, "type": "start", "X": X, "Y": Y}]
-    N = 0
-
-    for _ in range(max(1, int(cap))):
-        # 1) 水平到平衡线：在当前 Y 下，X_eq = Y / m
-        #    （教材/7-2 的标准做法：横向到平衡线）
-        if m <= 0:
-            raise RuntimeError("m 必须为正。请检查平衡式 Y* = m X 的 m。")
-        X_eq = Y / m
-
-        # 物理/数值保护：X 非负 & 不回退
-        if X_eq < 0:
-            X_eq = 0.0
-        if X_eq + tol < X:
-            # 若出现回退，说明 (X0, YN) 与 m 的关系不自洽，或单位/定义（摩尔比/分率）混用
-            raise RuntimeError(
-                f"逐级计算检测到 X 回退：X_eq({X_eq:.6g}) < 当前 X({X:.6g})。"
-                "请核对起点 (X0, YN) 与 m（以及 X/Y 的定义是否为摩尔比而非分率）。"
-            )
-
-        stairs.append({"stage": N + 1, "type": "horizontal", "X": X_eq, "Y": Y})
-
-        # 2) 竖直到操作线：Y_new = r * X_eq + intercept
-        Y_new = r * X_eq + intercept
-        stairs.append({"stage": N + 1, "type": "vertical", "X": X_eq, "Y": Y_new})
-
-        # 更新状态
-        X, Y = X_eq, Y_new
-        N += 1
-
-        # 3) 停止条件：竖直到操作线后的 Y 达到/超过底部气相入口 YF
-        if Y >= YF - tol:
-            break
+    # 前若干级逐级标量计算（短阶梯时开销最小）；非线性平衡线全程逐级
+    n_scalar = min(cap, _SCALAR_STAGES) if m_lin is not None else cap
+    st = _step(L, V, m, YF, YN, X0, n_scalar, tol)
+    _raise_on(st.status, st.x_reject, st.x[-1] if st.n else X0)
+    X, Y = st.x, np.empty(st.n + 1)
+    Y[0], Y[1:] = YN, st.y
+    m = m_lin
+
+    if m is not None and len(X) < cap and Y[-1] < YF - tol:
+        # 长阶梯：其余各级按 Y_{k+1} = A·Y_k + b 闭式成块计算
+        Y_tail, _ = _blocked_sequence(lambda k: affine_sequence(float(Y[-1]), r / m, intercept, k),
+                                 lambda y: y >= YF - tol, cap - len(X))
+        X_tail = np.maximum(Y_tail[:-1] / m, 0.0)
+        _check_tail(X_tail, float(X[-1]), Y_tail[-1] >= YF - tol, tol)
+        X = np.concatenate((X, X_tail))
+        Y = np.concatenate((Y, Y_tail[1:]))
+
+    N = len(X)
+    PROFILER.count("stairs.calls")
+    PROFILER.count("stairs.stages", N)
+    PROFILER.count("equilibrium.evals", N)
+    return StairArray(X0, X, Y), N, float(X[-1])
+
+
+def _check_tail(X, X_prev, reached, tol):
+    """成块计算部分的物理/数值保护，按逐级顺序报告首个问题：X 不回退；未终止的级 X 不超过 1"""
+    prev = np.concatenate(([X_prev], X[:-1]))
+    back = X + tol < prev
+    over = X > 1.0 + 1e-6
+    if reached:
+        over[-1] = False
+    bad = np.nonzero(back | over)[0]
+    if bad.size:
+        k = int(bad[0])
+        if back[k]:
+            raise RuntimeError(_BACKTRACK_MSG.format(X[k], prev[k]))
+        raise RuntimeError(_OVER_ONE_MSG.format(X[k]))
+
+
+def _step_args(L, V, m, YF, YN, X0, cap, tol):
+    """逐级内核参数：自塔顶 (X0, YN) 水平到平衡线（X_eq ≥ 0）、竖直到操作线，Y ≥ YF − tol 时终止"""
+    r = L / V
+    m_lin = _linear_m(m)
+    if m_lin is None:
+        inv = m.x_star1
+        x_star = lambda Y: max(inv(Y), 0.0)
+    else:
+        x_star = lambda Y: max(Y / m_lin, 0.0)
+    return (x_star, [(r, YN - r * X0, None)], YN, X0), dict(
+        cap=max(1, int(cap)), y_stop=YF - tol, bounds=(-math.inf, 1.0 + 1e-6), backtrack_tol=tol)
+
+
+def _step(L, V, m, YF, YN, X0, cap, tol):
+    args, kw = _step_args(L, V, m, YF, YN, X0, cap, tol)
+    return step_stages(*args, **kw)
+
+
+def _raise_on(status, x_reject, x_last):
+    # X 回退说明 (X0, YN) 与 m 的关系不自洽，或单位/定义（摩尔比/分率）混用
+    if status == BACKTRACK:
+        raise RuntimeError(_BACKTRACK_MSG.format(x_reject, x_last))
+    if status == BOUNDS:
+        raise RuntimeError(_OVER_ONE_MSG.format(x_last))
 
-        # 额外保护：防止异常大 X（定义/单位错误）
-        if X > 1.0 + 1e-6:
-            raise RuntimeError(
-                f"X 已超过 1（X={X:.6g}），不合物理。请检查输入定义/单位（是否以摩尔分率而非摩尔比）。"
-            )
 
-    return stairs, N, X
\ No newline at end of file
+def iter_stairs(L, V, m, YF, YN, X0, cap=500, tol=1e-12):
+    """
+    逐级产出 (stage, X_eq, Y_top, Y_below)（Python 标量），便于只取终点或逐级检查：
+        for stage, X1, _, Y in iter_stairs(...): pass
+    惰性：由 iter_steps 逐级计算，提前停止迭代时不再计算后续各级、也不保存整条阶梯。
+    X 回退 / 超过 1 的检查与 stepwise_stairs 相同（出错前的各级先依次给出，再抛出异常）。
+    m 可为数值或 Equilibrium 对象。
+    """
+    _check_inputs(L, V, m)
+    args, kw = _step_args(L, V, m, YF, YN, X0, cap, tol)
+    steps = iter_steps(*args, **kw)
+    stage, Y_top, x_last = 0, float(YN), float(X0)
+    while True:
+        try:
+            _, x_eq, y_op, _, _ = next(steps)
+        except StopIteration as stop:
+            _raise_on(*stop.value, x_last)
+            return
+        stage += 1
+        yield stage, x_eq, Y_top, y_op
+        Y_top, x_last = y_op, x_eq
+
+
+def bottom_up_stairs(L, V, m, YF, YN, X0, cap):
+    """
+    自底向上级板表：从操作线上 Y=YF 对应的 X1 出发，Y_k = m·X_k，
+    X_{k+1} = (Y_k - b)/r（即 X 的线性递推，系数 1/A）；
+    到 Y ≤ YN 为止（含该级），或 X 不再下降时停止（不含）。
+    m 为非线性 Equilibrium 时 Y_k = Y*(X_k) 逐级计算，另在 X 低于平衡数据下限时停止。
+    返回：(stage, X, Y) 三个数组
+    """
+    _check_inputs(L, V, m)
+    r = L / V
+    b = YN - r * X0
+    X1 = (YF - b) / r
+    if not math.isfinite(X1) or X1 < 0:
+        raise RuntimeError("计算底部 X1 失败：请检查参数。")
+
+    cap = max(1, int(cap))
+    if _linear_m(m) is None:
+        X, Y, x = [], [], X1
+        while len(X) < cap and x >= m.X_min and not (X and x > X[-1] + 1e-12):
+            y = m._y1(x)
+            X.append(x)
+            Y.append(y)
+            if y <= YN + 1e-12:
+                break
+            x = (y - b) / r
+        return np.arange(1, len(X) + 1), np.array(X), np.array(Y)
+
+    m = _linear_m(m)
+    X = affine_sequence(X1, m / r, -b / r, np.arange(cap))
+    Y = m * X
+    stop = np.nonzero(Y <= YN + 1e-12)[0]
+    n = int(stop[0]) + 1 if stop.size else cap
+    rising = np.nonzero(X[1:n] > X[:n - 1] + 1e-12)[0]
+    if rising.size:
+        n = int(rising[0]) + 1
+    return np.arange(1, n + 1), X[:n], Y[:n]
+
+
+def lockstep_stairs(L, V, eq, YF, YN, X0, cap=500, tol=1e-12):
+    """
+    多工况同步逐级（共用一个 Equilibrium，其余参数可为数组）：每一级对所有尚未
+    终止的工况调用一次向量化的 eq.x_star，终止判据与 iter_stairs 相同。
+    返回：(N, X1, reached)
+        N       级数；未在 cap 内达到 YF 时为 cap；X 回退、X 超过 1 或超出平衡数据范围时为 NaN
+        X1      最后一级液相 X_eq
+        reached 是否在 cap 内达到 YF
+    """
+    L, V, YF, YN, X0 = (a.ravel() for a in np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (L, V, YF, YN, X0))))
+    r = L / V
+    intercept = YN - r * X0
+    N = np.full(len(L), float(cap))
+    X1 = np.full(len(L), np.nan)
+    reached = np.zeros(len(L), dtype=bool)
+
+    idx = np.arange(len(L))
+    Y, X = YN.copy(), X0.copy()
+    for k in range(1, max(1, int(cap)) + 1):
+        if not idx.size:
+            break
+        X_eq = np.maximum(eq.x_star(Y), 0.0)
+        Y_new = r[idx] * X_eq + intercept[idx]
+        X1[idx] = X_eq
+        failed = ~np.isfinite(X_eq) | (X_eq + tol < X)
+        done = ~failed & (Y_new >= YF[idx] - tol)
+        failed |= ~done & (X_eq > 1.0 + 1e-6)
+        N[idx[failed]] = np.nan
+        N[idx[done]] = k
+        reached[idx[done]] = True
+        keep = ~(failed | done)
+        idx, Y, X = idx[keep], Y_new[keep], X_eq[keep]
+    PROFILER.count("stairs.lockstep_cases", len(L))
+    return N, X1, reached
@@ -0,0 +1,142 @@
+import numpy as np
+
+from utils.instrument import PROFILER
+
+from .equilibrium import Equilibrium
+
+
+# 填料塔传质单元法（摩尔比，低浓度）：
+#   NTU_OG = ∫_{YN}^{YF} dY / (Y − Y*(X))，X 沿操作线 X = X0 + (V/L)(Y − YN)
+#   HTU_OG = V / (K_Y·a·Ω) = HTU_G + S·HTU_L，S = mV/L（解吸因子）
+#   Z = NTU_OG · HTU_OG
+# 线性平衡用对数平均推动力闭式；非线性平衡在预先生成的复合 Gauss–Legendre 节点上
+# 对所有工况一次性求积（节点只依赖 [0, 1]，与工况无关）。
+_GL_ORDER = 8
+_GL_PANELS = 32
+
+# 传质单元高度相关的配置键（可写在 cfg["transfer_units"] 中，也可直接写在 cfg 顶层）
+HTU_KEYS = ("HTU_OG", "HTU_G", "HTU_L", "area", "kYa", "kXa")
+
+
+def _gl_nodes(panels=_GL_PANELS, order=_GL_ORDER):
+    """[0, 1] 上的复合 Gauss–Legendre 节点与权重（panels 段 × order 点）"""
+    x, w = np.polynomial.legendre.leggauss(order)
+    edges = np.linspace(0.0, 1.0, panels + 1)
+    half = 0.5 * np.diff(edges)[:, None]
+    t = (edges[:-1, None] + half * (x + 1.0)).ravel()
+    return t, (half * w).ravel()
+
+
+_T, _W = _gl_nodes()
+
+
+def _result(a):
+    return a if a.ndim else float(a)
+
+
+def ntu_og(L, V, m, YF, YN, X0):
+    """
+    气相总传质单元数 NTU_OG，参数可广播（如对 L 扫描或批量工况）。
+    m 为斜率（线性）或 Equilibrium 对象。推动力在塔内任一处 ≤ 0（L ≤ Lmin、YN ≤ Y*(X0)）时为 inf。
+    """
+    nonlinear = isinstance(m, Equilibrium) and not m.linear
+    if isinstance(m, Equilibrium) and m.linear:
+        m = m.m
+    L, V, YF, YN, X0 = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (L, V, YF, YN, X0)))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if not nonlinear:
+            X1 = X0 + V * (YF - YN) / L
+            d1 = YF - m * X1                # 塔底推动力
+            d2 = YN - m * X0                # 塔顶推动力
+            r = d1 / d2
+            near = np.abs(r - 1.0) < 1e-9
+            dlm = np.where(near, 0.5 * (d1 + d2), (d1 - d2) / np.log(np.where(near, 2.0, r)))
+            NTU = np.where((d1 > 0) & (d2 > 0), (YF - YN) / dlm, np.inf)
+            return _result(NTU)
+
+        with PROFILER.span("ntu.quadrature"):
+            span = (YF - YN)[..., None]
+            Y = YN[..., None] + span * _T
+            X = X0[..., None] + (V / L)[..., None] * (Y - YN[..., None])
+            drive = Y - m.y_star(X)
+            NTU = span[..., 0] * np.sum(_W / drive, axis=-1)
+            NTU = np.where(np.all(drive > 0, axis=-1) & np.all(X <= m.X_max, axis=-1), NTU, np.inf)
+    return _result(NTU)
+
+
+def mean_slope(L, V, m, YF, YN, X0):
+    """操作范围 [X0, X1] 内平衡线的平均斜率（线性平衡即 m），用于 S = mV/L"""
+    if not isinstance(m, Equilibrium):
+        return np.asarray(m, dtype=float) + 0.0 * np.asarray(L, dtype=float)
+    if m.linear:
+        return m.m + 0.0 * np.asarray(L, dtype=float)
+    X0 = np.asarray(X0, dtype=float)
+    X1 = X0 + np.asarray(V, dtype=float) * (np.asarray(YF) - np.asarray(YN)) / np.asarray(L, dtype=float)
+    X1 = np.minimum(X1, m.X_max)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (m.y_star(X1) - m.y_star(X0)) / (X1 - X0)
+
+
+def htu_spec(cfg):
+    """从配置中取出传质单元高度参数：cfg["transfer_units"]，缺省为顶层的 HTU_KEYS 项"""
+    spec = cfg.get("transfer_units")
+    if spec is None:
+        spec = {k: cfg[k] for k in HTU_KEYS if k in cfg}
+    return spec
+
+
+def _film(k, flux):
+    """体积传质系数：常数，或简单关联式 {"c": c, "n": n} → k = c·flux^n（flux 为 kmol/(m²·h)）"""
+    if isinstance(k, dict):
+        return float(k["c"]) * flux ** float(k.get("n", 0.8))
+    return np.asarray(k, dtype=float)
+
+
+def htu_og(spec, L, V, m):
+    """
+    气相总传质单元高度 HTU_OG (m)，参数可广播。spec 中按优先级取：
+        HTU_OG                         直接给定
+        HTU_G [+ HTU_L]                双膜：HTU_OG = HTU_G + S·HTU_L
+        area + kYa [+ kXa]             HTU_G = (V/Ω)/kYa，HTU_L = (L/Ω)/kXa
+    kYa/kXa 可为常数或 {"c", "n"} 幂律关联式；缺液膜项时按气膜控制处理（HTU_L = 0）。
+    m 为平衡线（平均）斜率。spec 为空或参数为 NaN 时返回 NaN。
+    """
+    L, V, m = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (L, V, m)))
+    nan = np.full(L.shape, np.nan)
+
+    def get(key):
+        v = spec.get(key)
+        return nan if v is None else v
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        area = np.asarray(get("area"), dtype=float)
+        G_flux, L_flux = V / area, L / area
+        H_G = np.asarray(get("HTU_G"), dtype=float)
+        H_L = np.asarray(get("HTU_L"), dtype=float)
+        if spec.get("kYa") is not None:
+            H_G = np.where(np.isfinite(H_G), H_G, G_flux / _film(spec["kYa"], G_flux))
+        if spec.get("kXa") is not None:
+            H_L = np.where(np.isfinite(H_L), H_L, L_flux / _film(spec["kXa"], L_flux))
+        film = H_G + m * V / L * np.where(np.isfinite(H_L), H_L, 0.0)
+        direct = np.asarray(get("HTU_OG"), dtype=float)
+        H = np.where(np.isfinite(direct), direct, film)
+    H = np.where(H > 0, H, np.nan)
+    return _result(H)
+
+
+def transfer_unit_height(cfg, L, V, m, YF, YN, X0):
+    """
+    填料层高度（传质单元法）：返回 dict(NTU_OG, HTU_OG, H_NTU_m, S)。
+    未给出 HTU 参数时 HTU_OG 与 H_NTU_m 为 None（仅报告 NTU_OG）。
+    """
+    NTU = ntu_og(L, V, m, YF, YN, X0)
+    S = float(mean_slope(L, V, m, YF, YN, X0)) * V / L
+    H = htu_og(htu_spec(cfg), L, V, S * L / V)
+    ok = np.isfinite(H)
+    return {
+        "NTU_OG": NTU if np.isfinite(NTU) else None,
+        "HTU_OG": float(H) if ok else None,
+        "H_NTU_m": float(NTU * H) if ok and np.isfinite(NTU) else None,
+        "stripping_factor": S,
+    }
@@ -1,14 +1,32 @@
-import argparse, json
+import os, argparse, json
 from utils.io_utils import load_config_any
-from core import run_absorption 
+from utils.config import Sweep
+from core import run_absorption, run_batch, load_cases, run_optimization, run_sweep, run_sweep_sharded
 
 def parse_args():
     p = argparse.ArgumentParser(
         description="Absorption Platform (main). "
                     "No --config & no --interactive will enter interactive mode."
     )
-    p.add_argument("--config", type=str, help="YAML/JSON config file path")
+    p.add_argument("--config", type=str,
+                   help="YAML/JSON config file path (a \"sweep\" block streams every case into one table)")
     p.add_argument("--interactive", action="store_true", help="Run in interactive mode")
+    p.add_argument("--batch", type=str,
+                   help="Batch cases file (CSV rows, or JSON/YAML list / {base, grid}); "
+                        "writes one consolidated table")
+    p.add_argument("--detail", action="store_true",
+                   help="With --batch: also write the full per-case results folder (tables + log)")
+    p.add_argument("--plot", action="store_true", help="With --batch --detail: draw M–T plots")
+    p.add_argument("--optimize", action="store_true",
+                   help="Economic optimization of L/Lmin and packing (uses the economics block of the config)")
+    p.add_argument("--workers", type=int, default=None,
+                   help="With --optimize: processes for stage counting under curved equilibrium; "
+                        "with --shards: local worker processes")
+    p.add_argument("--shards", type=str,
+                   help="With a sweep: shared work directory; shards are claimed there, committed atomically "
+                        "and skipped on re-run (several hosts may run the same command on one directory)")
+    p.add_argument("--shard-size", type=int, default=None,
+                   help="With --shards: cases per shard (fixed when the directory is first planned)")
     return p.parse_args()
 
 def interactive_input():
@@ -42,13 +60,54 @@ def interactive_input():
         "max_stages_cap": cap, "case_name": case_name, "notes": notes, "plot": plot
     }
 
+def report_sweep(outdir, summary):
+    print(f"\n✅ Sweep complete: {summary['n_cases']} cases, {summary['status_counts']['ok']} ok.")
+    print("📁 Results saved to:", outdir)
+
+def run_shards(cfg, args):
+    outdir, summary = run_sweep_sharded(cfg, args.shards, workers=args.workers or 1,
+                                        shard_size=args.shard_size)
+    if not summary["complete"]:
+        print(f"\n⏳ {summary['done']}/{summary['n_shards']} shards done "
+              f"({summary['shards_run']} here); {summary['pending']} still running elsewhere. "
+              "Re-run the same command to resume or merge.")
+        print("📁 Shard directory:", outdir)
+        return
+    report_sweep(outdir, summary)
+
 def main():
     args = parse_args()
+    if args.batch:
+        cases = load_cases(args.batch)
+        name = os.path.splitext(os.path.basename(args.batch))[0]
+        if isinstance(cases, Sweep):
+            if args.shards:
+                return run_shards(args.batch, args)
+            return report_sweep(*run_sweep(cases, name=name))
+        outdir, results = run_batch(cases, name=name, detail=args.detail, plot=args.plot)
+        status = results["status"]
+        print(f"\n✅ Batch complete: {len(status)} cases, {int((status == 'ok').sum())} ok.")
+        print("📁 Results saved to:", outdir)
+        return
+
     if args.interactive or not args.config:
         cfg = interactive_input()
     else:
         cfg = load_config_any(args.config)
 
+    if "sweep" in cfg and not args.optimize:
+        if args.shards:
+            return run_shards(cfg, args)
+        return report_sweep(*run_sweep(cfg))
+
+    if args.optimize:
+        outdir, optimum = run_optimization(cfg, config_path=args.config, max_workers=args.workers)
+        print(f"\n✅ Optimization complete: L/Lmin = {optimum['L_factor_opt']:.4f}, "
+              f"N = {optimum['N_opt']}, packing = {optimum['packing_opt']}, "
+              f"H = {optimum['H_opt']:.3f} m, cost = {optimum['C_opt']:.4g}")
+        print("📁 Results saved to:", outdir)
+        return
+
     outdir, summary = run_absorption(cfg, config_path=args.config)
     print("\n✅ Absorption complete. Results saved to:", outdir)
     print(json.dumps(summary, indent=2, ensure_ascii=False))
@@ -1,8 +1,12 @@
 """Utilities: IO helpers, plotting, logging."""
 
 from .io_utils import ensure_dir, write_json, load_config_any, copy_file, now
-from .logger import Logger
+from .logger import Logger, LogListener, configure_logging
 from .plot_mt import draw_mt
+from .instrument import PROFILER
+from .config import ConfigError, AbsorptionCase, compile_case, load_study, Sweep
+from .sinks import CSVSink, JSONSink, ParquetSink, MemorySink, NullSink, make_sink
+from .shards import ShardQueue
 
 __all__ = [
     "ensure_dir",
@@ -11,7 +15,22 @@ __all__ = [
     "copy_file",
     "now",
     "Logger",
+    "LogListener",
+    "configure_logging",
     "draw_mt",
+    "PROFILER",
+    "ConfigError",
+    "AbsorptionCase",
+    "compile_case",
+    "load_study",
+    "Sweep",
+    "CSVSink",
+    "JSONSink",
+    "ParquetSink",
+    "MemorySink",
+    "NullSink",
+    "make_sink",
+    "ShardQueue",
 ]
 
 __version__ = "0.1.0"
\ No newline at end of file
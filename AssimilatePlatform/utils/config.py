@@ -0,0 +1,487 @@
+"""
+Typed run configs and lazy parametric sweeps.
+
+    case = compile_case(load_config_any("case.json"))   # validated once -> AbsorptionCase
+    case.YF, case.get("equilibrium"), case["V"]          # attribute or mapping access
+    study = load_study("study.json")                     # fields + "sweep" -> Sweep
+    len(study)                                           # no case is built yet
+    for case in study: ...                               # AbsorptionCase objects, one at a time
+    for start, cols in study.chunks(100_000): ...        # column arrays for evaluate_cases()
+
+A config is a flat dict of case fields (see ABSORPTION) plus an optional
+"sweep" whose axes are combined as a Cartesian product, last axis fastest:
+
+    "sweep": {
+        "grid":   {"m": {"linspace": [0.5, 2.0, 100]}, "X0": [0.0, 0.001]},
+        "zip":    {"YF": [0.03, 0.04, 0.05], "YN_target": [0.0015, 0.002, 0.0025]},
+        "random": {"n": 100000, "seed": 7,
+                   "params": {"L_factor": {"uniform": [1.1, 3.0]}, "HETP": {"normal": [0.5, 0.05]}}}
+    }
+
+A list of single-key dicts ([{"grid": ...}, {"random": ...}]) gives the same
+axes in an explicit order. Value lists may be written literally or as
+{"linspace"|"logspace": [start, stop, num]}, {"arange": [start, stop, step]}.
+Random axes draw fixed-size blocks from a seeded generator on demand, so a
+sample is reproducible from its index and nothing is held per case.
+
+Validation runs once: scalar fields when the config is compiled, swept
+columns vectorised per chunk. Solvers then read typed attributes directly.
+
+Field, Schema and Sweep are duplicated in DistillationPlatform/utils/config.py
+because the two platforms' `utils` packages share a name and cannot import
+each other; only the schema section at the end differs between the copies.
+Run tools/check_sync.py after changing either one.
+"""
+
+import json
+import math
+import hashlib
+import itertools
+
+import numpy as np
+
+
+class ConfigError(ValueError):
+    """Config does not match its schema; the message lists every problem found."""
+
+
+# ---------- schema ----------
+class Field:
+    """
+    One config key: python type, default (None = optional), required flag and
+    an optional check(value) -> bool that also works elementwise on arrays.
+    """
+
+    __slots__ = ("name", "type", "default", "required", "check", "hint")
+
+    def __init__(self, name, type=float, default=None, required=False, check=None, hint=""):
+        self.name, self.type, self.default = name, type, default
+        self.required, self.check, self.hint = required, check, hint
+
+    @property
+    def numeric(self):
+        return self.type in (float, int)
+
+    def coerce(self, value):
+        if value is None or value == "":
+            return self.default
+        if self.type is bool and isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "y")
+        if self.type in (float, int, bool, str):
+            return self.type(float(value)) if self.type is int else self.type(value)
+        return value
+
+
+class Schema:
+    """
+    Ordered set of Fields plus cross-field rules, compiled into a slotted case
+    class (attribute access, no per-instance dict). `rules` are callables
+    rule(values) -> message or None, where values maps names to scalars or arrays.
+    """
+
+    def __init__(self, name, fields, rules=()):
+        self.name = name
+        self.fields = {f.name: f for f in fields}
+        self.rules = tuple(rules)
+        self.case_class = type(name, (CaseBase,), {"__slots__": tuple(self.fields), "_schema": self})
+
+    # ---------- validation ----------
+    def validate(self, cfg):
+        """dict -> (typed values for every field, unknown keys); raises ConfigError"""
+        values, errors, failed = {}, [], set()
+        for name, f in self.fields.items():
+            try:
+                values[name] = f.coerce(cfg.get(name))
+            except (TypeError, ValueError):
+                errors.append(f"{name}: cannot convert {cfg.get(name)!r} to {f.type.__name__}")
+                values[name] = None
+                failed.add(name)
+        errors += self._check(values, failed)
+        if errors:
+            raise ConfigError(f"{self.name}: " + "; ".join(errors))
+        extras = {k: v for k, v in cfg.items() if k not in self.fields and k != "sweep"}
+        return values, extras
+
+    def _check(self, values, failed=()):
+        errors = []
+        for name, f in self.fields.items():
+            v = values.get(name)
+            if v is None:
+                if f.required and name not in failed:
+                    errors.append(f"{name} is required")
+                continue
+            if f.check is not None:
+                with np.errstate(invalid="ignore"):
+                    bad = ~np.asarray(f.check(v), dtype=bool)
+                if bad.any():
+                    where = f" (case {int(np.argmax(bad)) + 1})" if np.ndim(bad) else ""
+                    errors.append(f"{name}{where} {f.hint}".rstrip())
+        # fields that failed conversion are already reported; cross-field rules would only repeat them
+        for rule in () if failed else self.rules:
+            msg = rule(values)
+            if msg:
+                errors.append(msg)
+        return errors
+
+    def check_columns(self, values):
+        """vectorised validation of one chunk of swept columns (plus broadcast scalars)"""
+        errors = self._check(values)
+        if errors:
+            raise ConfigError(f"{self.name} sweep: " + "; ".join(errors))
+
+    # ---------- compilation ----------
+    def compile(self, cfg):
+        """dict (or an existing case) -> validated case object"""
+        if isinstance(cfg, self.case_class):
+            return cfg
+        values, extras = self.validate(dict(cfg))
+        return self.build(values, extras)
+
+    def build(self, values, extras=None):
+        """Construct a case from already validated values (no checks)."""
+        case = self.case_class.__new__(self.case_class)
+        for name in self.fields:
+            object.__setattr__(case, name, values.get(name))
+        object.__setattr__(case, "_extras", extras or {})
+        return case
+
+
+class CaseBase:
+    """
+    Slotted case object. Behaves like a read-only mapping for code that still
+    takes a config dict (`case["YF"]`, `case.get("equilibrium")`, `"HTU_OG" in case`);
+    unset (None) fields read as missing. Keys outside the schema are kept in
+    `extras` so to_dict() round-trips the original config.
+    """
+
+    __slots__ = ("_extras",)
+    _schema = None
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self._schema.fields:
+            value = getattr(self, key)
+        else:
+            value = self._extras.get(key)
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def keys(self):
+        return [k for k in itertools.chain(self._schema.fields, self._extras) if k in self]
+
+    def items(self):
+        return [(k, self.get(k)) for k in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    @property
+    def extras(self):
+        return dict(self._extras)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def replace(self, **changes):
+        """Copy with some fields changed (re-validated)."""
+        return self._schema.compile({**self.to_dict(), **changes})
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is read-only; use replace()")
+
+    def __repr__(self):
+        body = ", ".join(f"{k}={v!r}" for k, v in self.items())
+        return f"{type(self).__name__}({body})"
+
+
+# ---------- sweep axes ----------
+def expand_values(spec):
+    """literal list, or {"linspace"|"logspace": [a, b, n]} / {"arange": [a, b, step]} / {"values": [...]}"""
+    if isinstance(spec, dict):
+        (kind, args), = spec.items()
+        if kind == "linspace":
+            return np.linspace(float(args[0]), float(args[1]), int(args[2]))
+        if kind == "logspace":
+            return np.geomspace(float(args[0]), float(args[1]), int(args[2]))
+        if kind == "arange":
+            return np.arange(float(args[0]), float(args[1]), float(args[2]))
+        if kind == "values":
+            return _array(args)
+        raise ConfigError(f"unknown value range {kind!r}, choose linspace/logspace/arange/values")
+    return _array(spec if isinstance(spec, (list, tuple, np.ndarray)) else [spec])
+
+
+def _array(values):
+    values = list(values)
+    if all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in values):
+        return np.asarray(values, dtype=float)
+    return np.asarray(values, dtype=object)
+
+
+class GridAxis:
+    """Cartesian product of several value lists (last key fastest)."""
+
+    def __init__(self, spec):
+        self.columns = {k: expand_values(v) for k, v in spec.items()}
+        self.shape = tuple(len(v) for v in self.columns.values())
+        self.size = math.prod(self.shape)
+
+    def take(self, idx):
+        sub = np.unravel_index(idx, self.shape) if self.shape else ()
+        return {k: v[i] for (k, v), i in zip(self.columns.items(), sub)}
+
+
+class ZipAxis:
+    """Value lists walked in lockstep (all the same length)."""
+
+    def __init__(self, spec):
+        self.columns = {k: expand_values(v) for k, v in spec.items()}
+        lengths = {len(v) for v in self.columns.values()}
+        if len(lengths) > 1:
+            raise ConfigError(f"zip sweep lists differ in length: {sorted(lengths)}")
+        self.size = lengths.pop() if lengths else 1
+
+    def take(self, idx):
+        return {k: v[idx] for k, v in self.columns.items()}
+
+
+class RandomAxis:
+    """
+    n seeded random samples. Values are generated in blocks of BLOCK indices
+    from default_rng([seed, block]) so any index range can be produced lazily
+    and reproducibly; the last block is cached for case-by-case iteration.
+    """
+
+    BLOCK = 1 << 16
+    DISTRIBUTIONS = ("uniform", "loguniform", "normal", "lognormal", "choice")
+
+    def __init__(self, spec):
+        self.size = int(spec["n"])
+        self.seed = int(spec.get("seed", 0))
+        self.params = {}
+        for k, d in spec["params"].items():
+            (kind, args), = d.items()
+            if kind not in self.DISTRIBUTIONS:
+                raise ConfigError(f"{k}: unknown distribution {kind!r}, choose from {self.DISTRIBUTIONS}")
+            self.params[k] = (kind, args)
+        self._cache = (None, None)
+
+    def _block(self, b):
+        if self._cache[0] != b:
+            rng = np.random.default_rng([self.seed, b])
+            cols = {}
+            for k, (kind, args) in self.params.items():
+                if kind == "uniform":
+                    cols[k] = rng.uniform(args[0], args[1], self.BLOCK)
+                elif kind == "loguniform":
+                    cols[k] = np.exp(rng.uniform(math.log(args[0]), math.log(args[1]), self.BLOCK))
+                elif kind == "normal":
+                    cols[k] = rng.normal(args[0], args[1], self.BLOCK)
+                elif kind == "lognormal":
+                    cols[k] = rng.lognormal(args[0], args[1], self.BLOCK)
+                else:
+                    cols[k] = _array(args)[rng.integers(0, len(args), self.BLOCK)]
+            self._cache = (b, cols)
+        return self._cache[1]
+
+    def take(self, idx):
+        idx = np.asarray(idx)
+        if idx.ndim == 0:
+            cols = self._block(int(idx) // self.BLOCK)
+            return {k: v[int(idx) % self.BLOCK] for k, v in cols.items()}
+        out = {k: np.empty(len(idx), dtype=object if kind == "choice" else float)
+               for k, (kind, _) in self.params.items()}
+        blocks = idx // self.BLOCK
+        for b in np.unique(blocks):
+            sel = blocks == b
+            cols = self._block(int(b))
+            for k in out:
+                out[k][sel] = cols[k][idx[sel] % self.BLOCK]
+        return out
+
+
+AXES = {"grid": GridAxis, "zip": ZipAxis, "random": RandomAxis}
+
+
+def _parse_axes(sweep):
+    items = sweep.items() if isinstance(sweep, dict) else [next(iter(a.items())) for a in sweep]
+    axes = []
+    for kind, spec in items:
+        if kind not in AXES:
+            raise ConfigError(f"unknown sweep axis {kind!r}, choose from {sorted(AXES)}")
+        axes.append(AXES[kind](spec))
+    return axes
+
+
+class Sweep:
+    """
+    Lazy parametric study: base config × product of sweep axes. Nothing per
+    case is stored; cases (or column chunks) are produced on demand.
+    """
+
+    def __init__(self, schema, cfg):
+        cfg = dict(cfg)
+        # hash of the raw config: shard directories refuse to resume a different study
+        self.fingerprint = hashlib.sha1(
+            json.dumps(cfg, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+        self.schema = schema
+        self.axes = _parse_axes(cfg.pop("sweep", None) or {})
+        self.swept = [k for a in self.axes for k in (a.columns if hasattr(a, "columns") else a.params)]
+        dup = {k for k in self.swept if self.swept.count(k) > 1}
+        if dup:
+            raise ConfigError(f"parameters swept on more than one axis: {sorted(dup)}")
+        unknown = [k for k in self.swept if k not in schema.fields]
+        if unknown:
+            raise ConfigError(f"{schema.name}: cannot sweep unknown parameters {unknown}")
+        # base validated once, with swept fields standing in as present
+        probe = {**cfg, **{k: _first(a, k) for a in self.axes for k in self.swept if _owns(a, k)}}
+        self.base, self.extras = schema.validate(probe)
+        for k in self.swept:
+            self.base[k] = None
+        self.shape = tuple(a.size for a in self.axes)
+        self.size = math.prod(self.shape)
+        self.name = cfg.get("case_name") or "case"
+
+    def __len__(self):
+        return self.size
+
+    def _columns(self, idx):
+        sub = np.unravel_index(idx, self.shape) if self.axes else ()
+        cols = {}
+        for axis, i in zip(self.axes, sub):
+            cols.update(axis.take(i))
+        return cols
+
+    def case_name(self, i):
+        if not self.axes:
+            return self.name
+        return f"{self.name}_{i + 1:0{len(str(self.size))}d}"
+
+    def chunks(self, size=100_000, start=0, stop=None):
+        """
+        Yield (start, columns) for consecutive index blocks of [start, stop). columns
+        holds an array per swept field, the base value (scalar) for every other field
+        set, and "case_name"; each chunk is validated vectorised before it is yielded.
+        """
+        stop = self.size if stop is None else min(stop, self.size)
+        for lo in range(start, stop, size):
+            idx = np.arange(lo, min(lo + size, stop))
+            cols = {k: v for k, v in self.base.items() if v is not None}
+            swept = self._columns(idx)
+            for k, v in swept.items():
+                f = self.schema.fields[k]
+                cols[k] = v.astype(float) if f.numeric else v
+            self.schema.check_columns(cols)
+            if "case_name" not in swept:
+                cols["case_name"] = [self.case_name(i) for i in idx.tolist()]
+            yield lo, cols
+
+    def __iter__(self):
+        return self.cases()
+
+    def cases(self, start=0, stop=None):
+        """Case objects for indices [start, stop), built one at a time."""
+        for _, cols in self.chunks(4096, start, stop):
+            swept = {k: cols[k] for k in self.swept}
+            for j, name in enumerate(cols["case_name"]):
+                values = dict(self.base, case_name=name)
+                for k, v in swept.items():
+                    values[k] = self.schema.fields[k].coerce(v[j].item() if hasattr(v[j], "item") else v[j])
+                yield self.schema.build(values, self.extras)
+
+    def __getitem__(self, i):
+        if not -self.size <= i < self.size:
+            raise IndexError(i)
+        i %= self.size
+        values = dict(self.base, case_name=self.case_name(i))
+        for k, v in self._columns(np.int64(i)).items():
+            values[k] = self.schema.fields[k].coerce(v.item() if hasattr(v, "item") else v)
+        self.schema.check_columns(values)
+        return self.schema.build(values, self.extras)
+
+    def describe(self):
+        return {"n_cases": self.size, "axes": [
+            {"kind": type(a).__name__.replace("Axis", "").lower(), "size": a.size,
+             "params": list(a.columns if hasattr(a, "columns") else a.params)} for a in self.axes]}
+
+
+def _owns(axis, key):
+    return key in (axis.columns if hasattr(axis, "columns") else axis.params)
+
+
+def _first(axis, key):
+    v = axis.take(0)[key]
+    return v.item() if hasattr(v, "item") else v
+
+
+# ---------- absorber schema ----------
+def _positive(v):
+    return v > 0
+
+
+def _non_negative(v):
+    return v >= 0
+
+
+def _need_m(values):
+    if values.get("m") is None and values.get("equilibrium") is None:
+        return "m is required unless equilibrium is given"
+
+
+def _yf_above_yn(values):
+    YF, YN = values.get("YF"), values.get("YN_target")
+    if YF is not None and YN is not None and np.any(np.asarray(YN) >= np.asarray(YF)):
+        return "YN_target must be below YF"
+
+
+ABSORPTION = Schema("AbsorptionCase", [
+    Field("case_name", str, "case"),
+    Field("m", float, check=_positive, hint="must be > 0"),
+    Field("equilibrium", object),
+    Field("YF", float, required=True, check=_positive, hint="must be > 0"),
+    Field("YN_target", float, required=True, check=_non_negative, hint="must be >= 0"),
+    Field("X0", float, required=True, check=_non_negative, hint="must be >= 0"),
+    Field("V", float, required=True, check=_positive, hint="must be > 0"),
+    Field("L", float, 0.0, check=_non_negative, hint="must be >= 0 (0 = L_factor x Lmin)"),
+    Field("L_factor", float, 1.5, check=_positive, hint="must be > 0"),
+    Field("HETP", float, 0.5, check=_positive, hint="must be > 0"),
+    Field("max_stages_cap", int, 300, check=lambda v: v >= 1, hint="must be >= 1"),
+    Field("plot", bool, True),
+    Field("notes", str, ""),
+    Field("solute_name", str, "溶质"),
+    Field("inert_name", str, "惰性气体"),
+    Field("solvent_name", str, "溶剂"),
+    Field("transfer_units", object),
+    Field("HTU_OG", float, check=_positive, hint="must be > 0"),
+    Field("HTU_G", float, check=_positive, hint="must be > 0"),
+    Field("HTU_L", float, check=_non_negative, hint="must be >= 0"),
+    Field("area", float, check=_positive, hint="must be > 0"),
+    Field("kYa", object),
+    Field("kXa", object),
+    Field("economics", object),
+    Field("L_factor_range", object),
+], rules=(_need_m, _yf_above_yn))
+
+AbsorptionCase = ABSORPTION.case_class
+
+
+def compile_case(cfg):
+    """Validate an absorber config dict once -> AbsorptionCase (cases pass through)."""
+    return ABSORPTION.compile(cfg)
+
+
+def load_study(path_or_cfg):
+    """Config file or dict with an optional "sweep" -> Sweep (a single case if no sweep)."""
+    from .io_utils import load_config_any
+    cfg = load_config_any(path_or_cfg) if isinstance(path_or_cfg, str) else path_or_cfg
+    return Sweep(ABSORPTION, cfg)
@@ -1,15 +1,212 @@
-import os, datetime
+"""
+Run logger with a persistent buffered handle.
+
+    logger = Logger("results/case/log.txt")          # text lines: [INFO] 2025-11-10T08:16:17.123456 msg
+    logger.info("L = %.6f", L)                       # %-args are formatted only if the level is enabled
+    logger.info("stage table", rows=n)               # keyword fields (appended as JSON in text mode)
+    logger.close()                                   # or `with Logger(...) as logger:`
+
+Defaults come from configure_logging() or the environment:
+    CHEMENG_LOG_LEVEL=DEBUG|INFO|WARN|ERROR   (default INFO)
+    CHEMENG_LOG_FORMAT=text|json              (json = one JSON object per line)
+
+Several processes writing logs at once: start one LogListener in the parent and
+route the workers' loggers through its queue; a single background thread then
+owns every file handle, so lines never interleave mid-record.
+
+    listener = LogListener().start()
+    pool = ProcessPoolExecutor(initializer=configure_logging, initargs=(None, None, listener.queue))
+    ...
+    listener.stop()
+
+Open loggers and running listeners are flushed at interpreter exit.
+"""
+
+import os
+import time
+import json
+import queue as _queue
+import atexit
+import weakref
+import threading
+import multiprocessing
+
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARN": 30, "WARNING": 30, "ERROR": 40}
+
+_DEFAULTS = {
+    "level": os.environ.get("CHEMENG_LOG_LEVEL", "INFO").upper(),
+    "fmt": os.environ.get("CHEMENG_LOG_FORMAT", "text").lower(),
+    "queue": None,
+}
+
+_BUFFER = 1 << 16
+_OPEN = weakref.WeakSet()
+
+
+def configure_logging(level=None, fmt=None, queue=None):
+    """Set process-wide defaults for new loggers (also usable as a pool initializer)."""
+    if level is not None:
+        _level_no(level)
+        _DEFAULTS["level"] = level.upper()
+    if fmt is not None:
+        if fmt not in ("text", "json"):
+            raise ValueError(f"unknown log format {fmt!r}, choose 'text' or 'json'")
+        _DEFAULTS["fmt"] = fmt
+    if queue is not None:
+        _DEFAULTS["queue"] = queue
+
+
+def _level_no(level):
+    try:
+        return LEVELS[level.upper()]
+    except KeyError:
+        raise ValueError(f"unknown log level {level!r}, choose from {sorted(LEVELS)}") from None
+
+
+_stamp_cache = [None, ""]
+
+
+def _timestamp(t):
+    """ISO-8601 local time with microseconds; strftime runs once per second."""
+    sec = int(t)
+    if sec != _stamp_cache[0]:
+        _stamp_cache[:] = [sec, time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(sec))]
+    return f"{_stamp_cache[1]}.{int((t - sec) * 1e6):06d}"
+
+
+def _open(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return open(path, "a", encoding="utf-8", buffering=_BUFFER)
+
 
 class Logger:
-    def __init__(self, logfile):
+    def __init__(self, logfile, level=None, fmt=None, queue=None):
+        # logfile=None：不落盘（内存/空输出模式）
         self.file = logfile
-        os.makedirs(os.path.dirname(logfile), exist_ok=True)
+        self.level = _level_no(level or _DEFAULTS["level"])
+        self.fmt = fmt or _DEFAULTS["fmt"]
+        self.queue = queue if queue is not None else _DEFAULTS["queue"]
+        self._fh = None
+        self._lock = threading.Lock()
+        if logfile and self.queue is None:
+            self._fh = _open(logfile)
+            _OPEN.add(self)
+
+    def enabled(self, level):
+        return self.file is not None and LEVELS[level] >= self.level
+
+    def log(self, level, msg, *args, **fields):
+        if not self.file or LEVELS[level] < self.level:
+            return
+        if args:
+            msg = msg % args
+        ts = _timestamp(time.time())
+        if self.fmt == "json":
+            line = json.dumps({"ts": ts, "level": level, "msg": msg, **fields},
+                              ensure_ascii=False, default=str) + "\n"
+        elif fields:
+            line = f"[{level}] {ts} {msg} {json.dumps(fields, ensure_ascii=False, default=str)}\n"
+        else:
+            line = f"[{level}] {ts} {msg}\n"
+        if self.queue is not None:
+            self.queue.put((self.file, line))
+            return
+        with self._lock:
+            if self._fh is None:                 # reopened after close()
+                self._fh = _open(self.file)
+                _OPEN.add(self)
+            self._fh.write(line)
+
+    def debug(self, msg, *args, **fields): self.log("DEBUG", msg, *args, **fields)
+    def info(self, msg, *args, **fields): self.log("INFO", msg, *args, **fields)
+    def warn(self, msg, *args, **fields): self.log("WARN", msg, *args, **fields)
+    def error(self, msg, *args, **fields): self.log("ERROR", msg, *args, **fields)
+
+    def flush(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+        _OPEN.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class LogListener:
+    """
+    Background writer for (path, line) records put on `queue` by Loggers in any
+    process. Handles stay open until stop(); they are flushed whenever the
+    queue runs dry, so the files stay current without a write per line.
+    """
+
+    def __init__(self, queue=None):
+        self.queue = queue if queue is not None else multiprocessing.Queue()
+        self._thread = None
+        self._handles = {}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-listener", daemon=True)
+            self._thread.start()
+            _LISTENERS.add(self)
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                record = self.queue.get(timeout=0.2)
+            except _queue.Empty:
+                self._flush()
+                continue
+            if record is None:
+                break
+            path, line = record
+            fh = self._handles.get(path)
+            if fh is None:
+                fh = self._handles[path] = _open(path)
+            fh.write(line)
+        self._flush()
+        for fh in self._handles.values():
+            fh.close()
+        self._handles.clear()
+
+    def _flush(self):
+        for fh in self._handles.values():
+            fh.flush()
+
+    def stop(self):
+        """Drain the queue, close all files and join the writer thread."""
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join()
+            self._thread = None
+            _LISTENERS.discard(self)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+_LISTENERS = weakref.WeakSet()
 
-    def log(self, level, msg):
-        line = f"[{level}] {datetime.datetime.now().isoformat()} {msg}\n"
-        with open(self.file, "a", encoding="utf-8") as f:
-            f.write(line)
 
-    def info(self, msg): self.log("INFO", msg)
-    def warn(self, msg): self.log("WARN", msg)
-    def error(self, msg): self.log("ERROR", msg)
\ No newline at end of file
+@atexit.register
+def _flush_all():
+    for logger in list(_OPEN):
+        logger.close()
+    for listener in list(_LISTENERS):
+        listener.stop()
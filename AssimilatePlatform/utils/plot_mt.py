@@ -1,11 +1,13 @@
+import numpy as np
 import matplotlib.pyplot as plt
 
-def draw_mt(out_png, m, L, V, YN, X0, YF, stairs):
+def draw_mt(out_png, m, L, V, YN, X0, YF, stairs, pinch=None):
     """
     教材式 McCabe–Thiele 吸收图。
-    - 平衡线: Y = mX
+    - 平衡线: Y = mX；m 为 Equilibrium 对象时按曲线绘制
+    - pinch: {"kind", "X"}（可选），切点夹点时标出夹点位置
     - 操作线: Y = (L/V)X + (YN - (L/V)X0)
-    - 阶梯: 按 stairs 逐级绘制
+    - 阶梯: stairs 为 StairArray，整条折线一次绘制
     """
 
     r = L / V
@@ -19,10 +21,20 @@ def draw_mt(out_png, m, L, V, YN, X0, YF, stairs):
     ax.grid(True, linestyle="--", alpha=0.4)
 
     # ==== 平衡线 ====
-    x_eq = [0, max(0.02, max(s["X"] for s in stairs)) * 1.1]
-    y_eq = [m * x for x in x_eq]
-    ax.plot(x_eq, y_eq, "r-", lw=1.8,
-            label=f"Equilibrium line  Y = {m:.3f}·X")
+    x_path, y_path = stairs.path()
+    x_eq = [0, max(0.02, float(x_path.max())) * 1.1]
+    if hasattr(m, "y_star"):
+        x_eq[1] = min(x_eq[1], m.X_max)
+        xs = np.linspace(max(m.X_min, 0.0), x_eq[1], 200)
+        y_eq = m.y_star(xs)
+        ax.plot(xs, y_eq, "r-", lw=1.8, label=f"Equilibrium curve  ({m.kind})")
+        if pinch and pinch.get("kind") == "tangent":
+            ax.scatter(pinch["X"], float(m.y_star(pinch["X"])), c="r", marker="x", s=50,
+                       label="Tangent pinch")
+    else:
+        y_eq = [m * x for x in x_eq]
+        ax.plot(x_eq, y_eq, "r-", lw=1.8,
+                label=f"Equilibrium line  Y = {m:.3f}·X")
 
     # ==== 操作线 ====
     y_op = [r * x + intercept for x in x_eq]
@@ -30,16 +42,11 @@ def draw_mt(out_png, m, L, V, YN, X0, YF, stairs):
             label=f"Operating line  Y = {r:.3f}·X + {intercept:.4f}")
 
     # ==== 阶梯 ====
-    for i in range(1, len(stairs), 2):
-        h1, v1 = stairs[i - 1], stairs[i]
-        ax.plot([h1["X"], v1["X"]], [h1["Y"], h1["Y"]], "k-", lw=1)
-        if i + 1 < len(stairs):
-            v2 = stairs[i + 1]
-            ax.plot([v1["X"], v2["X"]], [v1["Y"], v2["Y"]], "k-", lw=1)
+    ax.plot(x_path, y_path, "k-", lw=1)
 
     # ==== 起点/终点 ====
     ax.scatter(X0, YN, c="g", s=40, label="Top  (X₀, Y_N)")
-    ax.scatter(stairs[-1]["X"], stairs[-1]["Y"], c="orange", s=40, label="Bottom (X₁, Y_F)")
+    ax.scatter(x_path[-1], y_path[-1], c="orange", s=40, label="Bottom (X₁, Y_F)")
 
     # ==== 坐标范围与图例 ====
     ax.set_xlim(0, max(x_eq) * 1.05)
@@ -49,4 +56,40 @@ def draw_mt(out_png, m, L, V, YN, X0, YF, stairs):
     plt.tight_layout()
     plt.savefig(out_png, dpi=300, bbox_inches="tight")
     plt.close()
-    return True
\ No newline at end of file
+    return True
+
+
+def draw_cost_curves(out_png, curves, optimum):
+    """
+    吸收塔经济优化曲线：上图为各填料的总成本 C 与分项（随 L/Lmin），下图为理论级数 N。
+    curves 为 AbsorberOptimizer.costs() 的返回值，optimum 为最优点 dict。
+    """
+    f = curves["L_factor"]
+    fig, (ax, ax_n) = plt.subplots(2, 1, figsize=(7, 7), sharex=True,
+                                   gridspec_kw={"height_ratios": [2, 1]})
+    for j, p in enumerate(curves["packings"]):
+        basis = f"HETP={p['HETP']:g} m" if p["HETP"] is not None else "NTU·HTU"
+        ax.plot(f, curves["C"][:, j], lw=1.6, label=f"Total  ({p['name']}, {basis})")
+        if len(curves["packings"]) == 1:
+            ax.plot(f, curves["C_height"][:, j], "--", lw=1.0, label="Column height")
+    ax.plot(f, curves["C_solvent"][:, 0] + curves["C_regen"][:, 0], ":", lw=1.2,
+            label="Solvent circulation + regeneration")
+    ax.scatter([optimum["L_factor_opt"]], [optimum["C_opt"]], c="r", s=40, zorder=3,
+               label=f"Optimum  L/Lmin={optimum['L_factor_opt']:.3f}")
+    ax.set_ylabel("Cost")
+    ax.set_title("Absorber Economic Optimization", fontsize=13)
+    ax.grid(True, linestyle="--", alpha=0.4)
+    ax.legend(fontsize=8, frameon=False)
+
+    ax_n.step(f, curves["N"], where="post", c="k", lw=1.2)
+    ax_n.set_xlabel("L / Lmin")
+    ax_n.set_ylabel("N (theoretical stages)")
+    ax_n.set_xscale("log")
+    ax_n.xaxis.set_major_formatter(plt.FormatStrFormatter("%g"))
+    ax_n.xaxis.set_minor_formatter(plt.FormatStrFormatter("%g"))
+    ax_n.grid(True, linestyle="--", alpha=0.4)
+
+    plt.tight_layout()
+    plt.savefig(out_png, dpi=300, bbox_inches="tight")
+    plt.close()
+    return True
@@ -0,0 +1,264 @@
+"""
+Sharded, resumable sweeps with a plain directory as the coordinator.
+
+    root/
+    ├── plan.json              n_cases, shard_size, study fingerprint (written once, checked on resume)
+    ├── claims/00012.claim     lease of the worker computing shard 12: {"host", "pid", "time"};
+    │                          its mtime is the heartbeat
+    └── shards/00012.csv       shard table, renamed into place when complete
+        shards/00012.json      shard statistics, written last: its presence marks the shard done
+
+Shard i covers case indices [i*shard_size, (i+1)*shard_size), so every worker
+on every host produces the same rows for the same shard. Workers (local
+processes or other machines sharing the directory) claim shards with
+O_CREAT|O_EXCL. A claim whose owner is gone (same host, pid no longer alive)
+or whose heartbeat is older than `lease` seconds is taken over. Shard output
+is committed with os.replace, so a crash leaves at most a stray temp file,
+and the worst outcome of a lost claim race is a shard computed twice with
+identical output. Re-running the same sweep on the directory skips every
+completed shard; merge() concatenates the shard tables in order.
+
+DistillationPlatform/utils/shards.py is a copy of this module: each platform
+runs with its own top-level `core`/`utils` packages, so neither can import the
+other's. Apart from text and DEFAULT_SHARD_SIZE the code must stay identical;
+tools/check_sync.py at the repository root checks it.
+"""
+
+import os
+import json
+import time
+import shutil
+import socket
+
+
+PLAN = "plan.json"
+HOST = socket.gethostname()
+DEFAULT_SHARD_SIZE = 100_000
+
+
+def _write_json_atomic(path, data):
+    tmp = f"{path}.{HOST}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid):
+    if os.name != "posix":
+        return True                  # os.kill(pid, 0) would terminate the process on Windows; rely on the lease
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ShardQueue:
+    """
+    Work queue of one sharded sweep rooted at `root`.
+
+    n_cases / fingerprint identify the sweep; a directory planned for another
+    sweep is refused. shard_size=None adopts the stored plan (or
+    DEFAULT_SHARD_SIZE for a new one). lease is the number of seconds after
+    which a claim without heartbeat counts as abandoned; it must exceed the
+    time a worker needs between heartbeat() calls plus any clock skew
+    between hosts.
+    """
+
+    def __init__(self, root, n_cases, fingerprint, shard_size=None, lease=600.0):
+        self.root = os.path.abspath(root)
+        self.claims = os.path.join(self.root, "claims")
+        self.shards = os.path.join(self.root, "shards")
+        os.makedirs(self.claims, exist_ok=True)
+        os.makedirs(self.shards, exist_ok=True)
+        self.lease = float(lease)
+        self.plan = self._load_plan(int(n_cases), fingerprint, shard_size)
+        self.n_cases = self.plan["n_cases"]
+        self.shard_size = self.plan["shard_size"]
+        self.n_shards = self.plan["n_shards"]
+        self._width = max(5, len(str(self.n_shards - 1)))
+        self._held = {}              # shard -> (claimed at, last heartbeat), perf_counter seconds
+
+    def _load_plan(self, n_cases, fingerprint, shard_size):
+        path = os.path.join(self.root, PLAN)
+        if not os.path.exists(path):
+            size = int(shard_size or DEFAULT_SHARD_SIZE)
+            tmp = f"{path}.{HOST}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": fingerprint, "n_cases": n_cases, "shard_size": size,
+                           "n_shards": -(-n_cases // size),
+                           "created": time.strftime("%Y-%m-%d %H:%M:%S")}, f, indent=2)
+            try:
+                os.link(tmp, path)   # create-if-absent with complete content: the first planner wins
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(tmp)
+        with open(path, encoding="utf-8") as f:
+            plan = json.load(f)
+        if plan["fingerprint"] != fingerprint or plan["n_cases"] != n_cases:
+            raise ValueError(f"{self.root} holds a different sweep "
+                             f"({plan['n_cases']} cases, fingerprint {plan['fingerprint']}); use a new directory")
+        if shard_size is not None and int(shard_size) != plan["shard_size"]:
+            raise ValueError(f"{self.root} was planned with shard_size={plan['shard_size']}")
+        return plan
+
+    # ---------- layout ----------
+    def bounds(self, i):
+        lo = i * self.shard_size
+        return lo, min(lo + self.shard_size, self.n_cases)
+
+    def _name(self, i):
+        return f"{i:0{self._width}d}"
+
+    def table_path(self, i):
+        return os.path.join(self.shards, f"{self._name(i)}.csv")
+
+    def _stats_path(self, i):
+        return os.path.join(self.shards, f"{self._name(i)}.json")
+
+    def _claim_path(self, i):
+        return os.path.join(self.claims, f"{self._name(i)}.claim")
+
+    def temp_name(self, i):
+        """Table name (no extension, inside `shards`) a worker writes shard i to before commit()."""
+        return f".{self._name(i)}.{HOST}.{os.getpid()}"
+
+    # ---------- state ----------
+    def pending(self):
+        done = set(os.listdir(self.shards))
+        return [i for i in range(self.n_shards) if f"{self._name(i)}.json" not in done]
+
+    def progress(self):
+        n_pending = len(self.pending())
+        running = sum(1 for f in os.listdir(self.claims) if f.endswith(".claim"))
+        return {"n_shards": self.n_shards, "done": self.n_shards - n_pending,
+                "running": min(running, n_pending), "pending": n_pending}
+
+    def stats(self):
+        """Statistics of every completed shard, in shard order."""
+        out = []
+        for i in range(self.n_shards):
+            try:
+                with open(self._stats_path(i), encoding="utf-8") as f:
+                    out.append(json.load(f))
+            except FileNotFoundError:
+                pass
+        return out
+
+    # ---------- claims ----------
+    def _stale(self, path):
+        """None while the claim is live, else the owner record ({} if unreadable)."""
+        try:
+            age = time.time() - os.path.getmtime(path)
+            with open(path, encoding="utf-8") as f:
+                owner = json.load(f)
+        except FileNotFoundError:
+            return None              # released meanwhile; the next pass sees the shard as free or done
+        except ValueError:
+            owner = {}               # still being written
+        if owner.get("host") == HOST and "pid" in owner and not _pid_alive(owner["pid"]):
+            owner["dead"] = True
+            return owner
+        return owner if age > self.lease else None
+
+    def claim(self, i):
+        """Try to take shard i; True if this process now holds it."""
+        path = self._claim_path(i)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                owner = self._stale(path)
+                if owner is None:
+                    return False
+                try:                 # only one taker can move the stale claim away
+                    stale = f"{path}.{HOST}.{os.getpid()}.stale"
+                    os.rename(path, stale)
+                    os.remove(stale)
+                except FileNotFoundError:
+                    return False
+                if owner.get("dead"):            # its partial table can go; a merely silent owner may still commit
+                    try:
+                        os.remove(os.path.join(self.shards, f".{self._name(i)}.{HOST}.{owner['pid']}.csv"))
+                    except FileNotFoundError:
+                        pass
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"host": HOST, "pid": os.getpid(), "time": time.time()}, f)
+            if os.path.exists(self._stats_path(i)):      # finished while we were looking
+                os.remove(path)
+                return False
+            now = time.perf_counter()
+            self._held[i] = (now, now)
+            return True
+        return False
+
+    def heartbeat(self, i):
+        """Refresh the lease on shard i (cheap; touches the claim at most every lease/4 seconds)."""
+        t0, beat = self._held[i]
+        now = time.perf_counter()
+        if now - beat >= self.lease / 4:
+            try:
+                os.utime(self._claim_path(i))
+            except FileNotFoundError:
+                pass
+            self._held[i] = (t0, now)
+
+    def release(self, i):
+        """Give shard i back without completing it (its temp table is discarded)."""
+        self._held.pop(i, None)
+        for path in (self._claim_path(i), os.path.join(self.shards, self.temp_name(i) + ".csv")):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def commit(self, i, stats):
+        """Move the temp table of shard i into place, then record its statistics (marks it done)."""
+        t0, _ = self._held.get(i, (time.perf_counter(), None))
+        lo, hi = self.bounds(i)
+        os.replace(os.path.join(self.shards, self.temp_name(i) + ".csv"), self.table_path(i))
+        _write_json_atomic(self._stats_path(i), {
+            "shard": i, "start": lo, "stop": hi, **stats, "host": HOST, "pid": os.getpid(),
+            "seconds": time.perf_counter() - t0, "finished": time.strftime("%Y-%m-%d %H:%M:%S")})
+        self.release(i)
+
+    def work(self, fn):
+        """
+        Claim and compute shards until none is left to take. fn(i, start, stop)
+        writes table temp_name(i) into `shards` and returns the shard statistics.
+        Shards held by live workers elsewhere are left to them. Returns the
+        number of shards this process completed.
+        """
+        n = 0
+        while True:
+            claimed = False
+            for i in self.pending():
+                if not self.claim(i):
+                    continue
+                claimed = True
+                try:
+                    stats = fn(i, *self.bounds(i))
+                except BaseException:
+                    self.release(i)
+                    raise
+                self.commit(i, stats)
+                n += 1
+            if not claimed:
+                return n
+
+    # ---------- result ----------
+    def merge(self, dest):
+        """Concatenate all shard tables in shard order into dest (one header line), atomically."""
+        tmp = f"{dest}.{HOST}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as out:
+            for i in range(self.n_shards):
+                with open(self.table_path(i), "rb") as f:
+                    if i:
+                        f.readline()
+                    shutil.copyfileobj(f, out, 1 << 20)
+        os.replace(tmp, dest)
+        return dest
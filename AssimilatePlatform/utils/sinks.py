@@ -0,0 +1,173 @@
+"""
+Result sinks: every artifact of a run is produced exactly once and the sink
+decides where it goes.
+
+    CSVSink(folder)      tables -> {name}.csv, documents -> {name}.json (default)
+    JSONSink(folder)     tables -> {name}.json (records), documents -> {name}.json
+    ParquetSink(folder)  tables -> {name}.parquet (needs pyarrow), documents -> {name}.json
+    MemorySink()         keep everything in memory (.tables / .documents), no file I/O
+    NullSink()           drop everything (sweeps that only need the return value)
+
+Tables are passed as column names + row tuples of raw values; `formats` gives
+an optional per-column format spec (e.g. ".8f") applied only by text sinks.
+Long streamed tables use append_table() chunk by chunk: CSV and memory sinks
+extend the table in place, the others collect the rows and write on close().
+Only sinks with a folder get file-only artifacts such as the log and the plot.
+
+DistillationPlatform/utils/sinks.py has the same sink classes but takes
+pandas DataFrames (write_table(name, df, **csv_kwargs)), since its engines
+already build DataFrames. The absorber never imports pandas, and its sweeps
+stream millions of rows, so here tables stay plain rows with per-column
+formats. The two platforms cannot share one module (both use top-level
+core/utils packages), so each keeps the signature that fits its callers.
+"""
+
+import os
+import json
+
+
+class ResultSink:
+    folder = None
+    table_ext = None
+
+    def __init__(self):
+        self._pending = {}           # append_table() chunks collected until close()
+
+    def write_table(self, name, columns, rows, formats=None):
+        raise NotImplementedError
+
+    def append_table(self, name, columns, rows, formats=None):
+        self._pending.setdefault(name, (columns, formats, []))[2].extend(rows)
+
+    def write_json(self, name, data):
+        raise NotImplementedError
+
+    def path(self, filename):
+        return os.path.join(self.folder, filename) if self.folder else None
+
+    def artifact(self, name):
+        """File name a table ends up in, or None when nothing is written."""
+        return f"{name}{self.table_ext}" if self.folder else None
+
+    def close(self):
+        pending, self._pending = self._pending, {}
+        for name, (columns, formats, rows) in pending.items():
+            self.write_table(name, columns, rows, formats)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _fmt(value, spec):
+    return format(value, spec) if spec else str(value)
+
+
+class _FolderSink(ResultSink):
+    def __init__(self, folder):
+        super().__init__()
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+
+    def write_json(self, name, data):
+        with open(self.path(f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+class CSVSink(_FolderSink):
+    table_ext = ".csv"
+
+    def __init__(self, folder):
+        super().__init__(folder)
+        self._started = set()        # tables already created by append_table()
+
+    def write_table(self, name, columns, rows, formats=None):
+        self._write(name, columns, rows, formats, "w")
+
+    def append_table(self, name, columns, rows, formats=None):
+        self._write(name, columns, rows, formats, "a" if name in self._started else "w")
+        self._started.add(name)
+
+    def _write(self, name, columns, rows, formats, mode):
+        formats = formats or [None] * len(columns)
+        lines = [",".join(columns)] if mode == "w" else []
+        lines.extend(",".join(_fmt(v, s) for v, s in zip(row, formats)) for row in rows)
+        with open(self.path(f"{name}.csv"), mode, encoding="utf-8") as f:
+            if lines:
+                f.write("\n".join(lines) + "\n")
+
+
+class JSONSink(_FolderSink):
+    table_ext = ".json"
+
+    def write_table(self, name, columns, rows, formats=None):
+        self.write_json(name, [dict(zip(columns, row)) for row in rows])
+
+
+class ParquetSink(_FolderSink):
+    table_ext = ".parquet"
+
+    def write_table(self, name, columns, rows, formats=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except Exception as e:
+            raise RuntimeError(
+                "Parquet output requested but pyarrow is not installed.\n"
+                "Install with:  pip install pyarrow  (or use the csv/json sink)."
+            ) from e
+        cols = list(zip(*rows)) if rows else [()] * len(columns)
+        pq.write_table(pa.table({c: list(v) for c, v in zip(columns, cols)}),
+                       self.path(f"{name}.parquet"))
+
+
+class MemorySink(ResultSink):
+    def __init__(self):
+        super().__init__()
+        self.tables = {}
+        self.documents = {}
+
+    def write_table(self, name, columns, rows, formats=None):
+        self.tables[name] = {"columns": list(columns), "rows": [tuple(r) for r in rows]}
+
+    def append_table(self, name, columns, rows, formats=None):
+        t = self.tables.setdefault(name, {"columns": list(columns), "rows": []})
+        t["rows"].extend(tuple(r) for r in rows)
+
+    def write_json(self, name, data):
+        self.documents[name] = data
+
+    def records(self, name):
+        t = self.tables[name]
+        return [dict(zip(t["columns"], r)) for r in t["rows"]]
+
+
+class NullSink(ResultSink):
+    def write_table(self, name, columns, rows, formats=None):
+        pass
+
+    def append_table(self, name, columns, rows, formats=None):
+        pass
+
+    def write_json(self, name, data):
+        pass
+
+
+SINKS = {"csv": CSVSink, "json": JSONSink, "parquet": ParquetSink,
+         "memory": MemorySink, "null": NullSink}
+
+
+def make_sink(kind="csv", folder=None):
+    """Build a sink by name; csv/json/parquet need a folder."""
+    try:
+        cls = SINKS[kind]
+    except KeyError:
+        raise ValueError(f"unknown sink {kind!r}, choose from {sorted(SINKS)}") from None
+    if cls in (MemorySink, NullSink):
+        return cls()
+    if not folder:
+        raise ValueError(f"{kind} sink needs an output folder")
+    return cls(folder)
@@ -0,0 +1 @@
+"""Microbenchmarks for the DistillationPlatform solver hot paths."""
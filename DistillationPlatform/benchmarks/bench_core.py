@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+bench_core.py
+-------------
+DistillationPlatform 求解热点的基准用例。
+
+运行（在 DistillationPlatform 目录下）：
+    python -m benchmarks.bench_core                  # 仅计时
+    python -m benchmarks.bench_core --save baseline  # 写入 benchmarks/baselines/baseline.json
+    python -m benchmarks.bench_core --compare        # 与基线比较，回退时退出码为 1
+
+夹具：
+    real  : main.py / optimize.py 中的 50 点实验 x–y 表
+    a2.5 / a1.5 / a1.1 / a1.05 : 相对挥发度为常数的合成体系（101 点）
+    H_SYN : 11 点合成焓–组成表（潜热随组成变化、含混合热，非恒摩尔流），用于 Ponchon–Savarit
+规模从 ~8 级到 2000 级上限（R 低于 Rmin 时跑满上限）。
+"""
+
+import sys
+
+import numpy as np
+
+from core.vle_data import VLEData
+from core.spec import DistillationSpec
+from core.distillation_column import DistillationColumn
+from core.batch_distillation import BatchDistillation
+from core.ponchon_savarit import EnthalpyData, PonchonSavaritColumn
+from core.optimizer import DistillationOptimizer
+from core.shortcut import prescreen
+from core.sequencing import SequenceSynthesizer
+from core.multiple_effect import MultiEffectSystem
+from core.pressure_vle import METHANOL_WATER
+from core.vle_library import VLELibrary
+import multiple_tower
+
+from benchmarks.harness import case, main
+
+
+# ---------- 夹具 ----------
+X_REAL = np.linspace(0, 0.98, 50)
+Y_REAL = np.array([0.000, 0.135, 0.235, 0.311, 0.372, 0.421, 0.463, 0.499, 0.529, 0.556,
+                   0.580, 0.602, 0.622, 0.640, 0.656, 0.672, 0.686, 0.700, 0.713, 0.725,
+                   0.737, 0.748, 0.759, 0.769, 0.779, 0.789, 0.799, 0.808, 0.817, 0.826,
+                   0.835, 0.844, 0.853, 0.861, 0.870, 0.878, 0.886, 0.895, 0.903, 0.911,
+                   0.919, 0.927, 0.936, 0.944, 0.952, 0.960, 0.968, 0.976, 0.984, 0.992])
+
+
+def vle_real():
+    return VLEData(X_REAL, Y_REAL)
+
+
+def vle_alpha(alpha, n=101):
+    x = np.linspace(0.0, 1.0, n)
+    return VLEData(x, alpha * x / (1.0 + (alpha - 1.0) * x))
+
+
+def enthalpy_syn():
+    x = np.linspace(0.0, 1.0, 11)
+    hL = 7500.0 * (1 - x) + 4700.0 * x - 3000.0 * x * (1 - x)
+    HV = 48300.0 * (1 - x) + 39300.0 * x + 1500.0 * x * (1 - x)
+    return EnthalpyData(x, hL, x, HV)
+
+
+# (名称, VLE 构造, xF, xD, xW, R/Rmin) —— 理论级数约 8 / 14 / 47 / 253 / 631 / 2000(上限)
+COLUMN_CASES = [
+    ("real_8", vle_real, 0.50, 0.90, 0.01, 1.5),
+    ("a2.5_14", lambda: vle_alpha(2.5), 0.50, 0.95, 0.05, 1.3),
+    ("a1.5_47", lambda: vle_alpha(1.5), 0.50, 0.99, 0.01, 1.2),
+    ("a1.1_253", lambda: vle_alpha(1.1), 0.50, 0.99, 0.01, 1.05),
+    ("a1.05_631", lambda: vle_alpha(1.05), 0.50, 0.995, 0.005, 1.02),
+    ("a1.05_cap2000", lambda: vle_alpha(1.05), 0.50, 0.995, 0.005, 0.98),
+]
+
+MURPHREE = {
+    "plain": dict(consider_murphree=False),
+    "EML0.7": dict(consider_murphree=True, EM_L=0.7),
+    "EMV0.7": dict(consider_murphree=True, EM_L=1.0, EM_V=0.7),
+}
+
+
+def _column(vle, xF, xD, xW, R_factor, q=1.0, **eff):
+    spec = DistillationSpec(xF=xF, q=q, xD=xD, xW=xW, R=0.0, **eff)
+    col = DistillationColumn(spec, vle)
+    spec.R = R_factor * col.compute_Rmin()
+    return col
+
+
+# ---------- VLEData ----------
+def _register_vle():
+    ys = np.linspace(0.01, 0.99, 1000)
+    for name, make in (("real", vle_real), ("a2.5", lambda: vle_alpha(2.5))):
+        @case(f"vle.y_star[{name}]x1000")
+        def _y(make=make):
+            vle = make()
+            return lambda: sum(vle.y_star(x) for x in ys)
+
+        @case(f"vle.x_star[{name}]x1000")
+        def _x(make=make):
+            vle = make()
+            return lambda: sum(vle.x_star(y) for y in ys)
+
+
+# ---------- VLE 库 ----------
+def _register_library():
+    @case("vle_library.open+get[cold,methanol_water]")
+    def _cold():
+        # 新打开库（读 manifest）+ 内存映射数组 + 首次求值时构造样条
+        return lambda: VLELibrary().get("methanol_water").y_star(0.3)
+
+    @case("vle_library.get[hit]x1000")
+    def _hit():
+        lib = VLELibrary()
+        lib.get("methanol_water")
+        return lambda: [lib.get("methanol_water") for _ in range(1000)][-1].y_star(0.3)
+
+
+# ---------- DistillationColumn.run ----------
+def _register_run():
+    for cname, make, xF, xD, xW, f in COLUMN_CASES:
+        for ename, eff in MURPHREE.items():
+            @case(f"column.run[{cname},{ename}]")
+            def _run(make=make, xF=xF, xD=xD, xW=xW, f=f, eff=eff):
+                col = _column(make(), xF, xD, xW, f, **eff)
+                return lambda: len(col.run()["theory"])
+
+
+# ---------- Ponchon–Savarit ----------
+def _register_ponchon_savarit():
+    for cname, make, xF, xD, xW, f in COLUMN_CASES[:4]:
+        for ename in ("plain", "EML0.7"):
+            @case(f"ponchon_savarit.run[{cname},{ename}]")
+            def _ps(make=make, xF=xF, xD=xD, xW=xW, f=f, eff=MURPHREE[ename]):
+                spec = DistillationSpec(xF=xF, q=1.0, xD=xD, xW=xW, R=0.0, **eff)
+                col = PonchonSavaritColumn(spec, make(), enthalpy_syn())
+                spec.R = f * col.compute_Rmin()
+                return lambda: len(col.run()["theory"])
+
+    @case("ponchon_savarit.compute_Rmin[real]")
+    def _ps_rmin():
+        spec = DistillationSpec(xF=0.48, q=1.0, xD=0.90, xW=0.01)
+        return PonchonSavaritColumn(spec, vle_real(), enthalpy_syn()).compute_Rmin
+
+
+# ---------- 间歇精馏 ----------
+def _register_batch():
+    for n, kw in ((5, dict(policy="constant_reflux", R=2.0, xW_target=0.05)),
+                  (10, dict(policy="constant_reflux", R=1.5, xD_avg_target=0.95)),
+                  (8, dict(policy="constant_xD", xD=0.95, R_max=30.0))):
+        @case(f"batch.run[a2.5,N={n},{kw['policy']}]", repeat=3)
+        def _batch(n=n, kw=kw):
+            batch = BatchDistillation(vle_alpha(2.5), n, boilup=10.0)
+            return lambda: batch.run(100.0, 0.5, **kw)["summary"]["t_final"]
+
+
+# ---------- 多塔串联阶梯（multiple_tower.step_off_theory） ----------
+def _register_multiple_tower():
+    for xW, R in ((0.3, 0.6), (0.01, 2.5), (0.01, 0.3)):
+        @case(f"multiple_tower.step_off_theory[real,xW={xW},R={R}]")
+        def _mt(xW=xW, R=R):
+            fy, fx = multiple_tower.make_interp_xy(X_REAL, Y_REAL)
+            return lambda: len(multiple_tower.step_off_theory(0.90, xW, 0.48, R, fy, fx)[0]) // 2
+
+
+# ---------- compute_Rmin ----------
+def _register_rmin():
+    for q in (1.0, 0.5, 1.3):
+        @case(f"column.compute_Rmin[real,q={q}]")
+        def _rmin(q=q):
+            col = DistillationColumn(DistillationSpec(xF=0.48, q=q, xD=0.90, xW=0.01), vle_real())
+            return col.compute_Rmin
+
+
+# ---------- 优化器 ----------
+def _register_optimizer():
+    for vname, make, N in (("real", vle_real, 10), ("a1.5", lambda: vle_alpha(1.5), 40)):
+        @case(f"optimizer.find_R_for_N[{vname},N={N}]", repeat=3)
+        def _find(make=make, N=N):
+            vle = make()
+
+            def fn():
+                spec = DistillationSpec(xF=0.5, q=1.0, xD=0.95, xW=0.02, consider_murphree=False)
+                R, _ = DistillationOptimizer(spec, vle).find_R_for_N(N)
+                return R
+            return fn
+
+        @case(f"optimizer.economic_optimization[{vname}]", repeat=3)
+        def _econ(make=make):
+            vle = make()
+
+            def fn():
+                spec = DistillationSpec(xF=0.5, q=1.0, xD=0.95, xW=0.02, consider_murphree=False)
+                res = DistillationOptimizer(spec, vle).economic_optimization(a=1.0, b=5.0)
+                return res["N_opt"]
+            return fn
+
+
+# ---------- FUG 简捷法 ----------
+def _register_shortcut():
+    @case("shortcut.prescreen[100k specs]", repeat=3)
+    def _fug():
+        rng = np.random.default_rng(0)
+        xF, q = rng.uniform(0.2, 0.6, 100_000), rng.uniform(0.5, 1.3, 100_000)
+        alpha, R = rng.uniform(1.2, 4.0, 100_000), rng.uniform(0.5, 6.0, 100_000)
+
+        def fn():
+            keep, d = prescreen(xF, 0.95, 0.02, q, alpha, R=R, N_max=60, R_margin=0.9)
+            return [int(keep.sum()), float(np.nansum(np.where(keep, d["N"], 0.0)))]
+        return fn
+
+
+# ---------- 分离序列综合 ----------
+def _register_sequencing():
+    alphas, flows = np.geomspace(6.0, 1.0, 8), np.full(8, 0.125)
+
+    @case("sequencing.synthesize[8 comp,shortcut,top10]", repeat=3)
+    def _seq_fug():
+        return lambda: SequenceSynthesizer(alphas, flows).synthesize(top=10)["best"]["cost"]
+
+    @case("sequencing.synthesize[5 comp,stagewise]", repeat=3)
+    def _seq_step():
+        return lambda: SequenceSynthesizer(alphas[:5], flows[:5], model="stagewise").synthesize(
+            max_workers=1)["best"]["cost"]
+
+
+# ---------- 多效精馏 ----------
+def _register_multi_effect():
+    @case("multi_effect.run[real,2 effects]", repeat=3)
+    def _me():
+        vle1, vle2 = vle_real(), vle_real()
+
+        def fn():
+            spec1 = DistillationSpec(xF=0.48, q=1.0, xD=0.90, xW=0.05, R=1.5, consider_murphree=True, EM_L=0.75)
+            spec2 = DistillationSpec(xF=0.30, q=1.0, xD=0.85, xW=0.02, R=1.2, consider_murphree=True, EM_L=0.75)
+            res = MultiEffectSystem([spec1, spec2], [vle1, vle2], heat_efficiency=0.85).run(
+                None, max_workers=1)
+            return [len(r["data"]["theory"]) for r in res]
+        return fn
+
+    @case("pressure_vle.vle_at[methanol-water]x20")
+    def _pvle():
+        Ps = np.geomspace(20.0, 600.0, 20)
+        return lambda: [METHANOL_WATER.vle_at(P).y_star(0.5) for P in Ps]
+
+    @case("multi_effect.optimize_pressures[methanol-water,2 effects]", repeat=3)
+    def _me_opt():
+        def fn():
+            specs = [DistillationSpec(xF=0.5, q=1.0, xD=0.95, xW=0.02, consider_murphree=True, EM_L=0.75)
+                     for _ in range(2)]
+            system = MultiEffectSystem(specs, system=METHANOL_WATER, pressures=[300.0, 101.325],
+                                       heat_efficiency=0.85, T_cooling=30.0)
+            return system.optimize_pressures(max_workers=1)["cost"]
+        return fn
+
+
+_register_vle()
+_register_library()
+_register_run()
+_register_ponchon_savarit()
+_register_batch()
+_register_multiple_tower()
+_register_rmin()
+_register_optimizer()
+_register_shortcut()
+_register_sequencing()
+_register_multi_effect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+harness.py
+----------
+极简基准测试框架：注册用例、计时、保存/比较 JSON 基线。
+
+每个用例是一个 setup 函数：在计时外完成准备工作，返回零参数可调用对象；
+该对象的返回值作为“结果指纹”（如理论板数）写入基线，用于发现性能改动
+引入的数值行为变化。
+
+AssimilatePlatform/benchmarks/harness.py 是本文件的副本（两个平台互不导入），
+改动需两边同步，tools/check_sync.py 检查两份代码一致。
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import datetime
+import contextlib
+import statistics
+
+import numpy as np
+
+
+CASES = []
+
+
+class Case:
+    __slots__ = ("name", "setup", "repeat")
+
+    def __init__(self, name, setup, repeat):
+        self.name = name
+        self.setup = setup
+        self.repeat = repeat
+
+
+def case(name, repeat=5):
+    """注册一个基准用例（装饰 setup 函数）。"""
+    def deco(setup):
+        CASES.append(Case(name, setup, repeat))
+        return setup
+    return deco
+
+
+def _fingerprint(value):
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return float(f"{float(value):.6g}")
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint(v) for v in value]
+    return value
+
+
+def _autorange(fn, min_time):
+    """类似 timeit.autorange：找到使单次重复耗时不少于 min_time 的调用次数。"""
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t0 >= min_time or number >= 10 ** 6:
+            return number
+        number *= 2
+
+
+def run_cases(pattern=None, min_time=0.05, quick=False):
+    """运行匹配的用例，返回 {name: {min, median, number, repeat, fingerprint}}（单位：秒/次）。"""
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        for c in CASES:
+            if pattern and pattern not in c.name:
+                continue
+            with contextlib.redirect_stdout(devnull):
+                fn = c.setup()
+                value = fn()                     # 预热 + 取指纹
+                number = 1 if quick else _autorange(fn, min_time)
+                repeat = 1 if quick else c.repeat
+                times = []
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    for _ in range(number):
+                        fn()
+                    times.append((time.perf_counter() - t0) / number)
+            results[c.name] = {
+                "min": min(times),
+                "median": statistics.median(times),
+                "number": number,
+                "repeat": repeat,
+                "fingerprint": _fingerprint(value),
+            }
+            print(f"{c.name:<48s} {results[c.name]['median'] * 1e3:12.4f} ms")
+    return results
+
+
+def environment():
+    return {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def save_baseline(results, path):
+    # 先完整序列化再写临时文件、原子替换：序列化失败时不会留下写了一半的基线
+    text = json.dumps({"environment": environment(), "results": results}, indent=2)
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    tmp = os.path.join(folder, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    print(f"📁 基线已保存：{path}")
+
+
+def compare(results, path, threshold=1.25):
+    """
+    与基线比较：
+    - 最小耗时（受系统噪声影响最小）比值 > threshold 记为性能回退；
+    - 结果指纹不同记为行为变化；
+    返回：问题条目数（0 表示通过）。
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        base = json.load(f)["results"]
+
+    problems = 0
+    print(f"\n{'case':<48s} {'base ms':>10s} {'now ms':>10s} {'ratio':>7s}")
+    for name, cur in results.items():
+        ref = base.get(name)
+        if ref is None:
+            print(f"{name:<48s} {'—':>10s} {cur['min'] * 1e3:10.4f}    new")
+            continue
+        ratio = cur["min"] / ref["min"] if ref["min"] > 0 else float("inf")
+        flag = ""
+        if ratio > threshold:
+            flag = "  ⚠️ slower"
+            problems += 1
+        if cur["fingerprint"] != ref["fingerprint"]:
+            flag += f"  ⚠️ result {ref['fingerprint']} → {cur['fingerprint']}"
+            problems += 1
+        print(f"{name:<48s} {ref['min'] * 1e3:10.4f} {cur['min'] * 1e3:10.4f} {ratio:7.2f}{flag}")
+    return problems
+
+
+def main(argv=None, default_baseline="baseline"):
+    import argparse
+    p = argparse.ArgumentParser(description="Run solver microbenchmarks.")
+    p.add_argument("-k", "--filter", help="only run cases whose name contains this string")
+    p.add_argument("--save", metavar="NAME", help="store results as benchmarks/baselines/NAME.json")
+    p.add_argument("--compare", metavar="NAME", nargs="?", const=default_baseline,
+                   help=f"compare against a stored baseline (default: {default_baseline})")
+    p.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio treated as regression")
+    p.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per timing repeat")
+    p.add_argument("--quick", action="store_true", help="single call per case (smoke test)")
+    args = p.parse_args(argv)
+
+    here = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+    results = run_cases(args.filter, args.min_time, args.quick)
+    if args.save:
+        save_baseline(results, os.path.join(here, f"{args.save}.json"))
+    if args.compare:
+        problems = compare(results, os.path.join(here, f"{args.compare}.json"), args.threshold)
+        print("\n✅ 无回退" if problems == 0 else f"\n❌ 发现 {problems} 处回退/变化")
+        return 1 if problems else 0
+    return 0
@@ -1,7 +1,8 @@
 from .vle_data import VLEData
 from .spec import DistillationSpec
 from .engine import DistillationEngine
+from .ponchon_savarit import EnthalpyData, PonchonSavaritColumn
 
-__all__ = ["VLEData", "DistillationSpec", "DistillationEngine"]
+__all__ = ["VLEData", "DistillationSpec", "DistillationEngine", "EnthalpyData", "PonchonSavaritColumn"]
 __Version__ = "1.0.0"
 __Author__ = "Zhen-Ning Guo"
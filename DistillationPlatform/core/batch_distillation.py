@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+from scipy.integrate import solve_ivp
+from scipy.optimize import brentq
+
+from utils.instrument import PROFILER
+from utils.sinks import as_sink
+
+from .stepping import step_stages
+
+
+# 间歇精馏（Rayleigh）：釜液 W、组成 xW 随时间变化，塔内按拟稳态处理（持液量忽略）。
+#   dW/dt   = −D，           D = V / (R + 1)       （V 为釜的汽化速率，kmol/h）
+#   dxW/dt  = −D·(xD − xW) / W                     （Rayleigh 方程）
+# 每个时刻 xD 与 R、xW 之间的关系由 n_stages 块理论板（含釜）的 McCabe–Thiele 逐级给出：
+#   恒回流比：已知 R、xW，求 xD，使自 xD 逐级 n_stages 块后恰好到达 xW；
+#   恒馏出组成：已知 xD、xW，求 R（随 xW 下降而增大）。
+# 内层求根以上一时刻的解为初值（割线法），失败时再在全区间用 brentq；
+# 外层用 solve_ivp（RK45 自适应步长），事件函数在釜液组成 / 累计馏出液纯度 / 回流比上限处终止。
+
+POLICIES = ("constant_reflux", "constant_xD")
+
+
+class BatchDistillation:
+    """
+    间歇精馏釜 + 固定理论板数的精馏柱。
+    参数：
+        vle      : VLEData
+        n_stages : 理论板数（含蒸馏釜本身）
+        boilup   : 釜汽化速率 V（kmol/h），只影响时间坐标
+        EM_L     : 液相 Murphree 效率（1 表示理论板）
+    """
+
+    def __init__(self, vle, n_stages, boilup=1.0, EM_L=1.0):
+        if int(n_stages) < 1:
+            raise ValueError("n_stages 至少为 1（仅釜）")
+        self.vle = vle
+        self.n_stages = int(n_stages)
+        self.boilup = float(boilup)
+        self.EM_L = float(EM_L)
+        self.inner_evals = 0                   # 逐级计算次数（内层求根的代价）
+        self.unbracketed = 0                   # 区间两端同号、只能取端点的内层求根次数
+
+    # ---------- 内层：固定板数的逐级 ----------
+    def bottom_composition(self, xD, R):
+        """自塔顶 xD 以回流比 R 逐级 n_stages 块后的釜液组成（越出 [0, 1] 时返回越界的那一级）"""
+        self.inner_evals += 1
+        a = R / (R + 1.0)
+        run = step_stages(self.vle.x_star, [(a, xD / (R + 1.0), None)], xD, cap=self.n_stages,
+                          bounds=(0.0, 1.0), murphree=("L", self.EM_L) if self.EM_L < 1.0 else None)
+        return float(run.x_real[-1])
+
+    def _solve(self, f, guess, lo, hi, step, ftol=1e-9):
+        """
+        以 guess 为初值做割线迭代（通常 3–4 次），不收敛或越界时在 [lo, hi] 上 brentq。
+        [lo, hi] 两端同号（区间内无根）时返回残差较小的端点：残差 ≤ ftol 视为根落在端点上，
+        否则计入 self.unbracketed（积分步越过 R_max 事件点时会出现，由 run() 汇报）。
+        """
+        x0, x1 = guess, min(max(guess + step, lo), hi)
+        if x1 == x0:
+            x1 = x0 - step
+        f0, f1 = f(x0), f(x1)
+        for _ in range(12):
+            if f1 == f0:
+                break
+            x2 = x1 - f1 * (x1 - x0) / (f1 - f0)
+            if not lo < x2 < hi:
+                break
+            x0, f0, x1 = x1, f1, x2
+            f1 = f(x1)
+            if abs(x1 - x0) < 1e-12 or f1 == 0.0:
+                return x1
+        f_lo, f_hi = f(lo), f(hi)
+        if f_lo * f_hi > 0:
+            x, fx = (lo, f_lo) if abs(f_lo) < abs(f_hi) else (hi, f_hi)
+            if abs(fx) > ftol:
+                self.unbracketed += 1
+            return x
+        return brentq(f, lo, hi, xtol=1e-13)
+
+    def distillate_composition(self, xW, R, guess=None):
+        """恒回流比：求 xD ∈ (xW, 1)，使 n_stages 块板后恰到 xW"""
+        guess = min(xW + 0.5 * (1.0 - xW), 1.0 - 1e-9) if guess is None else guess
+        return self._solve(lambda xD: self.bottom_composition(xD, R) - xW, guess, xW, 1.0, 1e-4)
+
+    def reflux_for(self, xW, xD, R_max, guess=None):
+        """恒馏出组成：求 R，使 n_stages 块板后恰到 xW（xW 越低所需 R 越大）"""
+        guess = 1.0 if guess is None else guess
+        return self._solve(lambda R: self.bottom_composition(xD, R) - xW, guess, 1e-6, R_max,
+                           1e-4 * (1.0 + guess))
+
+    # ---------- 外层：Rayleigh 积分 ----------
+    def run(self, W0, x0, policy="constant_reflux", R=None, xD=None,
+            xW_target=None, xD_avg_target=None, R_max=50.0, W_min_frac=0.01,
+            rtol=1e-6, atol=1e-9, n_points=101, result_folder=None, sink=None):
+        """
+        积分至任一终止事件：
+            xW_target     : 釜液组成降至该值
+            xD_avg_target : 累计馏出液平均组成降至该值（恒回流比时馏出液逐渐变稀）
+            R_max         : 恒馏出组成时所需回流比达到上限
+            W_min_frac    : 釜液剩余量降至 W0 的该比例（兜底）
+        返回 {"profile": DataFrame, "summary": dict}；profile 由稠密输出在 [0, t_final] 上
+        等距取 n_points 个点（t, W, xW, xD, R, D_total, xD_avg）。给出 sink / result_folder 时写出
+        batch_profile 与 batch_summary 两个产物。
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"policy 须为 {POLICIES} 之一")
+        if policy == "constant_reflux" and (R is None or R <= 0):
+            raise ValueError("恒回流比操作需给出 R > 0")
+        if policy == "constant_xD" and not (xD is not None and x0 < xD < 1):
+            raise ValueError("恒馏出组成操作需给出 x0 < xD < 1")
+        if policy == "constant_xD" and x0 < self.bottom_composition(xD, R_max):
+            raise ValueError(f"回流比上限 R_max = {R_max} 下 {self.n_stages} 块板也达不到 xD = {xD}")
+        sink = as_sink(sink, result_folder)
+        W0, x0, V = float(W0), float(x0), self.boilup
+        n0 = W0 * x0
+        self.inner_evals = 0
+        warm = {"xD": None, "R": None}
+        last = [None, None]                    # 最近一次内层解（同一状态重复求值时直接复用）
+
+        def top(xW):
+            if last[0] == xW:
+                return last[1]
+            if policy == "constant_reflux":
+                sol = (self.distillate_composition(xW, R, warm["xD"]), R)
+                warm["xD"] = sol[0]
+            else:
+                sol = (xD, self.reflux_for(xW, xD, R_max, warm["R"]))
+                warm["R"] = sol[1]
+            last[0], last[1] = xW, sol
+            return sol
+
+        def rhs(t, s):
+            W, xW = s
+            xd, r = top(xW)
+            D = V / (r + 1.0)
+            return [-D, -D * (xd - xW) / max(W, 1e-300)]
+
+        def xD_avg(W, xW):
+            Dt = W0 - W
+            return top(xW)[0] if Dt <= 1e-12 * W0 else (n0 - W * xW) / Dt
+
+        events, names = [], []
+
+        def add_event(name, fn):
+            fn.terminal, fn.direction = True, -1
+            events.append(fn)
+            names.append(name)
+
+        add_event("W_min", lambda t, s: s[0] - W_min_frac * W0)
+        if xW_target is not None:
+            add_event("xW_target", lambda t, s: s[1] - xW_target)
+        if xD_avg_target is not None:
+            add_event("xD_avg_target", lambda t, s: xD_avg(s[0], s[1]) - xD_avg_target)
+        if policy == "constant_xD":
+            # R_max 下逐级仍到不了 xW 时 xD 无法维持（不需要求根）
+            add_event("R_max", lambda t, s: s[1] - self.bottom_composition(xD, R_max))
+
+        R_top = R if policy == "constant_reflux" else R_max
+        t_end = W0 * (R_top + 1.0) / V         # 以最小馏出速率蒸干所需时间，作为积分上限
+        with PROFILER.span("batch.integrate", policy=policy, n_stages=self.n_stages):
+            sol = solve_ivp(rhs, (0.0, t_end), [W0, x0], method="RK45",
+                            events=events, rtol=rtol, atol=atol, dense_output=True)
+        if sol.status < 0:
+            raise RuntimeError(f"间歇精馏积分失败：{sol.message}")
+
+        t = np.linspace(0.0, sol.t[-1], max(int(n_points), 2))   # 终止事件时 sol.t[-1] 即事件点
+        W, xW = sol.sol(t)
+        W[-1], xW[-1] = sol.y[:, -1]
+        stop = next((nm for nm, te in zip(names, sol.t_events) if len(te)), "t_end")
+        # 只统计输出点：积分中被事件拒绝的试探步可能越过可行区，不影响结果
+        self.unbracketed, last[0] = 0, None
+        tops = np.array([top(x) for x in xW])
+        if self.unbracketed:
+            print(f"⚠️ 间歇精馏：{self.unbracketed} 个输出点的内层求根在搜索区间内无解，"
+                  f"已取区间端点（xD 或 R 不准确，见 summary 的 unbracketed_points）")
+        Dt = W0 - W
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg = np.where(Dt > 1e-12 * W0, (n0 - W * xW) / Dt, tops[:, 0])
+        profile = pd.DataFrame({"t": t, "W": W, "xW": xW, "xD": tops[:, 0], "R": tops[:, 1],
+                                "D_total": Dt, "xD_avg": avg})
+        PROFILER.count("batch.rhs", sol.nfev)
+        PROFILER.count("batch.inner_evals", self.inner_evals)
+
+        summary = {
+            "policy": policy,
+            "n_stages": self.n_stages,
+            "boilup": V,
+            "EM_L": self.EM_L,
+            "W0": W0,
+            "x0": x0,
+            "stop_reason": stop,
+            "t_final": float(t[-1]),
+            "W_final": float(W[-1]),
+            "xW_final": float(xW[-1]),
+            "D_total": float(Dt[-1]),
+            "xD_avg": float(avg[-1]),
+            "recovery": float((n0 - W[-1] * xW[-1]) / n0),
+            "R_final": float(tops[-1, 1]),
+            "boilup_total": float(V * t[-1]),
+            "rhs_evals": int(sol.nfev),
+            "inner_stage_runs": int(self.inner_evals),
+            "unbracketed_points": int(self.unbracketed),
+        }
+        with PROFILER.span("write.batch"):
+            sink.write_table("batch_profile", profile)
+            sink.write_json("batch_summary", summary, indent=4)
+        return {"profile": profile, "summary": summary}
@@ -2,6 +2,9 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from dataclasses import dataclass
+from utils.instrument import PROFILER
+
+from .stepping import step_stages, BOUNDS, SECTION_NAMES
 
 
 @dataclass
@@ -38,6 +41,7 @@ class DistillationColumn:
             return abs(self.vle.y_star(x) - (mq * x + bq))
 
         # 优先使用 scipy 精确优化
+        PROFILER.count("column.pinch_search")
         try:
             from scipy.optimize import minimize_scalar
             res = minimize_scalar(diff, bounds=(0.0, 1.0), method="bounded")
@@ -93,14 +97,6 @@ class DistillationColumn:
         b_strip = self.spec.xW - m_strip * self.spec.xW
         return (m_rect, b_rect), (m_strip, b_strip), (mq, bq), (x_int, y_int)
 
-    # ---------- 单步理论计算 ----------
-    def _theory_step(self, x_in, y_in, section, lines):
-        (mr, br), (ms, bs), (_, _), (x_int, _) = lines
-        x_eq = self.vle.x_star(y_in)
-        sec = "rectifying" if (section == "rectifying" and x_eq > x_int + 1e-12) else "stripping"
-        y_op = mr * x_eq + br if sec == "rectifying" else ms * x_eq + bs
-        return x_eq, y_op, sec
-
     # ---------- 主运行 ----------
     def run(self):
         R = self.spec.R
@@ -113,56 +109,36 @@ class DistillationColumn:
 
         EM_L = getattr(self.spec, "EM_L", 1.0)
         EM_V = getattr(self.spec, "EM_V", None)
-        use_gas = (EM_V is not None) and (EM_V < 1.0)
-        tol = self.spec.tol
-
-        # 初始化
-        x_theory, y_theory = self.spec.xD, self.spec.xD
-        x_real, y_real = self.spec.xD, self.spec.xD
-        section = "rectifying"
-
-        theory_pts, real_pts = [], []
-        achieved = False
-
-        for i in range(1, 2001):
-            # ---------- 理论级 ----------
-            x_eq, y_op, section = self._theory_step(x_theory, y_theory, section, lines)
-            x_theory, y_theory = x_eq, y_op
-
-            # ---------- 实际级 ----------
-            if not self.spec.consider_murphree:
-                x_real, y_real = x_eq, y_op
-            elif use_gas:
-                y_star = self.vle.y_star(x_eq)
-                y_real = y_real + EM_V * (y_star - y_real)
-                x_real = (y_real - br) / mr if section == "rectifying" else (y_real - bs) / ms
-            else:
-                x_real = x_real + EM_L * (x_eq - x_real)
-                y_real = mr * x_real + br if section == "rectifying" else ms * x_real + bs
-
-            # ---------- 判断是否达标 ----------
-            if x_real <= self.spec.xW:
-                theory_pts.append((i, x_eq, y_op, section))
-                real_pts.append((i, x_real, y_real, section, x_eq, y_op))
-                achieved = True
-                break
-
-            # ---------- 记录 ----------
-            theory_pts.append((i, x_eq, y_op, section))
-            real_pts.append((i, x_real, y_real, section, x_eq, y_op))
-
-            # 防止数值发散
-            if x_real < 0 or x_real > 1:
-                print("⚠️ Numerical instability detected, aborting loop.")
-                break
+        if not self.spec.consider_murphree:
+            murphree = None
+        elif (EM_V is not None) and (EM_V < 1.0):
+            murphree = ("V", EM_V)
+        else:
+            murphree = ("L", EM_L)
+
+        # 自塔顶 (xD, xD) 逐级：x_eq 低于 q 线交点后改用提馏段操作线；实际级 x ≤ xW 时终止
+        with PROFILER.span("column.step"):
+            st = step_stages(self.vle.x_star, [(mr, br, x_int + 1e-12), (ms, bs, None)], self.spec.xD,
+                             cap=2000, x_stop=self.spec.xW, bounds=(0.0, 1.0),
+                             murphree=murphree, y_star=self.vle.y_star)
+        if st.status == BOUNDS:
+            print("⚠️ Numerical instability detected, aborting loop.")
+        achieved = st.reached
+
+        PROFILER.count("column.runs")
+        PROFILER.count("column.stages", st.n)
 
         # 输出 DataFrame
-        df_theory = pd.DataFrame(theory_pts, columns=["stage", "x_theory", "y_theory", "section"])
-        df_real = pd.DataFrame(real_pts, columns=["stage", "x_real", "y_real", "section",
-                                                  "x_theory_ref", "y_theory_ref"])
+        with PROFILER.span("column.frames"):
+            stage = np.arange(1, st.n + 1)
+            section = SECTION_NAMES[st.section]
+            df_theory = pd.DataFrame({"stage": stage, "x_theory": st.x, "y_theory": st.y, "section": section})
+            df_real = pd.DataFrame({"stage": stage, "x_real": st.x_real, "y_real": st.y_real, "section": section,
+                                    "x_theory_ref": st.x, "y_theory_ref": st.y})
 
         if not achieved:
-            print(f"⚠️ Warning: target bottom composition not reached, last x_real = {x_real:.5f}")
+            x_last = st.x_real[-1] if st.n else self.spec.xD
+            print(f"⚠️ Warning: target bottom composition not reached, last x_real = {x_last:.5f}")
 
         return {
             "R_used": R,
@@ -172,8 +148,92 @@ class DistillationColumn:
             "achieved": achieved
         }
 
+    # ---------- 进料位置扫描（双向逐级） ----------
+    def feed_stage_scan(self, N=None, R=None, max_stages=2000):
+        """
+        双向逐级法评价全部进料位置（理论板）：
+        - 自塔顶 (xD) 只沿精馏段操作线向下逐级：x_r[k] 为自上数第 k 块板的液相组成；
+        - 自塔釜 (xW) 只沿提馏段操作线向上逐级：x_s[j] 为自下数第 j 块板的液相组成；
+        - 共 N 块板、第 f 块进料时两段在进料板相接，余量 d(f) = x_s[N-f+1] - x_r[f]，
+          d ≥ 0 表示塔顶段已达到（或越过）塔釜段所需的组成，设计可行。
+        两条剖面各计算一次，某个 N 下的全部进料位置由一次向量运算评价。
+
+        参数：
+            N          : 总理论板数（计数方式与 run() 一致）；None 时求最少板数 N_min 及其最优进料板
+            R          : 回流比，默认 spec.R（≤0 时取 1.5·Rmin，不修改 spec）
+            max_stages : 剖面长度上限
+        返回：dict
+            N, feed_stage, margin, feasible, x_bottom（按该进料位置逐级得到的塔釜组成），
+            geometric_feed_stage（run() 所用 q 线交点切换规则对应的进料板），
+            scan（各进料位置的余量表），rectifying_profile / stripping_profile
+        """
+        if R is None:
+            R = self.spec.R
+        if R <= 0:
+            R = 1.5 * self.compute_Rmin()
+        (mr, br), (ms, bs), _, (x_int, _) = self.operating_lines(R)
+        xD, xW = float(self.spec.xD), float(self.spec.xW)
+
+        x_r = np.empty(max_stages)
+        x_s = np.empty(max_stages)
+        y_r = xD                                     # 进入当前板的上升蒸汽
+        x_b = xW
+        n_built = 0
+
+        def extend(n):
+            nonlocal y_r, x_b, n_built
+            for k in range(n_built, n):
+                x = float(self.vle.x_star(y_r))
+                x_r[k] = x
+                y_r = mr * x + br
+                x_s[k] = x_b
+                x_b = min((float(self.vle.y_star(x_b)) - bs) / ms, 1.0)
+            n_built = max(n_built, n)
+
+        def margins(n):
+            return x_s[n - 1::-1] - x_r[:n]
+
+        with PROFILER.span("column.feed_scan"):
+            if N is None:
+                for n in range(1, max_stages + 1):
+                    extend(n)
+                    if margins(n).max() >= 0.0:
+                        N = n
+                        break
+                else:
+                    N = max_stages
+            N = int(N)
+            if not 1 <= N <= max_stages:
+                raise ValueError(f"N 必须在 1~{max_stages} 之间")
+            extend(N)
+            d = margins(N)
+
+        f = int(np.argmax(d)) + 1
+        x = x_r[f - 1]
+        for _ in range(N - f):
+            x = float(self.vle.x_star(ms * x + bs))
+
+        below = np.nonzero(x_r[:N] <= x_int + 1e-12)[0]
+        return {
+            "R_used": float(R),
+            "N": N,
+            "feed_stage": f,
+            "margin": float(d[f - 1]),
+            "feasible": bool(d[f - 1] >= 0.0),
+            "x_bottom": float(x),
+            "geometric_feed_stage": int(below[0]) + 1 if below.size else None,
+            "scan": pd.DataFrame({"feed_stage": np.arange(1, N + 1), "x_rectifying": x_r[:N],
+                                  "x_stripping": x_s[N - 1::-1], "margin": d}),
+            "rectifying_profile": x_r[:N].copy(),
+            "stripping_profile": x_s[:N].copy(),
+        }
+
     # ---------- 绘图 ----------
     def plot(self, result, vle, folder):
+        with PROFILER.span("plot.mccabe_thiele"):
+            self._plot(result, vle, folder)
+
+    def _plot(self, result, vle, folder):
         xs = np.linspace(0, 1, 1000)
         plt.figure(figsize=(8, 8))
 
@@ -1,15 +1,30 @@
-import json
 import pandas as pd
 from core.distillation_column import DistillationColumn
+from core.ponchon_savarit import PonchonSavaritColumn
+from utils.instrument import PROFILER
+from utils.sinks import as_sink
 
 class DistillationEngine:
-    def __init__(self, spec, vle):
+    def __init__(self, spec, vle, enthalpy=None):
         self.spec = spec
         self.vle = vle
+        self.enthalpy = enthalpy      # EnthalpyData：给出时按 Ponchon–Savarit 焓浓法逐级（非恒摩尔流）
 
-    def run(self, result_folder):
-        column = DistillationColumn(self.spec, self.vle)
-        res = column.run()  # res 含 lines/theory/real 等完整信息
+    def run(self, result_folder=None, sink=None):
+        """
+        计算并输出 results / summary 两个产物（各写一次）。
+        sink 为 None 时：给定 result_folder 则写 CSV/JSON 文件，否则不做任何文件 I/O。
+        """
+        with PROFILER.run("engine.run", mode=self.spec.mode):
+            return self._run(as_sink(sink, result_folder))
+
+    def _run(self, sink):
+        if self.enthalpy is None:
+            column = DistillationColumn(self.spec, self.vle)
+        else:
+            column = PonchonSavaritColumn(self.spec, self.vle, self.enthalpy)
+        with PROFILER.span("column.run"):
+            res = column.run()  # res 含 lines/theory/real 等完整信息
 
         df_theory = res["theory"]
         df_real = res.get("real", None)
@@ -20,7 +35,8 @@ class DistillationEngine:
             EM_val = 1.0
         else:
             # outer merge 保留理论/实际所有列
-            df_out = df_theory.merge(df_real, on=["stage", "section"], how="outer")
+            with PROFILER.span("merge"):
+                df_out = df_theory.merge(df_real, on=["stage", "section"], how="outer")
             if self.spec.EM_V is not None and self.spec.EM_V < 1.0:
                 efficiency_type = "gas"
                 EM_val = self.spec.EM_V
@@ -44,11 +60,14 @@ class DistillationEngine:
             "xW": self.spec.xW,
             "q": self.spec.q,
         }
+        if self.enthalpy is not None:
+            summary.update(method="ponchon_savarit", delta=res["delta"], feed=res["feed"], duties=res["duties"])
 
-        # 写文件
-        df_out.to_csv(f"{result_folder}/results.csv", index=False)
-        with open(f"{result_folder}/summary.json", "w") as f:
-            json.dump(summary, f, indent=4)
+        # 输出（由 sink 决定写文件、留在内存或丢弃）
+        with PROFILER.span("write.results"):
+            sink.write_table("results", df_out)
+        with PROFILER.span("write.summary"):
+            sink.write_json("summary", summary, indent=4)
 
         # ✅ 这里返回外层+内层数据一起
         return {
@@ -58,4 +77,5 @@ class DistillationEngine:
             "theory": res["theory"],
             "real": res["real"],
             "achieved": res["achieved"],
+            **{k: res[k] for k in ("delta", "feed", "duties") if k in res},
         }
\ No newline at end of file
@@ -1,32 +1,118 @@
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+
 from core.distillation_column import DistillationColumn
+from core.spec import DistillationSpec
+from core.pressure_vle import PressureVLECache
 import numpy as np
+from utils.instrument import PROFILER
+
+
+# ---------- 压力相关的单效计算（子进程入口） ----------
+# 每个进程各自持有按压力缓存的 VLE（键为体系常数），同一进程内重复出现的压力只生成一次平衡数据。
+_VLE_CACHES = {}
+
+
+def _pressure_vle(system, P):
+    cache = _VLE_CACHES.get(system.key())
+    if cache is None:
+        cache = _VLE_CACHES[system.key()] = PressureVLECache(system)
+    return cache.get(P)
+
+
+def _spec_kwargs(spec):
+    return dict(xF=spec.xF, q=spec.q, xD=spec.xD, xW=spec.xW, R=spec.R,
+                consider_murphree=spec.consider_murphree,
+                EM_L=spec.EM_L, EM_V=spec.EM_V, mode=spec.mode, tol=spec.tol)
+
+
+def _eval_effect(task):
+    """
+    单效在压力 P、回流比 R = R_factor·Rmin(P) 下的计算：
+    返回 (Rmin, R, N_theory, N_real, achieved, V, T_reb, T_cond)，V 为每 kmol 进料的塔顶上升蒸汽量。
+    计算失败时 N 记为 NaN。
+    """
+    spec_kw, system, P, R_factor = task
+    spec = DistillationSpec(**spec_kw)
+    col = DistillationColumn(spec, _pressure_vle(system, P))
+    T_reb = float(system.bubble_T(spec.xW, P))
+    T_cond = float(system.dew_T(spec.xD, P))
+    try:
+        Rmin = col.compute_Rmin()
+        spec.R = R_factor * Rmin
+        res = col.run()
+    except Exception:
+        return (np.nan, np.nan, np.nan, np.nan, 0.0, np.nan, T_reb, T_cond)
+    d = (spec.xF - spec.xW) / (spec.xD - spec.xW)          # D/F
+    return (Rmin, spec.R, len(res["theory"]), len(res["real"]), float(res["achieved"]),
+            (spec.R + 1.0) * d, T_reb, T_cond)
+
+
+EFFECT_COLUMNS = ["Rmin", "R", "N_theory", "N_real", "achieved", "V", "T_reb", "T_cond"]
+
+
+def _run_column(column):
+    return column.run()
+
+
+def _map(tasks, max_workers, pool=None):
+    if pool is not None:
+        return list(pool.map(_eval_effect, tasks, chunksize=max(1, len(tasks) // 32)))
+    if max_workers == 1 or len(tasks) <= 1:
+        return [_eval_effect(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=max_workers) as p:
+        return list(p.map(_eval_effect, tasks, chunksize=max(1, len(tasks) // 32)))
+
 
 class MultiEffectSystem:
-    def __init__(self, specs, vles, heat_efficiency=0.9):
+    def __init__(self, specs, vles=None, heat_efficiency=0.9, system=None, pressures=None, dT_min=10.0,
+                 T_cooling=None):
         """
         参数：
             specs : list[DistillationSpec]   每个塔的参数对象
-            vles : list[VLEData]             对应的气液平衡数据
+            vles : list[VLEData]             对应的气液平衡数据（给出 system 时可省略）
             heat_efficiency : float          热耦合效率（默认 0.9）
+            system : RaoultSystem            给出时各效平衡数据按压力由 Antoine/Raoult 生成
+            pressures : list[float]          各效操作压力 kPa（缺省取 spec.pressures），由高到低
+            dT_min : float                   前一效冷凝器与后一效再沸器的最小传热温差（°C）
+            T_cooling : float | None         冷却水温度（°C）；给出时末效冷凝温度须高出 dT_min
         """
-        assert len(specs) == len(vles), "每个塔必须有对应的 VLE 数据"
         self.specs = specs
-        self.vles = vles
         self.heat_eff = heat_efficiency
+        self.system = system
+        self.dT_min = dT_min
+        self.T_cooling = T_cooling
+        if system is not None:
+            self.pressures = list(pressures if pressures is not None else [s.pressures for s in specs])
+            if any(P is None for P in self.pressures):
+                raise ValueError("压力模式需给出每一效的操作压力")
+            vles = [_pressure_vle(system, P) for P in self.pressures]
+        else:
+            self.pressures = None
+        assert vles is not None and len(specs) == len(vles), "每个塔必须有对应的 VLE 数据"
+        self.vles = vles
         self.columns = [DistillationColumn(spec, vle) for spec, vle in zip(specs, vles)]
 
-    def run(self, result_folder):
+    def run(self, result_folder, max_workers=None):
         """
         串联运行多效精馏塔：
+        - 各效逐级计算互不依赖，默认在进程池中并行求解（max_workers=1 时在当前进程串行）
         - 前一塔的冷凝热部分供给下一塔再沸
         - 能量平衡为简化版：Q_next = η * Q_prev
+        - 压力模式下另给出各效再沸/冷凝温度与温差是否可行
         """
+        with PROFILER.span("effects.run", n_effects=len(self.columns)):
+            if max_workers == 1 or len(self.columns) <= 1:
+                outputs = [column.run() for column in self.columns]
+            else:
+                with ProcessPoolExecutor(max_workers=max_workers) as p:
+                    outputs = list(p.map(_run_column, self.columns))
         results = []
         Q_prev = None  # 前一塔冷凝热
 
-        for i, column in enumerate(self.columns):
-            print(f"\n🚀 正在计算第 {i+1} 效精馏塔...")
-            result = column.run()
+        for i, (column, result) in enumerate(zip(self.columns, outputs)):
+            print(f"\n🚀 第 {i+1} 效精馏塔")
+            column.spec.R = result["R_used"]          # 子进程中 R ≤ 0 时自动取的回流比，与串行时一致
 
             # 估算热负荷（简化为与蒸汽流量 ~ R/(R+1) 成正比）
             R_used = result["R_used"]
@@ -41,14 +127,133 @@ class MultiEffectSystem:
                 effective_Q = Q_current
                 print(f"  ↳ 第一效塔，无上级供热，需热量 {effective_Q:.3f}")
 
-            results.append({
+            entry = {
                 "tower_index": i + 1,
                 "R_used": R_used,
                 "energy_load": effective_Q,
                 "data": result
-            })
+            }
+            if self.system is not None:
+                spec, P = self.specs[i], self.pressures[i]
+                entry.update(P_kPa=P, T_reb=float(self.system.bubble_T(spec.xW, P)),
+                             T_cond=float(self.system.dew_T(spec.xD, P)))
+                if i > 0:
+                    dT = results[-1]["T_cond"] - entry["T_reb"]
+                    entry["dT_integration"] = dT
+                    entry["feasible"] = bool(dT >= self.dT_min)
+                    if not entry["feasible"]:
+                        print(f"  ⚠️ 第 {i} 效冷凝温度仅比本效再沸温度高 {dT:.1f} °C（< {self.dT_min} °C），热耦合不可行")
+            results.append(entry)
 
             Q_prev = Q_current  # 下一塔用
 
         print("\n✅ 多效精馏系统计算完成。")
-        return results
\ No newline at end of file
+        return results
+
+    # ---------- 压力分配 + 各效回流比寻优 ----------
+    def _tasks(self, pressures, R_factors):
+        return [(_spec_kwargs(spec), self.system, float(P), float(f))
+                for spec, P, f in zip(self.specs, pressures, R_factors)]
+
+    def _combine(self, effects):
+        """
+        effects : shape (n_effects, ..., len(EFFECT_COLUMNS))，各效按广播组合。
+        第 i 效（i ≥ 1）再沸器由第 i−1 效冷凝器供热：外供热 Q_i = max(0, V_i − η·V_{i−1})；
+        可行要求各效达标、T_cond,i−1 − T_reb,i ≥ dT_min（以及末效冷凝器对冷却水的温差）。热量以上升蒸汽量 V（kmol/kmol 进料）计。
+        """
+        col = {c: k for k, c in enumerate(EFFECT_COLUMNS)}
+        V = [e[..., col["V"]] for e in effects]
+        ok = np.ones(np.broadcast_shapes(*[v.shape for v in V]), dtype=bool)
+        Q_ext = np.broadcast_to(V[0], ok.shape).copy()
+        N = np.zeros(ok.shape)
+        for i, e in enumerate(effects):
+            ok &= (e[..., col["achieved"]] > 0) & np.isfinite(e[..., col["N_theory"]])
+            N = N + e[..., col["N_real"]]
+            if i:
+                ok &= effects[i - 1][..., col["T_cond"]] - e[..., col["T_reb"]] >= self.dT_min
+                Q_ext = Q_ext + np.maximum(0.0, V[i] - self.heat_eff * V[i - 1])
+        if self.T_cooling is not None:
+            ok &= effects[-1][..., col["T_cond"]] - self.T_cooling >= self.dT_min
+        return ok, N, Q_ext
+
+    def evaluate(self, pressures, R_factors, max_workers=None, pool=None):
+        """
+        给定各效压力与 R/Rmin，各效在进程池中并行计算（可传入已有 pool；max_workers=1 时串行），
+        返回 dict(feasible, N_total, Q_external, effects=list[dict])。
+        """
+        rows = np.array(_map(self._tasks(pressures, R_factors), max_workers, pool), dtype=float)
+        ok, N, Q = self._combine(list(rows))
+        return {"feasible": bool(ok), "N_total": float(N), "Q_external": float(Q),
+                "effects": [dict(zip(EFFECT_COLUMNS, map(float, r)), P_kPa=float(P))
+                            for r, P in zip(rows, pressures)]}
+
+    def optimize_pressures(self, P_bounds=(20.0, 500.0), n_P=9,
+                           R_factors=(1.1, 1.2, 1.35, 1.5, 1.75, 2.0, 2.5),
+                           a=1.0, b=10.0, refine=True, max_workers=None):
+        """
+        在压力分配与各效 R/Rmin 上最小化 C = a·ΣN_real + b·Q_external（与经济优化同一形式）。
+        - 各效的计算只依赖自身的 (P, R/Rmin)：先把所有不同的 (效, P, R/Rmin) 单效计算一次性分发到
+          进程池并行求解，再按广播组合全部方案，过滤温差不可行 / 未达标方案后取最小成本；
+        - refine=True 时在最优压力附近（相邻网格点之间）再做一轮细化。
+        max_workers=1 时在当前进程串行计算。
+        """
+        if self.system is None:
+            raise ValueError("压力寻优需要给出 system（Antoine/Raoult 体系）")
+        R_factors = np.asarray(R_factors, dtype=float)
+        grids = [np.geomspace(P_bounds[0], P_bounds[1], int(n_P))] * len(self.specs)
+
+        pool = None if max_workers == 1 else ProcessPoolExecutor(max_workers=max_workers)
+        try:
+            with PROFILER.span("multi_effect.optimize", n_effects=len(self.specs)):
+                best = self._grid_search(grids, R_factors, a, b, pool)
+                if refine and best is not None:
+                    fine = []
+                    for g, P in zip(grids, best["pressures"]):
+                        k = int(np.argmin(np.abs(g - P)))
+                        lo, hi = g[max(k - 1, 0)], g[min(k + 1, len(g) - 1)]
+                        fine.append(np.geomspace(lo, hi, int(n_P)))
+                    best = self._grid_search(fine, R_factors, a, b, pool) or best
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        if best is None:
+            raise ValueError("压力范围内没有满足温差与分离要求的方案")
+        return best
+
+    def _grid_search(self, grids, R_factors, a, b, pool):
+        n = len(self.specs)
+        tasks, index = [], []
+        for i, (spec, g) in enumerate(zip(self.specs, grids)):
+            for P, f in itertools.product(g, R_factors):
+                tasks.append((_spec_kwargs(spec), self.system, float(P), float(f)))
+            index.append((len(g), len(R_factors)))
+        rows = np.array(_map(tasks, 1 if pool is None else None, pool), dtype=float)
+
+        # 第 i 效的结果 reshape 为 (P_i, f_i)，放到 2n 维广播格点中各自的两个轴上
+        effects, start = [], 0
+        for i, (nP, nf) in enumerate(index):
+            block = rows[start:start + nP * nf].reshape(nP, nf, -1)
+            start += nP * nf
+            shape = [1] * (2 * n) + [block.shape[-1]]
+            shape[2 * i], shape[2 * i + 1] = nP, nf
+            effects.append(block.reshape(shape))
+        ok, N, Q = self._combine(effects)
+        cost = np.where(ok, a * N + b * Q, np.inf)
+        if not np.isfinite(cost).any():
+            return None
+        idx = np.unravel_index(int(np.argmin(cost)), cost.shape)
+        pressures = [float(grids[i][idx[2 * i]]) for i in range(n)]
+        factors = [float(R_factors[idx[2 * i + 1]]) for i in range(n)]
+        effect_rows = [effects[i][tuple(idx[k] if k in (2 * i, 2 * i + 1) else 0 for k in range(2 * n))]
+                       for i in range(n)]
+        return {
+            "pressures": pressures,
+            "R_factors": factors,
+            "cost": float(cost[idx]),
+            "N_total": float(N[idx]),
+            "Q_external": float(Q[idx]),
+            "n_feasible": int(np.isfinite(cost).sum()),
+            "n_combinations": int(cost.size),
+            "effects": [dict(zip(EFFECT_COLUMNS, map(float, r)), P_kPa=P)
+                        for r, P in zip(effect_rows, pressures)],
+        }
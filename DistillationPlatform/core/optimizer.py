@@ -1,48 +1,80 @@
 import numpy as np
-from core.distillation_column import DistillationColumn
+from core.session import DistillationSession
+from core.shortcut import relative_volatility, fenske_nmin, gilliland_R
+from utils.instrument import PROFILER
 
 class DistillationOptimizer:
-    def __init__(self, spec, vle):
+    def __init__(self, spec, vle, session=None):
         self.spec = spec
         self.vle = vle
+        # 会话缓存 Rmin / 操作线 / 各 R 的逐级结果，多种优化方法之间共享
+        self.session = session if session is not None else DistillationSession(spec, vle)
 
     # ---------- (1) 给定塔板数 N，求对应回流比 ----------
-    def find_R_for_N(self, N_target, tol=1e-3, R_max=10.0):
+    def find_R_for_N(self, N_target, tol=1e-3, R_max=10.0, warm_start=True):
         """
         迭代求解：给定理论塔板数 N_target，求对应回流比 R
-        方法：二分搜索
+        方法：二分搜索，求使理论板数不多于 N_target 的最小回流比（区间收缩到宽度 tol 以内，
+        返回区间上端及其计算结果）。板数随 R 阶梯式下降，N = N_target 的 R 是一段区间，
+        取其下端使结果与搜索起点无关（warm_start 与否只影响逐级计算次数）。
+        warm_start 时先由 FUG 简捷法（Fenske Nmin + Gilliland 反算）给出初值，
+        自初值按 1.2 倍向两侧试探直到区间两端分别多于/不多于 N_target，再在该区间内二分
         """
-        column = DistillationColumn(self.spec, self.vle)
-        Rmin = column.compute_Rmin()
+        Rmin = self.session.compute_Rmin()
 
         R_low = 1.05 * Rmin
         R_high = R_max
         iteration = 0
-        best_result = None
+        high_result = result = None            # high_result：R_high 处的计算结果（板数不多于 N_target）
 
-        while iteration < 50:
-            R_mid = 0.5 * (R_low + R_high)
-            self.spec.R = R_mid
-            col = DistillationColumn(self.spec, self.vle)
-            result = col.run()
+        def plates(R):
+            self.spec.R = R
+            result = self.session.run()
             N_now = len(result["theory"])
+            PROFILER.trace("find_R_for_N", iteration=iteration, R=R, N=N_now, N_target=N_target)
+            return N_now, result
+
+        R_mid = self.shortcut_R(N_target, Rmin) if warm_start else np.inf
+        if np.isfinite(R_mid) and R_low < R_mid < R_high:
+            found_low = found_high = False
+            while iteration < 50:
+                N_now, result = plates(R_mid)
+                iteration += 1
+                if N_now > N_target:
+                    R_low, found_low = R_mid, True
+                else:
+                    R_high, high_result, found_high = R_mid, result, True
+                if found_low and found_high:
+                    break
+                R_mid = min(R_mid * 1.2, R_high) if found_low else max(R_mid / 1.2, R_low)
+                if R_mid in (R_low, R_high):
+                    break
 
-            if abs(N_now - N_target) < 1:
-                return R_mid, result
-            elif N_now > N_target:
+        while R_high - R_low > tol and iteration < 50:
+            R_mid = 0.5 * (R_low + R_high)
+            N_now, result = plates(R_mid)
+            iteration += 1
+            if N_now > N_target:
                 R_low = R_mid
             else:
-                R_high = R_mid
-            best_result = result
-            iteration += 1
+                R_high, high_result = R_mid, result
+
+        if high_result is None:                # R_max 下仍多于 N_target（或初始区间已窄于 tol）
+            _, high_result = plates(R_high)
+        return R_high, high_result
 
-        return R_mid, best_result
+    def shortcut_R(self, N_target, Rmin=None):
+        """FUG 估算：Fenske Nmin（α 取塔顶、塔底的几何平均）与 Rmin 代入 Gilliland 反求 R；不可行时为 inf"""
+        xD, xW = float(self.spec.xD), float(self.spec.xW)
+        a_D, a_W = relative_volatility(self.vle, [xD, xW])
+        Nmin = fenske_nmin(xD, xW, np.sqrt(a_D * a_W))
+        Rmin = self.session.compute_Rmin() if Rmin is None else Rmin
+        return float(gilliland_R(N_target, Rmin, Nmin))
 
     # ---------- (2) 给定回流比 R，求塔板数 ----------
     def plates_for_R(self, R):
         self.spec.R = R
-        col = DistillationColumn(self.spec, self.vle)
-        result = col.run()
+        result = self.session.run()
         return len(result["theory"]), result
 
     # ---------- (3) 经济优化 ----------
@@ -51,8 +83,7 @@ class DistillationOptimizer:
         能耗与塔板成本平衡：
             C = a * N + b * Q(R)
         """
-        column = DistillationColumn(self.spec, self.vle)
-        Rmin = column.compute_Rmin()
+        Rmin = self.session.compute_Rmin()
 
         if R_range is None:
             R_range = np.linspace(1.05 * Rmin, 3.0 * Rmin, 20)
@@ -63,6 +94,7 @@ class DistillationOptimizer:
             N, _ = self.plates_for_R(R)
             Q = R / (R + 1.0)
             C = a * N + b * Q
+            PROFILER.trace("economic_optimization", R=float(R), N=N, C=float(C))
             Rs.append(R)
             Ns.append(N)
             Cs.append(C)
@@ -0,0 +1,250 @@
+import math
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+from scipy.interpolate import PchipInterpolator
+from scipy.optimize import brentq
+
+from utils.instrument import PROFILER
+
+from .stepping import ScalarPPoly, SECTION_NAMES
+
+
+# Ponchon–Savarit（焓–组成图）逐级：不假设恒摩尔流，能量衡算由差点 Δ 给出。
+#   塔顶差点 Δ_D = (xD, h_D')，h_D' = hD + Q_C/D = HV(xD) + R·[HV(xD) − hL(xD)]   （全凝器，回流为饱和液）
+#   塔底差点 Δ_W = (xW, h_W')，h_W' = hW − Q_B/W，由全塔物料/焓衡算 F·hF = D·h_D' + W·h_W' 给出
+#   每一级：气相 y_n 沿平衡线（tie line）到液相 x_n = x*(y_n)；过 Δ 与 (x_n, hL(x_n)) 的直线
+#   与饱和气相线 HV(y) 的交点即下一级上升蒸汽 y_{n+1}（Newton + 区间保护）。
+#   液相点越过 Δ_D–F–Δ_W 连线后改用 Δ_W（最优进料位置，对应 McCabe–Thiele 的 q 线交点）。
+# 焓数据为恒定潜热、饱和液焓为常数时，结果与 McCabe–Thiele 逐级一致。
+
+
+class EnthalpyData:
+    """
+    饱和液相焓 hL(x) 与饱和气相焓 HV(y)（同一单位，如 kJ/kmol），单调 PCHIP 插值。
+    标量求值走 ScalarPPoly（逐级计算用），hL_func / HV_func 为向量化插值器。
+    """
+
+    def __init__(self, x, hL, y=None, HV=None):
+        x = np.asarray(x, dtype=float)
+        y = x if y is None else np.asarray(y, dtype=float)
+        if HV is None:
+            raise ValueError("需要饱和气相焓 HV")
+        self.x, self.hL_data = x, np.asarray(hL, dtype=float)
+        self.y, self.HV_data = y, np.asarray(HV, dtype=float)
+        self.hL_func = PchipInterpolator(self.x, self.hL_data)
+        self.HV_func = PchipInterpolator(self.y, self.HV_data)
+        self._hL1 = ScalarPPoly(self.hL_func)
+        self._HV1 = ScalarPPoly(self.HV_func)
+
+    @classmethod
+    def from_csv(cls, path, x_col="x", hL_col="hL", y_col="y", HV_col="HV"):
+        """CSV 表：液相列 x、hL 与气相列 y、HV（y 列缺省时与 x 共用组成列；空单元格忽略）"""
+        df = pd.read_csv(path)
+        liq = df[[x_col, hL_col]].dropna()
+        vap = df[[y_col if y_col in df else x_col, HV_col]].dropna()
+        return cls(liq.iloc[:, 0], liq.iloc[:, 1], vap.iloc[:, 0], vap.iloc[:, 1])
+
+    @classmethod
+    def constant_molar(cls, latent=40000.0):
+        """恒摩尔流：hL = 0，HV = latent（与 McCabe–Thiele 等价，用于对照）"""
+        return cls([0.0, 1.0], [0.0, 0.0], [0.0, 1.0], [latent, latent])
+
+    def hL(self, x):
+        return self._hL1(float(x))
+
+    def HV(self, y):
+        return self._HV1(float(y))
+
+    def HV_slope(self, y):
+        """(HV(y), dHV/dy)：一次区间查找同时给出值与斜率（逐级求交点的 Newton 迭代用）"""
+        P = self._HV1
+        i = bisect_right(P.x, y) - 1
+        i = 0 if i < 0 else (P.hi if i > P.hi else i)
+        d = y - P.x[i]
+        c0, c1, c2, c3 = P.c[i]
+        return c0 + d * (c1 + d * (c2 + d * c3)), c1 + d * (2.0 * c2 + 3.0 * c3 * d)
+
+    def describe(self):
+        return {"n_liquid": int(len(self.x)), "n_vapor": int(len(self.y)),
+                "hL_range": [float(self.hL_data.min()), float(self.hL_data.max())],
+                "HV_range": [float(self.HV_data.min()), float(self.HV_data.max())]}
+
+
+class PonchonSavaritColumn:
+    """
+    焓浓法精馏塔，接口与 DistillationColumn 相同（compute_Rmin / run），run() 的返回值
+    另含 delta（两个差点）、feed（进料点）与 duties（冷凝/再沸热负荷，按每 kmol 进料）。
+    Murphree 效率仅支持液相（EM_L）：实际级按 x_n = x_{n-1} + E·(x* − x_{n-1}) 单独逐级。
+    """
+
+    def __init__(self, spec, vle, enthalpy):
+        self.spec = spec
+        self.vle = vle
+        self.enthalpy = enthalpy
+
+    # ---------- 进料点与差点 ----------
+    def feed_point(self):
+        """进料 (zF, hF)：hF = q·hL(xF) + (1 − q)·HV(xF)"""
+        xF, q = float(self.spec.xF), float(self.spec.q)
+        H = self.enthalpy
+        return xF, q * H.hL(xF) + (1.0 - q) * H.HV(xF)
+
+    def difference_points(self, R):
+        """返回 ((xD, h_D'), (xW, h_W'))"""
+        H = self.enthalpy
+        xD, xW = float(self.spec.xD), float(self.spec.xW)
+        xF, hF = self.feed_point()
+        hD = H.HV(xD) + R * (H.HV(xD) - H.hL(xD))
+        d = (xF - xW) / (xD - xW)                 # D/F
+        hW = (hF - d * hD) / (1.0 - d)
+        return (xD, hD), (xW, hW)
+
+    def _y_star_array(self, xs):
+        f = getattr(self.vle, "y_star_func", None)
+        if f is not None and "y_star" not in vars(self.vle):
+            return np.asarray(f(xs), dtype=float)
+        return np.array([self.vle.y_star(x) for x in xs])
+
+    # ---------- Rmin ----------
+    def compute_Rmin(self, n=2001):
+        """
+        最小回流比：精馏段各平衡线（自过进料点的那条起，至 xD）延长到 x = xD，
+        取最高的交点作为 Δ_D,min（同时覆盖进料夹点与切点夹点），
+        Rmin = [h_D,min − HV(xD)] / [HV(xD) − hL(xD)]。
+        """
+        H = self.enthalpy
+        xD = float(self.spec.xD)
+        xF, hF = self.feed_point()
+        xs = np.linspace(float(self.spec.xW), xD, n)[:-1]
+        ys = self._y_star_array(xs)
+        hl, hv = H.hL_func(xs), H.HV_func(ys)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = (hv - hl) / (ys - xs)
+            at_feed = hl + slope * (xF - xs) - hF         # 平衡线在 x = xF 处相对进料点的高度
+            ext = hl + slope * (xD - xs)
+        ok = ys > xs
+        # 过进料点的平衡线：at_feed 在网格上变号处细化求根（液相组成向上为精馏段）
+        cross = np.nonzero(ok[:-1] & ok[1:] & (np.sign(at_feed[:-1]) != np.sign(at_feed[1:])))[0]
+        ext = np.where(ok, ext, -np.inf)
+        if cross.size:
+            i = int(cross[-1])
+
+            def tie(x, at):
+                y = self.vle.y_star(x)
+                hl = H.hL(x)
+                return hl + (H.HV(y) - hl) * (at - x) / (y - x)
+
+            x_f = brentq(lambda x: tie(x, xF) - hF, xs[i], xs[i + 1], xtol=1e-14)
+            hD_min = max(tie(x_f, xD), float(ext[i + 1:].max()))
+        else:
+            hD_min = float(ext[int(np.searchsorted(xs, xF)):].max())
+        hv_D, hl_D = H.HV(xD), H.hL(xD)
+        Rmin = (hD_min - hv_D) / (hv_D - hl_D)
+        return float(max(Rmin, 1e-8))
+
+    # ---------- 逐级 ----------
+    def _vapor_on_line(self, dx, dh, x, h, y):
+        """
+        过差点 (dx, dh) 与液相点 (x, h) 的直线与 HV(y) 的交点：自上一级 y 起 Newton 迭代
+        （通常 2–3 步），步长 < 1e-9 时二次收敛已使误差远低于舍入；越出保护区间时二分。
+        """
+        hv_slope = self.enthalpy.HV_slope
+        s = (dh - h) / (dx - x)
+        lo, hi = -1.0, 2.0
+        for _ in range(60):
+            hv, dhv = hv_slope(y)
+            g = hv - dh - s * (y - dx)
+            dg = dhv - s
+            if (g > 0.0) == (dg < 0.0):
+                lo = y
+            else:
+                hi = y
+            y_new = y - g / dg if dg != 0.0 else math.nan
+            if not lo < y_new < hi:
+                y_new = 0.5 * (lo + hi)
+            elif abs(y_new - y) < 1e-9:
+                return y_new
+            y = y_new
+        return y
+
+    def _stairs(self, R, E=1.0, cap=2000):
+        H = self.enthalpy
+        x_star, hL1 = self.vle.x_star, H._hL1
+        (xD, hD), (xW, hW) = self.difference_points(R)
+        sx, sh = xW - xD, hW - hD                # Δ_D → Δ_W 方向；液相点在其左侧（叉积 > 0）为精馏段
+
+        dx, dh, sec = xD, hD, 0
+        y, x_prev = xD, xD
+        xs, ys, hls, secs = [], [], [], []
+        achieved = False
+        for _ in range(cap):
+            x_eq = x_star(y)
+            x = x_prev + E * (x_eq - x_prev)
+            h = hL1(x)
+            if sec == 0 and sx * (h - hD) - sh * (x - xD) <= 0.0:
+                dx, dh, sec = xW, hW, 1
+            y_next = self._vapor_on_line(dx, dh, x, h, y)
+            xs.append(x)
+            ys.append(y_next)
+            hls.append(h)
+            secs.append(sec)
+            if x <= xW:
+                achieved = True
+                break
+            if not 0.0 <= x <= 1.0 or not math.isfinite(y_next):
+                print("⚠️ Numerical instability detected, aborting loop.")
+                break
+            x_prev, y = x, y_next
+        return np.array(xs), np.array(ys), np.array(hls), np.array(secs, dtype=np.int8), achieved
+
+    # ---------- 主运行 ----------
+    def run(self):
+        R = self.spec.R
+        if R <= 0:
+            R = 1.5 * self.compute_Rmin()
+            self.spec.R = R
+
+        EM_V = getattr(self.spec, "EM_V", None)
+        if self.spec.consider_murphree and EM_V is not None and EM_V < 1.0:
+            raise ValueError("Ponchon–Savarit 模式仅支持液相 Murphree 效率 EM_L")
+        E = float(self.spec.EM_L) if self.spec.consider_murphree and self.spec.EM_L is not None else 1.0
+
+        H = self.enthalpy
+        (xD, hD), (xW, hW) = self.difference_points(R)
+        with PROFILER.span("column.ponchon_savarit"):
+            x, y, hl, sec, achieved_t = self._stairs(R)
+            if E < 1.0:
+                x_r, y_r, _, sec_r, achieved = self._stairs(R, E)
+            else:
+                x_r, y_r, sec_r, achieved = x, y, sec, achieved_t
+        PROFILER.count("column.runs")
+        PROFILER.count("column.stages", len(x))
+
+        hv = H.HV_func(y)
+        dh = np.where(sec == 0, hD, hW)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            LV = (dh - hv) / (dh - hl)            # L_n / V_{n+1}（恒摩尔流时为操作线斜率）
+        df_theory = pd.DataFrame({"stage": np.arange(1, len(x) + 1), "x_theory": x, "y_theory": y,
+                                  "section": SECTION_NAMES[sec], "h_liquid": hl, "H_vapor": hv,
+                                  "L_over_V": LV})
+        df_real = pd.DataFrame({"stage": np.arange(1, len(x_r) + 1), "x_real": x_r, "y_real": y_r,
+                                "section": SECTION_NAMES[sec_r]})
+
+        if not achieved:
+            x_last = x_r[-1] if len(x_r) else xD
+            print(f"⚠️ Warning: target bottom composition not reached, last x_real = {x_last:.5f}")
+
+        xF, hF = self.feed_point()
+        d = (xF - xW) / (xD - xW)
+        return {
+            "R_used": R,
+            "lines": None,
+            "theory": df_theory,
+            "real": df_real,
+            "achieved": achieved,
+            "delta": {"x_D": xD, "h_D": hD, "x_W": xW, "h_W": hW},
+            "feed": {"x": xF, "h": hF},
+            "duties": {"Q_C_per_F": d * (hD - H.hL(xD)), "Q_B_per_F": (1.0 - d) * (H.hL(xW) - hW)},
+        }
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+pressure_vle.py
+---------------
+由 Antoine 方程 + Raoult 定律生成随压力变化的二元 x–y 平衡数据。
+
+    log10(Psat / mmHg) = A − B / (C + T / °C)
+    泡点：x·P1sat(T) + (1 − x)·P2sat(T) = P，   y = x·P1sat(T) / P
+    露点：y / P1sat(T) + (1 − y) / P2sat(T) = 1 / P
+
+对外的压力单位为 kPa、温度为 °C。泡点/露点在整张组成网格上向量化 Newton 求解（4–6 次迭代），
+同一压力下的 VLEData 由 PressureVLECache 按压力缓存（LRU 淘汰），多效精馏各效与压力寻优共用。
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from core.vle_data import VLEData
+
+
+MMHG_PER_KPA = 760.0 / 101.325
+
+
+class Antoine:
+    """单组分 Antoine 常数（mmHg、°C）"""
+
+    def __init__(self, A, B, C, name=""):
+        self.A, self.B, self.C = float(A), float(B), float(C)
+        self.name = name
+
+    def psat(self, T):
+        """饱和蒸气压（kPa）"""
+        return 10.0 ** (self.A - self.B / (self.C + np.asarray(T, dtype=float))) / MMHG_PER_KPA
+
+    def dlnpsat_dT(self, T):
+        return np.log(10.0) * self.B / (self.C + np.asarray(T, dtype=float)) ** 2
+
+    def tsat(self, P):
+        """饱和温度（°C），P 为 kPa"""
+        return self.B / (self.A - np.log10(np.asarray(P, dtype=float) * MMHG_PER_KPA)) - self.C
+
+    def key(self):
+        return (self.A, self.B, self.C)
+
+
+class RaoultSystem:
+    """
+    理想二元体系（轻组分 light、重组分 heavy）。
+    参数：
+        light, heavy : Antoine
+        n            : 生成 VLEData 时的组成网格点数
+    """
+
+    def __init__(self, light, heavy, n=101):
+        self.light, self.heavy = light, heavy
+        self.n = int(n)
+
+    def key(self):
+        return (self.light.key(), self.heavy.key(), self.n)
+
+    def bubble_T(self, x, P):
+        """泡点温度（°C）：x 可为数组，P 为 kPa"""
+        x = np.asarray(x, dtype=float)
+        L, H = self.light, self.heavy
+        T = x * L.tsat(P) + (1.0 - x) * H.tsat(P)
+        for _ in range(50):
+            p1, p2 = L.psat(T), H.psat(T)
+            f = x * p1 + (1.0 - x) * p2 - P
+            df = x * p1 * L.dlnpsat_dT(T) + (1.0 - x) * p2 * H.dlnpsat_dT(T)
+            dT = f / df
+            T = T - dT
+            if np.max(np.abs(dT)) < 1e-10:
+                break
+        return T
+
+    def dew_T(self, y, P):
+        """露点温度（°C）"""
+        y = np.asarray(y, dtype=float)
+        L, H = self.light, self.heavy
+        T = y * L.tsat(P) + (1.0 - y) * H.tsat(P)
+        for _ in range(50):
+            p1, p2 = L.psat(T), H.psat(T)
+            # g(T) = ln(P·[y/P1 + (1 − y)/P2])，单调递减，近似线性，Newton 收敛快
+            s = y / p1 + (1.0 - y) / p2
+            g = np.log(P * s)
+            dg = -(y / p1 * L.dlnpsat_dT(T) + (1.0 - y) / p2 * H.dlnpsat_dT(T)) / s
+            dT = g / dg
+            T = T - dT
+            if np.max(np.abs(dT)) < 1e-10:
+                break
+        return T
+
+    def relative_volatility(self, T):
+        return self.light.psat(T) / self.heavy.psat(T)
+
+    def vle_at(self, P):
+        """压力 P（kPa）下的 VLEData（泡点线 y = x·P1sat(Tb)/P）"""
+        x = np.linspace(0.0, 1.0, self.n)
+        Tb = self.bubble_T(x, P)
+        y = np.clip(x * self.light.psat(Tb) / P, 0.0, 1.0)
+        y[0], y[-1] = 0.0, 1.0
+        return VLEData(x, y)
+
+
+class PressureVLECache:
+    """
+    按压力缓存 RaoultSystem.vle_at 的结果（OrderedDict LRU）。
+    压力按 decimals 位小数取整后作为键，寻优中反复出现的压力水平只构造一次样条。
+    """
+
+    def __init__(self, system, size=32, decimals=6):
+        self.system = system
+        self.size = int(size)
+        self.decimals = decimals
+        self._items = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, P):
+        key = round(float(P), self.decimals)
+        vle = self._items.get(key)
+        if vle is None:
+            self.misses += 1
+            vle = self._items[key] = self.system.vle_at(key)
+            if len(self._items) > self.size:
+                self._items.popitem(last=False)
+        else:
+            self.hits += 1
+            self._items.move_to_end(key)
+        return vle
+
+    def __len__(self):
+        return len(self._items)
+
+
+# 常用体系（Antoine 常数：mmHg、°C）
+METHANOL = Antoine(8.08097, 1582.271, 239.726, "methanol")
+ETHANOL = Antoine(8.20417, 1642.89, 230.300, "ethanol")
+WATER = Antoine(8.07131, 1730.63, 233.426, "water")
+BENZENE = Antoine(6.90565, 1211.033, 220.790, "benzene")
+TOLUENE = Antoine(6.95464, 1344.800, 219.482, "toluene")
+
+METHANOL_WATER = RaoultSystem(METHANOL, WATER)
+BENZENE_TOLUENE = RaoultSystem(BENZENE, TOLUENE)
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+sequencing.py
+-------------
+多元混合物简单塔分离序列综合（清晰分割，动态规划 + 备忘）。
+
+组分按相对挥发度由高到低编号 0..n−1。任一塔的进料是连续的一段组分 [i, j]，
+在 k | k+1 之间切割（k 为轻关键、k+1 为重关键组分）：比 k 轻的全部进塔顶、比 k+1 重的全部进塔釜，
+关键组分按回收率 recovery 分配。子问题只由 (i, j, k) 决定，与它出现在哪个序列中无关，因此：
+
+    - n 个组分共有 n(n²−1)/6 个不同的切割，而序列数为 Catalan(n−1)（n = 6 时 42 个，n = 8 时 429 个）；
+    - 每个切割只计算一次（结果缓存在对象中，改变费用权重 a、b 重新组合时不再计算），可分发到进程池并行；
+    - best(i, j) = min_k [cost(i, j, k) + best(i, k) + best(k+1, j)]，每段保留前 top 名，
+      因为费用可加，逐段取前 top 名即得到整体前 top 名（direct / indirect / mixed 序列全部参与排名）。
+
+单塔模型：
+    shortcut  : 多元 Fenske–Underwood–Gilliland（core.shortcut），每个切割约数十微秒；
+    stagewise : 以关键组分对的 α 构造拟二元平衡数据（轻于/重于切割处的组分分别并入轻/重组），
+                按 DistillationColumn.feed_stage_scan 逐级求 R = R_factor·Rmin 下的最少理论板数与最优进料板。
+费用 C = a·N + b·V（与经济优化、多效寻优同一形式），N 为理论板数，V = (R + 1)·D 为塔顶上升蒸汽量，
+与进料流量同单位；flows 为摩尔分率时即每 kmol 原料的蒸汽量。
+下游塔的进料取清晰分割的组成（忽略关键组分的少量夹带），均为饱和液体（q = 1）。
+"""
+
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core.shortcut import fenske_nmin, underwood_rmin, gilliland_N, kirkbride_ratio
+from utils.instrument import PROFILER
+
+
+MODELS = ("shortcut", "stagewise")
+SPLIT_COLUMNS = ["feed", "split", "F", "D", "W", "alpha_key", "Nmin", "Rmin", "R", "N", "feed_stage", "V",
+                 "feasible"]
+
+
+# ---------- 单个切割（子进程入口） ----------
+def _products(flows, k, recovery):
+    """切割 k | k+1 的塔顶、塔釜组分流量（flows 为该塔进料的组分流量）"""
+    d = np.zeros_like(flows)
+    d[:k] = flows[:k]
+    d[k] = recovery * flows[k]
+    d[k + 1] = (1.0 - recovery) * flows[k + 1]
+    return d, flows - d
+
+
+def _shortcut_split(alphas, flows, k, q, recovery, R_factor):
+    d, w = _products(flows, k, recovery)
+    F, D, W = flows.sum(), d.sum(), w.sum()
+    a_key = alphas[k] / alphas[k + 1]
+    Nmin = float(fenske_nmin(d[k], w[k], a_key, d[k + 1], w[k + 1]))
+    Rmin = float(underwood_rmin(alphas, flows / F, d / D, q, k, k + 1))
+    R = R_factor * Rmin
+    N = float(gilliland_N(R, Rmin, Nmin))
+    ratio = float(kirkbride_ratio(flows[k] / F, flows[k + 1] / F, w[k] / W, d[k + 1] / D, W / D))
+    feasible = bool(np.isfinite(N) and Rmin > 0.0)
+    feed = int(np.clip(np.floor(N * ratio / (1.0 + ratio)) + 1.0, 1.0, np.ceil(N))) if feasible else None
+    return dict(F=F, D=D, W=W, alpha_key=a_key, Nmin=Nmin, Rmin=Rmin, R=R, N=int(np.ceil(N)) if feasible else np.inf,
+                feed_stage=feed, V=(R + 1.0) * D, feasible=feasible)
+
+
+def _stagewise_split(alphas, flows, k, q, recovery, R_factor):
+    from core.vle_data import VLEData
+    from core.spec import DistillationSpec
+    from core.distillation_column import DistillationColumn
+
+    d, w = _products(flows, k, recovery)
+    F, D, W = flows.sum(), d.sum(), w.sum()
+    a_key = alphas[k] / alphas[k + 1]
+    x = np.linspace(0.0, 1.0, 201)
+    vle = VLEData(x, a_key * x / (1.0 + (a_key - 1.0) * x))
+    spec = DistillationSpec(xF=flows[:k + 1].sum() / F, q=q, xD=d[:k + 1].sum() / D, xW=w[:k + 1].sum() / W,
+                            consider_murphree=False)
+    col = DistillationColumn(spec, vle)
+    Rmin = float(col.compute_Rmin())
+    R = R_factor * Rmin
+    scan = col.feed_stage_scan(R=R)
+    Nmin = float(fenske_nmin(spec.xD, spec.xW, a_key))
+    return dict(F=F, D=D, W=W, alpha_key=a_key, Nmin=Nmin, Rmin=Rmin, R=R, N=int(scan["N"]),
+                feed_stage=int(scan["feed_stage"]), V=(R + 1.0) * D, feasible=bool(scan["feasible"]))
+
+
+def _eval_split(task):
+    """task = (model, alphas, flows, k, q, recovery, R_factor)；计算失败时 feasible = False"""
+    model, alphas, flows, k, q, recovery, R_factor = task
+    fn = _shortcut_split if model == "shortcut" else _stagewise_split
+    try:
+        return fn(np.asarray(alphas, dtype=float), np.asarray(flows, dtype=float), k, q, recovery, R_factor)
+    except Exception as e:
+        return dict(F=float(np.sum(flows)), feasible=False, error=repr(e))
+
+
+def _map(tasks, max_workers):
+    if max_workers == 1 or len(tasks) <= 1:
+        return [_eval_split(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=max_workers) as p:
+        return list(p.map(_eval_split, tasks, chunksize=max(1, len(tasks) // 32)))
+
+
+# ---------- 序列综合 ----------
+class SequenceSynthesizer:
+    def __init__(self, alphas, flows, names=None, q=1.0, recovery=0.99, R_factor=1.3, model="shortcut"):
+        """
+        参数：
+            alphas   : 各组分相对挥发度（对任一参比组分；内部按由大到小排序）
+            flows    : 原料中各组分的摩尔流量（或摩尔分率）
+            names    : 组分名称，默认 A、B、C…
+            q        : 原料热状态；中间物流均按饱和液体（q = 1）
+            recovery : 轻关键组分进塔顶、重关键组分进塔釜的回收率
+            R_factor : 各塔操作回流比 R = R_factor·Rmin
+            model    : "shortcut"（FUG）或 "stagewise"（拟二元逐级）
+        """
+        if model not in MODELS:
+            raise ValueError(f"model 须为 {MODELS} 之一")
+        alphas, flows = np.asarray(alphas, dtype=float), np.asarray(flows, dtype=float)
+        if alphas.shape != flows.shape or alphas.ndim != 1 or len(alphas) < 2:
+            raise ValueError("alphas、flows 须为等长一维数组（至少 2 个组分）")
+        if np.any(flows <= 0.0) or np.any(alphas <= 0.0):
+            raise ValueError("alphas、flows 须为正数")
+        if not 0.5 < recovery < 1.0:
+            raise ValueError("recovery 须在 (0.5, 1) 之间")
+        names = list(names) if names is not None else [chr(ord("A") + i) for i in range(len(alphas))]
+        order = np.argsort(-alphas, kind="stable")
+        if np.any(np.diff(alphas[order]) >= 0.0):
+            raise ValueError("相邻组分的相对挥发度不能相等")
+        self.alphas, self.flows = alphas[order], flows[order]
+        self.names = [names[i] for i in order]
+        self.n = len(alphas)
+        self.q, self.recovery, self.R_factor, self.model = float(q), float(recovery), float(R_factor), model
+        self._splits = {}            # (i, j, k) -> 单塔结果
+
+    def _label(self, i, j, k=None):
+        if k is None:              # 单字母组分名直接相连（ABC/DE），否则以 + 分隔
+            return ("" if all(len(n) == 1 for n in self.names) else "+").join(self.names[i:j + 1])
+        return f"{self._label(i, k)}/{self._label(k + 1, j)}"
+
+    def split_keys(self):
+        """全部不同的切割 (i, j, k)：进料为组分 i..j，在 k | k+1 之间切割"""
+        return [(i, j, k) for size in range(2, self.n + 1) for i in range(self.n - size + 1)
+                for j in (i + size - 1,) for k in range(i, j)]
+
+    def evaluate_splits(self, max_workers=None):
+        """
+        计算尚未缓存的切割。max_workers=1 时在当前进程串行；None 时 shortcut 模型串行
+        （每个切割仅数十微秒，不值得启动进程池）、stagewise 模型用进程池。
+        """
+        todo = [key for key in self.split_keys() if key not in self._splits]
+        if max_workers is None and self.model == "shortcut":
+            max_workers = 1
+        tasks = [(self.model, self.alphas[i:j + 1], self.flows[i:j + 1], k - i,
+                  self.q if (i, j) == (0, self.n - 1) else 1.0, self.recovery, self.R_factor)
+                 for i, j, k in todo]
+        with PROFILER.span("sequencing.splits", n=len(tasks), model=self.model):
+            for key, res in zip(todo, _map(tasks, max_workers)):
+                i, j, k = key
+                self._splits[key] = {"feed": self._label(i, j), "split": self._label(i, j, k), **res}
+        return dict(self._splits)
+
+    def splits_table(self):
+        """已计算的全部切割（pandas.DataFrame，一行一个切割）"""
+        rows = [self._splits[key] for key in self.split_keys() if key in self._splits]
+        return pd.DataFrame(rows, columns=SPLIT_COLUMNS)
+
+    def _cost(self, s, a, b):
+        return a * s["N"] + b * s["V"] if s["feasible"] else np.inf
+
+    def synthesize(self, a=1.0, b=10.0, top=10, max_workers=None):
+        """
+        求费用最低的分离序列及前 top 名备选（top=None 时列出全部序列）。
+        返回 dict：best、ranked（按费用升序，每项含 cost、type、label、N_total、V_total、columns）、
+        n_sequences（序列总数）、n_splits（不同切割数）。
+        """
+        self.evaluate_splits(max_workers)
+        cost = {key: self._cost(s, a, b) for key, s in self._splits.items()}
+
+        best = {(i, i): [(0.0, None)] for i in range(self.n)}
+        for size in range(2, self.n + 1):
+            for i in range(self.n - size + 1):
+                j = i + size - 1
+                cand = [(cost[(i, j, k)] + cl + cr, ((i, j, k), tl, tr))
+                        for k in range(i, j) if np.isfinite(cost[(i, j, k)])
+                        for cl, tl in best[(i, k)] for cr, tr in best[(k + 1, j)]]
+                best[(i, j)] = (sorted(cand, key=lambda c: c[0]) if top is None
+                                else heapq.nsmallest(top, cand, key=lambda c: c[0]))
+        ranked = [self._describe(c, tree, rank, a, b) for rank, (c, tree) in enumerate(best[(0, self.n - 1)], 1)]
+        if not ranked:
+            raise ValueError("没有可行的分离序列（检查回收率与相对挥发度）")
+        return {"best": ranked[0], "ranked": ranked, "n_sequences": _catalan(self.n - 1),
+                "n_splits": len(cost)}
+
+    def _describe(self, c, tree, rank, a, b):
+        keys = []
+
+        def walk(node):                  # 先序：原料塔，再塔顶产品塔、塔釜产品塔
+            if node is not None:
+                keys.append(node[0])
+                walk(node[1])
+                walk(node[2])
+
+        walk(tree)
+        cols = [{**self._splits[key], "cost": self._cost(self._splits[key], a, b)} for key in keys]
+        if all(k == i for i, j, k in keys):
+            kind = "direct"
+        elif all(k == j - 1 for i, j, k in keys):
+            kind = "indirect"
+        else:
+            kind = "mixed"
+        return {"rank": rank, "cost": float(c), "type": kind, "label": ", ".join(col["split"] for col in cols),
+                "N_total": int(sum(col["N"] for col in cols)), "V_total": float(sum(col["V"] for col in cols)),
+                "columns": cols}
+
+
+def ranking_table(result):
+    """synthesize() 结果的排名表（pandas.DataFrame，一行一个序列）"""
+    return pd.DataFrame([{k: seq[k] for k in ("rank", "cost", "type", "N_total", "V_total", "label")}
+                         for seq in result["ranked"]])
+
+
+def _catalan(m):
+    c = 1
+    for i in range(m):
+        c = c * 2 * (2 * i + 1) // (i + 2)
+    return c
+
+
+def synthesize_sequence(alphas, flows, names=None, a=1.0, b=10.0, top=10, max_workers=None, **kwargs):
+    """SequenceSynthesizer(alphas, flows, names, **kwargs).synthesize(a, b, top, max_workers) 的简写"""
+    return SequenceSynthesizer(alphas, flows, names, **kwargs).synthesize(a, b, top, max_workers)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+session.py
+----------
+DistillationSession：绑定单个 VLE 的精馏计算会话，对派生量做细粒度缓存。
+
+每个缓存项显式声明其依赖的 spec 字段，缓存键即这些字段的当前值（外加 VLE 对象身份）：
+    q_line            ← q, xF
+    pinch             ← q, xF
+    Rmin              ← q, xF, xD
+    operating_lines   ← q, xF, xD, xW, R          （按 R 分别缓存）
+    run               ← 全部设计/效率字段         （按 R 等分别缓存）
+因此直接修改 spec（包括优化器中的 spec.R = ...）也会自动命中或失效：
+改变 R 只会让依赖 R 的项重新计算，q 线、pinch、Rmin 保持缓存。
+
+注意：run() 返回的结果对象在缓存中共享，调用方不应原地修改其中的 DataFrame。
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from core.distillation_column import DistillationColumn
+
+
+RUN_FIELDS = ("xF", "q", "xD", "xW", "R", "consider_murphree", "EM_L", "EM_V", "tol")
+
+
+@dataclass
+class DistillationSession(DistillationColumn):
+    max_entries: int = 256
+    _cache: dict = field(default_factory=dict, repr=False)
+    stats: dict = field(default_factory=lambda: {"hits": 0, "misses": 0}, repr=False)
+
+    # ---------- 缓存基础 ----------
+    def _key(self, deps, extra=()):
+        spec = self.spec
+        return (id(self.vle),) + tuple(getattr(spec, d, None) for d in deps) + tuple(extra)
+
+    def _memo(self, name, deps, compute, extra=()):
+        """按 (依赖字段值, extra) 缓存 compute() 的结果；每个名称一个有界 LRU。"""
+        slot = self._cache.setdefault(name, OrderedDict())
+        key = self._key(deps, extra)
+        if key in slot:
+            slot.move_to_end(key)
+            self.stats["hits"] += 1
+            return slot[key]
+        self.stats["misses"] += 1
+        value = compute()
+        slot[key] = value
+        if len(slot) > self.max_entries:
+            slot.popitem(last=False)
+        return value
+
+    def invalidate(self, *names):
+        """手动清除缓存（不带参数时全部清除），如原地修改了 VLE 数据后调用。"""
+        if not names:
+            self._cache.clear()
+        for n in names:
+            self._cache.pop(n, None)
+
+    def set(self, **changes):
+        """修改 spec 字段；依赖这些字段的缓存项会在下次访问时自动重算。"""
+        for k, v in changes.items():
+            if not hasattr(self.spec, k):
+                raise AttributeError(f"DistillationSpec 没有字段 {k!r}")
+            setattr(self.spec, k, v)
+        return self
+
+    # ---------- 派生量（覆盖 DistillationColumn 的同名方法） ----------
+    def q_line(self):
+        return self._memo("q_line", ("q", "xF"), super().q_line)
+
+    def _find_pinch(self):
+        # 与 DistillationColumn 同一求解（缓存只省去重复计算，不改变结果）
+        return self._memo("pinch", ("q", "xF"), super()._find_pinch)
+
+    def compute_Rmin(self):
+        return self._memo("Rmin", ("q", "xF", "xD"), super().compute_Rmin)
+
+    def operating_lines(self, R):
+        return self._memo("operating_lines", ("q", "xF", "xD", "xW"),
+                          lambda: DistillationColumn.operating_lines(self, R), (float(R),))
+
+    def run(self):
+        if self.spec.R <= 0:
+            self.spec.R = 1.5 * self.compute_Rmin()
+        return self._memo("run", RUN_FIELDS, super().run)
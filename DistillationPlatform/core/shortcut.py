@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+shortcut.py
+-----------
+Fenske–Underwood–Gilliland（FUG）简捷设计：全部为数组运算，可对成千上万组设计条件一次求值
+（每组约微秒级），用于在逐级计算之前预筛设计点，或为 find_R_for_N 提供初值与区间。
+
+    Fenske      Nmin = ln[(xD_LK/xD_HK)·(xW_HK/xW_LK)] / ln α          （全回流，含再沸器）
+    Underwood   Σ αi·zFi/(αi − θ) = 1 − q，θ 取轻、重关键组分 α 之间的根；Rmin + 1 = Σ αi·xDi/(αi − θ)
+    Gilliland   Y = (N − Nmin)/(N + 1) 与 X = (R − Rmin)/(R + 1) 的关联，采用 Molokanov 式
+                Y = 1 − exp[(1 + 54.4X)/(11 + 117.2X) · (X − 1)/√X]
+    Kirkbride   NR/NS = [(W/D)·(zF_HK/zF_LK)·(xW_LK/xD_HK)²]^0.206
+
+板数计数方式与 DistillationColumn.run() 一致（全凝器，再沸器计为一块理论板）。
+恒定相对挥发度下 Nmin、Rmin 为精确值；N(R) 为关联式估算，通常与逐级结果相差 10–20 %。
+"""
+
+import numpy as np
+
+
+# ---------- 相对挥发度 ----------
+def relative_volatility(vle, x):
+    """VLEData 在液相组成 x 处的 α = y(1 − x) / [x(1 − y)]（共沸/萃取修正后的 y_star 同样适用）"""
+    x = np.clip(np.asarray(x, dtype=float), 1e-9, 1.0 - 1e-9)
+    if "y_star" in vars(vle):                   # 修正函数就地替换了标量 y_star，样条已不代表平衡线
+        y = np.array([vle.y_star(v) for v in x.ravel()]).reshape(x.shape)
+    else:
+        y = np.asarray(vle.y_star_func(x), dtype=float)
+    y = np.clip(y, 1e-12, 1.0 - 1e-12)
+    return y * (1.0 - x) / (x * (1.0 - y))
+
+
+# ---------- Fenske ----------
+def fenske_nmin(xD, xW, alpha, xD_hk=None, xW_hk=None):
+    """
+    全回流最少理论板数。二元体系只给 xD、xW（重组分为 1 − x）；多元体系另给重关键组分的
+    塔顶/塔底组成 xD_hk、xW_hk，xD、xW 为轻关键组分组成，alpha 为 α_LK,HK。
+    """
+    xD, xW = np.asarray(xD, dtype=float), np.asarray(xW, dtype=float)
+    xD_hk = 1.0 - xD if xD_hk is None else np.asarray(xD_hk, dtype=float)
+    xW_hk = 1.0 - xW if xW_hk is None else np.asarray(xW_hk, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.log((xD / xD_hk) * (xW_hk / xW)) / np.log(np.asarray(alpha, dtype=float))
+
+
+# ---------- Underwood ----------
+def underwood_theta(alphas, z, q, lk=0, hk=1, tol=1e-12, max_iter=60):
+    """
+    求 Σ αi·zi/(αi − θ) = 1 − q 在 (α_hk, α_lk) 内的根。alphas、z 的最后一维为组分，
+    前面各维为设计点（可广播）；q 与设计点同形。左端趋于 −∞、右端趋于 +∞ 且单调递增，
+    采用带区间保护的 Newton 迭代（越界时取二分点），通常 5–8 次收敛。
+    """
+    alphas = np.asarray(alphas, dtype=float)
+    z = np.asarray(z, dtype=float)
+    alphas, z = np.broadcast_arrays(alphas, z)
+    rhs = 1.0 - np.asarray(q, dtype=float)
+    lo, hi = alphas[..., hk].copy(), alphas[..., lk].copy()
+    lo, hi, rhs = np.broadcast_arrays(lo, hi, rhs)
+    lo, hi = lo.astype(float), hi.astype(float)
+    theta = 0.5 * (lo + hi)
+    for _ in range(max_iter):
+        d = alphas - theta[..., None]
+        t = alphas * z / d
+        f = t.sum(axis=-1) - rhs
+        df = (t / d).sum(axis=-1)
+        lo = np.where(f < 0.0, theta, lo)
+        hi = np.where(f > 0.0, theta, hi)
+        step = theta - f / df
+        new = np.where((step > lo) & (step < hi), step, 0.5 * (lo + hi))
+        done = np.abs(new - theta) <= tol * np.maximum(1.0, np.abs(theta))
+        theta = new
+        if np.all(done):
+            break
+    return theta
+
+
+def underwood_rmin(alphas, zF, xD, q=1.0, lk=0, hk=1):
+    """多元 Underwood 最小回流比（轻、重关键组分相邻，非关键组分不在两者之间分配）"""
+    alphas = np.asarray(alphas, dtype=float)
+    theta = underwood_theta(alphas, zF, q, lk, hk)
+    return (alphas * np.asarray(xD, dtype=float) / (alphas - theta[..., None])).sum(axis=-1) - 1.0
+
+
+def underwood_rmin_binary(alpha, xF, xD, q=1.0):
+    """二元体系的 Underwood 最小回流比（恒定 α 时与 q 线–平衡线交点法一致）"""
+    alpha, xF, xD, q = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (alpha, xF, xD, q)))
+    alphas = np.stack([alpha, np.ones_like(alpha)], axis=-1)
+    return underwood_rmin(alphas, np.stack([xF, 1.0 - xF], axis=-1), np.stack([xD, 1.0 - xD], axis=-1), q)
+
+
+# ---------- Gilliland（Molokanov 式） ----------
+def molokanov(X):
+    """Y(X)，X ∈ (0, 1]；X → 0 时 Y → 1（板数趋于无穷），X = 1 时 Y = 0（全回流）"""
+    X = np.clip(np.asarray(X, dtype=float), 1e-12, 1.0)
+    return 1.0 - np.exp((1.0 + 54.4 * X) / (11.0 + 117.2 * X) * (X - 1.0) / np.sqrt(X))
+
+
+def gilliland_N(R, Rmin, Nmin):
+    """回流比 R 下的理论板数估算（分数）；R ≤ Rmin 时为 inf"""
+    R, Rmin, Nmin = (np.asarray(v, dtype=float) for v in (R, Rmin, Nmin))
+    X = (R - Rmin) / (R + 1.0)
+    Y = molokanov(X)
+    return np.where(X > 0.0, (Nmin + Y) / (1.0 - Y), np.inf)
+
+
+def gilliland_R(N, Rmin, Nmin, iters=60):
+    """
+    给定理论板数 N 反求回流比（Molokanov 式关于 X 单调，在 log X 上二分）；
+    N ≤ Nmin 时为 inf。
+    """
+    N, Rmin, Nmin = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (N, Rmin, Nmin)))
+    Y = (N - Nmin) / (N + 1.0)
+    lo = np.full(Y.shape, np.log(1e-12))
+    hi = np.zeros(Y.shape)
+    for _ in range(iters):
+        mid = 0.5 * (lo + hi)
+        above = molokanov(np.exp(mid)) > Y      # Y 随 X 减小：当前 X 太小
+        lo = np.where(above, mid, lo)
+        hi = np.where(above, hi, mid)
+    X = np.exp(0.5 * (lo + hi))
+    with np.errstate(divide="ignore", invalid="ignore"):     # Y ≤ 0 时 X → 1，该分支不取
+        return np.where(Y > 0.0, (X + Rmin) / (1.0 - X), np.inf)
+
+
+# ---------- Kirkbride ----------
+def kirkbride_ratio(zF_lk, zF_hk, xW_lk, xD_hk, W_over_D):
+    """精馏段与提馏段理论板数之比 NR/NS"""
+    return ((np.asarray(W_over_D, dtype=float) * np.asarray(zF_hk, dtype=float) / np.asarray(zF_lk, dtype=float))
+            * (np.asarray(xW_lk, dtype=float) / np.asarray(xD_hk, dtype=float)) ** 2) ** 0.206
+
+
+# ---------- 二元 FUG 设计 ----------
+def fug_design(xF, xD, xW, q=1.0, alpha=2.5, R=None, R_factor=1.5, alpha_top=None, alpha_bottom=None):
+    """
+    二元体系 FUG 简捷设计，所有参数可为标量或可广播的数组。
+    参数：
+        alpha                    : 相对挥发度（Underwood 用；也是 Fenske 的缺省值）
+        alpha_top, alpha_bottom  : 给出时 Fenske 用两者的几何平均
+        R                        : 操作回流比；None（或 ≤ 0 的元素）取 R_factor·Rmin
+    返回 dict（数组）：
+        Nmin, Rmin, R, N（分数板数）, N_stages（向上取整）, NR_over_NS, feed_stage（自塔顶数的进料板）,
+        separable（xW < xF < xD 且 α > 1）, feasible（另需 R > Rmin）
+    """
+    xF, xD, xW, q, alpha = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (xF, xD, xW, q, alpha)))
+    a_f = alpha
+    if alpha_top is not None or alpha_bottom is not None:
+        a_t = alpha if alpha_top is None else np.asarray(alpha_top, dtype=float)
+        a_b = alpha if alpha_bottom is None else np.asarray(alpha_bottom, dtype=float)
+        a_f = np.sqrt(a_t * a_b)
+    ok = (xW < xF) & (xF < xD) & (alpha > 1.0) & (a_f > 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Nmin = fenske_nmin(xD, xW, a_f)
+        Rmin = underwood_rmin_binary(np.where(ok, alpha, 2.0), xF, xD, q)
+        if R is None:
+            R = R_factor * Rmin
+        else:
+            R = np.asarray(R, dtype=float)
+            R = np.where(R > 0.0, R, R_factor * Rmin)
+        N = gilliland_N(R, Rmin, Nmin)
+        ratio = kirkbride_ratio(xF, 1.0 - xF, xW, 1.0 - xD, (xD - xF) / (xF - xW))
+        NR = N * ratio / (1.0 + ratio)
+    feasible = ok & (R > Rmin) & np.isfinite(N)
+    N_stages = np.where(feasible, np.ceil(N), np.inf)
+    feed = np.where(feasible, np.clip(np.floor(NR) + 1.0, 1.0, N_stages), np.nan)
+    return {"Nmin": Nmin, "Rmin": Rmin, "R": R, "N": np.where(feasible, N, np.inf), "N_stages": N_stages,
+            "NR_over_NS": ratio, "feed_stage": feed, "separable": ok, "feasible": feasible}
+
+
+def fug_from_vle(spec, vle, R=None, R_factor=1.5):
+    """
+    用实际平衡数据的局部相对挥发度做 FUG：Fenske 取 α(xD)、α(xW) 的几何平均，Underwood 取 α(xF)。
+    非理想体系（α 沿组成变化大、接近共沸）的结果只作数量级参考。
+    """
+    a_F, a_D, a_W = relative_volatility(vle, [spec.xF, spec.xD, spec.xW])
+    R = spec.R if R is None else R
+    return fug_design(spec.xF, spec.xD, spec.xW, spec.q, a_F, R=R, R_factor=R_factor,
+                      alpha_top=a_D, alpha_bottom=a_W)
+
+
+# ---------- 预筛 ----------
+def prescreen(xF, xD, xW, q=1.0, alpha=2.5, R=None, N_max=None, R_margin=1.0, R_factor=1.5, **alphas):
+    """
+    逐级计算之前的预筛：返回 (keep, design)。keep 为布尔数组，以下设计点剔除：
+        - 分离本身不可行（组成次序不对、α ≤ 1）；
+        - R < R_margin·Rmin（R_margin < 1 为 α 估算误差留余量）；
+        - N_max 给出时，估算板数 N > N_max。
+    design 为 fug_design 的返回值，另含 "reason"（剔除原因，保留者为空串）。
+    """
+    d = fug_design(xF, xD, xW, q, alpha, R=R, R_factor=R_factor, **alphas)
+    below = d["R"] < R_margin * d["Rmin"]
+    tall = np.zeros_like(below) if N_max is None else d["feasible"] & (d["N"] > N_max)
+    reason = np.where(~d["separable"], "infeasible", np.where(below, "R<Rmin", np.where(tall, "N>N_max", "")))
+    d["reason"] = reason
+    return reason == "", d
@@ -43,4 +43,21 @@ class DistillationSpec:
         self.feed_volume_L = feed_volume_L
         self.feed_density_kg_per_L = feed_density_kg_per_L
         self.MW_light = MW_light
-        self.MW_heavy = MW_heavy
\ No newline at end of file
+        self.MW_heavy = MW_heavy
+
+    # 与构造参数同名、可由配置直接给出的字段
+    CONFIG_FIELDS = ("xF", "q", "xD", "xW", "R", "consider_murphree", "EM_L", "EM_V", "mode", "tol",
+                     "solvent_ratio", "feed_volume_L", "feed_density_kg_per_L")
+
+    @classmethod
+    def from_config(cls, cfg):
+        """
+        由配置构造：cfg 为 utils.config.compile_case 编译后的 DistillationCase（已校验、已转换类型），
+        或普通 dict（此处先编译一次）。共沸参数 azeo_x / azeo_y / azeo_strength 一并写入。
+        """
+        from utils.config import compile_case
+        case = compile_case(cfg)
+        spec = cls(**{k: getattr(case, k) for k in cls.CONFIG_FIELDS})
+        spec.azeotrope_x, spec.azeotrope_y = case.azeo_x, case.azeo_y
+        spec.azeotrope_strength = case.azeo_strength
+        return spec
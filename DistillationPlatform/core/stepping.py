@@ -0,0 +1,203 @@
+import math
+from bisect import bisect_right
+
+import numpy as np
+
+
+# McCabe–Thiele 逐级内核（精馏 DistillationColumn.run、multiple_tower.step_off_theory 共用；
+# AssimilatePlatform/core/stepping.py 为同一实现，两个平台的 core 包不能互相导入，改动需同步，
+# 由仓库根目录的 tools/check_sync.py 检查）。
+#
+# 每一级：水平到平衡线 x_eq = x_star(y)，再竖直到当前段操作线 y_op = a·x_eq + b；
+# 操作线分段给出 [(a, b, x_switch), ...]，x_eq 不再大于 x_switch 时切换到下一段（不回切）。
+# 逐级是严格串行的递推，内核只做标量运算、结果一次性转成数组；x_star 应为快速标量函数
+# （见 ScalarPPoly），每级的开销基本就是一次 x_star 调用。
+
+REACHED, CAP, BACKTRACK, BOUNDS = "reached", "cap", "backtrack", "bounds"
+
+SECTION_NAMES = np.array(["rectifying", "stripping"], dtype=object)
+
+
+class ScalarPPoly:
+    """
+    分段多项式（scipy PPoly / CubicSpline）的纯 Python 标量求值：
+    区间查找与求值顺序与 scipy 相同（区间外按首/末段外推），单次调用约为 scipy 的 1/10。
+    """
+
+    __slots__ = ("x", "c", "hi")
+
+    def __init__(self, pp):
+        self.x = [float(v) for v in pp.x]
+        self.c = [tuple(float(v) for v in col[::-1]) for col in np.asarray(pp.c).T]
+        self.hi = len(self.x) - 2
+
+    def __call__(self, v):
+        i = bisect_right(self.x, v) - 1
+        i = 0 if i < 0 else (self.hi if i > self.hi else i)
+        dx = v - self.x[i]
+        c = self.c[i]
+        res, z = c[0], 1.0
+        for ck in c[1:]:
+            z *= dx
+            res += ck * z
+        return res
+
+
+class StageRun:
+    """
+    逐级结果（列式）：
+        x, y        理论级：第 k 级 x_eq 与其下方操作线上的 y_op
+        section     所用操作线段序号（0 起；由各段起始级 starts 展开）
+        x_real, y_real  计入 Murphree 效率后的实际级（无效率模型时与 x, y 相同）
+        status      reached（达到终止条件）/ cap（达到级数上限）/
+                    backtrack（x 回退，该级未记录）/ bounds（实际级 x 越界，该级已记录）
+        x_reject    backtrack 时被拒绝的 x_eq
+    """
+
+    __slots__ = ("x", "y", "starts", "x_real", "y_real", "status", "x_reject")
+
+    def __init__(self, x, y, starts, x_real, y_real, status, x_reject=None):
+        self.x = x
+        self.y = y
+        self.starts = starts
+        self.x_real = x_real
+        self.y_real = y_real
+        self.status = status
+        self.x_reject = x_reject
+
+    @property
+    def n(self):
+        return len(self.x)
+
+    @property
+    def reached(self):
+        return self.status == REACHED
+
+    @property
+    def section(self):
+        counts = np.diff(np.append(self.starts, self.n))
+        return np.repeat(np.arange(len(self.starts), dtype=np.int8), counts)
+
+
+def iter_steps(x_star, lines, y0, x0=None, cap=2000, x_stop=None, y_stop=None,
+               bounds=(-math.inf, math.inf), backtrack_tol=None, murphree=None, y_star=None):
+    """
+    step_stages 的生成器形式：逐级产出 (section, x_eq, y_op, x_real, y_real)（Python 标量），
+    只在取下一级时才计算下一级。参数与 step_stages 相同；
+    生成器结束时的返回值（StopIteration.value）为 (status, x_reject)。
+    与 step_stages 是同一递推，改动需两处同步；step_stages 一次收集整条阶梯，
+    不经生成器（逐级 yield 约使每级开销增加一半）。
+    """
+    lines = [(float(a), float(b), -math.inf if s is None else float(s)) for a, b, s in lines]
+    last = len(lines) - 1
+    x_lo, x_hi = bounds
+    x_stop = -math.inf if x_stop is None else x_stop
+    y_stop = math.inf if y_stop is None else y_stop
+    mode, E = murphree if murphree else (None, 1.0)
+    check_back = backtrack_tol is not None
+
+    y = float(y0)
+    x_prev = y if x0 is None else float(x0)
+    x_r, y_r = x_prev, y
+    sec = 0
+    a, b, sw = lines[0]
+
+    for _ in range(max(1, int(cap))):
+        x_eq = x_star(y)
+        if check_back and x_eq + backtrack_tol < x_prev:
+            return BACKTRACK, x_eq
+        while sec < last and not x_eq > sw:
+            sec += 1
+            a, b, sw = lines[sec]
+        y_op = a * x_eq + b
+
+        if mode is None:
+            x_r, y_r = x_eq, y_op
+        elif mode == "V":
+            y_r = y_r + E * (y_star(x_eq) - y_r)
+            x_r = (y_r - b) / a
+        else:
+            x_r = x_r + E * (x_eq - x_r)
+            y_r = a * x_r + b
+        yield sec, x_eq, y_op, x_r, y_r
+
+        if x_r <= x_stop or y_r >= y_stop:
+            return REACHED, None
+        if not x_lo <= x_r <= x_hi:
+            return BOUNDS, None
+        x_prev, y = x_eq, y_op
+    return CAP, None
+
+
+def step_stages(x_star, lines, y0, x0=None, cap=2000, x_stop=None, y_stop=None,
+                bounds=(-math.inf, math.inf), backtrack_tol=None, murphree=None, y_star=None):
+    """
+    从 (x0, y0) 出发逐级。
+    参数：
+        x_star        : 平衡线反函数 y -> x（标量）
+        lines         : 分段操作线 [(a, b, x_switch), ...]，最后一段的 x_switch 不用
+        y0, x0        : 起点（x0 缺省为 y0，即对角线上的塔顶点）
+        cap           : 最大级数
+        x_stop        : 实际级 x ≤ x_stop 时终止（含该级；精馏自塔顶向下）
+        y_stop        : 实际级 y ≥ y_stop 时终止（含该级；吸收自塔顶向下）
+        bounds        : 实际级 x 的合理范围，越界时停止（含该级）
+        backtrack_tol : 给出时检查 x_eq 不得比上一级小于该容差（x 应单调增加）
+        murphree      : None、("L", E_ML) 或 ("V", E_MV)；"V" 需要 y_star（平衡线 x -> y）
+    返回：StageRun
+    """
+    lines = [(float(a), float(b), -math.inf if s is None else float(s)) for a, b, s in lines]
+    last = len(lines) - 1
+    x_lo, x_hi = bounds
+    x_stop = -math.inf if x_stop is None else x_stop
+    y_stop = math.inf if y_stop is None else y_stop
+    mode, E = murphree if murphree else (None, 1.0)
+    check_back = backtrack_tol is not None
+
+    y = float(y0)
+    x_prev = y if x0 is None else float(x0)
+    x_r, y_r = x_prev, y
+    sec = 0
+    a, b, sw = lines[0]
+    xs, ys, xr, yr, starts = [], [], [], [], [0]
+    status, reject = CAP, None
+
+    for _ in range(max(1, int(cap))):
+        x_eq = x_star(y)
+        if check_back and x_eq + backtrack_tol < x_prev:
+            status, reject = BACKTRACK, x_eq
+            break
+        if sec < last and not x_eq > sw:
+            while sec < last and not x_eq > sw:
+                sec += 1
+                starts.append(len(xs))
+                a, b, sw = lines[sec]
+        y_op = a * x_eq + b
+        xs.append(x_eq)
+        ys.append(y_op)
+
+        if mode is None:
+            x_r, y_r = x_eq, y_op
+        else:
+            if mode == "V":
+                y_r = y_r + E * (y_star(x_eq) - y_r)
+                x_r = (y_r - b) / a
+            else:
+                x_r = x_r + E * (x_eq - x_r)
+                y_r = a * x_r + b
+            xr.append(x_r)
+            yr.append(y_r)
+
+        if x_r <= x_stop or y_r >= y_stop:
+            status = REACHED
+            break
+        if not x_lo <= x_r <= x_hi:
+            status = BOUNDS
+            break
+        x_prev, y = x_eq, y_op
+
+    x, y = np.array(xs), np.array(ys)
+    if mode is None:
+        x_real, y_real = x, y
+    else:
+        x_real, y_real = np.array(xr), np.array(yr)
+    return StageRun(x, y, starts, x_real, y_real, status, reject)
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+surrogate.py
+------------
+单一 VLE 体系的设计空间代理表：预先在 (xF, xD, xW, q, R/Rmin) 网格上批量运行
+DistillationColumn，保存为压缩 .npz 表，查询时直接插值，不再进入逐级循环。
+
+- 理论板数以“分数板数”存储（最后一级按 (x_{N-1}-xW)/(x_{N-1}-x_N) 计），
+  对输入连续，适合插值；查询同时给出整数板数 N = ceil(N_frac)；
+- Rmin 只依赖 (xF, xD, q)，单独存 3 维表，查询时先插值 Rmin，再换算 R/Rmin；
+- xW 与 R/Rmin 在对数坐标 log(xW)、log(R/Rmin - 1) 上插值（N 在这两个方向上接近线性）；
+- 误差界：N 在单个网格单元内沿各坐标单调，因此真值位于该单元 32 个角点值之间，
+  角点极差即插值误差上界；
+- 超出网格范围、所在单元含不可行角点，或误差界超过 max_error 的查询回退到精确求解。
+
+构建按 (xF, xD, q) 分组：同组共享一个 DistillationSession（Rmin、pinch 只算一次），
+各组通过 ProcessPoolExecutor 并行计算。
+"""
+
+import io
+import json
+import hashlib
+import contextlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.interpolate import RegularGridInterpolator
+
+from core.vle_data import VLEData
+from core.spec import DistillationSpec
+from core.distillation_column import DistillationColumn
+from core.session import DistillationSession
+
+
+AXES = ("xF", "xD", "xW", "q", "R_factor")
+
+DEFAULT_GRID = {
+    "xF": np.linspace(0.2, 0.7, 11),
+    "xD": np.array([0.85, 0.88, 0.90, 0.92, 0.95]),
+    "xW": np.array([0.005, 0.01, 0.02, 0.03, 0.05]),
+    "q": np.array([0.5, 0.75, 1.0, 1.25, 1.5]),
+    "R_factor": np.array([1.1, 1.2, 1.35, 1.5, 1.75, 2.0, 2.5, 3.0]),
+}
+
+# 插值坐标变换（需保持单调递增）
+_TRANSFORM = {
+    "xW": np.log,
+    "R_factor": lambda f: np.log(np.asarray(f, dtype=float) - 1.0),
+}
+
+
+def _coord(name, v):
+    f = _TRANSFORM.get(name)
+    return f(v) if f is not None else np.asarray(v, dtype=float)
+
+
+def fractional_stages(result, xD, xW):
+    """由 run() 结果计算分数理论板数；未达到 xW 时返回 NaN。"""
+    if not result["achieved"]:
+        return np.nan
+    xs = result["theory"]["x_theory"].to_numpy()
+    x_prev = xs[-2] if len(xs) > 1 else xD
+    x_last = xs[-1]
+    frac = (x_prev - xW) / (x_prev - x_last) if x_prev > x_last else 1.0
+    return len(xs) - 1 + float(np.clip(frac, 0.0, 1.0))
+
+
+# ---------- 构建（子进程入口） ----------
+def _eval_group(task):
+    """计算一组 (xF, xD, q) 下全部 (xW, R/Rmin) 的分数板数，返回 (Rmin, 2 维数组)。"""
+    x_data, y_data, xF, xD, q, xWs, factors = task
+    out = np.full((len(xWs), len(factors)), np.nan)
+    if not xF < xD:
+        return np.nan, out
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        session = DistillationSession(DistillationSpec(xF=xF, q=q, xD=xD, xW=xWs[0], R=1.0),
+                                      VLEData(x_data, y_data))
+        try:
+            Rmin = session.compute_Rmin()
+        except Exception:
+            return np.nan, out
+        for i, xW in enumerate(xWs):
+            if not xW < xF:
+                continue
+            for j, f in enumerate(factors):
+                session.set(xW=float(xW), R=float(f * Rmin))
+                try:
+                    out[i, j] = fractional_stages(session.run(), xD, xW)
+                except Exception:
+                    pass
+    return Rmin, out
+
+
+class DesignSurrogate:
+    """
+    设计空间代理表。
+
+    参数：
+        grid : dict[str, array]     各坐标轴网格点（键为 AXES）
+        N : ndarray                 分数理论板数，shape 与网格一致，不可行处为 NaN
+        Rmin : ndarray              (xF, xD, q) 3 维最小回流比表
+        x_data, y_data : array      VLE 数据（精确回退与一致性校验用）
+    """
+
+    def __init__(self, grid, N, Rmin, x_data, y_data):
+        self.grid = {k: np.asarray(grid[k], dtype=float) for k in AXES}
+        self.N = np.asarray(N, dtype=float)
+        self.Rmin = np.asarray(Rmin, dtype=float)
+        self.x_data = np.asarray(x_data, dtype=float)
+        self.y_data = np.asarray(y_data, dtype=float)
+        self._coords = [_coord(k, self.grid[k]) for k in AXES]
+        self._N_interp = RegularGridInterpolator(self._coords, self.N, bounds_error=False)
+        self._Rmin_interp = RegularGridInterpolator(
+            [self.grid["xF"], self.grid["xD"], self.grid["q"]], self.Rmin, bounds_error=False)
+        self._vle = None
+
+    # ---------- 构建 ----------
+    @classmethod
+    def build(cls, vle, grid=None, max_workers=None):
+        """
+        在网格上预计算。grid 中未给出的轴使用 DEFAULT_GRID。
+        max_workers=1 时在当前进程串行计算。
+        """
+        g = {k: np.sort(np.asarray((grid or {}).get(k, DEFAULT_GRID[k]), dtype=float)) for k in AXES}
+        if g["R_factor"][0] <= 1.0:
+            raise ValueError("R_factor 网格必须全部大于 1")
+        x_data, y_data = np.asarray(vle.x, dtype=float), np.asarray(vle.y, dtype=float)
+        keys = list(itertools.product(range(len(g["xF"])), range(len(g["xD"])), range(len(g["q"]))))
+        tasks = [(x_data, y_data, g["xF"][a], g["xD"][b], g["q"][c], g["xW"], g["R_factor"])
+                 for a, b, c in keys]
+
+        if max_workers == 1:
+            blocks = [_eval_group(t) for t in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                blocks = list(pool.map(_eval_group, tasks, chunksize=max(1, len(tasks) // 64)))
+
+        shape = tuple(len(g[k]) for k in AXES)
+        N = np.full(shape, np.nan)
+        Rmin = np.full((shape[0], shape[1], shape[3]), np.nan)
+        for (a, b, c), (rmin, block) in zip(keys, blocks):
+            Rmin[a, b, c] = rmin
+            N[a, b, :, c, :] = block
+        return cls(g, N, Rmin, x_data, y_data)
+
+    # ---------- 存取 ----------
+    def fingerprint(self):
+        """VLE 数据指纹，用于确认代理表与当前体系一致。"""
+        h = hashlib.sha1(self.x_data.tobytes() + self.y_data.tobytes())
+        return h.hexdigest()[:16]
+
+    def save(self, path):
+        meta = {"axes": list(AXES), "vle": self.fingerprint()}
+        np.savez_compressed(path, N=self.N.astype(np.float32), Rmin=self.Rmin.astype(np.float32),
+                            x_data=self.x_data, y_data=self.y_data, meta=json.dumps(meta),
+                            **{f"grid_{k}": self.grid[k] for k in AXES})
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            return cls({k: z[f"grid_{k}"] for k in AXES}, z["N"], z["Rmin"], z["x_data"], z["y_data"])
+
+    # ---------- 查询 ----------
+    def _corner_spread(self, pts):
+        """各查询点所在网格单元 32 个角点的极差（含 NaN 角点时为 NaN）。"""
+        idx = []
+        for d, ax in enumerate(self._coords):
+            i = np.searchsorted(ax, pts[:, d], side="right") - 1
+            idx.append(np.clip(i, 0, len(ax) - 2))
+        corners = np.stack([self.N[tuple(i + o for i, o in zip(idx, off))]
+                            for off in itertools.product((0, 1), repeat=len(AXES))])
+        return corners.max(axis=0) - corners.min(axis=0)
+
+    def _exact(self, xF, xD, xW, q, R):
+        if self._vle is None:
+            self._vle = VLEData(self.x_data, self.y_data)
+        col = DistillationColumn(DistillationSpec(xF=xF, q=q, xD=xD, xW=xW, R=R), self._vle)
+        with contextlib.redirect_stdout(io.StringIO()):
+            Rmin = col.compute_Rmin()
+            try:
+                N = fractional_stages(col.run(), xD, xW) if R > Rmin else np.nan
+            except Exception:
+                N = np.nan
+        return N, Rmin
+
+    def query(self, xF, xD, xW, q, R, max_error=None, exact=True):
+        """
+        批量查询（参数可为标量或可广播数组）。
+        返回：dict（均为 1 维数组）
+            N_frac, N, Rmin, R_factor, error（插值误差上界，精确解为 0），
+            source（"table" / "exact" / "none"）
+        """
+        xF, xD, xW, q, R = (a.ravel() for a in np.broadcast_arrays(
+            *(np.asarray(v, dtype=float) for v in (xF, xD, xW, q, R))))
+        Rmin = self._Rmin_interp(np.column_stack([xF, xD, q]))
+        factor = R / Rmin
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pts = np.column_stack([_coord(k, v) for k, v in zip(AXES, (xF, xD, xW, q, factor))])
+        inside = np.all([(pts[:, d] >= ax[0]) & (pts[:, d] <= ax[-1])
+                         for d, ax in enumerate(self._coords)], axis=0)
+        N_frac = np.full(len(R), np.nan)
+        error = np.full(len(R), np.nan)
+        if inside.any():
+            N_frac[inside] = self._N_interp(pts[inside])
+            error[inside] = self._corner_spread(pts[inside])
+
+        ok = inside & np.isfinite(error)
+        if max_error is not None:
+            ok &= error <= max_error
+        source = np.where(ok, "table", "none").astype(object)
+        N_frac[~ok] = np.nan
+        error[~ok] = np.nan
+
+        if exact:
+            for k in np.nonzero(~ok)[0]:
+                N_frac[k], Rmin[k] = self._exact(xF[k], xD[k], xW[k], q[k], R[k])
+                factor[k] = R[k] / Rmin[k]
+                error[k] = 0.0
+                source[k] = "exact"
+
+        with np.errstate(invalid="ignore"):
+            N = np.where(np.isfinite(N_frac), np.ceil(N_frac - 1e-9), np.nan)
+        return {"N_frac": N_frac, "N": N, "Rmin": Rmin, "R_factor": factor,
+                "error": error, "source": source}
+
+    def lookup(self, xF, xD, xW, q, R, max_error=None):
+        """单点查询，返回标量 dict。"""
+        out = self.query(xF, xD, xW, q, R, max_error=max_error)
+        res = {k: float(v[0]) for k, v in out.items() if k != "source"}
+        res["source"] = out["source"][0]
+        return res
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+uncertainty.py
+--------------
+VLE 数据与设计规格的 Monte Carlo 不确定度传递。
+
+对实验 x–y 表、进料组成 xF 与 Murphree 效率施加测量误差扰动，
+批量运行 DistillationColumn，统计理论板数 N、最小回流比 Rmin
+以及实际达到的塔釜组成的分布。
+
+- 样本按块（chunk）划分，每块一个独立的 SeedSequence 子流，
+  结果与进程数、调度顺序无关，可完全复现；
+- 各块通过 ProcessPoolExecutor 分发到多个进程并行计算。
+"""
+
+import io
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core.vle_data import VLEData
+from core.spec import DistillationSpec
+from core.distillation_column import DistillationColumn
+
+
+SAMPLE_COLUMNS = ["xF", "EM", "Rmin", "R_used", "N_theory", "N_real",
+                  "xW_theory", "xW_real", "achieved"]
+
+
+# ---------- 扰动 ----------
+def perturb_vle(rng, x_data, y_data, sigma_x=0.0, sigma_y=0.005, corr_len=0.05):
+    """
+    对 VLE 表施加高斯测量误差：
+    - 端点 (纯组分) 不扰动；
+    - corr_len>0 时误差沿 x 方向按高斯核相关（系统误差），逐点标准差仍为 sigma；
+      corr_len=0 为逐点独立误差，插值曲线会明显抖动；
+    - 结果裁剪到 [0, 1] 后按 x 对 (x, y) 成对排序（每个点保持自己的 y），噪声使 x 或 y
+      不再严格递增的点整对剔除，保证 y*(x)、x*(y) 样条均可构造。
+    """
+    x = np.array(x_data, dtype=float)
+    y = np.array(y_data, dtype=float)
+    n = len(x)
+    if corr_len > 0:
+        d = x[1:-1, None] - x[None, 1:-1]
+        K = np.exp(-0.5 * (d / corr_len) ** 2)
+        K /= np.sqrt((K ** 2).sum(axis=1, keepdims=True))
+    else:
+        K = None
+
+    for arr, sigma in ((x, sigma_x), (y, sigma_y)):
+        if sigma > 0:
+            e = rng.normal(0.0, sigma, n - 2)
+            arr[1:-1] += e if K is None else K @ e
+
+    x, y = np.clip(x, 0.0, 1.0), np.clip(y, 0.0, 1.0)
+    order = np.argsort(x[1:-1], kind="stable") + 1
+    keep = [0]
+    for i in order:
+        if x[keep[-1]] < x[i] < x[-1] and y[keep[-1]] < y[i] < y[-1]:
+            keep.append(i)
+    keep.append(n - 1)
+    return x[keep], y[keep]
+
+
+def _spec_kwargs(spec):
+    """提取 DistillationSpec 的构造参数，便于跨进程传递与逐样本复制。"""
+    return dict(xF=spec.xF, q=spec.q, xD=spec.xD, xW=spec.xW, R=spec.R,
+                consider_murphree=spec.consider_murphree,
+                EM_L=spec.EM_L, EM_V=spec.EM_V, mode=spec.mode, tol=spec.tol)
+
+
+# ---------- 单块计算（子进程入口） ----------
+def _run_chunk(task):
+    """
+    计算一个样本块，返回 shape=(n, len(SAMPLE_COLUMNS)) 的数组。
+    单个样本失败（样条构造失败、数值发散等）记为 NaN，不中断整块。
+    """
+    (x_data, y_data, base, sigmas, R_factor, seed_seq, n) = task
+    rng = np.random.default_rng(seed_seq)
+    out = np.full((n, len(SAMPLE_COLUMNS)), np.nan)
+
+    use_gas = base["EM_V"] is not None and base["EM_V"] < 1.0
+    EM0 = base["EM_V"] if use_gas else base["EM_L"]
+    EM0 = 1.0 if EM0 is None else EM0
+
+    # 逐级计算中的告警打印在大样本下没有意义，统一吞掉
+    with contextlib.redirect_stdout(io.StringIO()):
+        for k in range(n):
+            x, y = perturb_vle(rng, x_data, y_data, sigmas["x"], sigmas["y"], sigmas["corr_len"])
+            xF = float(np.clip(base["xF"] + rng.normal(0.0, sigmas["xF"]), base["xW"], base["xD"]))
+            EM = float(np.clip(EM0 + rng.normal(0.0, sigmas["EM"]), 0.05, 1.0))
+
+            kw = dict(base, xF=xF)
+            if use_gas:
+                kw["EM_V"] = EM
+            else:
+                kw["EM_L"] = EM
+            try:
+                spec = DistillationSpec(**kw)
+                col = DistillationColumn(spec, VLEData(x, y))
+                Rmin = col.compute_Rmin()
+                if R_factor is not None:
+                    spec.R = R_factor * Rmin
+                elif spec.R <= 0:
+                    spec.R = 1.5 * Rmin
+                res = col.run()
+            except Exception:
+                out[k, :2] = xF, EM
+                continue
+
+            df_t, df_r = res["theory"], res["real"]
+            out[k] = (xF, EM, Rmin, res["R_used"], len(df_t), len(df_r),
+                      df_t["x_theory"].iloc[-1], df_r["x_real"].iloc[-1],
+                      float(res["achieved"]))
+    return out
+
+
+# ---------- 主入口 ----------
+class MonteCarloUQ:
+    """
+    Monte Carlo 不确定度分析器。
+
+    参数：
+        spec : DistillationSpec      名义设计规格
+        x_data, y_data : array       名义实验 VLE 数据
+        sigma_x, sigma_y : float     x、y 测量标准差（绝对值）
+        sigma_xF : float             进料组成标准差
+        sigma_EM : float             Murphree 效率标准差
+        corr_len : float             VLE 误差沿 x 方向的相关长度（0 表示逐点独立）
+        R_factor : float | None      若给定，每个样本取 R = R_factor × Rmin(样本)；
+                                     否则沿用 spec.R（spec.R<=0 时为 1.5×Rmin）
+    """
+
+    def __init__(self, spec, x_data, y_data,
+                 sigma_x=0.0, sigma_y=0.005, sigma_xF=0.005, sigma_EM=0.03,
+                 corr_len=0.05, R_factor=None):
+        self.spec = spec
+        self.x_data = np.asarray(x_data, dtype=float)
+        self.y_data = np.asarray(y_data, dtype=float)
+        self.sigmas = {"x": sigma_x, "y": sigma_y, "xF": sigma_xF, "EM": sigma_EM,
+                       "corr_len": corr_len}
+        self.R_factor = R_factor
+
+    def _tasks(self, n_samples, seed, chunk_size):
+        base = _spec_kwargs(self.spec)
+        n_chunks = max(1, -(-n_samples // chunk_size))
+        streams = np.random.SeedSequence(seed).spawn(n_chunks)
+        for i, ss in enumerate(streams):
+            n = min(chunk_size, n_samples - i * chunk_size)
+            yield (self.x_data, self.y_data, base, self.sigmas, self.R_factor, ss, n)
+
+    def run(self, n_samples=10000, seed=0, chunk_size=500, max_workers=None):
+        """
+        运行 Monte Carlo 抽样。
+        - max_workers=1 时在当前进程串行计算（便于调试）；
+        - 同一 seed 与 chunk_size 下结果与 max_workers 无关。
+        返回：
+            dict(samples=DataFrame, stats=DataFrame, N_distribution=Series)
+        """
+        tasks = list(self._tasks(int(n_samples), seed, int(chunk_size)))
+        if max_workers == 1 or len(tasks) == 1:
+            blocks = [_run_chunk(t) for t in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                blocks = list(pool.map(_run_chunk, tasks))
+
+        df = pd.DataFrame(np.vstack(blocks), columns=SAMPLE_COLUMNS)
+        return {
+            "samples": df,
+            "stats": summarize(df),
+            "N_distribution": df["N_theory"].dropna().astype(int).value_counts().sort_index(),
+        }
+
+
+def summarize(df, columns=("Rmin", "R_used", "N_theory", "N_real", "xW_theory", "xW_real")):
+    """统计各输出量的均值、标准差与分位数，以及达标率与失败样本数。"""
+    rows = {}
+    for c in columns:
+        s = df[c].dropna()
+        rows[c] = {
+            "mean": s.mean(), "std": s.std(),
+            "p05": s.quantile(0.05), "p50": s.quantile(0.50), "p95": s.quantile(0.95),
+            "min": s.min(), "max": s.max(),
+        }
+    stats = pd.DataFrame(rows).T
+    stats.attrs["achieved_rate"] = float(df["achieved"].mean())
+    stats.attrs["failed"] = int(df["Rmin"].isna().sum())
+    return stats
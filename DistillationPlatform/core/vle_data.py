@@ -1,18 +1,39 @@
 import numpy as np
 from scipy.interpolate import CubicSpline
+from utils.instrument import PROFILER
+
+from .stepping import ScalarPPoly
 
 class VLEData:
     """存储气液平衡数据，提供三次样条插值方法"""
+    _SPLINES = ("y_star_func", "x_star_func", "_y1", "_x1")
+
     def __init__(self, x_data, y_data):
         self.x = np.array(x_data)
         self.y = np.array(y_data)
 
+    def __getattr__(self, name):
+        # 样条在第一次用到时才构造（只建立 VLEData 而不计算时几乎没有开销）；
+        # 构造后成为实例属性，之后的访问不再经过这里
+        if name not in VLEData._SPLINES:
+            raise AttributeError(name)
+        self._build()
+        return self.__dict__[name]
+
+    def _build(self):
         # 使用 SciPy 三次样条插值（自然边界）
         self.y_star_func = CubicSpline(self.x, self.y, bc_type='natural')
         self.x_star_func = CubicSpline(self.y, self.x, bc_type='natural')
+        # 标量快速求值（结果与上面两个样条逐位一致），供逐级计算使用
+        self._y1 = ScalarPPoly(self.y_star_func)
+        self._x1 = ScalarPPoly(self.x_star_func)
 
     def y_star(self, x):
-        return float(self.y_star_func(x))
+        if PROFILER.enabled:
+            PROFILER.count("vle.y_star")
+        return self._y1(float(x))
 
     def x_star(self, y):
-        return float(self.x_star_func(y))
\ No newline at end of file
+        if PROFILER.enabled:
+            PROFILER.count("vle.x_star")
+        return self._x1(float(y))
\ No newline at end of file
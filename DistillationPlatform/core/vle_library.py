@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+vle_library.py
+--------------
+磁盘上的二元体系 VLE 库：一个 manifest.json 索引 + 每个体系一个 .npy 数组（2×n，第一行 x、第二行 y）。
+
+    data/vle_library/
+    ├── manifest.json        {"format": 1, "systems": {"methanol_water": {"file": "methanol_water.npy",
+    │                                                  "n": 50, "source": "...", ...}}}
+    └── methanol_water.npy
+
+- 打开库只读 manifest（体系名与元数据），不读任何数组；
+- arrays(name) 以 np.load(mmap_mode="r") 内存映射返回 x、y，不占用常驻内存；
+- get(name) 返回构造好的 VLEData，同一进程内经 open_library 打开的同一目录共享一个
+  OrderedDict LRU（默认 32 个体系），淘汰的体系下次用到时重新映射、重新构造样条。
+库里体系再多，启动开销与常驻内存只随 manifest 的大小与 LRU 容量变化。
+"""
+
+import os
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+from core.vle_data import VLEData
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROOT = os.environ.get("CHEMENG_VLE_LIBRARY",
+                              os.path.join(os.path.dirname(HERE), "data", "vle_library"))
+MANIFEST = "manifest.json"
+FORMAT = 1
+
+
+class VLELibrary:
+    """
+    参数：
+        root       : 库目录（含 manifest.json；不存在时 add 会创建）
+        cache_size : 已构造 VLEData 的 LRU 容量
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, cache_size=32):
+        self.root = os.path.abspath(root)
+        self.cache_size = int(cache_size)
+        self._manifest = None
+        self._cache = OrderedDict()
+        self.hits = self.misses = 0
+
+    # ---------- manifest ----------
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            path = os.path.join(self.root, MANIFEST)
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    self._manifest = json.load(f)
+            else:
+                self._manifest = {"format": FORMAT, "systems": {}}
+        return self._manifest
+
+    def names(self):
+        return sorted(self.manifest["systems"])
+
+    def __contains__(self, name):
+        return name in self.manifest["systems"]
+
+    def __len__(self):
+        return len(self.manifest["systems"])
+
+    def info(self, name):
+        try:
+            return dict(self.manifest["systems"][name])
+        except KeyError:
+            raise KeyError(f"VLE 库中没有体系：{name}") from None
+
+    # ---------- 读取 ----------
+    def arrays(self, name):
+        """内存映射的 (x, y) 只读视图"""
+        data = np.load(os.path.join(self.root, self.info(name)["file"]), mmap_mode="r")
+        return data[0], data[1]
+
+    def get(self, name):
+        """按名称取 VLEData（LRU 缓存；同一对象在各引擎间共享，调用方不应就地修改）"""
+        vle = self._cache.get(name)
+        if vle is not None:
+            self.hits += 1
+            self._cache.move_to_end(name)
+            return vle
+        self.misses += 1
+        x, y = self.arrays(name)
+        vle = self._cache[name] = VLEData(x, y)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return vle
+
+    def cache_info(self):
+        return {"systems": len(self), "cached": len(self._cache), "cache_size": self.cache_size,
+                "hits": self.hits, "misses": self.misses}
+
+    # ---------- 写入 ----------
+    def add(self, name, x, y, overwrite=False, **meta):
+        """
+        写入一个体系（.npy 先写临时文件再替换，manifest 同样原子替换）。
+        x、y 须严格递增（两个方向的样条都要求自变量单调）。meta 原样记入 manifest。
+        """
+        if not overwrite and name in self:
+            raise ValueError(f"体系已存在：{name}（overwrite=True 覆盖）")
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        if x.shape != y.shape or x.ndim != 1 or len(x) < 2:
+            raise ValueError("x、y 须为等长一维数组（至少 2 点）")
+        if np.any(np.diff(x) <= 0) or np.any(np.diff(y) <= 0):
+            raise ValueError(f"{name}：x、y 须严格递增")
+        os.makedirs(self.root, exist_ok=True)
+        fname = f"{name}.npy"
+        tmp = os.path.join(self.root, f".{fname}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, np.vstack([x, y]))
+        os.replace(tmp, os.path.join(self.root, fname))
+
+        self.manifest["systems"][name] = {"file": fname, "n": int(len(x)), **meta}
+        self._write_manifest()
+        self._cache.pop(name, None)
+        return self.info(name)
+
+    def import_csv(self, path, name=None, x_col="x", y_col="y", **meta):
+        import pandas as pd
+        df = pd.read_csv(path)
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        return self.add(name, df[x_col].to_numpy(), df[y_col].to_numpy(),
+                        source=os.path.basename(path), **meta)
+
+    def _write_manifest(self):
+        tmp = os.path.join(self.root, f".{MANIFEST}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp, os.path.join(self.root, MANIFEST))
+
+
+# 进程内共享：同一目录只打开一次，所有引擎共用同一个 LRU
+_LIBRARIES = {}
+
+
+def open_library(root=None, cache_size=32):
+    root = os.path.abspath(root or DEFAULT_ROOT)
+    lib = _LIBRARIES.get(root)
+    if lib is None:
+        lib = _LIBRARIES[root] = VLELibrary(root, cache_size)
+    return lib
+
+
+def load_vle(name, root=None):
+    """open_library(root).get(name) 的简写"""
+    return open_library(root).get(name)
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+vle_regression.py
+-----------------
+二元体系 x–y(–T) 实验数据回归：相对挥发度 α、Wilson、NRTL。
+
+统一写成“有效相对挥发度”形式：
+    y = α_eff·x / [1 + (α_eff − 1)·x]
+    ln α_eff = ln r(T) + ln γ1 − ln γ2
+其中 r = P1sat/P2sat：
+    - 无温度数据时 r 为常数，ln r = a0；
+    - 有温度数据 T (K) 时按 Clausius–Clapeyron 取 ln r = a0 + a1·(1000/T)。
+γ 由 Wilson / NRTL 给出（model="alpha" 时 γ≡1）。
+
+残差与 Jacobian 全部向量化、解析求导，交由 scipy.optimize.least_squares。
+回归结果 FittedVLE 与 VLEData 接口一致（x, y, y_star, x_star），可直接用于
+DistillationColumn / DistillationEngine。
+"""
+
+import os
+import glob
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares
+
+
+MODELS = ("alpha", "wilson", "nrtl")
+
+
+# ---------- 活度系数模型 (返回 ln(γ1/γ2) 及其对参数的导数) ----------
+def _wilson(x1, L12, L21):
+    x2 = 1.0 - x1
+    D1 = x1 + L12 * x2
+    D2 = x2 + L21 * x1
+    C = L12 / D1 - L21 / D2
+    lng1 = -np.log(D1) + x2 * C
+    lng2 = -np.log(D2) - x1 * C
+    dC_dL12 = x1 / D1 ** 2
+    dC_dL21 = -x2 / D2 ** 2
+    d12 = (-x2 / D1 + x2 * dC_dL12) - (-x1 * dC_dL12)
+    d21 = (x2 * dC_dL21) - (-x1 / D2 - x1 * dC_dL21)
+    return lng1 - lng2, np.stack([d12, d21], axis=-1)
+
+
+def _nrtl(x1, t12, t21, a=0.3):
+    x2 = 1.0 - x1
+    G12 = np.exp(-a * t12)
+    G21 = np.exp(-a * t21)
+    A = x1 + x2 * G21
+    B = x2 + x1 * G12
+    lng1 = x2 ** 2 * (t21 * (G21 / A) ** 2 + t12 * G12 / B ** 2)
+    lng2 = x1 ** 2 * (t12 * (G12 / B) ** 2 + t21 * G21 / A ** 2)
+
+    k12 = 2.0 * a * t12 * x1 * G12 / B
+    k21 = 2.0 * a * t21 * x2 * G21 / A
+    dg1_t12 = x2 ** 2 * G12 / B ** 2 * (1.0 - a * t12 + k12)
+    dg1_t21 = x2 ** 2 * G21 ** 2 / A ** 2 * (1.0 - 2.0 * a * t21 + k21)
+    dg2_t12 = x1 ** 2 * G12 ** 2 / B ** 2 * (1.0 - 2.0 * a * t12 + k12)
+    dg2_t21 = x1 ** 2 * G21 / A ** 2 * (1.0 - a * t21 + k21)
+    return lng1 - lng2, np.stack([dg1_t12 - dg2_t12, dg1_t21 - dg2_t21], axis=-1)
+
+
+# ---------- 统一模型 ----------
+class _Model:
+    """
+    参数向量 θ = [a0, (a1), p1, p2]：
+        a0, a1 : ln r 的常数项 / 1000/T 系数（a1 仅在有温度数据时出现）
+        p1, p2 : Wilson Λ12, Λ21 或 NRTL τ12, τ21
+    """
+
+    def __init__(self, model, with_T, nrtl_alpha=0.3):
+        if model not in MODELS:
+            raise ValueError(f"未知模型 {model!r}，可选：{MODELS}")
+        self.model = model
+        self.with_T = with_T
+        self.nrtl_alpha = nrtl_alpha
+        self.n_r = 2 if with_T else 1
+        self.n_g = 0 if model == "alpha" else 2
+
+    @property
+    def names(self):
+        r = ["a0", "a1"][:self.n_r]
+        g = {"alpha": [], "wilson": ["Lambda12", "Lambda21"], "nrtl": ["tau12", "tau21"]}
+        return r + g[self.model]
+
+    def ln_alpha(self, theta, x, T=None, jac=False):
+        """返回 ln α_eff(x)；jac=True 时同时返回 ∂lnα/∂θ，shape=(n, len(θ))。"""
+        invT = None if T is None else 1000.0 / T
+        ln_a = theta[0] + (theta[1] * invT if self.with_T else 0.0)
+        parts = [np.ones_like(x)] + ([invT] if self.with_T else [])
+
+        if self.model != "alpha":
+            p1, p2 = theta[self.n_r], theta[self.n_r + 1]
+            if self.model == "wilson":
+                dg, dpar = _wilson(x, p1, p2)
+            else:
+                dg, dpar = _nrtl(x, p1, p2, self.nrtl_alpha)
+            ln_a = ln_a + dg
+            parts += [dpar[..., 0], dpar[..., 1]]
+
+        if not jac:
+            return ln_a
+        return ln_a, np.stack(parts, axis=-1)
+
+    def initial(self, x, y, T=None):
+        """以数据点的平均 ln α 作为 a0 初值；活度参数从理想溶液出发。"""
+        mask = (x > 1e-6) & (x < 1 - 1e-6) & (y > 1e-6) & (y < 1 - 1e-6)
+        xm, ym = x[mask], y[mask]
+        ln_a0 = float(np.mean(np.log(ym * (1 - xm) / (xm * (1 - ym))))) if mask.any() else 0.0
+        theta = [ln_a0] + ([0.0] if self.with_T else [])
+        theta += {"alpha": [], "wilson": [1.0, 1.0], "nrtl": [0.0, 0.0]}[self.model]
+        return np.array(theta, dtype=float)
+
+    def bounds(self):
+        lo = [-np.inf] * self.n_r
+        hi = [np.inf] * self.n_r
+        if self.model == "wilson":
+            lo += [1e-6, 1e-6]
+            hi += [np.inf, np.inf]
+        elif self.model == "nrtl":
+            lo += [-10.0, -10.0]
+            hi += [10.0, 10.0]
+        return np.array(lo), np.array(hi)
+
+
+def _y_from_ln_alpha(x, ln_a):
+    a = np.exp(ln_a)
+    den = 1.0 + (a - 1.0) * x
+    return a * x / den, x * (1.0 - x) * a / den ** 2   # y, ∂y/∂lnα
+
+
+# ---------- 回归结果：可作为 VLE 对象使用 ----------
+class FittedVLE:
+    """
+    回归得到的平衡模型，接口与 VLEData 一致：
+        y_star(x) : 闭式计算
+        x_star(y) : 预先计算的致密单调表 + 线性插值
+        x, y      : 原始实验数据（供 compute_operating_lines 等使用）
+    有温度数据时，T(x) 由实验点插值得到，用于计算 r(T)。
+    """
+
+    def __init__(self, model, theta, x_data, y_data, T_data=None,
+                 nrtl_alpha=0.3, rmse=None, n_grid=2001):
+        self.model = model
+        self._m = _Model(model, T_data is not None, nrtl_alpha)
+        self.theta = np.asarray(theta, dtype=float)
+        self.params = dict(zip(self._m.names, map(float, self.theta)))
+        self.nrtl_alpha = nrtl_alpha
+        self.rmse = rmse
+        self.x = np.asarray(x_data, dtype=float)
+        self.y = np.asarray(y_data, dtype=float)
+
+        if T_data is not None:
+            order = np.argsort(self.x)
+            self._xT = (self.x[order], np.asarray(T_data, dtype=float)[order])
+        else:
+            self._xT = None
+
+        xs = np.linspace(0.0, 1.0, n_grid)
+        ys = np.maximum.accumulate(self.y_star_array(xs))
+        self._grid = (xs, ys)
+
+    def _T(self, x):
+        return None if self._xT is None else np.interp(x, *self._xT)
+
+    def y_star_array(self, x):
+        x = np.asarray(x, dtype=float)
+        ln_a = self._m.ln_alpha(self.theta, x, self._T(x))
+        return _y_from_ln_alpha(x, ln_a)[0]
+
+    def y_star(self, x):
+        return float(self.y_star_array(x))
+
+    def x_star(self, y):
+        xs, ys = self._grid
+        return float(np.interp(y, ys, xs))
+
+    def alpha(self, x):
+        """有效相对挥发度 α_eff(x)。"""
+        x = np.asarray(x, dtype=float)
+        return np.exp(self._m.ln_alpha(self.theta, x, self._T(x)))
+
+    def label(self):
+        """平衡线方程摘要字符串（写入 summary_oplines.json）。"""
+        if self.model == "alpha" and self._xT is None:
+            a = float(np.exp(self.theta[0]))
+            return f"y = {a:.6f}·x / [1 + ({a:.6f} - 1)·x]"
+        pars = ", ".join(f"{k}={v:.6g}" for k, v in self.params.items())
+        return f"y = α_eff·x / [1 + (α_eff - 1)·x], {self.model}: {pars}"
+
+    def to_dict(self):
+        return {"model": self.model, "params": self.params,
+                "nrtl_alpha": self.nrtl_alpha if self.model == "nrtl" else None,
+                "rmse": self.rmse, "n_points": int(len(self.x))}
+
+
+# ---------- 单组数据回归 ----------
+def fit_vle(x_data, y_data, model="alpha", T_data=None, nrtl_alpha=0.3, weights=None):
+    """
+    回归单个二元体系。
+    参数：
+        x_data, y_data : 液相/气相轻组分摩尔分数
+        model : "alpha" | "wilson" | "nrtl"
+        T_data : 可选，各点温度 (K)；给出时 ln r 含 1000/T 项
+        nrtl_alpha : NRTL 非随机参数（固定）
+        weights : 可选，各点残差权重
+    返回：
+        FittedVLE
+    """
+    x = np.asarray(x_data, dtype=float)
+    y = np.asarray(y_data, dtype=float)
+    T = None if T_data is None else np.asarray(T_data, dtype=float)
+    w = np.ones_like(x) if weights is None else np.asarray(weights, dtype=float)
+    m = _Model(model, T is not None, nrtl_alpha)
+
+    def resid(theta):
+        return w * (_y_from_ln_alpha(x, m.ln_alpha(theta, x, T))[0] - y)
+
+    def jac(theta):
+        ln_a, d_ln_a = m.ln_alpha(theta, x, T, jac=True)
+        _, dy_dlna = _y_from_ln_alpha(x, ln_a)
+        return (w * dy_dlna)[:, None] * d_ln_a
+
+    sol = least_squares(resid, m.initial(x, y, T), jac=jac, bounds=m.bounds(), method="trf")
+    rmse = float(np.sqrt(np.mean((sol.fun / w) ** 2)))
+    return FittedVLE(model, sol.x, x, y, T, nrtl_alpha=nrtl_alpha, rmse=rmse)
+
+
+# ---------- 目录批量回归 ----------
+def read_dataset(path):
+    """读取一个二元数据 CSV：需包含 x、y 列，可选 T 列 (K)。"""
+    df = pd.read_csv(path)
+    cols = {c.strip().lower(): c for c in df.columns}
+    if "x" not in cols or "y" not in cols:
+        raise ValueError(f"{path}: 缺少 x / y 列")
+    T = df[cols["t"]].to_numpy(float) if "t" in cols else None
+    return df[cols["x"]].to_numpy(float), df[cols["y"]].to_numpy(float), T
+
+
+def _fit_file(task):
+    path, models, nrtl_alpha = task
+    name = os.path.splitext(os.path.basename(path))[0]
+    rows = []
+    try:
+        x, y, T = read_dataset(path)
+    except Exception as e:
+        return [{"system": name, "model": None, "error": repr(e)}]
+    for model in models:
+        try:
+            fit = fit_vle(x, y, model, T_data=T, nrtl_alpha=nrtl_alpha)
+            rows.append({"system": name, "model": model, "rmse": fit.rmse,
+                         "n_points": len(x), "with_T": T is not None,
+                         **fit.params, "error": None})
+        except Exception as e:
+            rows.append({"system": name, "model": model, "error": repr(e)})
+    return rows
+
+
+def fit_directory(folder, models=("alpha", "wilson", "nrtl"), pattern="*.csv",
+                  nrtl_alpha=0.3, max_workers=None):
+    """
+    对目录下全部二元数据文件并行回归。
+    返回：
+        DataFrame，每行一个 (体系, 模型)，含参数、RMSE 与错误信息；
+        可按 system 取 rmse 最小的模型作为该体系的紧凑平衡模型。
+    """
+    paths = sorted(glob.glob(os.path.join(folder, pattern)))
+    tasks = [(p, tuple(models), nrtl_alpha) for p in paths]
+    if max_workers == 1 or len(tasks) <= 1:
+        blocks = [_fit_file(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            blocks = list(pool.map(_fit_file, tasks, chunksize=max(1, len(tasks) // 64)))
+    return pd.DataFrame([r for b in blocks for r in b])
+
+
+def best_fits(table):
+    """从 fit_directory 的结果中为每个体系挑选 RMSE 最小的模型。"""
+    ok = table[table["error"].isna()]
+    return ok.loc[ok.groupby("system")["rmse"].idxmin()].reset_index(drop=True)
@@ -1,11 +1,13 @@
-import os
-import csv
-import json
 import numpy as np
-from core import VLEData, DistillationSpec, DistillationEngine
+import pandas as pd
+from core import VLEData, DistillationSpec, DistillationEngine, EnthalpyData
 from core.special_models import azeotropic_modifier, extractive_modifier
 from core.multiple_effect import MultiEffectSystem
-from utils import create_result_folder, save_results, plot_mccabe_thiele
+from core.batch_distillation import BatchDistillation
+from core.pressure_vle import METHANOL_WATER
+from core.vle_library import open_library
+from core.vle_regression import fit_vle
+from utils import create_result_folder, plot_mccabe_thiele, plot_ponchon_savarit, plot_batch_distillation, PROFILER, CSVSink
 
 
 # ========== 1️⃣ 模式选择 ==========
@@ -14,7 +16,8 @@ print("1 - 基础精馏 (basic)")
 print("2 - 共沸精馏 (azeotropic)")
 print("3 - 萃取精馏 (extractive)")
 print("4 - 多效精馏 (multiple)")
-mode_choice = input("请输入数字选择模式 [1-4]: ").strip()
+print("5 - 间歇精馏 (batch)")
+mode_choice = input("请输入数字选择模式 [1-5]: ").strip()
 
 if mode_choice == "1":
     mode = "basic"
@@ -24,6 +27,8 @@ elif mode_choice == "3":
     mode = "extractive"
 elif mode_choice == "4":
     mode = "multiple"
+elif mode_choice == "5":
+    mode = "batch"
 else:
     print("⚠️ 输入无效，默认使用基础精馏。")
     mode = "basic"
@@ -36,17 +41,9 @@ print("2 - 理论模型 (仅输入相对挥发度 α；自动生成 y = αx / [1
 vle_choice = input("请输入数字选择 [1/2]: ").strip()
 
 if vle_choice == "1":
-    print("\n✅ 使用实验数据模式（默认样例数据）")
-    x_data = np.array([0.000, 0.020, 0.040, 0.060, 0.080, 0.100, 0.120, 0.140, 0.160, 0.180,
-                       0.200, 0.220, 0.240, 0.260, 0.280, 0.300, 0.320, 0.340, 0.360, 0.380,
-                       0.400, 0.420, 0.440, 0.460, 0.480, 0.500, 0.520, 0.540, 0.560, 0.580,
-                       0.600, 0.620, 0.640, 0.660, 0.680, 0.700, 0.720, 0.740, 0.760, 0.780,
-                       0.800, 0.820, 0.840, 0.860, 0.880, 0.900, 0.920, 0.940, 0.960, 0.980])
-    y_data = np.array([0.000, 0.135, 0.235, 0.311, 0.372, 0.421, 0.463, 0.499, 0.529, 0.556,
-                       0.580, 0.602, 0.622, 0.640, 0.656, 0.672, 0.686, 0.700, 0.713, 0.725,
-                       0.737, 0.748, 0.759, 0.769, 0.779, 0.789, 0.799, 0.808, 0.817, 0.826,
-                       0.835, 0.844, 0.853, 0.861, 0.870, 0.878, 0.886, 0.895, 0.903, 0.911,
-                       0.919, 0.927, 0.936, 0.944, 0.952, 0.960, 0.968, 0.976, 0.984, 0.992])
+    print("\n✅ 使用实验数据模式（VLE 库体系 methanol_water）")
+    # 修正模型会就地改写 y_star，这里用库中数组新建 VLEData，不动库里共享的对象
+    x_data, y_data = (np.array(a) for a in open_library().arrays("methanol_water"))
     vle = VLEData(x_data, y_data)
     vle_source = "experimental"
 
@@ -68,7 +65,7 @@ else:
 
 
 # ========== 3️⃣ 参数输入 ==========
-if mode != "multiple":
+if mode not in ("multiple", "batch"):
     xF = float(input("请输入进料摩尔分数 xF (默认 0.48): ") or 0.48)
     xD = float(input("请输入塔顶摩尔分数 xD (默认 0.90): ") or 0.90)
     xW = float(input("请输入塔釜摩尔分数 xW (默认 0.01): ") or 0.01)
@@ -89,7 +86,7 @@ if mode != "multiple":
     else:
         consider_murphree = False
         EM_L = EM_V = None
-else:
+elif mode == "multiple":
     print("\n多效精馏模式：自动构建两个串联塔参数。\n")
 
 
@@ -126,26 +123,26 @@ def compute_operating_lines(xF, xD, xW, q, R, x_for_fit, y_for_fit, vle_source,
         m_strip = (y_q - xW) / (x_q - xW)
         b_strip = y_q - m_strip * x_q
 
-    # 平衡线摘要（实验拟合或理论式）
+    # 平衡线摘要（理论式，或对实验数据回归相对挥发度 α）
     if vle_source == "theoretical" and alpha is not None:
-        eq_label = f"y = {alpha:.6f}·x / [1 + ({alpha:.6f} - 1)·x]"
-        m_eq = None
-        b_eq = None
+        eq_summary = {"model": "alpha", "params": {"alpha": alpha}, "rmse": None,
+                      "eq": f"y = {alpha:.6f}·x / [1 + ({alpha:.6f} - 1)·x]"}
     else:
-        coeff = np.polyfit(x_for_fit, y_for_fit, 1)
-        m_eq, b_eq = float(coeff[0]), float(coeff[1])
-        eq_label = f"y = {m_eq:.6f} x + {b_eq:.6f}"
+        fit = fit_vle(x_for_fit, y_for_fit, model="alpha")
+        eq_summary = {"model": "alpha", "params": {"alpha": float(np.exp(fit.theta[0]))},
+                      "rmse": fit.rmse, "eq": fit.label()}
 
     return {
         "rectifying": {"m": m_rect, "b": b_rect, "eq": f"y = {m_rect:.6f} x + {b_rect:.6f}"},
         "stripping":  {"m": m_strip, "b": b_strip, "eq": f"y = {m_strip:.6f} x + {b_strip:.6f}"},
-        "equilibrium":{"m": m_eq, "b": b_eq, "eq": eq_label},
+        "equilibrium": eq_summary,
         "q_intersection": {"xq": x_q, "yq": y_q}
     }
 
-def write_streams_table_csv(folder, xF, xD, xW, basis_F=1.0):
+def streams_table(xF, xD, xW, basis_F=1.0):
     """
-    以 F=basis_F (kmol/h) 为基准输出进料/塔顶/塔釜的总量与组分（横向格式）。
+    以 F=basis_F (kmol/h) 为基准计算进料/塔顶/塔釜的总量与组分（横向格式）。
+    返回：(DataFrame, 摘要 dict)
     """
     F = float(basis_F)
     if abs(xD - xW) < 1e-12:
@@ -157,23 +154,20 @@ def write_streams_table_csv(folder, xF, xD, xW, basis_F=1.0):
     light = {"F": xF * F, "D": xD * D, "B": xW * B}
     heavy = {"F": (1 - xF) * F, "D": (1 - xD) * D, "B": (1 - xW) * B}
 
-    path = os.path.join(folder, "streams_table.csv")
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["", "进料", "塔顶采出", "塔釜采出"])
-        w.writerow(["总流量 (kmol/h)", f"{F:.6f}", f"{D:.6f}", f"{B:.6f}"])
-        w.writerow(["轻组分 (kmol/h)", f"{light['F']:.6f}", f"{light['D']:.6f}", f"{light['B']:.6f}"])
-        w.writerow(["重组分 (kmol/h)", f"{heavy['F']:.6f}", f"{heavy['D']:.6f}", f"{heavy['B']:.6f}"])
+    df = pd.DataFrame([
+        ["总流量 (kmol/h)", F, D, B],
+        ["轻组分 (kmol/h)", light["F"], light["D"], light["B"]],
+        ["重组分 (kmol/h)", heavy["F"], heavy["D"], heavy["B"]],
+    ], columns=["", "进料", "塔顶采出", "塔釜采出"])
+    return df, {"F": F, "D": D, "B": B, "light": light, "heavy": heavy}
 
-    return {"F": F, "D": D, "B": B, "light": light, "heavy": heavy, "csv": path}
-
-# === 新增：生成精馏塔物流表（与截图一致） ===
-# === 新版：精馏塔物流表（与截图一致；仅用进料体积与浓度） ===
-def write_distillation_mass_table(folder, xF, xD, xW, feed_volume_L, feed_density_kg_per_L):
+# === 精馏塔物流表（与截图一致；仅用进料体积与浓度） ===
+def distillation_mass_table(xF, xD, xW, feed_volume_L, feed_density_kg_per_L):
     """
     仅基于进料体积 feed_volume_L（直接视为总摩尔流量 F, 单位 kmol/h）与 xF/xD/xW，
-    自动计算 D/B 及各股甲醇/CO2/水的摩尔流量，并输出 distillation_mass_table.csv。
+    自动计算 D/B 及各股甲醇/CO2/水的摩尔流量。
     说明：为与示例保持一致，忽略密度，不做质量到摩尔的换算。
+    返回：(DataFrame, 摘要 dict)
     """
     # 1) 以“进料体积”直接作为 F（kmol/h 基准）
     F = float(feed_volume_L)
@@ -190,120 +184,85 @@ def write_distillation_mass_table(folder, xF, xD, xW, feed_volume_L, feed_densit
     water    = {"F": (1 - xF) * F, "D": (1 - xD) * D, "B": (1 - xW) * B}
     co2      = {"F": 0.0, "D": 0.0, "B": 0.0}  # 精馏塔场景无惰性
 
-    # 4) 写出与截图完全一致的横向表格
-    path = os.path.join(folder, "distillation_mass_table.csv")
-    with open(path, "w", newline="", encoding="utf-8-sig") as f:
-        w = csv.writer(f)
-        w.writerow(["精馏塔", "进料", "塔顶采出", "塔釜采出"])
-        w.writerow(["总流量 (kmol/h)",      f"{F:.2f}",           f"{D:.2f}",           f"{B:.2f}"])
-        w.writerow(["甲醇流量 (kmol/h)",    f"{methanol['F']:.2f}", f"{methanol['D']:.2f}", f"{methanol['B']:.2f}"])
-        w.writerow(["CO₂流量 (kmol/h)",     f"{co2['F']:.2f}",     f"{co2['D']:.2f}",     f"{co2['B']:.2f}"])
-        w.writerow(["水流量 (kmol/h)",      f"{water['F']:.2f}",   f"{water['D']:.2f}",   f"{water['B']:.2f}"])
-
-    print(f"📘 已生成精馏塔物流表: {path}")
-    return {"F": F, "D": D, "B": B, "methanol": methanol, "water": water, "co2": co2, "path": path}
+    # 4) 与截图完全一致的横向表格
+    df = pd.DataFrame([
+        ["总流量 (kmol/h)",   F,              D,              B],
+        ["甲醇流量 (kmol/h)", methanol["F"], methanol["D"], methanol["B"]],
+        ["CO₂流量 (kmol/h)",  co2["F"],      co2["D"],      co2["B"]],
+        ["水流量 (kmol/h)",   water["F"],    water["D"],    water["B"]],
+    ], columns=["精馏塔", "进料", "塔顶采出", "塔釜采出"])
+    return df, {"F": F, "D": D, "B": B, "methanol": methanol, "water": water, "co2": co2}
 
 
-if mode == "basic":
-    spec = DistillationSpec(
-        xF=xF, q=q, xD=xD, xW=xW, R=R,
-        consider_murphree=consider_murphree,
-        EM_L=EM_L, EM_V=EM_V,
-        mode="basic",
-        feed_volume_L=feed_volume_L,
-        feed_density_kg_per_L=feed_density_kg_per_L,
-        MW_light=46.07, MW_heavy=18.015
-    )
-    engine = DistillationEngine(spec, vle)
-    result = engine.run(result_folder)
-    save_results(result, result_folder)
-    plot_mccabe_thiele(result, vle, result_folder)
+def run_column_mode(spec, vle, sink, enthalpy=None):
+    """
+    单塔模式（basic / azeotropic / extractive）的统一计算与输出，每个产物只写一次：
+    results + summary（engine）、McCabe-Thiele 图或 Ponchon–Savarit 图（仅目录型 sink）、
+    summary_oplines、streams_table、distillation_mass_table。
+    """
+    R_input = spec.R                  # 操作线摘要沿用输入的 R（run() 在 R ≤ 0 时会改写 spec.R）
+    engine = DistillationEngine(spec, vle, enthalpy)
+    result = engine.run(sink=sink)
+    if sink.folder:
+        if enthalpy is None:
+            plot_mccabe_thiele(result, vle, sink.folder)
+        else:
+            plot_ponchon_savarit(result, vle, enthalpy, sink.folder)
 
     # 方程&物流摘要
     alpha_used = alpha if vle_choice == "2" else None
-    oplines = compute_operating_lines(xF, xD, xW, q, R, vle.x, vle.y, vle_source, alpha_used)
-    streams_meta = write_streams_table_csv(result_folder, xF, xD, xW, basis_F=1.0)
-
-    with open(os.path.join(result_folder, "summary_oplines.json"), "w", encoding="utf-8") as f:
-        json.dump({
-            "vle_source": vle_source,
-            "theoretical_alpha": alpha_used,
-            "operating_lines": oplines,
-            "streams_basis_F": streams_meta
-        }, f, indent=2, ensure_ascii=False)
-
-    # 新增：生成与截图一致的精馏物流表（由进料体积/浓度自动计算）
-    write_distillation_mass_table(result_folder, xF, xD, xW, feed_volume_L, feed_density_kg_per_L)
-
-    print(f"✅ 基础精馏计算完成，结果已保存至：{result_folder}")
-
-elif mode == "azeotropic":
+    oplines = compute_operating_lines(spec.xF, spec.xD, spec.xW, spec.q, R_input,
+                                      vle.x, vle.y, vle_source, alpha_used)
+    df_streams, streams_meta = streams_table(spec.xF, spec.xD, spec.xW, basis_F=1.0)
+    streams_meta["csv"] = sink.path("streams_table.csv")
+    with PROFILER.span("write.streams_table"):
+        sink.write_table("streams_table", df_streams, float_format="%.6f")
+    sink.write_json("summary_oplines", {
+        "vle_source": vle_source,
+        "theoretical_alpha": alpha_used,
+        "operating_lines": oplines,
+        "streams_basis_F": streams_meta
+    })
+
+    df_mass, mass_meta = distillation_mass_table(spec.xF, spec.xD, spec.xW,
+                                                 spec.feed_volume_L, spec.feed_density_kg_per_L)
+    mass_meta["path"] = sink.path("distillation_mass_table.csv")
+    with PROFILER.span("write.mass_table"):
+        sink.write_table("distillation_mass_table", df_mass, float_format="%.2f", encoding="utf-8-sig")
+    if sink.folder:
+        print(f"📘 已生成精馏塔物流表: {sink.path('distillation_mass_table.csv')}")
+    return result, oplines, mass_meta
+
+
+MODE_LABELS = {"basic": "基础精馏", "azeotropic": "共沸精馏", "extractive": "萃取精馏"}
+
+if mode == "azeotropic":
     azeo_x = float(input("请输入共沸点液相组成 azeo_x (默认 0.65): ") or 0.65)
     azeo_y = float(input("请输入共沸点气相组成 azeo_y (默认 0.65): ") or 0.65)
     strength = float(input("请输入扰动强度（负值打破共沸，默认 -0.05）: ") or -0.05)
     vle = azeotropic_modifier(vle, azeo_x, azeo_y, strength)
-
-    spec = DistillationSpec(
-        xF=xF, q=q, xD=xD, xW=xW, R=R,
-        consider_murphree=consider_murphree,
-        EM_L=EM_L, EM_V=EM_V,
-        mode="azeotropic",
-        feed_volume_L=feed_volume_L,
-        feed_density_kg_per_L=feed_density_kg_per_L
-    )
-    engine = DistillationEngine(spec, vle)
-    result = engine.run(result_folder)
-    save_results(result, result_folder)
-    plot_mccabe_thiele(result, vle, result_folder)
-
-    alpha_used = alpha if (vle_choice == "2") else None
-    oplines = compute_operating_lines(xF, xD, xW, q, R, vle.x, vle.y, vle_source, alpha_used)
-    streams_meta = write_streams_table_csv(result_folder, xF, xD, xW, basis_F=1.0)
-    with open(os.path.join(result_folder, "summary_oplines.json"), "w", encoding="utf-8") as f:
-        json.dump({
-            "vle_source": vle_source,
-            "theoretical_alpha": alpha_used,
-            "operating_lines": oplines,
-            "streams_basis_F": streams_meta
-        }, f, indent=2, ensure_ascii=False)
-
-    write_distillation_mass_table(result_folder, xF, xD, xW, feed_volume_L, feed_density_kg_per_L)
-
-    print(f"✅ 共沸精馏计算完成，结果已保存至：{result_folder}")
-
 elif mode == "extractive":
     solvent_ratio = float(input("请输入溶剂比例 S/F (默认 0.2): ") or 0.2)
     alpha_factor = float(input("请输入挥发度放大系数 (默认 1.3): ") or 1.3)
     vle = extractive_modifier(vle, solvent_ratio=solvent_ratio, alpha_factor=alpha_factor)
 
+if mode in MODE_LABELS:
+    # 逐级方法：默认恒摩尔流 McCabe–Thiele；选 Ponchon–Savarit 焓浓法时才需要焓–组成数据（CSV 列 x, hL, y, HV）
+    method_choice = input("逐级方法：1 - McCabe–Thiele（恒摩尔流），2 - Ponchon–Savarit（焓浓法）[默认 1]: ").strip() or "1"
+    enthalpy = None
+    if method_choice == "2":
+        enthalpy = EnthalpyData.from_csv(input("请输入焓–组成数据 CSV 路径: ").strip())
+        print(f"✅ 已读取焓数据：{enthalpy.describe()}")
     spec = DistillationSpec(
         xF=xF, q=q, xD=xD, xW=xW, R=R,
         consider_murphree=consider_murphree,
         EM_L=EM_L, EM_V=EM_V,
-        mode="extractive",
+        mode=mode,
         feed_volume_L=feed_volume_L,
         feed_density_kg_per_L=feed_density_kg_per_L
     )
-    engine = DistillationEngine(spec, vle)
-    result = engine.run(result_folder)
-    save_results(result, result_folder)
-    plot_mccabe_thiele(result, vle, result_folder)
-
-    alpha_used = alpha if (vle_choice == "2") else None
-    oplines = compute_operating_lines(xF, xD, xW, q, R, vle.x, vle.y, vle_source, alpha_used)
-    streams_meta = write_streams_table_csv(result_folder, xF, xD, xW, basis_F=1.0)
-    with open(os.path.join(result_folder, "summary_oplines.json"), "w", encoding="utf-8") as f:
-        json.dump({
-            "vle_source": vle_source,
-            "theoretical_alpha": alpha_used,
-            "operating_lines": oplines,
-            "streams_basis_F": streams_meta
-        }, f, indent=2, ensure_ascii=False)
-
-    write_distillation_mass_table(result_folder, xF, xD, xW, feed_volume_L, feed_density_kg_per_L)
-
-    print(f"✅ 萃取精馏计算完成，结果已保存至：{result_folder}")
-
+    run_column_mode(spec, vle, CSVSink(result_folder), enthalpy)
+    print(f"✅ {MODE_LABELS[mode]}计算完成，结果已保存至：{result_folder}")
 elif mode == "multiple":
     from core.vle_data import VLEData
     print("👉 构建两个串联塔：第一效高压，第二效低压。")
@@ -311,15 +270,55 @@ elif mode == "multiple":
     spec1 = DistillationSpec(xF=0.48, q=1.0, xD=0.90, xW=0.05, R=1.5, consider_murphree=True, EM_L=0.75)
     spec2 = DistillationSpec(xF=0.30, q=1.0, xD=0.85, xW=0.02, R=1.2, consider_murphree=True, EM_L=0.75)
 
-    vle1 = VLEData(x_data, y_data)
-    vle2 = VLEData(x_data, y_data)
-    system = MultiEffectSystem([spec1, spec2], [vle1, vle2], heat_efficiency=0.85)
+    pressure_choice = input("是否按压力由 Antoine/Raoult（甲醇–水）生成各效 VLE 并寻优压力分配? (y/n, 默认 n): ").strip().lower() or "n"
+    if pressure_choice == "y":
+        system = MultiEffectSystem([spec1, spec2], heat_efficiency=0.85, system=METHANOL_WATER,
+                                   pressures=[300.0, 101.325], T_cooling=30.0)
+        best = system.optimize_pressures(P_bounds=(20.0, 600.0))
+        print(f"🔎 最优压力分配: {[round(P, 1) for P in best['pressures']]} kPa，"
+              f"R/Rmin = {best['R_factors']}，总实际板数 {best['N_total']:.0f}，外供热 {best['Q_external']:.3f}")
+        for spec, e in zip((spec1, spec2), best["effects"]):
+            spec.R = e["R"]
+        system = MultiEffectSystem([spec1, spec2], heat_efficiency=0.85, system=METHANOL_WATER,
+                                   pressures=best["pressures"], T_cooling=30.0)
+    else:
+        vle1 = VLEData(x_data, y_data)
+        vle2 = VLEData(x_data, y_data)
+        system = MultiEffectSystem([spec1, spec2], [vle1, vle2], heat_efficiency=0.85)
     results = system.run(result_folder)
 
     for r in results:
         print(f"塔 {r['tower_index']}: R={r['R_used']:.2f}, 有效热负荷={r['energy_load']:.3f}")
+        if "P_kPa" in r:
+            print(f"    P = {r['P_kPa']:.1f} kPa，再沸 {r['T_reb']:.1f} °C，冷凝 {r['T_cond']:.1f} °C")
 
     print(f"✅ 多效精馏系统计算完成，结果已保存至：{result_folder}")
 
+elif mode == "batch":
+    print("\n🫕 间歇精馏：釜 + 固定理论板数，Rayleigh 方程积分至终止条件。")
+    W0 = float(input("请输入初始釜液量 W0 (kmol) (默认 100): ") or 100)
+    x0 = float(input("请输入初始釜液组成 x0 (默认 0.48): ") or 0.48)
+    n_stages = int(input("请输入理论板数（含釜）(默认 5): ") or 5)
+    boilup = float(input("请输入釜汽化速率 V (kmol/h) (默认 10): ") or 10)
+    policy_choice = input("操作方式：1 - 恒回流比，2 - 恒馏出组成（变回流比）[默认 1]: ").strip() or "1"
+    if policy_choice == "2":
+        policy, R, xD = "constant_xD", None, float(input("请输入馏出液组成 xD (默认 0.90): ") or 0.90)
+        R_max = float(input("请输入回流比上限 R_max (默认 20): ") or 20)
+    else:
+        policy, xD, R_max = "constant_reflux", None, 50.0
+        R = float(input("请输入回流比 R (默认 2.0): ") or 2.0)
+    xW_target = float(input("请输入釜液终点组成 xW (默认 0.05): ") or 0.05)
+    avg_in = input("请输入累计馏出液最低平均组成（留空不限）: ").strip()
+
+    batch = BatchDistillation(vle, n_stages, boilup=boilup)
+    res = batch.run(W0, x0, policy=policy, R=R, xD=xD, xW_target=xW_target,
+                    xD_avg_target=float(avg_in) if avg_in else None, R_max=R_max,
+                    sink=CSVSink(result_folder))
+    plot_batch_distillation(res, result_folder)
+    s = res["summary"]
+    print(f"终止条件: {s['stop_reason']}，t = {s['t_final']:.3f} h，釜液 xW = {s['xW_final']:.4f}，"
+          f"馏出 {s['D_total']:.3f} kmol（平均 xD = {s['xD_avg']:.4f}，回收率 {s['recovery']:.1%}）")
+    print(f"✅ 间歇精馏计算完成，结果已保存至：{result_folder}")
+
 else:
     print("⚠️ 模式未识别，程序结束。")
\ No newline at end of file
@@ -15,7 +15,11 @@ import os, json, datetime
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from scipy.interpolate import interp1d
+from scipy.interpolate import PPoly, make_interp_spline
+
+from core.stepping import ScalarPPoly, step_stages
+from core.shortcut import fug_design
+from core.vle_library import open_library
 
 
 # ==========================================================
@@ -30,11 +34,11 @@ def create_result_folder(base="./results"):
 
 
 def make_interp_xy(x_data, y_data):
-    """返回互为反函数的插值器 y*(x), x*(y)"""
-    x_data = np.asarray(x_data)
-    y_data = np.asarray(y_data)
-    fy = interp1d(x_data, y_data, kind="cubic", fill_value="extrapolate")
-    fx = interp1d(y_data, x_data, kind="cubic", fill_value="extrapolate")
+    """返回互为反函数的插值器 y*(x), x*(y)（三次 not-a-knot 样条，可外推；标量快速求值）"""
+    x_data = np.asarray(x_data, dtype=float)
+    y_data = np.asarray(y_data, dtype=float)
+    fy = ScalarPPoly(PPoly.from_spline(make_interp_spline(x_data, y_data, k=3)))
+    fx = ScalarPPoly(PPoly.from_spline(make_interp_spline(y_data, x_data, k=3)))
     return fy, fx  # y* = fy(x), x* = fx(y)
 
 
@@ -68,44 +72,23 @@ def step_off_theory(xD, xW_target, xF, R, fy, fx, consider_switch=True):
     y_int = mr * x_int + br
     ms, bs = stripping_line_from_intersection(xW_target, x_int, y_int)
 
-    X, Y = [], []
-    y_curr = xD
-    x_curr = fx(y_curr)
-    X.append(x_curr)
-    Y.append(y_curr)
-
-    max_iter = 500
-    count = 0
-
-    while x_curr > xW_target + 1e-6 and count < max_iter:
-        # 竖直段
-        if (not consider_switch) or (x_curr >= x_int):
-            y_next = mr * x_curr + br
-        else:
-            y_next = ms * x_curr + bs
-        X.append(x_curr)
-        Y.append(y_next)
-
-        # 水平段
-        x_next = float(fx(y_next))
-        X.append(x_next)
-        Y.append(y_next)
-
-        x_curr, y_curr = x_next, y_next
-        count += 1
-        if x_curr <= xW_target + 1e-6:
-            break
-
-    # ✅ 只补竖直段到 y=x 交点（不再水平延伸）
-    X.append(x_curr)
-    Y.append(x_curr)
-
-    # ✅ 塔顶补全
-    X.insert(0, xD)
-    Y.insert(0, xD)
+    # 第 k 级 x_k = fx(y_{k-1})、y_k = 操作线(x_k)，x_k ≤ xW_target + 1e-6 时终止（最多 500 次竖直段）
+    lines = [(mr, br, np.nextafter(x_int, -np.inf) if consider_switch else -np.inf), (ms, bs, None)]
+    st = step_stages(fx, lines, xD, cap=501, x_stop=xW_target + 1e-6)
+    xs, ys = st.x, st.y
+    n = st.n
+
+    # 折线：塔顶 (xD, xD) → (x_1, xD) → 各级竖直/水平段 → 塔底只补竖直段到 y=x 交点（不再水平延伸）
+    X = np.empty(2 * n + 1)
+    Y = np.empty(2 * n + 1)
+    X[0], Y[0] = xD, xD
+    X[1], Y[1] = xs[0], xD
+    X[2:-1:2], Y[2:-1:2] = xs[:-1], ys[:-1]
+    X[3::2], Y[3::2] = xs[1:], ys[:-1]
+    X[-1], Y[-1] = xs[-1], xs[-1]
 
     lines = (mr, br), (ms, bs), (None, None), (x_int, y_int)
-    return np.array(X), np.array(Y), lines
+    return X, Y, lines
 
 # ==========================================================
 # 绘图函数
@@ -189,15 +172,8 @@ def run_one_column(name, xF, q, xD, xW, R, x_data, y_data, out_dir):
 # 多塔串联主流程
 # ==========================================================
 if __name__ == "__main__":
-    # VLE 数据
-    x_data = np.linspace(0, 0.98, 50)
-    y_data = np.array([
-        0.000, 0.135, 0.235, 0.311, 0.372, 0.421, 0.463, 0.499, 0.529, 0.556,
-        0.580, 0.602, 0.622, 0.640, 0.656, 0.672, 0.686, 0.700, 0.713, 0.725,
-        0.737, 0.748, 0.759, 0.769, 0.779, 0.789, 0.799, 0.808, 0.817, 0.826,
-        0.835, 0.844, 0.853, 0.861, 0.870, 0.878, 0.886, 0.895, 0.903, 0.911,
-        0.919, 0.927, 0.936, 0.944, 0.952, 0.960, 0.968, 0.976, 0.984, 0.992
-    ])
+    # VLE 数据（VLE 库中的样例体系）
+    x_data, y_data = open_library().arrays("methanol_water")
 
     out_dir = create_result_folder("./results")
     print(f"🚀 启动多塔串联精馏计算，结果保存至：{out_dir}")
@@ -274,9 +250,13 @@ if __name__ == "__main__":
         print(f"   ➤ 回流比 R = {R:.2f}, 理论板数 = {N}, Δx = {Δx:.3f}")
 
         # 1️⃣ 回流比建议
-        # 估算 Rmin（基于平衡线交点近似）
-        yF = fy(xF)
-        Rmin_est = (xD - yF) / (yF - xF + 1e-8)
+        # FUG 简捷估算：Underwood Rmin 取进料处 α（q=1 时即平衡线交点法），Fenske Nmin 取塔顶/塔底 α 的几何平均
+        a_F, a_D, a_W = (fy(v) * (1 - v) / (v * (1 - fy(v))) for v in (xF, xD, xW_target))
+        fug = fug_design(xF, xD, xW_target, 1.0, a_F, R=R, alpha_top=a_D, alpha_bottom=a_W)
+        Rmin_est = float(fug["Rmin"])
+        if fug["feasible"]:
+            print(f"   ➤ FUG 估算：Rmin ≈ {Rmin_est:.3f}，Nmin ≈ {float(fug['Nmin']):.1f}，"
+                  f"N(R) ≈ {float(fug['N']):.1f}（逐级 {N}）")
         if R < 1.2 * Rmin_est:
             print(f"   ⚠️ 当前回流比低于 1.2×Rmin ({R:.2f} < {1.2*Rmin_est:.2f})，建议适当提高回流比以确保分离。")
         elif R > 2.0 * Rmin_est:
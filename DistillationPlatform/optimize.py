@@ -1,22 +1,15 @@
-import numpy as np
-from core import VLEData, DistillationSpec
+from core import DistillationSpec
 from core.optimizer import DistillationOptimizer
 from core.distillation_column import DistillationColumn
+from core.vle_library import load_vle
 from utils import create_result_folder, plot_optimization_results
 
 # ========== 1️⃣ 数据输入 ==========
 print("🧪 精馏系统优化分析")
 print("-----------------------------------------------------")
 
-# 基础物性与组成数据（可换为文件输入）
-x_data = np.linspace(0, 0.98, 50)
-y_data = np.array([0.000,0.135,0.235,0.311,0.372,0.421,0.463,0.499,0.529,0.556,
-                   0.580,0.602,0.622,0.640,0.656,0.672,0.686,0.700,0.713,0.725,
-                   0.737,0.748,0.759,0.769,0.779,0.789,0.799,0.808,0.817,0.826,
-                   0.835,0.844,0.853,0.861,0.870,0.878,0.886,0.895,0.903,0.911,
-                   0.919,0.927,0.936,0.944,0.952,0.960,0.968,0.976,0.984,0.992])
-
-vle = VLEData(x_data, y_data)
+# 气液平衡数据：VLE 库中的体系（data/vle_library，可用 VLELibrary.add / import_csv 扩充）
+vle = load_vle("methanol_water")
 
 # ========== 2️⃣ 用户输入基础规格 ==========
 xF = float(input("请输入进料摩尔分数 xF (默认 0.48): ") or 0.48)
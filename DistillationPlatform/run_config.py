@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+run_config.py
+-------------
+按配置文件运行精馏计算（无需交互输入）。
+
+    python run_config.py case.json               # 单个工况：results / summary / M–T 图（同 main.py 单塔模式）
+    python run_config.py study.json              # 含 "sweep"：逐工况流式计算，汇总写入 sweep_results.csv
+    python run_config.py study.json --chunk 500  # 每 500 个工况追加写一次
+    python run_config.py study.json --shards /shared/screen --workers 4   # 分片、可续算（可多台机器同时运行）
+
+配置字段见 utils/config.py 的 DISTILLATION（mode 支持 basic / azeotropic / extractive），例如：
+
+    {"case_name": "demo", "mode": "basic", "xF": 0.48, "xD": 0.90, "xW": 0.01, "q": 1.0, "R": 0,
+     "vle": {"file": "vle.csv"}, "enthalpy": {"file": "enthalpy.csv"},
+     "sweep": {"grid": {"q": [0.8, 1.0, 1.2]}, "random": {"n": 200, "params": {"alpha": {"uniform": [2, 3]}}}}}
+
+给出 enthalpy 时按 Ponchon–Savarit 焓浓法逐级（输出 ponchon_savarit.png）。
+给出 "prescreen": {"N_max": 60, "R_margin": 0.9} 时，扫描先用 FUG 简捷法估算，不可行或过高的工况
+记为 status = "screened"，不做逐级计算。
+扫描时不展开全部工况、不为每个工况建目录；平衡数据按 (vle, alpha, mode 修正参数) 缓存复用。
+"""
+
+import os
+import json
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core import VLEData, DistillationSpec, DistillationEngine, EnthalpyData, PonchonSavaritColumn
+from core.distillation_column import DistillationColumn
+from core.special_models import azeotropic_modifier, extractive_modifier
+from core.vle_library import open_library
+from core.shortcut import relative_volatility, prescreen
+from utils import create_result_folder, plot_mccabe_thiele, plot_ponchon_savarit, CSVSink, PROFILER
+from utils.config import ConfigError, load_config, load_study
+from utils.shards import ShardQueue
+
+
+SWEEP_COLUMNS = ["case_name", "mode", "xF", "xD", "xW", "q", "R", "alpha", "EM_L", "EM_V",
+                 "R_used", "stages_theory", "stages_real", "achieved", "xW_real", "status", "error"]
+
+
+# ==========================================================
+# 平衡数据
+# ==========================================================
+def _base_vle(case):
+    spec = case.get("vle") or {}
+    alpha = case.get("alpha", spec.get("alpha"))
+    if alpha is not None and "x" not in spec and "file" not in spec:
+        # 理论 Raoult 形式：y = αx / [1 + (α − 1)x]
+        x = np.linspace(0.0, 1.0, int(spec.get("n", 50)))
+        return VLEData(x, alpha * x / (1.0 + (alpha - 1.0) * x))
+    if "library" in spec:
+        # 用库中数组新建对象：修正函数会就地改写 y_star，不能动库里共享的 VLEData
+        x, y = open_library(spec.get("root")).arrays(spec["library"])
+        return VLEData(np.array(x), np.array(y))
+    if "file" in spec:
+        df = pd.read_csv(spec["file"])
+        return VLEData(df[spec.get("x_col", "x")].to_numpy(), df[spec.get("y_col", "y")].to_numpy())
+    if "x" in spec and "y" in spec:
+        return VLEData(spec["x"], spec["y"])
+    raise ValueError("vle 需为 {\"x\", \"y\"}、{\"file\"}、{\"library\"} 或 {\"alpha\"}")
+
+
+def load_enthalpy(spec):
+    """enthalpy 配置 -> EnthalpyData；未给出时返回 None（恒摩尔流，McCabe–Thiele）"""
+    if not spec:
+        return None
+    if "file" in spec:
+        cols = {k: spec[k] for k in ("x_col", "hL_col", "y_col", "HV_col") if k in spec}
+        return EnthalpyData.from_csv(spec["file"], **cols)
+    if "x" in spec and "hL" in spec and "HV" in spec:
+        return EnthalpyData(spec["x"], spec["hL"], spec.get("y"), spec["HV"])
+    if "latent" in spec:
+        return EnthalpyData.constant_molar(float(spec["latent"]))
+    raise ValueError("enthalpy 需为 {\"file\"}、{\"x\", \"hL\", \"HV\"} 或 {\"latent\"}")
+
+
+class VLECache:
+    """按 (vle, alpha, mode 修正参数) 缓存 VLEData；修正函数会就地改写 y_star，因此连同修正一起缓存"""
+
+    def __init__(self, size=64):
+        self.size = size
+        self._items = OrderedDict()
+
+    def get(self, case):
+        mode = case.mode.lower()
+        mod = ((case.azeo_x, case.azeo_y, case.azeo_strength) if mode == "azeotropic" else
+               (case.solvent_ratio, case.alpha_factor) if mode == "extractive" else ())
+        key = json.dumps([case.get("vle"), case.get("alpha"), mode, mod], sort_keys=True, default=str)
+        vle = self._items.get(key)
+        if vle is None:
+            vle = _base_vle(case)
+            if mode == "azeotropic":
+                vle = azeotropic_modifier(vle, case.azeo_x, case.azeo_y, case.azeo_strength)
+            elif mode == "extractive":
+                vle = extractive_modifier(vle, solvent_ratio=case.solvent_ratio, alpha_factor=case.alpha_factor)
+            self._items[key] = vle
+            if len(self._items) > self.size:
+                self._items.popitem(last=False)
+        else:
+            self._items.move_to_end(key)
+        return vle
+
+    def enthalpy(self, case):
+        """焓数据与平衡数据一起缓存（扫描中通常所有工况共用一张表）"""
+        spec = case.get("enthalpy")
+        if not spec:
+            return None
+        key = json.dumps(["enthalpy", spec], sort_keys=True, default=str)
+        H = self._items.get(key)
+        if H is None:
+            H = self._items[key] = load_enthalpy(spec)
+            if len(self._items) > self.size:
+                self._items.popitem(last=False)
+        else:
+            self._items.move_to_end(key)
+        return H
+
+
+# ==========================================================
+# 运行
+# ==========================================================
+def run_case(case, vle, folder, enthalpy=None):
+    """单个工况：完整输出到 folder"""
+    engine = DistillationEngine(DistillationSpec.from_config(case), vle, enthalpy)
+    result = engine.run(sink=CSVSink(folder))
+    if case.plot:
+        if enthalpy is None:
+            plot_mccabe_thiele(result, vle, folder)
+        else:
+            plot_ponchon_savarit(result, vle, enthalpy, folder)
+    return result["summary"]
+
+
+def _screen(case, vle):
+    """FUG 预筛（case.prescreen 给出时）：剔除时返回原因，保留时返回 None"""
+    opts = case.get("prescreen")
+    if not opts:
+        return None
+    a_F, a_D, a_W = relative_volatility(vle, [case.xF, case.xD, case.xW])
+    keep, d = prescreen(case.xF, case.xD, case.xW, case.q, a_F, R=case.R, N_max=opts.get("N_max"),
+                        R_margin=opts.get("R_margin", 1.0), alpha_top=a_D, alpha_bottom=a_W)
+    if keep:
+        return None
+    return f"{d['reason']}（FUG：Rmin = {float(d['Rmin']):.4g}，R = {float(d['R']):.4g}，N = {float(d['N']):.4g}）"
+
+
+def _sweep_row(case, vles):
+    row = {"case_name": case.case_name, "mode": case.mode, "xF": case.xF, "xD": case.xD, "xW": case.xW,
+           "q": case.q, "R": case.R, "alpha": case.alpha, "EM_L": case.EM_L, "EM_V": case.EM_V}
+    try:
+        spec, vle, H = DistillationSpec.from_config(case), vles.get(case), vles.enthalpy(case)
+        reason = _screen(case, vle)
+        if reason is not None:
+            return {**row, "status": "screened", "error": reason}
+        res = (DistillationColumn(spec, vle) if H is None else PonchonSavaritColumn(spec, vle, H)).run()
+    except Exception as e:                     # 单个工况失败不中断扫描
+        return {**row, "status": "error", "error": repr(e)}
+    df_r = res["real"]
+    return {**row, "R_used": float(res["R_used"]), "stages_theory": int(len(res["theory"])),
+            "stages_real": int(len(df_r)), "achieved": bool(res["achieved"]),
+            "xW_real": float(df_r["x_real"].iloc[-1]) if len(df_r) else None,
+            "status": "ok", "error": None}
+
+
+def _sweep_block(study, sink, table, chunk, start=0, stop=None, tick=None):
+    """
+    计算工况 [start, stop)，每 chunk 个工况向 sink 的 table 表追加一次（之后调用 tick()，分片运行时刷新租约）；
+    返回该段的成功工况数与实际板数范围
+    """
+    vles = VLECache()
+    rows, n_ok, n_screened, stages = [], 0, 0, []
+    for case in study.cases(start, stop):
+        row = _sweep_row(case, vles)
+        rows.append(row)
+        if row["status"] == "ok":
+            n_ok += 1
+            stages.append(row["stages_real"])
+        elif row["status"] == "screened":
+            n_screened += 1
+        if len(rows) >= chunk:
+            sink.append_table(table, pd.DataFrame(rows, columns=SWEEP_COLUMNS))
+            rows = []
+            if tick is not None:
+                tick()
+    if rows:
+        sink.append_table(table, pd.DataFrame(rows, columns=SWEEP_COLUMNS))
+    return {"n_ok": n_ok, "n_screened": n_screened,
+            "stages_real_range": [min(stages), max(stages)] if stages else None}
+
+
+def run_sweep(study, folder, chunk=1000):
+    """逐工况计算，每 chunk 个工况向 sweep_results.csv 追加一次；返回汇总 dict"""
+    sink = CSVSink(folder)
+    with PROFILER.run("run_config.sweep", case=study.name):
+        stats = _sweep_block(study, sink, "sweep_results", chunk)
+    summary = {
+        "name": study.name,
+        "n_cases": len(study),
+        "n_ok": stats["n_ok"],
+        "n_screened": stats["n_screened"],
+        "sweep": study.describe(),
+        "stages_real_range": stats["stages_real_range"],
+        "artifacts": {"sweep_results": "sweep_results.csv"},
+    }
+    sink.write_json("sweep_summary", summary)
+    sink.close()
+    return summary
+
+
+# ==========================================================
+# 分片扫描（可续算；本机多进程 / 多台机器共享目录）
+# ==========================================================
+def _shard_worker(cfg, root, chunk, lease):
+    """一个工作进程：由配置重建扫描，认领并计算分片直到没有可认领的分片；返回完成的分片数"""
+    study = load_study(cfg)
+    queue = ShardQueue(root, len(study), study.fingerprint, lease=lease)
+    sink = CSVSink(queue.shards)
+    return queue.work(lambda i, lo, hi: _sweep_block(study, sink, queue.temp_name(i), chunk, lo, hi,
+                                                     tick=lambda: queue.heartbeat(i)))
+
+
+def run_sweep_sharded(cfg, root, workers=1, shard_size=None, lease=600.0, chunk=1000):
+    """
+    扫描按 shard_size 个工况一片确定性切分，在 root 目录下认领计算（布局与规则见 utils/shards.py）：
+    workers 个本地进程同时认领，其他机器对同一 root 运行同一命令即加入；中断后重新运行只算未完成的分片；
+    全部完成时按顺序合并为 root/sweep_results.csv 并写 root/sweep_summary.json。
+    cfg 为配置 dict 或文件路径（工作进程据此重建扫描）。
+    返回汇总 dict；仍有分片在其他机器上计算时 "complete" 为 False，只含进度。
+    """
+    cfg = load_config(cfg) if isinstance(cfg, str) else cfg
+    study = load_study(cfg)
+    queue = ShardQueue(root, len(study), study.fingerprint, shard_size, lease)
+    args = (cfg, queue.root, chunk, lease)
+    with PROFILER.run("run_config.sweep_sharded", case=study.name):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                n_run = sum(f.result() for f in [pool.submit(_shard_worker, *args) for _ in range(workers)])
+        else:
+            n_run = _shard_worker(*args)
+
+        progress = queue.progress()
+        if progress["pending"]:
+            return {"name": study.name, "complete": False, "shards_run": n_run, **progress}
+
+        stats = queue.stats()
+        ranges = [st["stages_real_range"] for st in stats if st["stages_real_range"]]
+        queue.merge(os.path.join(queue.root, "sweep_results.csv"))
+    summary = {
+        "name": study.name,
+        "complete": True,
+        "n_cases": len(study),
+        "n_ok": sum(st["n_ok"] for st in stats),
+        "n_screened": sum(st["n_screened"] for st in stats),
+        "sweep": study.describe(),
+        "stages_real_range": [min(r[0] for r in ranges), max(r[1] for r in ranges)] if ranges else None,
+        "shards": {"n_shards": queue.n_shards, "shard_size": queue.shard_size, "shards_run": n_run,
+                   "hosts": sorted({st["host"] for st in stats}),
+                   "compute_seconds": sum(st["seconds"] for st in stats)},
+        "artifacts": {"sweep_results": "sweep_results.csv"},
+    }
+    CSVSink(queue.root).write_json("sweep_summary", summary)
+    return summary
+
+
+def main():
+    p = argparse.ArgumentParser(description="按 JSON/YAML 配置运行精馏计算（支持参数扫描）")
+    p.add_argument("config", help="配置文件路径")
+    p.add_argument("--out", default="./results", help="结果根目录（默认 ./results）")
+    p.add_argument("--chunk", type=int, default=1000, help="扫描时每多少个工况追加写一次结果")
+    p.add_argument("--shards", help="分片扫描的共享工作目录：可续算，多台机器可对同一目录运行同一命令")
+    p.add_argument("--shard-size", type=int, default=None, help="每片工况数（目录首次规划时确定）")
+    p.add_argument("--workers", type=int, default=1, help="分片扫描的本机工作进程数")
+    args = p.parse_args()
+
+    try:
+        study = load_study(args.config)
+    except ConfigError as e:
+        raise SystemExit(f"❌ 配置错误：{e}")
+    if args.shards and study.axes:
+        return main_sharded(args, study)
+    folder = create_result_folder(args.out)
+    if not study.axes:
+        case = next(iter(study))
+        vles = VLECache()
+        summary = run_case(case, vles.get(case), folder, vles.enthalpy(case))
+        print(f"✅ {case.case_name}：R = {summary['R_used']:.4f}，理论板 {summary['stages_theory']}，"
+              f"实际板 {summary['stages_real']}")
+    else:
+        print(f"🧪 参数扫描：{len(study)} 个工况")
+        summary = run_sweep(study, folder, chunk=args.chunk)
+        print(f"✅ 完成 {summary['n_ok']}/{summary['n_cases']} 个工况"
+              + (f"，预筛剔除 {summary['n_screened']} 个" if summary["n_screened"] else ""))
+    print(f"📁 结果已保存至：{folder}")
+
+
+def main_sharded(args, study):
+    print(f"🧪 分片参数扫描：{len(study)} 个工况 → {args.shards}")
+    summary = run_sweep_sharded(args.config, args.shards, workers=args.workers,
+                                shard_size=args.shard_size, chunk=args.chunk)
+    if not summary["complete"]:
+        print(f"⏳ 已完成 {summary['done']}/{summary['n_shards']} 片（本次 {summary['shards_run']} 片），"
+              f"其余 {summary['pending']} 片仍在其他进程/机器上计算；稍后重新运行同一命令即可续算并合并")
+    else:
+        print(f"✅ 完成 {summary['n_ok']}/{summary['n_cases']} 个工况（{summary['shards']['n_shards']} 片）"
+              + (f"，预筛剔除 {summary['n_screened']} 个" if summary["n_screened"] else ""))
+    print(f"📁 分片目录：{os.path.abspath(args.shards)}")
+
+
+if __name__ == "__main__":
+    main()
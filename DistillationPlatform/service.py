@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+"""
+service.py
+----------
+常驻本地计算服务（asyncio，仅依赖标准库 + 平台本身）。
+
+进程启动一次即完成 numpy/scipy/pandas 导入，VLE 插值对象按名称或数据哈希常驻内存；
+并发请求在短时间窗口内收集成一批：相同请求只计算一次、结果分发给全部等待者；
+不同的精馏请求按 VLE 分组，每组共用一个 DistillationSession，同一批内 q 线、pinch、Rmin
+与相同设计的逐级结果只算一次。整批在一个工作线程中求值，事件循环始终保持可响应。
+
+启动：
+    python service.py                         # HTTP，默认 127.0.0.1:8765
+    python service.py --port 9000
+    python service.py --unix /tmp/chemeng.sock # Unix socket（curl --unix-socket 可用）
+
+接口（POST，JSON 请求体；GET /health 查看状态）：
+    /vle                      {"name", "x", "y"}                     注册/替换一个 VLE 体系
+    /column/run               {"vle", "spec", "profile"?}            DistillationColumn.run
+    /column/rmin              {"vle", "spec"}                        compute_Rmin
+    /optimize/find_R_for_N    {"vle", "spec", "N", "tol"?, "R_max"?}
+    /optimize/economic        {"vle", "spec", "a"?, "b"?, "R_range"?}
+    /absorption/run           吸收平台配置字典（同 AssimilatePlatform --config）；
+                              可加 "sink": "memory"|"null"，不写结果目录（memory 时随响应返回各表）
+
+"vle" 可以是已注册名称、VLE 库（data/vle_library）中的体系名，也可以是 {"x": [...], "y": [...]}（按数据哈希缓存）。
+"spec" 字段与 DistillationSpec 构造参数一致。
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+
+from core.vle_data import VLEData
+from core.spec import DistillationSpec
+from core.optimizer import DistillationOptimizer
+from core.session import DistillationSession
+from core.vle_library import open_library
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ASSIMILATE_ROOT = os.path.join(os.path.dirname(HERE), "AssimilatePlatform")
+
+logger = logging.getLogger("chemeng.service")
+
+SPEC_FIELDS = ("xF", "q", "xD", "xW", "R", "consider_murphree", "EM_L", "EM_V", "mode", "tol")
+
+
+class RequestError(ValueError):
+    """请求内容错误，返回 HTTP 400。"""
+
+
+# ==========================================================
+# 吸收平台工作进程
+# 两个平台都使用顶层包名 core / utils，无法在同一解释器中共存，
+# 因此 run_absorption 在独立的常驻子进程中执行。
+# ==========================================================
+def _absorption_worker_init(root, workdir):
+    for name in list(sys.modules):
+        if name in ("core", "utils") or name.startswith(("core.", "utils.")):
+            del sys.modules[name]
+    sys.path.insert(0, root)
+    if workdir:
+        os.makedirs(workdir, exist_ok=True)
+        os.chdir(workdir)
+    import core  # noqa: F401  预热导入
+
+
+def _absorption_task(cfg):
+    from core import run_absorption
+    from utils.sinks import make_sink
+    cfg = dict(cfg)
+    kind = cfg.pop("sink", None)            # "memory" / "null"：不落盘
+    sink = make_sink(kind) if kind in ("memory", "null") else None
+    outdir, summary = run_absorption(cfg, sink=sink)
+    out = {"outdir": os.path.abspath(outdir) if outdir else None, "summary": summary}
+    if kind == "memory":
+        out["tables"] = {k: sink.records(k) for k in sink.tables}
+    return out
+
+
+# ==========================================================
+# 计算（同步，在工作线程中批量执行）
+# ==========================================================
+def _make_spec(payload):
+    raw = payload.get("spec")
+    if not isinstance(raw, dict):
+        raise RequestError("缺少 spec 对象")
+    missing = [k for k in ("xF", "q", "xD", "xW") if k not in raw]
+    if missing:
+        raise RequestError(f"spec 缺少字段：{missing}")
+    return DistillationSpec(**{k: raw[k] for k in SPEC_FIELDS if k in raw})
+
+
+def _column_summary(res, with_profile):
+    df_t, df_r = res["theory"], res["real"]
+    out = {
+        "R_used": float(res["R_used"]),
+        "stages_theory": int(len(df_t)),
+        "stages_real": int(len(df_r)),
+        "achieved": bool(res["achieved"]),
+        "xW_theory": float(df_t["x_theory"].iloc[-1]) if len(df_t) else None,
+        "xW_real": float(df_r["x_real"].iloc[-1]) if len(df_r) else None,
+        "feed_intersection": [float(v) for v in res["lines"][3]],
+    }
+    if with_profile:
+        out["theory"] = df_t.to_dict(orient="list")
+        out["real"] = df_r.to_dict(orient="list")
+    return out
+
+
+class CalculationService:
+    """
+    参数：
+        window_ms : 批处理窗口（毫秒）；首个请求到达后最多等待这么久收集同一批请求
+        max_batch : 单轮最多收集的请求数
+        cache_size: 结果 LRU 容量（相同请求直接命中）
+        absorption_workdir : 吸收计算结果目录的父目录（子进程工作目录）
+    """
+
+    def __init__(self, window_ms=1.0, max_batch=256, cache_size=4096, absorption_workdir=None):
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.cache_size = cache_size
+        self.vles = {}                  # 只整体替换、不就地修改：工作线程读取时不需要加锁
+        self._generation = 0            # 每次注册 VLE 加一，计算期间有注册发生的结果不进缓存
+        self._vle_by_hash = OrderedDict()
+        self._results = OrderedDict()
+        self._queue = None
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calc")
+        self._absorber = ProcessPoolExecutor(
+            max_workers=1, initializer=_absorption_worker_init,
+            initargs=(ASSIMILATE_ROOT, absorption_workdir))
+        self.stats = {"requests": 0, "batches": 0, "computed": 0, "cache_hits": 0, "session_hits": 0}
+        self.handlers = {
+            "/column/run": self._column_run,
+            "/column/rmin": self._column_rmin,
+            "/optimize/find_R_for_N": self._find_R_for_N,
+            "/optimize/economic": self._economic,
+        }
+
+    # ---------- VLE 常驻 ----------
+    def register_vle(self, payload):
+        if not isinstance(payload, dict):
+            raise RequestError("请求体需为 {name, x, y} 对象")
+        name = payload.get("name")
+        if not name:
+            raise RequestError("缺少 name")
+        vle = self._build_vle(payload)
+        self.vles = {**self.vles, name: vle}
+        self._generation += 1
+        self._results.clear()           # 同名体系数据变化后旧结果失效
+        return {"name": name, "points": int(len(vle.x))}
+
+    @staticmethod
+    def _build_vle(payload):
+        """校验 x、y 并立即构造样条（VLEData 的样条是惰性的，不在这里构造的话坏数据要到计算时才报错）"""
+        try:
+            x, y = np.asarray(payload["x"], float), np.asarray(payload["y"], float)
+        except KeyError as e:
+            raise RequestError(f"VLE 缺少字段 {e}") from None
+        except (TypeError, ValueError) as e:
+            raise RequestError(f"VLE 数据需为数值数组：{e}") from None
+        if x.ndim != 1 or y.ndim != 1 or len(x) != len(y):
+            raise RequestError(f"VLE 的 x、y 需为等长的一维数组（当前形状 {x.shape}、{y.shape}）")
+        if len(x) < 2:
+            raise RequestError("VLE 至少需要 2 个数据点")
+        if not (np.all(np.isfinite(x)) and np.all(np.isfinite(y))):
+            raise RequestError("VLE 数据含 NaN 或 inf")
+        if not (np.all(np.diff(x) > 0) and np.all(np.diff(y) > 0)):
+            raise RequestError("VLE 的 x、y 需严格递增")
+        vle = VLEData(x, y)
+        try:
+            vle._build()
+        except ValueError as e:
+            raise RequestError(f"VLE 数据无法插值：{e}") from None
+        return vle
+
+    def _vle(self, payload):
+        ref = payload.get("vle")
+        if isinstance(ref, str):
+            vle = self.vles.get(ref)
+            if vle is not None:
+                return vle
+            library = open_library()
+            if ref not in library:
+                raise RequestError(f"未注册的 VLE：{ref}")
+            return library.get(ref)
+        if not isinstance(ref, dict):
+            raise RequestError("vle 需为已注册名称或 {x, y}")
+        key = hashlib.sha1(json.dumps([ref.get("x"), ref.get("y")]).encode()).hexdigest()
+        vle = self._vle_by_hash.get(key)
+        if vle is None:
+            vle = self._build_vle(ref)
+            self._vle_by_hash[key] = vle
+            if len(self._vle_by_hash) > 64:
+                self._vle_by_hash.popitem(last=False)
+        else:
+            self._vle_by_hash.move_to_end(key)
+        return vle
+
+    # ---------- 各端点计算 ----------
+    def _session(self, p, sessions):
+        """本批次中该请求 VLE 的共享会话（换上本请求的 spec；会话缓存按字段值命中）"""
+        vle, spec = self._vle(p), _make_spec(p)
+        session = sessions.get(id(vle))
+        if session is None:
+            session = sessions[id(vle)] = DistillationSession(spec, vle)
+        else:
+            session.spec = spec
+        return session
+
+    def _column_run(self, p, sessions):
+        res = self._session(p, sessions).run()
+        return _column_summary(res, bool(p.get("profile", False)))
+
+    def _column_rmin(self, p, sessions):
+        return {"Rmin": self._session(p, sessions).compute_Rmin()}
+
+    def _optimizer(self, p, sessions):
+        session = self._session(p, sessions)
+        return DistillationOptimizer(session.spec, session.vle, session)
+
+    def _find_R_for_N(self, p, sessions):
+        if "N" not in p:
+            raise RequestError("缺少 N")
+        R, res = self._optimizer(p, sessions).find_R_for_N(int(p["N"]), tol=p.get("tol", 1e-3),
+                                                           R_max=p.get("R_max", 10.0))
+        return {"R": float(R), **_column_summary(res, False)}
+
+    def _economic(self, p, sessions):
+        res = self._optimizer(p, sessions).economic_optimization(R_range=p.get("R_range"),
+                                                                 a=p.get("a", 1.0), b=p.get("b", 1.0))
+        return {k: (np.asarray(v).tolist() if isinstance(v, (list, np.ndarray)) else
+                    (int(v) if isinstance(v, (int, np.integer)) else float(v)))
+                for k, v in res.items()}
+
+    def _compute_batch(self, jobs):
+        """
+        在工作线程中求值本轮去重后的一批请求；单个失败不影响其他请求。
+        各请求按 VLE 共用会话：同一批中 q、xF、xD 相同的请求只求一次 pinch / Rmin，
+        设计字段相同的逐级计算（如 /column/run 与优化器试探到的同一 R）只做一次。
+        """
+        sessions, out = {}, []
+        for path, payload in jobs:
+            try:
+                out.append((True, self.handlers[path](payload, sessions)))
+            except RequestError as e:
+                out.append((False, (400, str(e))))
+            except Exception as e:
+                out.append((False, (500, f"{type(e).__name__}: {e}")))
+        self.stats["session_hits"] += sum(sess.stats["hits"] for sess in sessions.values())
+        return out
+
+    # ---------- 批处理 ----------
+    async def submit(self, path, payload):
+        key = path + json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        self.stats["requests"] += 1
+        hit = self._results.get(key)
+        if hit is not None:
+            self._results.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return hit
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((key, path, payload, fut))
+        return await fut
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            groups = OrderedDict()
+            for key, path, payload, fut in batch:
+                groups.setdefault(key, (path, payload, []))[2].append(fut)
+
+            jobs = [(path, payload) for path, payload, _ in groups.values()]
+            generation = self._generation
+            results = await loop.run_in_executor(self._thread, self._compute_batch, jobs)
+            cacheable = generation == self._generation
+            self.stats["batches"] += 1
+            self.stats["computed"] += len(jobs)
+
+            for (key, (_, _, futs)), (ok, value) in zip(groups.items(), results):
+                if ok and cacheable:
+                    self._results[key] = value
+                    if len(self._results) > self.cache_size:
+                        self._results.popitem(last=False)
+                for fut in futs:
+                    if fut.done():
+                        continue
+                    if ok:
+                        fut.set_result(value)
+                    else:
+                        fut.set_exception(_HTTPError(*value))
+
+    async def absorption(self, cfg):
+        if not isinstance(cfg, dict):
+            raise RequestError("请求体需为吸收配置对象")
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._absorber, _absorption_task, cfg)
+        except (KeyError, ValueError, RuntimeError) as e:
+            raise _HTTPError(400, f"{type(e).__name__}: {e}") from None
+
+    # ---------- 路由 ----------
+    async def dispatch(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok", "vles": sorted(self.vles), "vle_library": open_library().cache_info(),
+                         **self.stats}
+        if method != "POST":
+            return 405, {"error": "仅支持 POST（GET /health 除外）"}
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError as e:
+            return 400, {"error": f"JSON 解析失败：{e}"}
+        try:
+            if path == "/vle":
+                return 200, self.register_vle(payload)
+            if path == "/absorption/run":
+                return 200, await self.absorption(payload)
+            if path in self.handlers:
+                if not isinstance(payload, dict):
+                    raise RequestError("请求体需为 JSON 对象")
+                return 200, await self.submit(path, payload)
+            return 404, {"error": f"未知接口 {path}"}
+        except RequestError as e:
+            return 400, {"error": str(e)}
+        except _HTTPError as e:
+            return e.status, {"error": e.message}
+        except Exception as e:                  # 兜底：保证每个请求都有响应，不让异常打断连接
+            logger.exception("请求 %s %s 处理失败", method, path)
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    # ---------- HTTP/1.1（keep-alive） ----------
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "bad request line"}, False)
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "bad Content-Length"}, False)
+                    break
+                body = await reader.readexactly(length)
+                keep = (headers.get("connection", "").lower() != "close"
+                        and version.upper() == "HTTP/1.1")
+                status, data = await self.dispatch(method.upper(), target.split("?", 1)[0], body)
+                await self._respond(writer, status, data, keep)
+                if not keep:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, data, keep):
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found",
+                  405: "Method Not Allowed", 500: "Internal Server Error"}.get(status, "")
+        body = json.dumps(data, ensure_ascii=False, default=float).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix=None):
+        self._queue = asyncio.Queue()
+        batcher = asyncio.create_task(self._batch_loop())
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, path=unix)
+            where = unix
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            where = f"http://{host}:{port}"
+        print(f"🚀 计算服务已启动：{where}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self._thread.shutdown(wait=False)
+            self._absorber.shutdown(wait=False)
+
+
+class _HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Warm local calculation service (HTTP or Unix socket).")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--unix", help="listen on a Unix socket path instead of TCP")
+    p.add_argument("--window-ms", type=float, default=1.0, help="batching window")
+    p.add_argument("--max-batch", type=int, default=256, help="max requests evaluated per batch")
+    p.add_argument("--absorption-dir", default=os.path.join(HERE, "results", "absorption"),
+                   help="working directory for run_absorption outputs")
+    args = p.parse_args(argv)
+
+    svc = CalculationService(args.window_ms, args.max_batch, absorption_workdir=args.absorption_dir)
+    try:
+        asyncio.run(svc.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("\n👋 服务已停止。")
+
+
+if __name__ == "__main__":
+    main()
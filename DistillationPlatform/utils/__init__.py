@@ -1,12 +1,32 @@
 from .file_utils import create_result_folder
-from .plotting import plot_mccabe_thiele, plot_optimization_results
+from .plotting import plot_mccabe_thiele, plot_ponchon_savarit, plot_batch_distillation, plot_optimization_results
 from .export import save_results
+from .instrument import PROFILER
+from .config import ConfigError, DistillationCase, compile_case, load_config, load_study, Sweep
+from .sinks import CSVSink, JSONSink, ParquetSink, MemorySink, NullSink, make_sink
+from .shards import ShardQueue
 
 __all__ = [
     "create_result_folder",
     "plot_mccabe_thiele",
+    "plot_ponchon_savarit",
+    "plot_batch_distillation",
     "plot_optimization_results",
-    "save_results"
+    "save_results",
+    "PROFILER",
+    "ConfigError",
+    "DistillationCase",
+    "compile_case",
+    "load_config",
+    "load_study",
+    "Sweep",
+    "CSVSink",
+    "JSONSink",
+    "ParquetSink",
+    "MemorySink",
+    "NullSink",
+    "make_sink",
+    "ShardQueue"
 ]
 __Version__ = "1.0.0"
 __Author__ = "Zhen-Ning Guo"
\ No newline at end of file
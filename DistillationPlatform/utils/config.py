@@ -0,0 +1,505 @@
+# -*- coding: utf-8 -*-
+"""
+config.py
+---------
+类型化配置与惰性参数扫描（与 AssimilatePlatform/utils/config.py 同一套结构，schema 为精馏工况）。
+
+    case = compile_case(load_config("case.json"))   # 只校验一次 → DistillationCase（__slots__ 对象）
+    spec = DistillationSpec.from_config(case)        # 直接取类型化属性，不再逐项 float()
+    study = load_study("study.json")                 # 配置 + "sweep" → Sweep（惰性）
+    for case in study: ...                           # 逐个生成工况对象，不预先展开
+
+配置为扁平的工况字段（见 DISTILLATION）加可选的 "sweep"，各扫描轴做全组合，最后一个轴变化最快：
+
+    "sweep": {
+        "grid":   {"R": {"linspace": [1.0, 4.0, 31]}, "q": [0.8, 1.0, 1.2]},
+        "zip":    {"xD": [0.90, 0.95], "xW": [0.02, 0.01]},
+        "random": {"n": 10000, "seed": 7, "params": {"alpha": {"uniform": [2.0, 3.0]}}}
+    }
+
+也可写成单键 dict 的列表（[{"grid": ...}, {"random": ...}]）以显式指定轴顺序。
+取值可为列表，或 {"linspace"|"logspace": [起, 止, 个数]}、{"arange": [起, 止, 步长]}。
+随机轴按索引分块、由 seed 确定地生成，任一工况都可由其序号复现，不保存逐工况数据。
+
+两个平台的 utils 包同名、不能互相导入，Field / Schema / Sweep 只能各存一份：
+除末尾的 schema 定义外须与吸收平台一致，改动后运行 tools/check_sync.py。
+"""
+
+import os
+import json
+import math
+import hashlib
+import itertools
+
+import numpy as np
+
+
+class ConfigError(ValueError):
+    """配置不符合 schema；消息中列出全部问题。"""
+
+
+# ---------- schema ----------
+class Field:
+    """
+    一个配置项：类型、默认值（None 表示可缺省）、是否必填，
+    以及可选的 check(value) -> bool（须同时支持 numpy 数组逐元素判断）。
+    """
+
+    __slots__ = ("name", "type", "default", "required", "check", "hint")
+
+    def __init__(self, name, type=float, default=None, required=False, check=None, hint=""):
+        self.name, self.type, self.default = name, type, default
+        self.required, self.check, self.hint = required, check, hint
+
+    @property
+    def numeric(self):
+        return self.type in (float, int)
+
+    def coerce(self, value):
+        if value is None or value == "":
+            return self.default
+        if self.type is bool and isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "y")
+        if self.type in (float, int, bool, str):
+            return self.type(float(value)) if self.type is int else self.type(value)
+        return value
+
+
+class Schema:
+    """
+    有序字段集合 + 跨字段规则，编译为带 __slots__ 的工况类（属性访问，无实例 dict）。
+    rules 为 rule(values) -> 错误信息或 None，values 中的值可以是标量或数组。
+    """
+
+    def __init__(self, name, fields, rules=()):
+        self.name = name
+        self.fields = {f.name: f for f in fields}
+        self.rules = tuple(rules)
+        self.case_class = type(name, (CaseBase,), {"__slots__": tuple(self.fields), "_schema": self})
+
+    # ---------- validation ----------
+    def validate(self, cfg):
+        """dict → (全部字段的类型化取值, 未知键)；不合法时抛出 ConfigError"""
+        values, errors, failed = {}, [], set()
+        for name, f in self.fields.items():
+            try:
+                values[name] = f.coerce(cfg.get(name))
+            except (TypeError, ValueError):
+                errors.append(f"{name}：无法将 {cfg.get(name)!r} 转换为 {f.type.__name__}")
+                values[name] = None
+                failed.add(name)
+        errors += self._check(values, failed)
+        if errors:
+            raise ConfigError(f"{self.name}：" + "；".join(errors))
+        extras = {k: v for k, v in cfg.items() if k not in self.fields and k != "sweep"}
+        return values, extras
+
+    def _check(self, values, failed=()):
+        errors = []
+        for name, f in self.fields.items():
+            v = values.get(name)
+            if v is None:
+                if f.required and name not in failed:
+                    errors.append(f"缺少必填参数 {name}")
+                continue
+            if f.check is not None:
+                with np.errstate(invalid="ignore"):
+                    bad = ~np.asarray(f.check(v), dtype=bool)
+                if bad.any():
+                    where = f"（第 {int(np.argmax(bad)) + 1} 个工况）" if np.ndim(bad) else ""
+                    errors.append(f"{name}{where}{f.hint}".rstrip())
+        # 转换失败的字段已单独报错；跨字段规则看到的是不完整的取值，跳过以免重复报错
+        for rule in () if failed else self.rules:
+            msg = rule(values)
+            if msg:
+                errors.append(msg)
+        return errors
+
+    def check_columns(self, values):
+        """对一块扫描列（含广播的标量）做向量化校验"""
+        errors = self._check(values)
+        if errors:
+            raise ConfigError(f"{self.name} 扫描：" + "；".join(errors))
+
+    # ---------- compilation ----------
+    def compile(self, cfg):
+        """dict（或已编译的工况）→ 校验后的工况对象"""
+        if isinstance(cfg, self.case_class):
+            return cfg
+        values, extras = self.validate(dict(cfg))
+        return self.build(values, extras)
+
+    def build(self, values, extras=None):
+        """由已校验的取值直接构造工况（不再检查）"""
+        case = self.case_class.__new__(self.case_class)
+        for name in self.fields:
+            object.__setattr__(case, name, values.get(name))
+        object.__setattr__(case, "_extras", extras or {})
+        return case
+
+
+class CaseBase:
+    """
+    带 __slots__ 的工况对象。同时表现为只读 mapping（case["xF"]、case.get("vle")、"EM_V" in case），
+    便于仍接收配置 dict 的代码直接使用；值为 None 的字段视为缺省。
+    schema 之外的键保存在 extras 中，to_dict() 可还原原始配置。
+    """
+
+    __slots__ = ("_extras",)
+    _schema = None
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self._schema.fields:
+            value = getattr(self, key)
+        else:
+            value = self._extras.get(key)
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def keys(self):
+        return [k for k in itertools.chain(self._schema.fields, self._extras) if k in self]
+
+    def items(self):
+        return [(k, self.get(k)) for k in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    @property
+    def extras(self):
+        return dict(self._extras)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def replace(self, **changes):
+        """修改部分字段后的副本（重新校验）"""
+        return self._schema.compile({**self.to_dict(), **changes})
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} 为只读对象，请使用 replace()")
+
+    def __repr__(self):
+        body = ", ".join(f"{k}={v!r}" for k, v in self.items())
+        return f"{type(self).__name__}({body})"
+
+
+# ---------- sweep axes ----------
+def expand_values(spec):
+    """取值列表，或 {"linspace"|"logspace": [a, b, n]} / {"arange": [a, b, step]} / {"values": [...]}"""
+    if isinstance(spec, dict):
+        (kind, args), = spec.items()
+        if kind == "linspace":
+            return np.linspace(float(args[0]), float(args[1]), int(args[2]))
+        if kind == "logspace":
+            return np.geomspace(float(args[0]), float(args[1]), int(args[2]))
+        if kind == "arange":
+            return np.arange(float(args[0]), float(args[1]), float(args[2]))
+        if kind == "values":
+            return _array(args)
+        raise ConfigError(f"未知取值范围 {kind!r}，可选 linspace/logspace/arange/values")
+    return _array(spec if isinstance(spec, (list, tuple, np.ndarray)) else [spec])
+
+
+def _array(values):
+    values = list(values)
+    if all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in values):
+        return np.asarray(values, dtype=float)
+    return np.asarray(values, dtype=object)
+
+
+class GridAxis:
+    """多个取值列表的全组合（最后一个键变化最快）"""
+
+    def __init__(self, spec):
+        self.columns = {k: expand_values(v) for k, v in spec.items()}
+        self.shape = tuple(len(v) for v in self.columns.values())
+        self.size = math.prod(self.shape)
+
+    def take(self, idx):
+        sub = np.unravel_index(idx, self.shape) if self.shape else ()
+        return {k: v[i] for (k, v), i in zip(self.columns.items(), sub)}
+
+
+class ZipAxis:
+    """多个等长取值列表同步取值"""
+
+    def __init__(self, spec):
+        self.columns = {k: expand_values(v) for k, v in spec.items()}
+        lengths = {len(v) for v in self.columns.values()}
+        if len(lengths) > 1:
+            raise ConfigError(f"zip 扫描的各列表长度不一致：{sorted(lengths)}")
+        self.size = lengths.pop() if lengths else 1
+
+    def take(self, idx):
+        return {k: v[idx] for k, v in self.columns.items()}
+
+
+class RandomAxis:
+    """
+    n 个随机样本（固定 seed）。按 BLOCK 个索引一块由 default_rng([seed, block]) 生成，
+    任意索引区间都可按需、可复现地生成；逐工况迭代时缓存最近一块。
+    """
+
+    BLOCK = 1 << 16
+    DISTRIBUTIONS = ("uniform", "loguniform", "normal", "lognormal", "choice")
+
+    def __init__(self, spec):
+        self.size = int(spec["n"])
+        self.seed = int(spec.get("seed", 0))
+        self.params = {}
+        for k, d in spec["params"].items():
+            (kind, args), = d.items()
+            if kind not in self.DISTRIBUTIONS:
+                raise ConfigError(f"{k}：未知分布 {kind!r}，可选 {self.DISTRIBUTIONS}")
+            self.params[k] = (kind, args)
+        self._cache = (None, None)
+
+    def _block(self, b):
+        if self._cache[0] != b:
+            rng = np.random.default_rng([self.seed, b])
+            cols = {}
+            for k, (kind, args) in self.params.items():
+                if kind == "uniform":
+                    cols[k] = rng.uniform(args[0], args[1], self.BLOCK)
+                elif kind == "loguniform":
+                    cols[k] = np.exp(rng.uniform(math.log(args[0]), math.log(args[1]), self.BLOCK))
+                elif kind == "normal":
+                    cols[k] = rng.normal(args[0], args[1], self.BLOCK)
+                elif kind == "lognormal":
+                    cols[k] = rng.lognormal(args[0], args[1], self.BLOCK)
+                else:
+                    cols[k] = _array(args)[rng.integers(0, len(args), self.BLOCK)]
+            self._cache = (b, cols)
+        return self._cache[1]
+
+    def take(self, idx):
+        idx = np.asarray(idx)
+        if idx.ndim == 0:
+            cols = self._block(int(idx) // self.BLOCK)
+            return {k: v[int(idx) % self.BLOCK] for k, v in cols.items()}
+        out = {k: np.empty(len(idx), dtype=object if kind == "choice" else float)
+               for k, (kind, _) in self.params.items()}
+        blocks = idx // self.BLOCK
+        for b in np.unique(blocks):
+            sel = blocks == b
+            cols = self._block(int(b))
+            for k in out:
+                out[k][sel] = cols[k][idx[sel] % self.BLOCK]
+        return out
+
+
+AXES = {"grid": GridAxis, "zip": ZipAxis, "random": RandomAxis}
+
+
+def _parse_axes(sweep):
+    items = sweep.items() if isinstance(sweep, dict) else [next(iter(a.items())) for a in sweep]
+    axes = []
+    for kind, spec in items:
+        if kind not in AXES:
+            raise ConfigError(f"未知扫描轴 {kind!r}，可选 {sorted(AXES)}")
+        axes.append(AXES[kind](spec))
+    return axes
+
+
+class Sweep:
+    """
+    惰性参数扫描：基础配置 × 各扫描轴的全组合。不保存任何逐工况数据，
+    工况对象（或列数组块）按需生成。
+    """
+
+    def __init__(self, schema, cfg):
+        cfg = dict(cfg)
+        # 原始配置的哈希：分片目录据此拒绝续算另一个扫描
+        self.fingerprint = hashlib.sha1(
+            json.dumps(cfg, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+        self.schema = schema
+        self.axes = _parse_axes(cfg.pop("sweep", None) or {})
+        self.swept = [k for a in self.axes for k in (a.columns if hasattr(a, "columns") else a.params)]
+        dup = {k for k in self.swept if self.swept.count(k) > 1}
+        if dup:
+            raise ConfigError(f"参数出现在多个扫描轴上：{sorted(dup)}")
+        unknown = [k for k in self.swept if k not in schema.fields]
+        if unknown:
+            raise ConfigError(f"{schema.name}：不能扫描未知参数 {unknown}")
+        # 基础配置只校验一次（扫描字段取第一个值占位）
+        probe = {**cfg, **{k: _first(a, k) for a in self.axes for k in self.swept if _owns(a, k)}}
+        self.base, self.extras = schema.validate(probe)
+        for k in self.swept:
+            self.base[k] = None
+        self.shape = tuple(a.size for a in self.axes)
+        self.size = math.prod(self.shape)
+        self.name = cfg.get("case_name") or "case"
+
+    def __len__(self):
+        return self.size
+
+    def _columns(self, idx):
+        sub = np.unravel_index(idx, self.shape) if self.axes else ()
+        cols = {}
+        for axis, i in zip(self.axes, sub):
+            cols.update(axis.take(i))
+        return cols
+
+    def case_name(self, i):
+        if not self.axes:
+            return self.name
+        return f"{self.name}_{i + 1:0{len(str(self.size))}d}"
+
+    def chunks(self, size=100_000, start=0, stop=None):
+        """
+        按 [start, stop) 内的连续索引块依次给出 (start, columns)：扫描字段为数组，其余已设置字段为
+        基础配置中的标量，另含 "case_name"；每块在给出前做一次向量化校验。
+        """
+        stop = self.size if stop is None else min(stop, self.size)
+        for lo in range(start, stop, size):
+            idx = np.arange(lo, min(lo + size, stop))
+            cols = {k: v for k, v in self.base.items() if v is not None}
+            swept = self._columns(idx)
+            for k, v in swept.items():
+                f = self.schema.fields[k]
+                cols[k] = v.astype(float) if f.numeric else v
+            self.schema.check_columns(cols)
+            if "case_name" not in swept:
+                cols["case_name"] = [self.case_name(i) for i in idx.tolist()]
+            yield lo, cols
+
+    def __iter__(self):
+        return self.cases()
+
+    def cases(self, start=0, stop=None):
+        """索引 [start, stop) 内的工况对象，逐个生成"""
+        for _, cols in self.chunks(4096, start, stop):
+            swept = {k: cols[k] for k in self.swept}
+            for j, name in enumerate(cols["case_name"]):
+                values = dict(self.base, case_name=name)
+                for k, v in swept.items():
+                    values[k] = self.schema.fields[k].coerce(v[j].item() if hasattr(v[j], "item") else v[j])
+                yield self.schema.build(values, self.extras)
+
+    def __getitem__(self, i):
+        if not -self.size <= i < self.size:
+            raise IndexError(i)
+        i %= self.size
+        values = dict(self.base, case_name=self.case_name(i))
+        for k, v in self._columns(np.int64(i)).items():
+            values[k] = self.schema.fields[k].coerce(v.item() if hasattr(v, "item") else v)
+        self.schema.check_columns(values)
+        return self.schema.build(values, self.extras)
+
+    def describe(self):
+        return {"n_cases": self.size, "axes": [
+            {"kind": type(a).__name__.replace("Axis", "").lower(), "size": a.size,
+             "params": list(a.columns if hasattr(a, "columns") else a.params)} for a in self.axes]}
+
+
+def _owns(axis, key):
+    return key in (axis.columns if hasattr(axis, "columns") else axis.params)
+
+
+def _first(axis, key):
+    v = axis.take(0)[key]
+    return v.item() if hasattr(v, "item") else v
+
+
+# ---------- 精馏工况 schema ----------
+MODES = ("basic", "azeotropic", "extractive")
+
+
+def _fraction(v):
+    return (v > 0) & (v < 1)
+
+
+def _positive(v):
+    return v > 0
+
+
+def _efficiency(v):
+    return (v > 0) & (v <= 1)
+
+
+def _compositions(values):
+    xF, xD, xW = values.get("xF"), values.get("xD"), values.get("xW")
+    if None not in (xF, xD, xW) and np.any((np.asarray(xW) >= np.asarray(xF)) | (np.asarray(xF) >= np.asarray(xD))):
+        return "组成须满足 xW < xF < xD"
+
+
+def _need_vle(values):
+    if values.get("vle") is None and values.get("alpha") is None:
+        return "需给出 vle（{\"x\", \"y\"} / {\"file\"} / {\"library\"} / {\"alpha\"}）或 alpha"
+
+
+def _known_mode(values):
+    mode = values.get("mode")
+    if mode is not None and not np.all(np.isin(np.char.lower(np.asarray(mode, dtype=str)), MODES)):
+        return f"mode 须为 {MODES} 之一"
+
+
+DISTILLATION = Schema("DistillationCase", [
+    Field("case_name", str, "case"),
+    Field("mode", str, "basic"),
+    Field("xF", float, required=True, check=_fraction, hint=" 须在 (0, 1) 内"),
+    Field("xD", float, required=True, check=_fraction, hint=" 须在 (0, 1) 内"),
+    Field("xW", float, required=True, check=_fraction, hint=" 须在 (0, 1) 内"),
+    Field("q", float, 1.0),
+    Field("R", float, 0.0, check=lambda v: v >= 0, hint=" 须 ≥ 0（0 表示自动取 1.5·Rmin）"),
+    Field("consider_murphree", bool, False),
+    Field("EM_L", float, 1.0, check=_efficiency, hint=" 须在 (0, 1] 内"),
+    Field("EM_V", float, check=_efficiency, hint=" 须在 (0, 1] 内"),
+    Field("tol", float, 1e-6, check=_positive, hint=" 须 > 0"),
+    Field("feed_volume_L", float, 100.0, check=lambda v: v >= 0, hint=" 须 ≥ 0"),
+    Field("feed_density_kg_per_L", float, 1.0, check=_positive, hint=" 须 > 0"),
+    # 平衡数据：vle = {"x": [...], "y": [...]} / {"file": "vle.csv"} / {"library": "methanol_water"} /
+    #          {"alpha": 2.5}，或直接给 alpha（可扫描）
+    Field("vle", object),
+    Field("alpha", float, check=lambda v: v > 1, hint=" 须 > 1"),
+    # 焓–组成数据（给出时按 Ponchon–Savarit 逐级）：{"file": "h.csv"} / {"x", "hL", "y", "HV"} / {"latent": 40000}
+    Field("enthalpy", object),
+    # FUG 简捷法预筛（扫描中剔除 R < R_margin·Rmin 或估算板数 > N_max 的工况，不做逐级计算）：
+    #          {"N_max": 60, "R_margin": 0.9}
+    Field("prescreen", object),
+    # 共沸 / 萃取精馏的平衡线修正参数
+    Field("azeo_x", float, 0.65, check=_fraction, hint=" 须在 (0, 1) 内"),
+    Field("azeo_y", float, 0.65, check=_fraction, hint=" 须在 (0, 1) 内"),
+    Field("azeo_strength", float, -0.05),
+    Field("solvent_ratio", float, 0.2, check=lambda v: v >= 0, hint=" 须 ≥ 0"),
+    Field("alpha_factor", float, 1.3, check=_positive, hint=" 须 > 0"),
+    Field("plot", bool, True),
+], rules=(_compositions, _need_vle, _known_mode))
+
+DistillationCase = DISTILLATION.case_class
+
+
+def load_config(path):
+    """读取 JSON（或 YAML，需 PyYAML）配置文件为 dict"""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8") as f:
+        if ext in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError as e:
+                raise RuntimeError("YAML 配置需要 PyYAML：pip install pyyaml（或改用 JSON 配置）") from e
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def compile_case(cfg):
+    """按 DISTILLATION 校验一次配置 dict → DistillationCase（已编译的工况原样返回）"""
+    return DISTILLATION.compile(cfg)
+
+
+def load_study(path_or_cfg):
+    """配置文件或 dict（可含 "sweep"）→ Sweep；无 sweep 时为单个工况"""
+    cfg = load_config(path_or_cfg) if isinstance(path_or_cfg, str) else path_or_cfg
+    return Sweep(DISTILLATION, cfg)
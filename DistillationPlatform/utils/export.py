@@ -1,6 +1,10 @@
-import json
+from utils.sinks import as_sink
 
-def save_results(result, folder):
-    with open(f"{folder}/summary.json", "w") as f:
-        json.dump(result["summary"], f, indent=4)
-    result["data"].to_csv(f"{folder}/results.csv", index=False)
\ No newline at end of file
+
+def save_results(result, folder=None, sink=None, prefix=None):
+    """把 engine.run 的结果 (summary + data) 写入 sink；只给 folder 时写 CSV/JSON 文件。"""
+    sink = as_sink(sink, folder)
+    stem = f"{prefix}_" if prefix else ""
+    sink.write_json(f"{stem}summary", result["summary"], indent=4)
+    sink.write_table(f"{stem}results", result["data"])
+    return sink
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+instrument.py
+-------------
+可选的热点埋点：阶段计时 (span)、计数器、优化迭代轨迹与 tracemalloc 峰值内存。
+AssimilatePlatform/utils/instrument.py 为同一份代码（两平台互不导入），改动需同步，tools/check_sync.py 检查。
+
+默认关闭，关闭时每个埋点仅一次属性判断。启用方式：
+    from utils.instrument import PROFILER
+    PROFILER.enable(memory=True)
+    ...
+    PROFILER.to_json("profile.json")          # 汇总 + 明细
+    PROFILER.to_chrome_trace("run.trace.json") # chrome://tracing / Perfetto
+
+或通过环境变量在脚本退出时自动导出：
+    CHEMENG_PROFILE=profile.json       JSON 汇总
+    CHEMENG_TRACE=run.trace.json       Chrome trace
+    CHEMENG_PROFILE_MEMORY=1           同时记录每次 run 的峰值内存
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+import tracemalloc
+from collections import Counter, defaultdict
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("prof", "name", "args", "t0", "mem")
+
+    def __init__(self, prof, name, args, mem=False):
+        self.prof = prof
+        self.name = name
+        self.args = args
+        self.mem = mem
+
+    def __enter__(self):
+        if self.mem:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.prof._owns_tracing = True
+            tracemalloc.reset_peak()
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter_ns()
+        rec = {
+            "name": self.name,
+            "ts_us": (self.t0 - self.prof._t_origin) / 1e3,
+            "dur_us": (t1 - self.t0) / 1e3,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": self.args,
+        }
+        if self.mem:
+            rec["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            self.prof.runs.append(rec)
+        self.prof.spans.append(rec)
+        return False
+
+
+class Instrumentation:
+    """埋点收集器；进程内通常只用模块级单例 PROFILER。"""
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self._owns_tracing = False       # tracemalloc 是否由本收集器启动（外部启动的不由 disable() 停止）
+        self.reset()
+
+    # ---------- 开关 ----------
+    def enable(self, memory=False):
+        self.enabled = True
+        self.memory = bool(memory)
+        return self
+
+    def disable(self):
+        self.enabled = False
+        if self._owns_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._owns_tracing = False
+
+    def reset(self):
+        self.spans = []
+        self.runs = []
+        self.counters = Counter()
+        self.traces = defaultdict(list)
+        self._t_origin = time.perf_counter_ns()
+
+    # ---------- 埋点 ----------
+    def span(self, name, **args):
+        """阶段计时：with PROFILER.span("write.csv"): ..."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def run(self, name, **args):
+        """一次完整运行：计时，且在 memory=True 时记录 tracemalloc 峰值内存。"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args, mem=self.memory)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def trace(self, name, **fields):
+        """记录一条迭代轨迹（如优化器每次试探的 R 与 N）。"""
+        if self.enabled:
+            self.traces[name].append(fields)
+
+    # ---------- 汇总与导出 ----------
+    def phases(self):
+        """按 span 名称汇总：次数、总耗时、平均耗时 (ms)。"""
+        agg = {}
+        for s in self.spans:
+            a = agg.setdefault(s["name"], {"calls": 0, "total_ms": 0.0})
+            a["calls"] += 1
+            a["total_ms"] += s["dur_us"] / 1e3
+        for a in agg.values():
+            a["mean_ms"] = a["total_ms"] / a["calls"]
+        return dict(sorted(agg.items(), key=lambda kv: -kv[1]["total_ms"]))
+
+    def summary(self):
+        return {
+            "phases": self.phases(),
+            "counters": dict(self.counters),
+            "runs": [{"name": r["name"], "dur_ms": r["dur_us"] / 1e3,
+                      "peak_bytes": r.get("peak_bytes"), **r["args"]} for r in self.runs],
+            "traces": dict(self.traces),
+        }
+
+    def to_json(self, path, include_spans=True):
+        data = self.summary()
+        if include_spans:
+            data["spans"] = self.spans
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+        return path
+
+    def to_chrome_trace(self, path):
+        """导出 Chrome Trace Event 格式：span 为 X 事件，计数器在末尾以 C 事件给出。"""
+        events = [{"name": s["name"], "ph": "X", "ts": s["ts_us"], "dur": s["dur_us"],
+                   "pid": s["pid"], "tid": s["tid"],
+                   "args": {**s["args"], **({"peak_bytes": s["peak_bytes"]} if "peak_bytes" in s else {})}}
+                  for s in self.spans]
+        end = max((s["ts_us"] + s["dur_us"] for s in self.spans), default=0.0)
+        if self.counters:
+            events.append({"name": "counters", "ph": "C", "ts": end, "pid": os.getpid(),
+                           "args": dict(self.counters)})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        return path
+
+
+PROFILER = Instrumentation()
+
+
+def _auto_export():
+    if os.environ.get("CHEMENG_PROFILE"):
+        PROFILER.to_json(os.environ["CHEMENG_PROFILE"])
+    if os.environ.get("CHEMENG_TRACE"):
+        PROFILER.to_chrome_trace(os.environ["CHEMENG_TRACE"])
+
+
+if os.environ.get("CHEMENG_PROFILE") or os.environ.get("CHEMENG_TRACE"):
+    PROFILER.enable(memory=os.environ.get("CHEMENG_PROFILE_MEMORY", "") not in ("", "0"))
+    atexit.register(_auto_export)
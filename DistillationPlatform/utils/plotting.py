@@ -1,6 +1,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from utils.instrument import PROFILER
 
 def _build_stair_xy_from_points(df_stages: pd.DataFrame, x0: float, y0: float,
                                 x_col: str, y_col: str):
@@ -29,6 +30,11 @@ def _build_stair_xy_from_points(df_stages: pd.DataFrame, x0: float, y0: float,
 
 
 def plot_mccabe_thiele(result, vle, folder):
+    with PROFILER.span("plot.mccabe_thiele"):
+        _plot_mccabe_thiele(result, vle, folder)
+
+
+def _plot_mccabe_thiele(result, vle, folder):
     """
     完整 McCabe–Thiele 图：
       - 平衡线、对角线
@@ -100,7 +106,112 @@ def plot_mccabe_thiele(result, vle, folder):
     plt.savefig(f"{folder}/mccabe_thiele.png", dpi=300)
     plt.close()
 
+def plot_ponchon_savarit(result, vle, enthalpy, folder):
+    with PROFILER.span("plot.ponchon_savarit"):
+        _plot_ponchon_savarit(result, vle, enthalpy, folder)
+
+
+def _plot_ponchon_savarit(result, vle, enthalpy, folder):
+    """
+    焓浓法结果图（ponchon_savarit.png）：
+      左：焓–组成图 —— 饱和液/气相线、差点 Δ_D / Δ_W、进料点、各级平衡线（tie line）与操作线
+      右：对应的 x–y 图 —— 平衡线、理论阶梯、操作曲线（非恒摩尔流时不是直线）
+    result 为 DistillationEngine.run 在给出 enthalpy 时的返回值（含 delta / feed）。
+    """
+    df = result["theory"]
+    delta, feed = result["delta"], result["feed"]
+    xD = delta["x_D"]
+    x, y = df["x_theory"].to_numpy(), df["y_theory"].to_numpy()
+    y_in = np.concatenate(([xD], y[:-1]))        # 各级上升蒸汽（第 1 级为 xD）
+    hl, hv_in = enthalpy.hL_func(x), enthalpy.HV_func(y_in)
+    hv_out = enthalpy.HV_func(y)
+    is_strip = (df["section"] == "stripping").to_numpy()
+
+    xs = np.linspace(0, 1, 400)
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(13, 6))
+
+    ax1.plot(xs, enthalpy.hL_func(xs), color="C0", label="Saturated liquid hL(x)")
+    ax1.plot(xs, enthalpy.HV_func(xs), color="C3", label="Saturated vapor HV(y)")
+    for k in range(len(x)):
+        ax1.plot([x[k], y_in[k]], [hl[k], hv_in[k]], color="0.55", lw=0.8)
+        dx, dh = (delta["x_W"], delta["h_W"]) if is_strip[k] else (xD, delta["h_D"])
+        ax1.plot([dx, y[k]], [dh, hv_out[k]], color="C2" if is_strip[k] else "orange", lw=0.6, alpha=0.7)
+    ax1.plot([xD, delta["x_W"]], [delta["h_D"], delta["h_W"]], "k--", lw=1.0, label="Δ_D – F – Δ_W")
+    ax1.scatter([xD, delta["x_W"]], [delta["h_D"], delta["h_W"]], color="k", zorder=5)
+    ax1.scatter([feed["x"]], [feed["h"]], color="red", s=35, zorder=5, label="Feed")
+    ax1.annotate("Δ_D", (xD, delta["h_D"]), textcoords="offset points", xytext=(-22, 4))
+    ax1.annotate("Δ_W", (delta["x_W"], delta["h_W"]), textcoords="offset points", xytext=(6, 4))
+    ax1.set_xlim(0, 1)
+    ax1.set_xlabel("x, y (mole fraction)")
+    ax1.set_ylabel("Enthalpy")
+    ax1.set_title("Ponchon–Savarit Diagram")
+    ax1.grid(True, alpha=0.3)
+    ax1.legend(loc="best", fontsize=8)
+
+    ax2.plot(xs, [vle.y_star(v) for v in xs], color="C0", label="Equilibrium")
+    ax2.plot(xs, xs, "k--", label="y = x")
+    x_th, y_th = _build_stair_xy_from_points(df, x0=xD, y0=xD, x_col="x_theory", y_col="y_theory")
+    ax2.plot(x_th, y_th, color="orange", linewidth=1.8, label="Theoretical stages")
+    ax2.plot(x, y, ".", color="C2", ms=4, label="Operating curve (x_n, y_n+1)")
+    ax2.set_xlim(0, 1)
+    ax2.set_ylim(0, 1.05)
+    ax2.set_xlabel("x (liquid mole fraction)")
+    ax2.set_ylabel("y (vapor mole fraction)")
+    ax2.set_title("x–y Diagram (non-CMO)")
+    ax2.grid(True, alpha=0.3)
+    ax2.legend(loc="upper left", fontsize=8)
+
+    fig.tight_layout()
+    fig.savefig(f"{folder}/ponchon_savarit.png", dpi=300)
+    plt.close(fig)
+
+
+def plot_batch_distillation(result, folder):
+    with PROFILER.span("plot.batch_distillation"):
+        _plot_batch_distillation(result, folder)
+
+
+def _plot_batch_distillation(result, folder):
+    """
+    间歇精馏过程图（batch_distillation.png）：
+      左：釜液 xW、瞬时馏出 xD 与累计馏出液平均组成随馏出比例 D/W0 的变化
+      右：恒回流比时为釜液量 W(t)，恒馏出组成时为回流比 R(t)
+    """
+    df, s = result["profile"], result["summary"]
+    frac = df["D_total"] / s["W0"]
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+
+    ax1.plot(frac, df["xW"], color="C0", label="Still xW")
+    ax1.plot(frac, df["xD"], color="C3", label="Distillate xD (instant)")
+    ax1.plot(frac, df["xD_avg"], "--", color="C3", label="Distillate xD (accumulated)")
+    ax1.set_xlabel("Fraction distilled D/W0")
+    ax1.set_ylabel("Mole fraction")
+    ax1.set_ylim(0, 1.02)
+    ax1.set_title(f"Batch Distillation ({s['policy']}, N = {s['n_stages']})")
+    ax1.grid(True, alpha=0.3)
+    ax1.legend(loc="best", fontsize=8)
+
+    if s["policy"] == "constant_xD":
+        ax2.plot(df["t"], df["R"], color="C2")
+        ax2.set_ylabel("Reflux ratio R")
+    else:
+        ax2.plot(df["t"], df["W"], color="C2")
+        ax2.set_ylabel("Still holdup W")
+    ax2.set_xlabel("Time")
+    ax2.set_title(f"Stop: {s['stop_reason']} at t = {s['t_final']:.3g}")
+    ax2.grid(True, alpha=0.3)
+
+    fig.tight_layout()
+    fig.savefig(f"{folder}/batch_distillation.png", dpi=300)
+    plt.close(fig)
+
+
 def plot_optimization_results(opt_result, result_folder):
+    with PROFILER.span("plot.optimization"):
+        _plot_optimization_results(opt_result, result_folder)
+
+
+def _plot_optimization_results(opt_result, result_folder):
     """
     绘制经济优化结果图：
     - 回流比 R vs 塔板数 N
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+shards.py
+---------
+分片、可续算的参数扫描，以一个普通目录作协调者（与 AssimilatePlatform/utils/shards.py 同一套布局）。
+
+    root/
+    ├── plan.json              工况数、分片大小、扫描配置指纹（首次写入，续算时核对）
+    ├── claims/00012.claim     正在计算第 12 片的进程的认领（租约）：{"host", "pid", "time"}，mtime 即心跳
+    └── shards/00012.csv       分片结果表，完整写出后改名就位
+        shards/00012.json      分片统计，最后写入：存在即表示该片已完成
+
+第 i 片为工况索引 [i·shard_size, (i+1)·shard_size)，任何机器上的任何进程算同一片得到相同的行。
+工作进程（本机多进程，或共享该目录的多台机器）用 O_CREAT|O_EXCL 创建认领文件；
+属主已不存在（同一主机且 pid 已退出）或心跳超过 lease 秒的认领会被接管。
+分片结果经 os.replace 提交，进程崩溃最多留下临时文件；认领竞争最坏的结果是某一片被算两次、输出相同。
+对同一目录重新运行同一扫描时跳过已完成的分片，merge() 按顺序拼接各片结果表。
+
+两个平台各以顶层 core / utils 包运行、不能互相导入，因此本模块各存一份；
+除文字与 DEFAULT_SHARD_SIZE 外两份代码须相同，由仓库根目录的 tools/check_sync.py 检查。
+"""
+
+import os
+import json
+import time
+import shutil
+import socket
+
+
+PLAN = "plan.json"
+HOST = socket.gethostname()
+DEFAULT_SHARD_SIZE = 2000
+
+
+def _write_json_atomic(path, data):
+    tmp = f"{path}.{HOST}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid):
+    if os.name != "posix":
+        return True                  # Windows 上 os.kill(pid, 0) 会结束该进程，只按租约判断
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ShardQueue:
+    """
+    以 root 为目录的一个分片扫描的工作队列。
+    参数：
+        n_cases, fingerprint : 标识该扫描；目录已规划给另一个扫描时报错
+        shard_size           : 每片工况数；None 时沿用目录中的规划（新目录取 DEFAULT_SHARD_SIZE）
+        lease                : 认领无心跳多少秒后视为放弃；须大于两次 heartbeat() 之间的最长间隔与各主机时钟偏差
+    """
+
+    def __init__(self, root, n_cases, fingerprint, shard_size=None, lease=600.0):
+        self.root = os.path.abspath(root)
+        self.claims = os.path.join(self.root, "claims")
+        self.shards = os.path.join(self.root, "shards")
+        os.makedirs(self.claims, exist_ok=True)
+        os.makedirs(self.shards, exist_ok=True)
+        self.lease = float(lease)
+        self.plan = self._load_plan(int(n_cases), fingerprint, shard_size)
+        self.n_cases = self.plan["n_cases"]
+        self.shard_size = self.plan["shard_size"]
+        self.n_shards = self.plan["n_shards"]
+        self._width = max(5, len(str(self.n_shards - 1)))
+        self._held = {}              # 分片 -> (认领时刻, 上次心跳)，perf_counter 秒
+
+    def _load_plan(self, n_cases, fingerprint, shard_size):
+        path = os.path.join(self.root, PLAN)
+        if not os.path.exists(path):
+            size = int(shard_size or DEFAULT_SHARD_SIZE)
+            tmp = f"{path}.{HOST}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": fingerprint, "n_cases": n_cases, "shard_size": size,
+                           "n_shards": -(-n_cases // size),
+                           "created": time.strftime("%Y-%m-%d %H:%M:%S")}, f, indent=2)
+            try:
+                os.link(tmp, path)   # 不存在才创建且内容完整：先到者的规划生效
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(tmp)
+        with open(path, encoding="utf-8") as f:
+            plan = json.load(f)
+        if plan["fingerprint"] != fingerprint or plan["n_cases"] != n_cases:
+            raise ValueError(f"{self.root} 属于另一个扫描（{plan['n_cases']} 个工况，"
+                             f"指纹 {plan['fingerprint']}），请换一个目录")
+        if shard_size is not None and int(shard_size) != plan["shard_size"]:
+            raise ValueError(f"{self.root} 已按 shard_size={plan['shard_size']} 规划")
+        return plan
+
+    # ---------- 布局 ----------
+    def bounds(self, i):
+        lo = i * self.shard_size
+        return lo, min(lo + self.shard_size, self.n_cases)
+
+    def _name(self, i):
+        return f"{i:0{self._width}d}"
+
+    def table_path(self, i):
+        return os.path.join(self.shards, f"{self._name(i)}.csv")
+
+    def _stats_path(self, i):
+        return os.path.join(self.shards, f"{self._name(i)}.json")
+
+    def _claim_path(self, i):
+        return os.path.join(self.claims, f"{self._name(i)}.claim")
+
+    def temp_name(self, i):
+        """第 i 片在 commit() 之前写入的表名（shards 目录内，不含扩展名）"""
+        return f".{self._name(i)}.{HOST}.{os.getpid()}"
+
+    # ---------- 状态 ----------
+    def pending(self):
+        done = set(os.listdir(self.shards))
+        return [i for i in range(self.n_shards) if f"{self._name(i)}.json" not in done]
+
+    def progress(self):
+        n_pending = len(self.pending())
+        running = sum(1 for f in os.listdir(self.claims) if f.endswith(".claim"))
+        return {"n_shards": self.n_shards, "done": self.n_shards - n_pending,
+                "running": min(running, n_pending), "pending": n_pending}
+
+    def stats(self):
+        """已完成各片的统计（按分片顺序）"""
+        out = []
+        for i in range(self.n_shards):
+            try:
+                with open(self._stats_path(i), encoding="utf-8") as f:
+                    out.append(json.load(f))
+            except FileNotFoundError:
+                pass
+        return out
+
+    # ---------- 认领 ----------
+    def _stale(self, path):
+        """认领仍有效时返回 None，否则返回属主记录（读不出时为 {}）"""
+        try:
+            age = time.time() - os.path.getmtime(path)
+            with open(path, encoding="utf-8") as f:
+                owner = json.load(f)
+        except FileNotFoundError:
+            return None              # 刚被释放；下一轮会看到该片空闲或已完成
+        except ValueError:
+            owner = {}               # 正在写入
+        if owner.get("host") == HOST and "pid" in owner and not _pid_alive(owner["pid"]):
+            owner["dead"] = True
+            return owner
+        return owner if age > self.lease else None
+
+    def claim(self, i):
+        """尝试认领第 i 片；成功（本进程持有）返回 True"""
+        path = self._claim_path(i)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                owner = self._stale(path)
+                if owner is None:
+                    return False
+                try:                 # 只有一个接管者能把失效的认领移走
+                    stale = f"{path}.{HOST}.{os.getpid()}.stale"
+                    os.rename(path, stale)
+                    os.remove(stale)
+                except FileNotFoundError:
+                    return False
+                if owner.get("dead"):            # 已退出进程的半成品可删；只是失联的属主可能仍会提交
+                    try:
+                        os.remove(os.path.join(self.shards, f".{self._name(i)}.{HOST}.{owner['pid']}.csv"))
+                    except FileNotFoundError:
+                        pass
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"host": HOST, "pid": os.getpid(), "time": time.time()}, f)
+            if os.path.exists(self._stats_path(i)):      # 查看期间已被别人完成
+                os.remove(path)
+                return False
+            now = time.perf_counter()
+            self._held[i] = (now, now)
+            return True
+        return False
+
+    def heartbeat(self, i):
+        """刷新第 i 片的租约（至多每 lease/4 秒 touch 一次认领文件，可频繁调用）"""
+        t0, beat = self._held[i]
+        now = time.perf_counter()
+        if now - beat >= self.lease / 4:
+            try:
+                os.utime(self._claim_path(i))
+            except FileNotFoundError:
+                pass
+            self._held[i] = (t0, now)
+
+    def release(self, i):
+        """放弃第 i 片（不提交，临时表删除）"""
+        self._held.pop(i, None)
+        for path in (self._claim_path(i), os.path.join(self.shards, self.temp_name(i) + ".csv")):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def commit(self, i, stats):
+        """临时表改名就位，再写分片统计（即标记完成）"""
+        t0, _ = self._held.get(i, (time.perf_counter(), None))
+        lo, hi = self.bounds(i)
+        os.replace(os.path.join(self.shards, self.temp_name(i) + ".csv"), self.table_path(i))
+        _write_json_atomic(self._stats_path(i), {
+            "shard": i, "start": lo, "stop": hi, **stats, "host": HOST, "pid": os.getpid(),
+            "seconds": time.perf_counter() - t0, "finished": time.strftime("%Y-%m-%d %H:%M:%S")})
+        self.release(i)
+
+    def work(self, fn):
+        """
+        反复认领并计算分片，直到没有可认领的分片。fn(i, start, stop) 把结果表 temp_name(i)
+        写入 shards 目录并返回该片统计；其他进程/机器正持有的分片留给它们。返回本进程完成的分片数。
+        """
+        n = 0
+        while True:
+            claimed = False
+            for i in self.pending():
+                if not self.claim(i):
+                    continue
+                claimed = True
+                try:
+                    stats = fn(i, *self.bounds(i))
+                except BaseException:
+                    self.release(i)
+                    raise
+                self.commit(i, stats)
+                n += 1
+            if not claimed:
+                return n
+
+    # ---------- 合并 ----------
+    def merge(self, dest):
+        """按分片顺序把各片结果表拼接为 dest（只保留一行表头），原子替换"""
+        tmp = f"{dest}.{HOST}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as out:
+            for i in range(self.n_shards):
+                with open(self.table_path(i), "rb") as f:
+                    if i:
+                        f.readline()
+                    shutil.copyfileobj(f, out, 1 << 20)
+        os.replace(tmp, dest)
+        return dest
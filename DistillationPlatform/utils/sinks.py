@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+sinks.py
+--------
+结果输出接口（Result Sink）：每个产物只生成一次，由 sink 决定写到哪里。
+
+    CSVSink(folder)      表格 → {name}.csv，文档 → {name}.json（默认，与原有输出一致）
+    JSONSink(folder)     表格 → {name}.json（records），文档 → {name}.json
+    ParquetSink(folder)  表格 → {name}.parquet（需 pyarrow 或 fastparquet），文档 → {name}.json
+    MemorySink()         全部保存在内存（.tables / .documents），零文件 I/O
+    NullSink()           丢弃全部输出（批量扫描只取返回值时使用）
+
+只有带目录的 sink（sink.folder 非空）才会生成图片等纯文件产物。
+逐块生成的长表用 append_table() 分块写入：CSV 追加到同一文件，内存 sink 按块拼接，
+其余 sink 暂存各块、在 close() 时一次写出。
+
+与 AssimilatePlatform/utils/sinks.py 的类与语义相同，但表格参数不同：这里传 DataFrame
+（write_table(name, df, **csv_kwargs)），因为精馏引擎本身就以 DataFrame 产出结果；
+吸收平台不依赖 pandas、扫描按行流式写出上百万行，故那边为 (name, columns, rows, formats)。
+两个平台的顶层包名都是 core / utils，不能共用一个模块，各自保留适合调用方的签名。
+"""
+
+import os
+import json
+
+import pandas as pd
+
+
+class ResultSink:
+    """结果输出基类。"""
+
+    folder = None
+
+    def __init__(self):
+        self._pending = {}           # append_table() 暂存的分块，close() 时写出
+
+    def write_table(self, name, df, **csv_kwargs):
+        raise NotImplementedError
+
+    def write_json(self, name, data, **json_kwargs):
+        raise NotImplementedError
+
+    def append_table(self, name, df, **csv_kwargs):
+        """分块写表：默认暂存，close() 时合并写出"""
+        self._pending.setdefault(name, ([], csv_kwargs))[0].append(df)
+
+    def path(self, filename):
+        """带目录 sink 中某个文件的完整路径；无目录时返回 None。"""
+        return os.path.join(self.folder, filename) if self.folder else None
+
+    def close(self):
+        pending, self._pending = self._pending, {}
+        for name, (frames, csv_kwargs) in pending.items():
+            self.write_table(name, pd.concat(frames, ignore_index=True), **csv_kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class _FolderSink(ResultSink):
+    def __init__(self, folder):
+        super().__init__()
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+
+    def write_json(self, name, data, **json_kwargs):
+        json_kwargs.setdefault("indent", 2)
+        json_kwargs.setdefault("ensure_ascii", False)
+        with open(self.path(f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, default=float, **json_kwargs)
+
+
+class CSVSink(_FolderSink):
+    def __init__(self, folder):
+        super().__init__(folder)
+        self._started = set()        # 已由 append_table() 创建的表
+
+    def write_table(self, name, df, **csv_kwargs):
+        csv_kwargs.setdefault("index", False)
+        df.to_csv(self.path(f"{name}.csv"), **csv_kwargs)
+
+    def append_table(self, name, df, **csv_kwargs):
+        csv_kwargs.setdefault("index", False)
+        df.to_csv(self.path(f"{name}.csv"), mode="a" if name in self._started else "w",
+                  header=name not in self._started, **csv_kwargs)
+        self._started.add(name)
+
+
+class JSONSink(_FolderSink):
+    def write_table(self, name, df, **csv_kwargs):
+        df.to_json(self.path(f"{name}.json"), orient="records", indent=2, force_ascii=False)
+
+
+class ParquetSink(_FolderSink):
+    def write_table(self, name, df, **csv_kwargs):
+        try:
+            df.to_parquet(self.path(f"{name}.parquet"), index=False)
+        except ImportError as e:
+            raise RuntimeError(
+                "Parquet 输出需要 pyarrow 或 fastparquet：pip install pyarrow"
+            ) from e
+
+
+class MemorySink(ResultSink):
+    def __init__(self):
+        super().__init__()
+        self.tables = {}
+        self.documents = {}
+
+    def write_table(self, name, df, **csv_kwargs):
+        self.tables[name] = df
+
+    def append_table(self, name, df, **csv_kwargs):
+        prev = self.tables.get(name)
+        self.tables[name] = df if prev is None else pd.concat([prev, df], ignore_index=True)
+
+    def write_json(self, name, data, **json_kwargs):
+        self.documents[name] = data
+
+
+class NullSink(ResultSink):
+    def write_table(self, name, df, **csv_kwargs):
+        pass
+
+    def append_table(self, name, df, **csv_kwargs):
+        pass
+
+    def write_json(self, name, data, **json_kwargs):
+        pass
+
+
+SINKS = {"csv": CSVSink, "json": JSONSink, "parquet": ParquetSink,
+         "memory": MemorySink, "null": NullSink}
+
+
+def make_sink(kind="csv", folder=None):
+    """按名称构造 sink；csv/json/parquet 需要 folder。"""
+    try:
+        cls = SINKS[kind]
+    except KeyError:
+        raise ValueError(f"未知 sink 类型 {kind!r}，可选：{sorted(SINKS)}") from None
+    if cls in (MemorySink, NullSink):
+        return cls()
+    if not folder:
+        raise ValueError(f"{kind} sink 需要输出目录")
+    return cls(folder)
+
+
+def as_sink(sink=None, folder=None):
+    """兼容旧接口：传入 sink 直接使用；只给目录时使用 CSVSink；都没有则 NullSink。"""
+    if sink is not None:
+        return sink
+    return CSVSink(folder) if folder else NullSink()
+
+
+def table(rows, columns):
+    """把行列表转成 DataFrame 的便捷函数。"""
+    return pd.DataFrame(rows, columns=columns)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+check_sync.py
+-------------
+检查两个平台之间复制的模块是否仍然一致。
+
+AssimilatePlatform 与 DistillationPlatform 各自以顶层 core / utils 包运行，
+两边的包同名、互相不能导入，共用的基础模块只能各放一份（见 SHARED）。
+本脚本逐个比较两份的顶层定义（函数、类、赋值、import）：忽略文档字符串、注释与
+字符串字面量（两边的提示语分别为英文/中文），其余代码须完全相同；
+每个文件可列出允许只属于一个平台或两边不同的顶层名字（各自的 schema、默认分片大小等）。
+
+    python tools/check_sync.py          # 一致时退出码 0，否则列出差异并返回 1
+"""
+
+import ast
+import difflib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLATFORMS = ("AssimilatePlatform", "DistillationPlatform")
+
+# 相对平台目录的路径 -> 允许两边不同的顶层名字
+SHARED = {
+    "core/stepping.py": set(),
+    "utils/config.py": {
+        "import os", "load_config", "compile_case", "load_study",
+        "ABSORPTION", "AbsorptionCase", "_non_negative", "_need_m", "_yf_above_yn",
+        "DISTILLATION", "DistillationCase", "MODES", "_fraction", "_efficiency",
+        "_compositions", "_need_vle", "_known_mode",
+    },
+    "utils/shards.py": {"DEFAULT_SHARD_SIZE"},
+    "utils/instrument.py": set(),
+    "benchmarks/harness.py": set(),
+}
+
+
+class _Normalize(ast.NodeTransformer):
+    """去掉文档字符串，字符串字面量与 f-string 一律替换为空串"""
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, str):
+            return ast.copy_location(ast.Constant(""), node)
+        return node
+
+    def visit_JoinedStr(self, node):
+        return ast.copy_location(ast.Constant(""), node)
+
+    def generic_visit(self, node):
+        body = getattr(node, "body", None)
+        if (isinstance(body, list) and body and isinstance(body[0], ast.Expr)
+                and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str)):
+            node.body = body[1:] or [ast.Pass()]
+        return super().generic_visit(node)
+
+
+def _key(stmt):
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return stmt.name
+    if isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+        target = stmt.targets[0] if isinstance(stmt, ast.Assign) else stmt.target
+        if isinstance(target, ast.Name):
+            return target.id
+    return ast.unparse(stmt).splitlines()[0]
+
+
+def top_level(path):
+    """文件 -> {顶层名字: 规范化后的源码}"""
+    with open(path, encoding="utf-8") as f:
+        tree = _Normalize().visit(ast.parse(f.read(), path))
+    return {_key(stmt): ast.unparse(stmt) for stmt in tree.body}
+
+
+def compare(rel, allowed=()):
+    """返回一个文件两份之间的差异描述列表（空列表表示一致）"""
+    a, b = (top_level(os.path.join(ROOT, p, rel)) for p in PLATFORMS)
+    problems = []
+    for name in [k for k in a if k not in b] + [k for k in b if k not in a]:
+        if name not in allowed:
+            where = PLATFORMS[0] if name in a else PLATFORMS[1]
+            problems.append(f"{rel}: {name} 只在 {where} 中")
+    for name in a:
+        if name in b and name not in allowed and a[name] != b[name]:
+            diff = difflib.unified_diff(a[name].splitlines(), b[name].splitlines(),
+                                        *PLATFORMS, lineterm="", n=1)
+            problems.append(f"{rel}: {name} 两边不同\n" + "\n".join(diff))
+    return problems
+
+
+def main():
+    problems = []
+    for rel, allowed in SHARED.items():
+        problems += compare(rel, allowed)
+    if problems:
+        print("\n\n".join(problems))
+        print(f"\n❌ {len(problems)} 处不同步（改动复制模块时两个平台需同步修改）")
+        return 1
+    print(f"✅ {len(SHARED)} 个复制模块两平台一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())